@@ -0,0 +1,76 @@
+"""add flexquery report store + section state
+
+Revision ID: 5a1c7e2d9f01
+Revises: 4f2c9d0f5b23
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "5a1c7e2d9f01"
+down_revision = "4f2c9d0f5b23"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+
+    if not insp.has_table("flexquery_reports"):
+        op.create_table(
+            "flexquery_reports",
+            sa.Column("id", sa.Integer(), primary_key=True, nullable=False),
+            sa.Column("account_number", sa.String(length=50), nullable=False),
+            sa.Column("digest", sa.String(length=64), nullable=False),
+            sa.Column("payload", sa.LargeBinary(), nullable=False),
+            sa.Column("raw_size", sa.Integer(), nullable=True),
+            sa.Column("section_hashes", sa.JSON(), nullable=True),
+            sa.Column(
+                "fetched_at",
+                sa.DateTime(timezone=True),
+                server_default=sa.text("CURRENT_TIMESTAMP"),
+                nullable=False,
+            ),
+            sa.UniqueConstraint("account_number", "digest", name="uq_flexquery_report_digest"),
+        )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_flexquery_reports_id ON flexquery_reports (id);"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_flexquery_reports_account_number ON flexquery_reports (account_number);"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_flexquery_report_account_time ON flexquery_reports (account_number, fetched_at);"
+    )
+
+    if not insp.has_table("flexquery_section_state"):
+        op.create_table(
+            "flexquery_section_state",
+            sa.Column("id", sa.Integer(), primary_key=True, nullable=False),
+            sa.Column("account_number", sa.String(length=50), nullable=False),
+            sa.Column("section", sa.String(length=64), nullable=False),
+            sa.Column("section_hash", sa.String(length=64), nullable=False),
+            sa.Column("report_digest", sa.String(length=64), nullable=True),
+            sa.Column(
+                "synced_at",
+                sa.DateTime(timezone=True),
+                server_default=sa.text("CURRENT_TIMESTAMP"),
+                nullable=False,
+            ),
+            sa.UniqueConstraint("account_number", "section", name="uq_flexquery_section_state"),
+        )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_flexquery_section_state_id ON flexquery_section_state (id);"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_flexquery_section_state_account_number ON flexquery_section_state (account_number);"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("flexquery_section_state")
+    op.drop_table("flexquery_reports")
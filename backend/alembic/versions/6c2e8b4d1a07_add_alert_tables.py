@@ -0,0 +1,142 @@
+"""add alert tables (alerts, conditions, templates, history)
+
+Revision ID: 6c2e8b4d1a07
+Revises: 5a1c7e2d9f01
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "6c2e8b4d1a07"
+down_revision = "5a1c7e2d9f01"
+branch_labels = None
+depends_on = None
+
+# Tables created here carry this comment; downgrade drops only those, so tables that
+# already existed (e.g. from Base.metadata.create_all before the models were
+# registered) are left alone.
+OWNER_COMMENT = "created by revision 6c2e8b4d1a07"
+TABLES = ("alert_history", "alert_templates", "alert_conditions", "alerts")
+
+
+def upgrade() -> None:
+    # Databases stamped before the alert models were registered in backend.models lack
+    # these tables; fresh ones already get them from the baseline's create_all.
+    bind = op.get_bind()
+    existing = set(sa.inspect(bind).get_table_names())
+
+    if "alerts" not in existing:
+        op.create_table(
+            "alerts",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("name", sa.String(length=100), nullable=False),
+            sa.Column("description", sa.Text()),
+            sa.Column("symbol", sa.String(length=20), nullable=False),
+            sa.Column("alert_type", sa.String(length=50), nullable=False),
+            sa.Column("is_active", sa.Boolean()),
+            sa.Column("is_repeating", sa.Boolean()),
+            sa.Column("max_triggers", sa.Integer()),
+            sa.Column("current_triggers", sa.Integer()),
+            sa.Column("notify_discord", sa.Boolean()),
+            sa.Column("notify_email", sa.Boolean()),
+            sa.Column("notify_app", sa.Boolean()),
+            sa.Column("priority", sa.String(length=10)),
+            sa.Column("sound_enabled", sa.Boolean()),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("updated_at", sa.DateTime(timezone=True)),
+            sa.Column("last_triggered", sa.DateTime(timezone=True)),
+            sa.Column("expires_at", sa.DateTime(timezone=True)),
+            sa.Column("custom_message", sa.Text()),
+            comment=OWNER_COMMENT,
+        )
+        op.create_index("ix_alerts_id", "alerts", ["id"])
+        op.create_index("ix_alerts_symbol", "alerts", ["symbol"])
+
+    if "alert_conditions" not in existing:
+        op.create_table(
+            "alert_conditions",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("alert_id", sa.Integer(), sa.ForeignKey("alerts.id"), nullable=False),
+            sa.Column("condition_type", sa.String(length=50), nullable=False),
+            sa.Column("operator", sa.String(length=20), nullable=False),
+            sa.Column("target_value", sa.Float(), nullable=False),
+            sa.Column("current_value", sa.Float()),
+            sa.Column("indicator_params", sa.JSON()),
+            sa.Column("timeframe", sa.String(length=10)),
+            sa.Column("is_met", sa.Boolean()),
+            sa.Column("last_checked", sa.DateTime(timezone=True)),
+            sa.Column("times_met", sa.Integer()),
+            sa.Column("logical_operator", sa.String(length=10)),
+            sa.Column("group_id", sa.Integer()),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            comment=OWNER_COMMENT,
+        )
+        op.create_index("ix_alert_conditions_id", "alert_conditions", ["id"])
+    else:
+        # CROSSES_ABOVE / CROSSES_BELOW do not fit the original VARCHAR(10)
+        op.alter_column(
+            "alert_conditions",
+            "operator",
+            type_=sa.String(length=20),
+            existing_type=sa.String(length=10),
+            existing_nullable=False,
+        )
+
+    if "alert_templates" not in existing:
+        op.create_table(
+            "alert_templates",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("name", sa.String(length=100), nullable=False),
+            sa.Column("description", sa.Text()),
+            sa.Column("category", sa.String(length=50)),
+            sa.Column("template_config", sa.JSON()),
+            sa.Column("is_public", sa.Boolean()),
+            sa.Column("usage_count", sa.Integer()),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            comment=OWNER_COMMENT,
+        )
+        op.create_index("ix_alert_templates_id", "alert_templates", ["id"])
+
+    if "alert_history" not in existing:
+        op.create_table(
+            "alert_history",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("alert_id", sa.Integer(), sa.ForeignKey("alerts.id"), nullable=False),
+            sa.Column("triggered_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("trigger_price", sa.Numeric(10, 4)),
+            sa.Column("trigger_value", sa.Float()),
+            sa.Column("condition_met", sa.String(length=200)),
+            sa.Column("discord_sent", sa.Boolean()),
+            sa.Column("email_sent", sa.Boolean()),
+            sa.Column("app_notification_sent", sa.Boolean()),
+            sa.Column("message_title", sa.String(length=200)),
+            sa.Column("message_body", sa.Text()),
+            sa.Column("user_acknowledged", sa.Boolean()),
+            sa.Column("acknowledged_at", sa.DateTime(timezone=True)),
+            sa.Column("market_conditions", sa.JSON()),
+            sa.Column("portfolio_impact", sa.JSON()),
+            comment=OWNER_COMMENT,
+        )
+        op.create_index("ix_alert_history_id", "alert_history", ["id"])
+
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_alerts_active_symbol ON alerts (is_active, symbol);"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_alert_conditions_alert_id ON alert_conditions (alert_id);"
+    )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    existing = set(inspector.get_table_names())
+    op.execute("DROP INDEX IF EXISTS idx_alerts_active_symbol;")
+    op.execute("DROP INDEX IF EXISTS ix_alert_conditions_alert_id;")
+    for table in TABLES:
+        if table in existing and (inspector.get_table_comment(table) or {}).get("text") == OWNER_COMMENT:
+            op.drop_table(table)
@@ -0,0 +1,68 @@
+"""add symbol_fundamentals store
+
+Revision ID: 7d3f1a9c2b15
+Revises: 6c2e8b4d1a07
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "7d3f1a9c2b15"
+down_revision = "6c2e8b4d1a07"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+
+    if not insp.has_table("symbol_fundamentals"):
+        op.create_table(
+            "symbol_fundamentals",
+            sa.Column("id", sa.Integer(), primary_key=True, nullable=False),
+            sa.Column("symbol", sa.String(length=20), nullable=False),
+            sa.Column("name", sa.String(length=200), nullable=True),
+            sa.Column("sector", sa.String(length=100), nullable=True),
+            sa.Column("industry", sa.String(length=100), nullable=True),
+            sa.Column("sub_industry", sa.String(length=100), nullable=True),
+            sa.Column("market_cap", sa.Float(), nullable=True),
+            sa.Column("source", sa.String(length=20), nullable=True),
+            sa.Column(
+                "refreshed_at",
+                sa.DateTime(timezone=True),
+                server_default=sa.text("CURRENT_TIMESTAMP"),
+                nullable=False,
+            ),
+        )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_symbol_fundamentals_id ON symbol_fundamentals (id);"
+    )
+    op.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ix_symbol_fundamentals_symbol ON symbol_fundamentals (symbol);"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_fundamentals_refreshed ON symbol_fundamentals (refreshed_at);"
+    )
+
+    # Seed from the latest stored snapshots so the first recompute does not start cold.
+    # refreshed_at is backdated so the next bulk refresh re-validates these rows.
+    op.execute(
+        """
+        INSERT INTO symbol_fundamentals (symbol, name, sector, industry, sub_industry, market_cap, source, refreshed_at)
+        SELECT DISTINCT ON (symbol)
+               symbol, name, sector, industry, sub_industry, market_cap, 'snapshot', TIMESTAMPTZ 'epoch'
+        FROM market_snapshot
+        WHERE analysis_type = 'technical_snapshot'
+          AND (sector IS NOT NULL OR industry IS NOT NULL OR market_cap IS NOT NULL)
+        ORDER BY symbol, analysis_timestamp DESC
+        ON CONFLICT (symbol) DO NOTHING;
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("symbol_fundamentals")
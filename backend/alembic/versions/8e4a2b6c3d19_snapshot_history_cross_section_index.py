@@ -0,0 +1,27 @@
+"""market_snapshot_history cross-section index (analysis_type, as_of_date, symbol)
+
+Revision ID: 8e4a2b6c3d19
+Revises: 7d3f1a9c2b15
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "8e4a2b6c3d19"
+down_revision = "7d3f1a9c2b15"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # uq_symbol_type_asof leads with symbol, so "all symbols on date D" scanned the table.
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_hist_type_date_symbol "
+        "ON market_snapshot_history (analysis_type, as_of_date, symbol);"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_hist_type_date_symbol;")
@@ -0,0 +1,30 @@
+"""job_run.profile for opt-in sampling profiles
+
+Revision ID: 9f5b3c7d4e20
+Revises: 8e4a2b6c3d19
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "9f5b3c7d4e20"
+down_revision = "8e4a2b6c3d19"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+    if not insp.has_table("job_run"):
+        return
+    columns = {c["name"] for c in insp.get_columns("job_run")}
+    if "profile" not in columns:
+        op.add_column("job_run", sa.Column("profile", sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE job_run DROP COLUMN IF EXISTS profile;")
@@ -0,0 +1,190 @@
+"""replace activity materialized views with incrementally refreshed tables
+
+Revision ID: a1c4e7f2b9d3
+Revises: 9f5b3c7d4e20
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "a1c4e7f2b9d3"
+down_revision = "9f5b3c7d4e20"
+branch_labels = None
+depends_on = None
+
+
+ACTIVITY_UNION = """
+    SELECT
+        t.execution_time AS ts,
+        DATE(t.execution_time) AS day,
+        t.account_id,
+        t.symbol,
+        'TRADE'::text AS category,
+        t.side AS side,
+        t.quantity::numeric AS quantity,
+        t.price::numeric AS price,
+        t.total_value::numeric AS amount,
+        NULL::numeric AS net_amount,
+        (COALESCE(t.commission,0) + COALESCE(t.fees,0))::numeric AS commission,
+        'trades'::text AS src,
+        t.id AS src_id,
+        t.execution_id AS external_id
+    FROM trades t
+    UNION ALL
+    SELECT
+        tr.transaction_date AS ts,
+        DATE(tr.transaction_date) AS day,
+        tr.account_id,
+        tr.symbol,
+        tr.transaction_type::text AS category,
+        CASE WHEN tr.transaction_type::text IN ('BUY','SELL') THEN tr.action ELSE NULL END AS side,
+        tr.quantity::numeric AS quantity,
+        tr.trade_price::numeric AS price,
+        tr.amount::numeric AS amount,
+        tr.net_amount::numeric AS net_amount,
+        COALESCE(tr.commission,0)::numeric AS commission,
+        'transactions'::text AS src,
+        tr.id AS src_id,
+        tr.external_id AS external_id
+    FROM transactions tr
+    UNION ALL
+    SELECT
+        d.ex_date AS ts,
+        DATE(d.ex_date) AS day,
+        d.account_id,
+        d.symbol,
+        'DIVIDEND'::text AS category,
+        NULL::text AS side,
+        d.shares_held::numeric AS quantity,
+        d.dividend_per_share::numeric AS price,
+        d.total_dividend::numeric AS amount,
+        d.net_dividend::numeric AS net_amount,
+        COALESCE(d.tax_withheld,0)::numeric AS commission,
+        'dividends'::text AS src,
+        d.id AS src_id,
+        d.external_id AS external_id
+    FROM dividends d
+"""
+
+DAILY_SELECT = """
+    SELECT
+        day,
+        account_id,
+        COUNT(*) FILTER (WHERE category = 'TRADE') AS trade_count,
+        COUNT(*) FILTER (WHERE category = 'TRADE' AND UPPER(COALESCE(side,'-')) = 'BUY') AS buy_count,
+        COUNT(*) FILTER (WHERE category = 'TRADE' AND UPPER(COALESCE(side,'-')) = 'SELL') AS sell_count,
+        COALESCE(SUM(quantity) FILTER (WHERE category = 'TRADE' AND UPPER(COALESCE(side,'-')) = 'BUY'), 0) AS buy_qty,
+        COALESCE(SUM(quantity) FILTER (WHERE category = 'TRADE' AND UPPER(COALESCE(side,'-')) = 'SELL'), 0) AS sell_qty,
+        COALESCE(SUM(COALESCE(net_amount, amount)) FILTER (
+            WHERE (category = 'TRADE' AND UPPER(COALESCE(side,'-')) = 'SELL')
+               OR category IN ('DIVIDEND','BROKER_INTEREST_RECEIVED','TAX_REFUND','DEPOSIT')
+        ), 0) AS money_in,
+        COALESCE(SUM(ABS(COALESCE(net_amount, amount))) FILTER (
+            WHERE (category = 'TRADE' AND UPPER(COALESCE(side,'-')) = 'BUY')
+               OR category IN ('COMMISSION','OTHER_FEE','BROKER_INTEREST_PAID','WITHDRAWAL','TRANSFER')
+        ), 0) AS money_out
+    FROM {source}
+    WHERE day IS NOT NULL
+    GROUP BY day, account_id
+"""
+
+COLUMNS = (
+    "ts, day, account_id, symbol, category, side, quantity, price, amount, "
+    "net_amount, commission, src, src_id, external_id"
+)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+    if not all(insp.has_table(t) for t in ("trades", "transactions", "dividends")):
+        return
+
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS portfolio_activity (
+            ts TIMESTAMPTZ,
+            day DATE,
+            account_id INTEGER NOT NULL,
+            symbol TEXT,
+            category TEXT,
+            side TEXT,
+            quantity NUMERIC,
+            price NUMERIC,
+            amount NUMERIC,
+            net_amount NUMERIC,
+            commission NUMERIC,
+            src TEXT NOT NULL,
+            src_id INTEGER NOT NULL,
+            external_id TEXT,
+            PRIMARY KEY (src, src_id)
+        );
+        """
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS idx_portfolio_activity_account_day ON portfolio_activity (account_id, day);")
+    op.execute("CREATE INDEX IF NOT EXISTS idx_portfolio_activity_ts ON portfolio_activity (ts DESC);")
+    op.execute("CREATE INDEX IF NOT EXISTS idx_portfolio_activity_day ON portfolio_activity (day);")
+    op.execute("CREATE INDEX IF NOT EXISTS idx_portfolio_activity_symbol ON portfolio_activity (UPPER(symbol));")
+    op.execute("CREATE INDEX IF NOT EXISTS idx_portfolio_activity_category ON portfolio_activity (category);")
+
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS portfolio_activity_daily (
+            day DATE NOT NULL,
+            account_id INTEGER NOT NULL,
+            trade_count BIGINT NOT NULL DEFAULT 0,
+            buy_count BIGINT NOT NULL DEFAULT 0,
+            sell_count BIGINT NOT NULL DEFAULT 0,
+            buy_qty NUMERIC NOT NULL DEFAULT 0,
+            sell_qty NUMERIC NOT NULL DEFAULT 0,
+            money_in NUMERIC NOT NULL DEFAULT 0,
+            money_out NUMERIC NOT NULL DEFAULT 0,
+            PRIMARY KEY (account_id, day)
+        );
+        """
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS idx_portfolio_activity_daily_day ON portfolio_activity_daily (day DESC);")
+
+    # Initial fill (idempotent: only when empty)
+    op.execute(
+        f"""
+        INSERT INTO portfolio_activity ({COLUMNS})
+        SELECT {COLUMNS} FROM ({ACTIVITY_UNION}) u
+        WHERE NOT EXISTS (SELECT 1 FROM portfolio_activity);
+        """
+    )
+    op.execute(
+        f"""
+        INSERT INTO portfolio_activity_daily
+        SELECT * FROM ({DAILY_SELECT.format(source='portfolio_activity')}) s
+        WHERE NOT EXISTS (SELECT 1 FROM portfolio_activity_daily);
+        """
+    )
+
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS portfolio_activity_daily_mv;")
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS portfolio_activity_mv;")
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+    op.execute("DROP TABLE IF EXISTS portfolio_activity_daily;")
+    op.execute("DROP TABLE IF EXISTS portfolio_activity;")
+    if not all(insp.has_table(t) for t in ("trades", "transactions", "dividends")):
+        return
+    op.execute(f"CREATE MATERIALIZED VIEW IF NOT EXISTS portfolio_activity_mv AS {ACTIVITY_UNION};")
+    op.execute("CREATE INDEX IF NOT EXISTS idx_activity_day ON portfolio_activity_mv (day);")
+    op.execute("CREATE INDEX IF NOT EXISTS idx_activity_ts ON portfolio_activity_mv (ts DESC);")
+    op.execute("CREATE INDEX IF NOT EXISTS idx_activity_account ON portfolio_activity_mv (account_id);")
+    op.execute("CREATE INDEX IF NOT EXISTS idx_activity_symbol ON portfolio_activity_mv (symbol);")
+    op.execute("CREATE INDEX IF NOT EXISTS idx_activity_category ON portfolio_activity_mv (category);")
+    op.execute(
+        "CREATE MATERIALIZED VIEW IF NOT EXISTS portfolio_activity_daily_mv AS "
+        + DAILY_SELECT.format(source="portfolio_activity_mv").replace("WHERE day IS NOT NULL", "")
+        + ";"
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS idx_activity_daily_day ON portfolio_activity_daily_mv (day DESC);")
+    op.execute("CREATE INDEX IF NOT EXISTS idx_activity_daily_account ON portfolio_activity_daily_mv (account_id);")
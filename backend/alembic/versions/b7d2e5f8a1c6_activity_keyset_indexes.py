@@ -0,0 +1,80 @@
+"""activity feed keyset indexes and normalized symbol
+
+Revision ID: b7d2e5f8a1c6
+Revises: a1c4e7f2b9d3
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "b7d2e5f8a1c6"
+down_revision = "a1c4e7f2b9d3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+
+    if insp.has_table("portfolio_activity"):
+        columns = {c["name"] for c in insp.get_columns("portfolio_activity")}
+        if "symbol_upper" not in columns:
+            op.add_column("portfolio_activity", sa.Column("symbol_upper", sa.Text(), nullable=True))
+        op.execute("UPDATE portfolio_activity SET symbol_upper = UPPER(symbol) WHERE symbol_upper IS DISTINCT FROM UPPER(symbol);")
+        # The feed is ordered by ts; rows without one are no longer materialized
+        op.execute("DELETE FROM portfolio_activity WHERE ts IS NULL;")
+        op.execute("ALTER TABLE portfolio_activity ALTER COLUMN ts SET NOT NULL;")
+
+        op.execute("DROP INDEX IF EXISTS idx_portfolio_activity_ts;")
+        op.execute("DROP INDEX IF EXISTS idx_portfolio_activity_symbol;")
+        op.execute("DROP INDEX IF EXISTS idx_portfolio_activity_category;")
+        # Keyset order (ts, src, src_id) behind each common equality filter
+        op.execute("CREATE INDEX IF NOT EXISTS idx_portfolio_activity_feed ON portfolio_activity (ts, src, src_id);")
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS idx_portfolio_activity_account_feed "
+            "ON portfolio_activity (account_id, ts, src, src_id);"
+        )
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS idx_portfolio_activity_account_category_feed "
+            "ON portfolio_activity (account_id, category, ts, src, src_id);"
+        )
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS idx_portfolio_activity_account_symbol_feed "
+            "ON portfolio_activity (account_id, symbol_upper, ts, src, src_id);"
+        )
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS idx_portfolio_activity_symbol_feed "
+            "ON portfolio_activity (symbol_upper, ts, src, src_id);"
+        )
+
+    # Base tables: per-account time scans used by scoped refreshes and the live fallback
+    if insp.has_table("trades"):
+        op.execute("CREATE INDEX IF NOT EXISTS idx_trades_account_time ON trades (account_id, execution_time, id);")
+    if insp.has_table("transactions"):
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS idx_transactions_account_date ON transactions (account_id, transaction_date, id);"
+        )
+    if insp.has_table("dividends"):
+        op.execute("CREATE INDEX IF NOT EXISTS idx_dividends_account_exdate ON dividends (account_id, ex_date, id);")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_dividends_account_exdate;")
+    op.execute("DROP INDEX IF EXISTS idx_transactions_account_date;")
+    op.execute("DROP INDEX IF EXISTS idx_trades_account_time;")
+    op.execute("DROP INDEX IF EXISTS idx_portfolio_activity_symbol_feed;")
+    op.execute("DROP INDEX IF EXISTS idx_portfolio_activity_account_symbol_feed;")
+    op.execute("DROP INDEX IF EXISTS idx_portfolio_activity_account_category_feed;")
+    op.execute("DROP INDEX IF EXISTS idx_portfolio_activity_account_feed;")
+    op.execute("DROP INDEX IF EXISTS idx_portfolio_activity_feed;")
+    bind = op.get_bind()
+    if sa.inspect(bind).has_table("portfolio_activity"):
+        op.execute("ALTER TABLE portfolio_activity ALTER COLUMN ts DROP NOT NULL;")
+        op.execute("ALTER TABLE portfolio_activity DROP COLUMN IF EXISTS symbol_upper;")
+        op.execute("CREATE INDEX IF NOT EXISTS idx_portfolio_activity_ts ON portfolio_activity (ts DESC);")
+        op.execute("CREATE INDEX IF NOT EXISTS idx_portfolio_activity_symbol ON portfolio_activity (UPPER(symbol));")
+        op.execute("CREATE INDEX IF NOT EXISTS idx_portfolio_activity_category ON portfolio_activity (category);")
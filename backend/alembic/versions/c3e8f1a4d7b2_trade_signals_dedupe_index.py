@@ -0,0 +1,29 @@
+"""trade_signals index for recent-signal dedupe
+
+Revision ID: c3e8f1a4d7b2
+Revises: b7d2e5f8a1c6
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "c3e8f1a4d7b2"
+down_revision = "b7d2e5f8a1c6"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if sa.inspect(bind).has_table("trade_signals"):
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS idx_trade_signals_strategy_symbol_time "
+            "ON trade_signals (strategy_name, symbol, created_at);"
+        )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_trade_signals_strategy_symbol_time;")
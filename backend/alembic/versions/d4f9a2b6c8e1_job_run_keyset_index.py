@@ -0,0 +1,28 @@
+"""job_run (started_at, id) index for keyset pagination
+
+Revision ID: d4f9a2b6c8e1
+Revises: c3e8f1a4d7b2
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "d4f9a2b6c8e1"
+down_revision = "c3e8f1a4d7b2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if sa.inspect(bind).has_table("job_run"):
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS idx_jobrun_started_id ON job_run (started_at, id);"
+        )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_jobrun_started_id;")
@@ -5,7 +5,7 @@ Replaces the massive monolithic API routes with focused, organized endpoints.
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 import logging
 from datetime import datetime
 
@@ -49,6 +49,8 @@ from backend.services.clients.tastytrade_client import (
 )
 from backend.services.portfolio.account_config_service import account_config_service
 from backend.api.routes.auth import get_password_hash
+from backend.services.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsMiddleware, render_latest
+from backend.services.market.service_container import market_data_container
 
 logger = logging.getLogger(__name__)
 
@@ -76,6 +78,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request latency / in-flight metrics (exposed at /metrics)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 
 # Create database tables
 @app.on_event("startup")
@@ -215,10 +221,25 @@ async def startup_event():
         except Exception as ne:
             logger.warning(f"Instrument normalization skipped: {ne}")
 
+        # Shared MarketDataService with pooled Redis / provider connections
+        try:
+            market_data_container.startup()
+        except Exception as ce:
+            logger.warning(f"Market data container startup failed: {ce}")
+
     except Exception as e:
         logger.error(f"❌ Startup error: {e}")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release pooled connections."""
+    try:
+        market_data_container.shutdown()
+    except Exception as e:
+        logger.warning(f"Market data container shutdown failed: {e}")
+
+
 # Health check endpoint
 @app.get("/health")
 async def health_check():
@@ -231,6 +252,14 @@ async def health_check():
     }
 
 
+# Prometheus scrape endpoint
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    if not settings.METRICS_ENABLED:
+        return JSONResponse(status_code=404, content={"detail": "Metrics disabled"})
+    return Response(content=render_latest(), media_type=METRICS_CONTENT_TYPE)
+
+
 # API root
 @app.get("/")
 async def root():
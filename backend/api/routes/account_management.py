@@ -21,7 +21,7 @@ from backend.database import get_db
 from backend.models import BrokerAccount, BrokerType, AccountType, AccountStatus, SyncStatus
 from backend.models.position import Position
 from backend.models.tax_lot import TaxLot
-from backend.services.portfolio.broker_sync_service import broker_sync_service
+from backend.services.portfolio.sync_orchestrator import sync_orchestrator
 from backend.tasks.celery_app import celery_app
 from celery.result import AsyncResult
 from fastapi import Query
@@ -232,21 +232,10 @@ async def sync_broker_account(
 async def sync_all_accounts(
     current_user: User = Depends(get_current_user), db: Session = Depends(get_db)
 ):
-    """Sync all enabled broker accounts for the user."""
+    """Sync all enabled broker accounts for the user (in parallel, per-broker caps)."""
     try:
-        accounts = (
-            db.query(BrokerAccount)
-            .filter(BrokerAccount.user_id == current_user.id, BrokerAccount.is_enabled == True)
-            .all()
-        )
-        results: Dict[str, Any] = {}
-        for account in accounts:
-            key = f"{account.broker.value}_{account.account_number}"
-            try:
-                results[key] = broker_sync_service.sync_account(account.account_number, db)
-            except ValueError as ve:
-                results[key] = {"status": "skipped", "reason": str(ve)}
-        return results
+        report = await sync_orchestrator.sync_accounts(user_id=current_user.id)
+        return report["results"]
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error syncing accounts: {str(e)}")
@@ -334,10 +323,10 @@ async def refresh_prices(
     ),
     db: Session = Depends(get_db),
 ) -> Dict[str, Any]:
-    from backend.services.market.market_data_service import MarketDataService
+    from backend.services.market.service_container import get_market_data_service
 
     try:
-        market_service = MarketDataService()
+        market_service = get_market_data_service()
 
         # Load target positions
         q = db.query(BrokerAccount, Position).join(
@@ -27,12 +27,13 @@ async def get_activity(
     category: Optional[str] = Query(None, description="TRADE, DIVIDEND, COMMISSION, etc."),
     side: Optional[str] = Query(None, description="BUY or SELL"),
     limit: int = Query(200, ge=1, le=1000),
-    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    offset: int = Query(0, ge=0, description="Deprecated; use cursor"),
     user: User | None = Depends(get_optional_user),
     db = Depends(get_db),
 ) -> Dict[str, Any]:
     try:
-        rows = activity_aggregator.get_activity(
+        page = activity_aggregator.get_activity_page(
             db=db,
             account_id=account_id,
             start=start,
@@ -41,10 +42,16 @@ async def get_activity(
             category=category,
             side=side,
             limit=limit,
+            cursor=cursor,
             offset=offset,
             use_mv=True,
         )
-        return {"status": "success", "data": {"activity": rows}}
+        return {
+            "status": "success",
+            "data": {"activity": page["rows"], "next_cursor": page["next_cursor"]},
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -74,13 +81,17 @@ async def get_activity_daily_summary(
 
 @router.post("/activity/refresh")
 async def refresh_activity_materialized_views(
+    account_id: Optional[int] = Query(None, description="Only rebuild this account"),
+    since: Optional[date] = Query(None, description="Only rebuild days on or after this date"),
     user: User | None = Depends(get_optional_user),
     db = Depends(get_db),
 ) -> Dict[str, Any]:
     try:
-        res = activity_aggregator.refresh_materialized_views(db)
+        res = activity_aggregator.refresh(
+            db,
+            account_ids=[account_id] if account_id is not None else None,
+            since=since,
+        )
         return {"status": "success", "data": res}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-
-
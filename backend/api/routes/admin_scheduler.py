@@ -8,9 +8,11 @@ import json
 from backend.api.dependencies import get_admin_user
 from backend.database import SessionLocal
 from backend.models.user import User
+from backend.services.job_history import job_history
 from backend.services.market.market_data_service import market_data_service
 from backend.tasks.celery_app import celery_app
 from backend.tasks.job_catalog import CATALOG
+from backend.tasks.queues import run_now_queue
 from backend.tasks.schedule_metadata import (
     ScheduleMetadata,
     ScheduleMetadataPatch,
@@ -77,6 +79,25 @@ def _paused_payload_to_schedule(data: Dict[str, Any]) -> Optional[Dict[str, Any]
     }
 
 
+def _attach_job_history(schedules: List[Dict[str, Any]]) -> None:
+    """Fill last_run/stats for all schedules with one latest-run and one stats query."""
+    names = {str(s["task"]).split(".")[-1]: s for s in schedules if s.get("task")}
+    if not names:
+        return
+    db = SessionLocal()
+    try:
+        latest = job_history.latest_by_task(db, names)
+        stats = job_history.duration_stats(db, task_names=names)
+    except Exception:
+        return
+    finally:
+        db.close()
+    for s in schedules:
+        simple = str(s.get("task") or "").split(".")[-1]
+        s["last_run"] = latest.get(simple)
+        s["stats"] = stats.get(simple)
+
+
 class ScheduleCreate(BaseModel):
     name: str
     task: str
@@ -106,27 +127,6 @@ async def list_schedules(
         scheduler = rb.RedBeatScheduler(app=celery_app)
         entries = list(scheduler.rdb.scan_iter(match="redbeat:*:task"))
         out: List[Dict[str, Any]] = []
-        # Helper to fetch last run for a given dotted task path
-        def _last_run_for_task(dotted_task: str) -> Dict[str, Any] | None:
-            try:
-                simple = dotted_task.split(".")[-1]
-                from backend.database import SessionLocal
-                from backend.models.market_data import JobRun
-                db = SessionLocal()
-                try:
-                    row = db.query(JobRun).filter(JobRun.task_name == simple).order_by(JobRun.started_at.desc()).first()
-                    if not row:
-                        return None
-                    return {
-                        "task_name": row.task_name,
-                        "status": row.status,
-                        "started_at": getattr(row.started_at, "isoformat", lambda: None)(),
-                        "finished_at": getattr(row.finished_at, "isoformat", lambda: None)(),
-                    }
-                finally:
-                    db.close()
-            except Exception:
-                return None
         for key in entries:
             try:
                 e = rb.RedBeatSchedulerEntry.from_key(key.decode() if isinstance(key, bytes) else key, app=celery_app)
@@ -143,7 +143,7 @@ async def list_schedules(
                         "kwargs": e.kwargs or {},
                         "enabled": True,
                         "source": "redbeat",
-                        "last_run": _last_run_for_task(e.task),
+                        "last_run": None,
                         "metadata": meta.model_dump() if meta else None,
                         "status": "active",
                     }
@@ -163,6 +163,7 @@ async def list_schedules(
                     out.append(paused_entry)
         except Exception:
             pass
+        _attach_job_history(out)
         return {"schedules": out, "mode": "redbeat"}
     except Exception:
         # Fallback to static config
@@ -183,6 +184,7 @@ async def list_schedules(
                     "metadata": None,
                 }
             )
+        _attach_job_history(out)
         return {"schedules": out, "mode": "static"}
 
 
@@ -354,12 +356,14 @@ async def run_now(
     task: str = Query(..., description="dotted task path"),
     args: Optional[List[Any]] = None,
     kwargs: Optional[Dict[str, Any]] = None,
+    queue: Optional[str] = Query(None, description="override; defaults to interactive unless the task is long-running"),
     admin_user: User = Depends(get_admin_user),
 ) -> Dict[str, Any]:
     """Immediately enqueue a task (one-off) on Celery."""
+    target = queue or run_now_queue(task)
     try:
-        res = celery_app.send_task(task, args=(args or ()), kwargs=(kwargs or {}))
-        return {"status": "ok", "task_id": res.id}
+        res = celery_app.send_task(task, args=(args or ()), kwargs=(kwargs or {}), queue=target)
+        return {"status": "ok", "task_id": res.id, "queue": target}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
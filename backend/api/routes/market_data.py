@@ -8,12 +8,13 @@ Providers are used only for OHLCV backfills (paid provider prioritized).
 
 import json
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Body
+from fastapi import APIRouter, Depends, HTTPException, Query, Body, Request, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import func, distinct
 from typing import List, Dict, Any, Callable, Optional
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
 
 # dependencies
 from backend.database import get_db
@@ -22,7 +23,12 @@ from backend.services.market.market_data_service import (
     MarketDataService,
     compute_coverage_status,
 )
-from backend.services.market.universe import tracked_symbols
+from backend.services.market.service_container import get_market_data_service
+from backend.services.market.universe import tracked_symbols, tracked_universe
+from backend.services.market.bar_series import BarSeries, etag_matches, series_etag
+from backend.services.market import snapshot_query
+from backend.services.market.snapshot_query import LEDGER_COLUMNS
+from backend.services.market.universe_digest import format_discord, universe_digest
 from backend.models.market_data import MarketSnapshot, MarketSnapshotHistory
 from backend.tasks.market_data_tasks import (
     record_daily_history,
@@ -39,7 +45,7 @@ from backend.api.dependencies import get_optional_user, get_admin_user, get_mark
 from backend.models.index_constituent import IndexConstituent
 from backend.models.market_data import PriceData
 from backend.models.market_data import JobRun
-from backend.api.routes.utils import serialize_job_runs
+from backend.services.job_history import job_history
 from backend.tasks.market_data_tasks import backfill_5m_last_n_days, enforce_price_data_retention, backfill_5m_for_symbols
 from backend.tasks.market_data_tasks import monitor_coverage_health
 from backend.tasks.market_data_tasks import bootstrap_daily_coverage_tracked
@@ -59,7 +65,7 @@ def _visibility_scope() -> str:
 
 def _tracked_universe_symbols(db: Session) -> List[str]:
     """Return tracked universe symbols (Redis tracked:all preferred, DB fallback)."""
-    svc = MarketDataService()
+    svc = get_market_data_service()
     return tracked_symbols(db, redis_client=svc.redis_client)
 
 
@@ -313,7 +319,7 @@ async def get_current_price(
 ) -> Dict[str, Any]:
     """Get current price for a symbol."""
     try:
-        market_service = MarketDataService()
+        market_service = get_market_data_service()
         price = await market_service.get_current_price(symbol)
 
         return {
@@ -327,51 +333,60 @@ async def get_current_price(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+_BAR_CACHE_CONTROL = "private, no-cache"
+
+
+def _bars_response(
+    series: BarSeries,
+    *,
+    meta: Dict[str, Any],
+    fmt: str,
+    etag: str,
+) -> Any:
+    """Render a BarSeries as legacy rows, column arrays or streamed NDJSON."""
+    headers = {"ETag": etag, "Cache-Control": _BAR_CACHE_CONTROL}
+    meta = {**meta, "count": len(series), "total": series.total, "downsample": series.downsample}
+    if fmt == "ndjson":
+        return StreamingResponse(series.iter_ndjson(meta), media_type="application/x-ndjson", headers=headers)
+    body = {**meta, "columns": series.to_columns()} if fmt == "columns" else {**meta, "bars": series.to_rows()}
+    return Response(content=json.dumps(body), media_type="application/json", headers=headers)
+
+
 @router.get("/history/{symbol}")
 async def get_history(
+    request: Request,
     symbol: str,
     period: str = Query("1y", description="e.g., 1mo, 3mo, 6mo, 1y, 2y, 5y"),
     interval: str = Query("1d", description="1d, 4h, 1h, 5m"),
+    max_points: int | None = Query(None, ge=10, le=20000, description="Downsample to at most this many bars"),
+    downsample: str = Query("ohlc", regex="^(ohlc|lttb)$"),
+    fmt: str = Query("rows", alias="format", regex="^(rows|columns|ndjson)$"),
     user: User | None = Depends(get_optional_user),
-) -> Dict[str, Any]:
+) -> Any:
     """
     Daily/intraday OHLCV series for the symbol using MarketDataService policy.
-    Returns list of { time, open, high, low, close, volume } with time as ISO.
+
+    format=rows (default): bars as [{ time (ISO), open, high, low, close, volume }].
+    format=columns: columns as { time: [unix s], open: [...], ... }.
+    format=ndjson: streamed header line, then [time, open, high, low, close, volume] lines.
+    Responses carry an ETag keyed on the last bar; If-None-Match returns 304.
     """
     try:
-        svc = MarketDataService()
+        svc = get_market_data_service()
         # Pass max_bars=None so longer periods (e.g., 3y) are not trimmed to default 270
         df = await svc.get_historical_data(symbol=symbol.upper(), period=period, interval=interval, max_bars=None)
         if df is None or df.empty:
             raise HTTPException(status_code=404, detail="No historical data")
-        # Expect newest->first index; convert to ascending by date
-        try:
-            df_out = df.iloc[::-1].copy()
-        except Exception:
-            df_out = df
-        # Normalize columns
-        cols = {c.lower(): c for c in df_out.columns}
-        def pick(col_name: str) -> str:
-            for key in cols:
-                if key.startswith(col_name):
-                    return cols[key]
-            return col_name
-        o = pick("open")
-        h = pick("high")
-        l = pick("low")
-        c = pick("close")
-        v = pick("volume")
-        out = []
-        for ts, row in df_out.iterrows():
-            out.append({
-                "time": ts.isoformat() if hasattr(ts, "isoformat") else str(ts),
-                "open": float(row.get(o, None) or row.get("open_price", 0) or 0),
-                "high": float(row.get(h, None) or row.get("high_price", 0) or 0),
-                "low": float(row.get(l, None) or row.get("low_price", 0) or 0),
-                "close": float(row.get(c, None) or row.get("close_price", 0) or 0),
-                "volume": float(row.get(v, 0) or 0),
-            })
-        return {"symbol": symbol.upper(), "period": period, "interval": interval, "bars": out}
+        series = BarSeries.from_frame(df)
+        etag = series_etag(symbol, interval, series.last_time, len(series), (period, max_points, downsample, fmt))
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": _BAR_CACHE_CONTROL})
+        return _bars_response(
+            series.downsampled(max_points, downsample),
+            meta={"symbol": symbol.upper(), "period": period, "interval": interval},
+            fmt=fmt,
+            etag=etag,
+        )
     except HTTPException:
         raise
     except Exception as e:
@@ -516,6 +531,75 @@ async def get_snapshots(
     return {"count": len(out), "rows": out}
 
 
+def _parse_as_of(value: str, name: str) -> datetime:
+    try:
+        return datetime.fromisoformat(value).replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=None)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid {name}: expected YYYY-MM-DD")
+
+
+def _split_csv(value: str | None) -> List[str] | None:
+    items = [v.strip() for v in (value or "").split(",") if v.strip()]
+    return items or None
+
+
+@router.get("/technical/cross-section")
+async def get_snapshot_cross_section(
+    as_of_date: str | None = Query(None, description="YYYY-MM-DD; defaults to the latest ledger date"),
+    fields: str | None = Query(None, description="Comma-separated ledger columns (default: all)"),
+    filter: List[str] = Query([], description="field:op:value, op in eq|ne|gt|gte|lt|lte|in|isnull|notnull"),
+    symbols: str | None = Query(None, description="Optional comma-separated symbol subset"),
+    cursor: str | None = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(500, ge=1, le=5000),
+    user: User | None = Depends(get_optional_user),
+    db: Session = Depends(get_db),
+) -> Dict[str, Any]:
+    """Point-in-time cross-section of the snapshot ledger: every symbol on one date."""
+    as_of = _parse_as_of(as_of_date, "as_of_date") if as_of_date else None
+    try:
+        return snapshot_query.cross_section(
+            db,
+            as_of,
+            fields=_split_csv(fields),
+            filters=filter,
+            symbols=_split_csv(symbols),
+            cursor=cursor,
+            limit=limit,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/technical/cross-section/stage-transitions")
+async def get_stage_transitions(
+    from_date: str = Query(..., description="YYYY-MM-DD"),
+    to_date: str = Query(..., description="YYYY-MM-DD"),
+    from_stage: str | None = Query(None),
+    to_stage: str | None = Query(None),
+    fields: str | None = Query(None, description="Comma-separated ledger columns from the to_date row"),
+    filter: List[str] = Query([], description="field:op:value applied to the to_date row"),
+    cursor: str | None = Query(None),
+    limit: int = Query(500, ge=1, le=5000),
+    user: User | None = Depends(get_optional_user),
+    db: Session = Depends(get_db),
+) -> Dict[str, Any]:
+    """Symbols whose stage_label changed between two ledger dates."""
+    try:
+        return snapshot_query.stage_transitions(
+            db,
+            _parse_as_of(from_date, "from_date"),
+            _parse_as_of(to_date, "to_date"),
+            from_stage=from_stage,
+            to_stage=to_stage,
+            fields=_split_csv(fields),
+            filters=filter,
+            cursor=cursor,
+            limit=limit,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.get("/technical/snapshot-history/{symbol}")
 async def get_snapshot_history(
     symbol: str,
@@ -536,45 +620,8 @@ async def get_snapshot_history(
     )
     out = []
     for r in reversed(rows):  # oldest->newest
-        # Build a stable snapshot dict from wide columns (no JSON payload).
-        col_names = [c.name for c in r.__table__.columns]
-        preferred = [
-            "symbol",
-            "analysis_type",
-            "analysis_timestamp",
-            "as_of_date",
-            "current_price",
-            "market_cap",
-            "sector",
-            "industry",
-            "sub_industry",
-            "stage_label",
-            "stage_label_5d_ago",
-            "rs_mansfield_pct",
-            "sma_5",
-            "sma_14",
-            "sma_21",
-            "sma_50",
-            "sma_100",
-            "sma_150",
-            "sma_200",
-            "atr_14",
-            "atr_30",
-            "atrp_14",
-            "atrp_30",
-            "atr_distance",
-            "atr_value",
-            "atr_percent",
-            "range_pos_20d",
-            "range_pos_50d",
-            "range_pos_52w",
-            "rsi",
-            "macd",
-            "macd_signal",
-        ]
-        ordered = [k for k in preferred if k in col_names]
-        ordered.extend([k for k in col_names if k not in set(ordered) and k not in {"id"}])
-        payload = {k: getattr(r, k) for k in ordered}
+        # Stable snapshot dict from wide columns (column order resolved once at import).
+        payload = {k: getattr(r, k) for k in LEDGER_COLUMNS}
         out.append(
             {
                 "as_of_date": r.as_of_date.isoformat() if hasattr(r.as_of_date, "isoformat") else str(r.as_of_date),
@@ -588,20 +635,32 @@ async def get_snapshot_history(
 async def admin_backfill_snapshot_history_last_n_days(
     days: int = Query(200, ge=1, le=3000),
     since_date: str | None = Query(None, description="Optional YYYY-MM-DD; overrides days by selecting all available trading days since date"),
+    fan_out: bool = Query(True, description="Run symbol chunks in parallel on bulk workers"),
+    restart: bool = Query(False, description="Discard the checkpoint of an unfinished run instead of resuming it"),
     user: User = Depends(get_admin_user),
 ) -> Dict[str, Any]:
-    """Backfill MarketSnapshotHistory for the last N trading days (DB-only)."""
-    return _enqueue_task(backfill_snapshot_history_last_n_days, days, since_date=since_date)
+    """Backfill MarketSnapshotHistory for the last N trading days (DB-only, chunked and resumable)."""
+    return _enqueue_task(
+        backfill_snapshot_history_last_n_days, days, since_date=since_date, fan_out=fan_out, restart=restart
+    )
 
 
 @router.post("/admin/backfill/daily-since-date")
 async def admin_backfill_daily_since_date(
     since_date: str = Query("2021-01-01", description="YYYY-MM-DD"),
-    batch_size: int = Query(25, ge=1, le=200),
+    batch_size: int = Query(
+        25,
+        ge=1,
+        le=200,
+        deprecated=True,
+        description="Deprecated and ignored; symbols are chunked by BACKFILL_CHUNK_SIZE",
+    ),
+    fan_out: bool = Query(True, description="Run symbol chunks in parallel on bulk workers"),
+    restart: bool = Query(False, description="Discard the checkpoint of an unfinished run instead of resuming it"),
     _admin: User = Depends(get_admin_user),
 ) -> Dict[str, Any]:
-    """Deep daily OHLCV backfill since a given date for the tracked universe (provider fetch)."""
-    return _enqueue_task(backfill_daily_since_date, since_date, batch_size)
+    """Deep daily OHLCV backfill since a given date for the tracked universe (provider fetch, chunked and resumable)."""
+    return _enqueue_task(backfill_daily_since_date, since_date, batch_size, fan_out=fan_out, restart=restart)
 
 
 @router.post("/admin/backfill/daily-last-bars")
@@ -656,7 +715,7 @@ async def admin_task_status(
 
 
 # =============================================================================
-# MarketSnapshot → Discord Digest (manual trigger; scheduled later)
+# MarketSnapshot → Discord Digest (manual trigger; scheduled via send_universe_digest)
 # =============================================================================
 
 
@@ -671,7 +730,8 @@ async def admin_send_snapshot_digest_to_discord(
 ) -> Dict[str, Any]:
     """Send a compact snapshot digest to Discord (Bot token).
 
-    Manual trigger today; reuse the same builder for scheduled sends later.
+    Uses the cached universe digest; the scheduled `send_universe_digest` task
+    sends the same content.
     """
     if not discord_bot_client.is_configured():
         raise HTTPException(status_code=400, detail="DISCORD_BOT_TOKEN not configured")
@@ -682,72 +742,19 @@ async def admin_send_snapshot_digest_to_discord(
             detail="No channel_id provided and DISCORD_BOT_DEFAULT_CHANNEL_ID not set",
         )
 
-    tracked = _tracked_universe_symbols(db)
-    if not tracked:
+    digest = universe_digest.get(db, limit=limit)
+    if not digest["universe"]:
         raise HTTPException(status_code=400, detail="No tracked symbols available")
 
-    sym_set = set(tracked)
-    rows = (
-        db.query(MarketSnapshot)
-        .filter(
-            MarketSnapshot.analysis_type == "technical_snapshot",
-            MarketSnapshot.symbol.in_(sym_set),
-        )
-        .order_by(MarketSnapshot.symbol.asc(), MarketSnapshot.analysis_timestamp.desc())
-        .distinct(MarketSnapshot.symbol)
-        .all()
-    )
-
-    total = len(tracked)
-    have = len(rows)
-
-    # Stage distribution
-    stage_counts: Dict[str, int] = {}
-    for r in rows:
-        lbl = getattr(r, "stage_label", None) or "UNKNOWN"
-        stage_counts[str(lbl)] = stage_counts.get(str(lbl), 0) + 1
-    stage_counts_sorted = sorted(stage_counts.items(), key=lambda kv: (-kv[1], kv[0]))
-
-    # Top RS (Mansfield %)
-    def rs_val(r) -> float:
-        try:
-            v = getattr(r, "rs_mansfield_pct", None)
-            return float(v) if v is not None else float("-inf")
-        except Exception:
-            return float("-inf")
-
-    top_rs = sorted(rows, key=rs_val, reverse=True)[: int(limit)]
-    top_lines: List[str] = []
-    for r in top_rs:
-        sym = getattr(r, "symbol", "")
-        rs = getattr(r, "rs_mansfield_pct", None)
-        stage = getattr(r, "stage_label", None) or "?"
-        try:
-            rs_fmt = f"{float(rs):.1f}%" if rs is not None else "—"
-        except Exception:
-            rs_fmt = "—"
-        top_lines.append(f"- {sym}: RS {rs_fmt} • Stage {stage}")
-
-    now = datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
-    lines = [
-        f"QuantMatrix — MarketSnapshot digest ({now})",
-        f"Universe: {have}/{total} symbols have snapshots",
-    ]
-    if stage_counts_sorted:
-        lines.append("Stage distribution:")
-        lines.extend([f"- {k}: {v}" for k, v in stage_counts_sorted])
-    if top_lines:
-        lines.append(f"Top RS (Mansfield vs SPY, top {len(top_lines)}):")
-        lines.extend(top_lines)
-
-    content = "\n".join(lines)
+    content = format_discord(digest, limit=limit)
     ok = await discord_bot_client.send_message(channel_id=resolved_channel, content=content)
     return {
         "status": "ok" if ok else "error",
         "channel_id": resolved_channel,
         "sent": bool(ok),
-        "symbols": total,
-        "snapshots": have,
+        "symbols": digest["universe"],
+        "snapshots": digest["with_snapshot"],
+        "as_of": digest["as_of"],
     }
 
 
@@ -782,6 +789,9 @@ async def post_refresh_constituents(
 @router.get("/tracked")
 async def get_tracked(
     include_details: bool = Query(True),
+    since_version: Optional[int] = Query(
+        None, ge=0, description="Also return net symbols added/removed after this universe version"
+    ),
     db: Session = Depends(get_db),
     _viewer: User = Depends(get_market_data_viewer),
 ) -> Dict[str, Any]:
@@ -789,9 +799,8 @@ async def get_tracked(
 
     r = market_data_service.redis_client
 
-    all_raw = r.get("tracked:all")
+    all_symbols = list(tracked_universe.get(r))
     new_raw = r.get("tracked:new")
-    all_symbols = sorted(json.loads(all_raw) if all_raw else [])
     new_symbols = json.loads(new_raw) if new_raw else []
 
     details = _load_tracked_details(db, all_symbols) if include_details else {}
@@ -803,12 +812,16 @@ async def get_tracked(
         "actions": _tracked_actions(),
     }
 
-    return {
+    payload = {
         "all": all_symbols,
         "new": new_symbols,
+        "version": tracked_universe.version(r),
         "details": details if include_details else {},
         "meta": meta,
     }
+    if since_version is not None:
+        payload["changes"] = tracked_universe.changes_since(r, since_version)
+    return payload
 
 
 @router.post("/tracked/update")
@@ -875,40 +888,46 @@ async def admin_record_history(
 
 @router.get("/db/history")
 async def get_db_history(
+    request: Request,
     symbol: str = Query(...),
     interval: str = Query("1d", regex="^(1d|5m)$"),
     start: str | None = Query(None),
     end: str | None = Query(None),
     limit: int | None = Query(None, ge=1, le=20000),
+    max_points: int | None = Query(None, ge=10, le=20000, description="Downsample to at most this many bars"),
+    downsample: str = Query("ohlc", regex="^(ohlc|lttb)$"),
+    fmt: str = Query("rows", alias="format", regex="^(rows|columns|ndjson)$"),
     db: Session = Depends(get_db),
-) -> Dict[str, Any]:
-    """Return OHLCV bars for a symbol from price_data (ascending)."""
-    from backend.services.market.market_data_service import MarketDataService
+) -> Any:
+    """Return OHLCV bars for a symbol from price_data (ascending).
 
-    svc = MarketDataService()
+    Same `format` / `max_points` / ETag semantics as `/history/{symbol}`. The ETag
+    is checked against max(date)/count before any bars are loaded.
+    """
+    svc = get_market_data_service()
     try:
         parse = lambda s: datetime.fromisoformat(s) if s else None
+        start_dt, end_dt = parse(start), parse(end)
+        last, count = svc.get_db_history_marker(
+            db, symbol=symbol.upper(), interval=interval, start=start_dt, end=end_dt
+        )
+        etag = series_etag(symbol, interval, last, count, (start, end, limit, max_points, downsample, fmt))
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": _BAR_CACHE_CONTROL})
         df = svc.get_db_history(
             db,
             symbol=symbol.upper(),
             interval=interval,
-            start=parse(start),
-            end=parse(end),
+            start=start_dt,
+            end=end_dt,
             limit=limit,
         )
-        bars = []
-        for ts, row in df.iterrows():
-            bars.append(
-                {
-                    "time": ts.isoformat() if hasattr(ts, "isoformat") else str(ts),
-                    "open": float(row.get("Open", 0) or 0),
-                    "high": float(row.get("High", 0) or 0),
-                    "low": float(row.get("Low", 0) or 0),
-                    "close": float(row.get("Close", 0) or 0),
-                    "volume": float(row.get("Volume", 0) or 0),
-                }
-            )
-        return {"symbol": symbol.upper(), "interval": interval, "bars": bars}
+        return _bars_response(
+            BarSeries.from_frame(df).downsampled(max_points, downsample),
+            meta={"symbol": symbol.upper(), "interval": interval},
+            fmt=fmt,
+            etag=etag,
+        )
     except Exception as e:
         logger.error(f"db history error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -927,7 +946,7 @@ async def get_coverage(
 ) -> Dict[str, Any]:
     """Return coverage summary across intervals with last bar timestamps and freshness buckets."""
     try:
-        svc = MarketDataService()
+        svc = get_market_data_service()
         snapshot: Dict[str, Any] | None = None
         updated_at: str | None = None
         source = "cache"
@@ -969,16 +988,11 @@ async def get_coverage(
         # never render as zeros when stale counts are non-zero.
         try:
             # Determine the universe: prefer Redis tracked:all; fallback to symbols present in DB.
-            tracked_symbols: List[str] = []
             try:
-                raw_tracked = svc.redis_client.get("tracked:all")
-                if raw_tracked:
-                    tracked_symbols = json.loads(raw_tracked.decode() if isinstance(raw_tracked, (bytes, bytearray)) else raw_tracked)  # type: ignore[arg-type]
+                tracked_symbols: List[str] = list(tracked_universe.get(svc.redis_client))
             except Exception:
                 tracked_symbols = []
 
-            tracked_symbols = sorted({str(s).upper() for s in (tracked_symbols or []) if s})
-
             if not tracked_symbols:
                 tracked_symbols = sorted(
                     {
@@ -1427,7 +1441,7 @@ async def get_coverage(
 async def get_backfill_5m_toggle(
     admin_user: User = Depends(get_admin_user),
 ) -> Dict[str, Any]:
-    svc = MarketDataService()
+    svc = get_market_data_service()
     return {"backfill_5m_enabled": _is_backfill_5m_enabled(svc)}
 
 
@@ -1436,7 +1450,7 @@ async def set_backfill_5m_toggle(
     enabled: bool = Body(..., embed=True),
     admin_user: User = Depends(get_admin_user),
 ) -> Dict[str, Any]:
-    svc = MarketDataService()
+    svc = get_market_data_service()
     try:
         svc.redis_client.set("coverage:backfill_5m_enabled", "true" if enabled else "false")
         return {"backfill_5m_enabled": enabled}
@@ -1453,16 +1467,13 @@ async def backfill_stale_daily(
     """
     Backfill daily bars for symbols currently marked stale (>48h) in coverage snapshot.
     """
-    svc = MarketDataService()
+    svc = get_market_data_service()
     try:
         # Provide an estimate for UI (full stale+missing set, not sample-capped).
-        tracked: List[str] = []
         try:
-            raw = svc.redis_client.get("tracked:all")
-            tracked = json.loads(raw.decode() if isinstance(raw, (bytes, bytearray)) else raw) if raw else []  # type: ignore[arg-type]
+            tracked: List[str] = list(tracked_universe.get(svc.redis_client))
         except Exception:
             tracked = []
-        tracked = sorted({str(s).upper() for s in (tracked or []) if s})
         if not tracked:
             tracked = sorted({str(s).upper() for (s,) in db.query(PriceData.symbol).distinct().all() if s})
 
@@ -1558,18 +1569,57 @@ async def post_retention_enforce(
 async def admin_get_jobs(
     limit: Optional[int] = Query(None, ge=1, le=1000),
     offset: int = Query(0, ge=0, le=100000),
-    all: bool = Query(False),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor from the previous page"),
+    task_name: Optional[str] = Query(None),
+    status: Optional[str] = Query(None),
+    include_payload: bool = Query(True, description="Include params/counters/error"),
     admin_user: User = Depends(get_admin_user),
     db: Session = Depends(get_db),
 ) -> Dict[str, Any]:
-    total = db.query(JobRun).count()
-    query = db.query(JobRun).order_by(JobRun.started_at.desc())
-    if all:
-        rows = query.all()
-        return {"jobs": serialize_job_runs(rows), "total": total, "limit": total, "offset": 0}
-    effective_limit = limit or 50
-    rows = query.offset(offset).limit(effective_limit).all()
-    return {"jobs": serialize_job_runs(rows), "total": total, "limit": effective_limit, "offset": offset}
+    """Job runs newest first; prefer `cursor` over deep `offset` paging."""
+    try:
+        page = job_history.page(
+            db,
+            task_name=task_name,
+            status=status,
+            cursor=cursor,
+            offset=offset,
+            limit=limit or 50,
+            include_payload=include_payload,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    count = job_history.count(db, task_name=task_name, status=status)
+    return {
+        **page,
+        "total": count["total"],
+        "total_estimated": count["estimated"],
+        "offset": 0 if cursor else offset,
+    }
+
+
+@router.get("/admin/jobs/summary")
+async def admin_get_jobs_summary(
+    days: int = Query(30, ge=1, le=365, description="Window for duration percentiles"),
+    admin_user: User = Depends(get_admin_user),
+    db: Session = Depends(get_db),
+) -> Dict[str, Any]:
+    """Latest run plus run/error counts and duration percentiles per task."""
+    since = datetime.utcnow() - timedelta(days=days)
+    return {"tasks": job_history.summary(db, since=since), "since": since.isoformat()}
+
+
+@router.get("/admin/jobs/{job_id}/profile", response_class=PlainTextResponse)
+async def admin_get_job_profile(
+    job_id: int,
+    admin_user: User = Depends(get_admin_user),
+    db: Session = Depends(get_db),
+) -> PlainTextResponse:
+    """Folded-stack sampling profile for a run (flamegraph.pl / speedscope input)."""
+    profile = db.query(JobRun.profile).filter(JobRun.id == job_id).scalar()
+    if not profile:
+        raise HTTPException(status_code=404, detail="No profile recorded for this job")
+    return PlainTextResponse(profile, headers={"Content-Disposition": f'attachment; filename="job-{job_id}.folded"'})
 
 
 @router.get("/admin/tasks")
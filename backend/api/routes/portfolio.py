@@ -210,6 +210,61 @@ async def get_tax_lots_summary(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/tax-lots/trim-impact")
+async def get_trim_tax_impact(
+    fraction: float = Query(0.10, gt=0, le=1, description="Fraction of every position to sell"),
+    method: str = Query("fifo", description="fifo | lifo | hifo | min_tax"),
+    include_lots: bool = Query(False, description="Include per-lot breakdown"),
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> Dict[str, Any]:
+    """
+    Estimated tax impact of trimming every position by `fraction`.
+    CLEAN: One lot load, one batched price lookup, vectorized lot selection.
+    """
+    from backend.services.portfolio.lot_ledger import resolve_lot_method
+    from backend.services.portfolio.tax_lot_service import TaxLotService
+
+    try:
+        lot_method = resolve_lot_method(method)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        return await TaxLotService(db).simulate_trim(
+            user.id, fraction=fraction, lot_method=lot_method, include_lots=include_lots
+        )
+    except Exception as e:
+        logger.error(f"❌ Trim tax impact error for user {user.id}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/tax-lots/harvest")
+async def get_harvest_candidates(
+    min_loss: float = Query(0.0, ge=0, description="Minimum unrealized loss per lot"),
+    limit: int = Query(50, ge=1, le=1000),
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> Dict[str, Any]:
+    """
+    Loss-harvest candidates ranked by estimated tax savings (wash-sale exposed last).
+    """
+    try:
+        from backend.services.portfolio.tax_lot_service import TaxLotService
+
+        candidates = await TaxLotService(db).harvest_candidates(
+            user.id, min_loss=min_loss, limit=limit
+        )
+        return {
+            "user_id": user.id,
+            "candidates": candidates,
+            "total_candidates": len(candidates),
+            "timestamp": datetime.now().isoformat(),
+        }
+    except Exception as e:
+        logger.error(f"❌ Harvest scan error for user {user.id}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 # =============================================================================
 # TRANSACTION ENDPOINTS (Clean & Focused)
 # =============================================================================
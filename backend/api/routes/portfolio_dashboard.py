@@ -10,6 +10,7 @@ from backend.database import get_db
 from backend.models.user import User
 from backend.models.position import Position
 from backend.models.transaction import Dividend
+from backend.services.market.universe_digest import universe_digest
 
 logger = logging.getLogger(__name__)
 
@@ -59,6 +60,13 @@ async def get_dashboard(
             .count()
         )
 
+        # Shared, cached universe digest (same payload the Discord digest sends)
+        try:
+            market_digest = universe_digest.get(db, limit=5)
+        except Exception as e:
+            logger.warning(f"⚠️ dashboard universe digest unavailable: {e}")
+            market_digest = None
+
         summary = {
             "total_market_value": total_value,
             "total_cost_basis": total_cost,
@@ -91,6 +99,7 @@ async def get_dashboard(
                 "holdings_count": len(positions),
                 "last_updated": datetime.utcnow().isoformat(),
                 "brokerages": ["IBKR", "TASTYTRADE"],
+                "market_digest": market_digest,
             },
         }
     except Exception as e:
@@ -0,0 +1,5 @@
+"""Offline performance benchmarks for market-data and FlexQuery hot paths.
+
+Run with ``python -m backend.benchmarks`` (see `suite.py`); inputs come from the
+deterministic generators in `synthetic.py`, so results are comparable across runs.
+"""
@@ -0,0 +1,48 @@
+"""CLI: ``python -m backend.benchmarks [--scale small medium] [--update-baseline]``."""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+from backend.benchmarks.suite import (
+    BASELINE_PATH,
+    CASES,
+    DEFAULT_THRESHOLD,
+    SCALES,
+    compare,
+    format_report,
+    load_baseline,
+    run_suite,
+    save_baseline,
+)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run offline performance benchmarks.")
+    parser.add_argument("--scale", nargs="+", default=["small"], choices=sorted(SCALES))
+    parser.add_argument("--case", nargs="+", default=None, choices=sorted(CASES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    report = run_suite(args.scale, cases=args.case, repeat=args.repeat)
+    baseline = load_baseline(args.baseline)
+    print(format_report(report, baseline))
+
+    if args.update_baseline:
+        save_baseline(report, args.baseline)
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+
+    regressions = compare(report, baseline, args.threshold)
+    for reg in regressions:
+        print(f"REGRESSION {reg.key}: {reg.current:.1f}/s vs baseline {reg.baseline:.1f}/s ({reg.change:+.1%})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,204 @@
+"""
+Backfill Load Test
+==================
+
+Drives the real daily-backfill fetch path (`_fetch_daily_for_symbols` ->
+MarketDataService.get_historical_data -> provider transport, with the
+production retry/backoff) against an in-process `FakeProviderServer`, once per
+concurrency level, and reports throughput plus what the server saw.
+
+    python -m backend.benchmarks.backfill_load --symbols 300 --concurrency 5 25 50 \
+        --latency-ms 80 --jitter-ms 40 --burst-every 100 --burst-length 10 --error-rate 0.01
+
+Needs Redis (the historical cache is cleared for the synthetic symbols before
+each run). `--persist` also writes the bars through `_persist_daily_fetch_results`
+and deletes the synthetic `SYN*` rows afterwards.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from backend.benchmarks.fake_provider import FakeProviderServer, FaultConfig
+from backend.config import settings
+from backend.services.market.backfill_params import daily_backfill_params
+from backend.services.market.provider_transport import HttpTransport, set_provider_transport
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class LoadResult:
+    concurrency: int
+    symbols: int
+    ok: int
+    empty: int
+    seconds: float
+    bars: int
+    requests: int
+    rate_limited: int
+    server_errors: int
+    persisted: Optional[int] = None
+
+    @property
+    def symbols_per_second(self) -> float:
+        return self.symbols / self.seconds if self.seconds > 0 else 0.0
+
+
+@contextmanager
+def _retry_settings(attempts: Optional[int], max_delay: Optional[float]) -> Iterator[None]:
+    saved = (settings.MARKET_BACKFILL_RETRY_ATTEMPTS, settings.MARKET_BACKFILL_RETRY_MAX_DELAY_SECONDS)
+    if attempts is not None:
+        settings.MARKET_BACKFILL_RETRY_ATTEMPTS = int(attempts)
+    if max_delay is not None:
+        settings.MARKET_BACKFILL_RETRY_MAX_DELAY_SECONDS = float(max_delay)
+    try:
+        yield
+    finally:
+        settings.MARKET_BACKFILL_RETRY_ATTEMPTS, settings.MARKET_BACKFILL_RETRY_MAX_DELAY_SECONDS = saved
+
+
+def _clear_cached_history(symbols: Sequence[str], period: str) -> None:
+    from backend.services.market.market_data_service import market_data_service
+
+    keys = [f"historical:{s}:{period}:1d" for s in symbols]
+    if keys:
+        market_data_service.redis_client.delete(*keys)
+
+
+def _cleanup_persisted(symbols: Sequence[str]) -> None:
+    from backend.database import SessionLocal
+    from backend.models import PriceData
+
+    session = SessionLocal()
+    try:
+        session.query(PriceData).filter(
+            PriceData.symbol.in_(list(symbols)), PriceData.symbol.like("SYN%")
+        ).delete(synchronize_session=False)
+        session.commit()
+    finally:
+        session.close()
+
+
+def run_backfill_load(
+    *,
+    symbols: int = 200,
+    concurrency: Sequence[int] = (5, 25, 50),
+    faults: Optional[FaultConfig] = None,
+    days: int = 200,
+    retry_attempts: Optional[int] = None,
+    retry_max_delay: Optional[float] = None,
+    persist: bool = False,
+) -> List[LoadResult]:
+    from backend.tasks.market_data_tasks import _fetch_daily_for_symbols, _persist_daily_fetch_results
+
+    universe = [f"SYN{i + 1:04d}" for i in range(int(symbols))]
+    params = daily_backfill_params(days=days)
+    results: List[LoadResult] = []
+
+    with FakeProviderServer(faults=faults) as server, _retry_settings(retry_attempts, retry_max_delay):
+        transport = HttpTransport(server.url, pool_size=max(concurrency))
+        previous = set_provider_transport(transport)
+        try:
+            for conc in concurrency:
+                _clear_cached_history(universe, params.period)
+                server.reset()
+                start = time.perf_counter()
+                fetched = asyncio.run(
+                    _fetch_daily_for_symbols(
+                        symbols=universe,
+                        period=params.period,
+                        max_bars=params.max_bars,
+                        concurrency=conc,
+                    )
+                )
+                seconds = time.perf_counter() - start
+                ok = [f for f in fetched if f.get("df") is not None and not f["df"].empty]
+                persisted = None
+                if persist:
+                    from backend.database import SessionLocal
+
+                    session = SessionLocal()
+                    try:
+                        res = _persist_daily_fetch_results(
+                            session=session, fetched=fetched, since_dt=None, use_delta_after=False
+                        )
+                        persisted = int(res["bars_inserted_total"])
+                    finally:
+                        session.close()
+                        _cleanup_persisted(universe)
+                status: Dict[str, int] = server.stats["status"]
+                results.append(
+                    LoadResult(
+                        concurrency=int(conc),
+                        symbols=len(universe),
+                        ok=len(ok),
+                        empty=len(fetched) - len(ok),
+                        seconds=round(seconds, 4),
+                        bars=sum(len(f["df"]) for f in ok),
+                        requests=int(server.stats["requests"]),
+                        rate_limited=int(status.get("429", 0)),
+                        server_errors=sum(v for k, v in status.items() if k.startswith("5")),
+                        persisted=persisted,
+                    )
+                )
+        finally:
+            set_provider_transport(previous)
+            transport.close()
+            _clear_cached_history(universe, params.period)
+    return results
+
+
+def format_results(results: Sequence[LoadResult]) -> str:
+    lines = [f"{'conc':>5} {'ok':>6} {'empty':>6} {'secs':>9} {'sym/s':>8} {'requests':>9} {'429':>6} {'5xx':>6} {'persisted':>10}"]
+    for r in results:
+        lines.append(
+            f"{r.concurrency:>5} {r.ok:>6} {r.empty:>6} {r.seconds:>9.3f} {r.symbols_per_second:>8.1f} "
+            f"{r.requests:>9} {r.rate_limited:>6} {r.server_errors:>6} {'' if r.persisted is None else r.persisted:>10}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Load-test daily backfill against the fake provider.")
+    parser.add_argument("--symbols", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[5, 25, 50])
+    parser.add_argument("--days", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=25.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--burst-every", type=int, default=0)
+    parser.add_argument("--burst-length", type=int, default=0)
+    parser.add_argument("--retry-attempts", type=int, default=None)
+    parser.add_argument("--retry-max-delay", type=float, default=None)
+    parser.add_argument("--persist", action="store_true")
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.WARNING)
+    results = run_backfill_load(
+        symbols=args.symbols,
+        concurrency=args.concurrency,
+        faults=FaultConfig(
+            latency_ms=args.latency_ms,
+            jitter_ms=args.jitter_ms,
+            error_rate=args.error_rate,
+            burst_every=args.burst_every,
+            burst_length=args.burst_length,
+        ),
+        days=args.days,
+        retry_attempts=args.retry_attempts,
+        retry_max_delay=args.retry_max_delay,
+        persist=args.persist,
+    )
+    print(format_results(results))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
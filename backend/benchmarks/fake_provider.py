@@ -0,0 +1,350 @@
+"""
+Fake Market Data Provider
+=========================
+
+A local, FMP-compatible HTTP stand-in for load testing provider-bound paths
+(daily backfill concurrency, retry/backoff) without spending real quota.
+
+Serves deterministic payloads built from `backend.benchmarks.synthetic`:
+
+- GET /api/v3/historical-price-full/{symbol}     daily OHLCV (newest first)
+- GET /api/v3/historical-chart/5min/{symbol}     intraday 5m bars (newest first)
+- GET /api/v3/quote/{symbols}                    comma-separated quotes
+- GET /api/v3/profile/{symbols}                  comma-separated company profiles
+- GET /api/v3/{sp500,nasdaq,dowjones}_constituent
+
+Fault injection (`FaultConfig`), applied to every /api/v3 request:
+
+- `latency_ms` (+ uniform `jitter_ms`) before responding
+- 429 bursts: the last `burst_length` requests of every `burst_every` requests
+- `error_rate`: seeded fraction of requests answered with 500/502/503
+
+Control plane: GET /_control/stats, POST /_control/faults (JSON FaultConfig
+fields) and POST /_control/reset.
+
+Run standalone and point the backend at it:
+
+    python -m backend.benchmarks.fake_provider --port 8765 --latency-ms 40 --error-rate 0.02
+    MARKET_PROVIDER_TRANSPORT=http MARKET_PROVIDER_BASE_URL=http://127.0.0.1:8765/api/v3
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import random
+import threading
+import time
+import zlib
+from dataclasses import asdict, dataclass, fields
+from datetime import date
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import numpy as np
+import pandas as pd
+
+from backend.benchmarks.synthetic import synthetic_ohlcv
+
+logger = logging.getLogger(__name__)
+
+API_PREFIX = "/api/v3"
+INDEX_SIZES = {"sp500_constituent": 500, "nasdaq_constituent": 100, "dowjones_constituent": 30}
+SECTORS = (
+    "Technology",
+    "Healthcare",
+    "Financial Services",
+    "Consumer Cyclical",
+    "Industrials",
+    "Energy",
+    "Utilities",
+    "Real Estate",
+    "Basic Materials",
+    "Communication Services",
+    "Consumer Defensive",
+)
+INTRADAY_BARS_PER_DAY = 78
+
+
+@dataclass
+class FaultConfig:
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    burst_every: int = 0
+    burst_length: int = 0
+    seed: int = 0
+
+    def update(self, values: Dict[str, Any]) -> None:
+        for f in fields(self):
+            if f.name in values and values[f.name] is not None:
+                setattr(self, f.name, type(getattr(self, f.name))(values[f.name]))
+
+
+def _symbols(n: int) -> List[str]:
+    return [f"SYN{i + 1:04d}" for i in range(n)]
+
+
+def _sector(symbol: str) -> str:
+    return SECTORS[zlib.crc32(symbol.encode()) % len(SECTORS)]
+
+
+@lru_cache(maxsize=4096)
+def _daily(symbol: str, bars: int, end: str) -> pd.DataFrame:
+    return synthetic_ohlcv(symbol, bars, end=end)
+
+
+@lru_cache(maxsize=4096)
+def _historical_payload(symbol: str, bars: int, end: str) -> bytes:
+    df = _daily(symbol, bars, end).iloc[::-1]
+    rows = [
+        {
+            "date": ts.strftime("%Y-%m-%d"),
+            "open": o,
+            "high": h,
+            "low": lo,
+            "close": c,
+            "adjClose": c,
+            "volume": int(v),
+        }
+        for ts, o, h, lo, c, v in zip(df.index, df["Open"], df["High"], df["Low"], df["Close"], df["Volume"])
+    ]
+    return json.dumps({"symbol": symbol, "historical": rows}).encode()
+
+
+@lru_cache(maxsize=1024)
+def _intraday_payload(symbol: str, days: int, end: str) -> bytes:
+    n = days * INTRADAY_BARS_PER_DAY
+    df = synthetic_ohlcv(f"{symbol}:5m", n, end=end)
+    sessions = pd.bdate_range(end=end, periods=days)
+    offsets = pd.to_timedelta(np.arange(INTRADAY_BARS_PER_DAY) * 5 + 9 * 60 + 30, unit="m")
+    stamps = (sessions.values[:, None] + offsets.values[None, :]).ravel()
+    rows = [
+        {
+            "date": pd.Timestamp(ts).strftime("%Y-%m-%d %H:%M:%S"),
+            "open": o,
+            "high": h,
+            "low": lo,
+            "close": c,
+            "volume": int(v),
+        }
+        for ts, o, h, lo, c, v in zip(stamps, df["Open"], df["High"], df["Low"], df["Close"], df["Volume"])
+    ]
+    return json.dumps(rows[::-1]).encode()
+
+
+class FakeProviderServer:
+    """Threaded FMP stand-in; use as a context manager or start()/stop()."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        *,
+        faults: Optional[FaultConfig] = None,
+        bars: int = 750,
+        intraday_days: int = 5,
+        end: Optional[str] = None,
+    ) -> None:
+        self.faults = faults or FaultConfig()
+        self.bars = int(bars)
+        self.intraday_days = int(intraday_days)
+        # Anchored to today so period-trimmed (intraday) and delta backfills see fresh bars.
+        self.end = end or date.today().isoformat()
+        self._lock = threading.Lock()
+        self._rng = random.Random(self.faults.seed)
+        self._count = 0
+        self.stats: Dict[str, Any] = {}
+        self.reset()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    # ---------------------- Lifecycle ----------------------
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}{API_PREFIX}"
+
+    def start(self) -> "FakeProviderServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-provider", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> "FakeProviderServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._count = 0
+            self._rng = random.Random(self.faults.seed)
+            self.stats = {"requests": 0, "status": {}, "endpoints": {}}
+
+    def configure(self, **values: Any) -> None:
+        with self._lock:
+            self.faults.update(values)
+            self._rng = random.Random(self.faults.seed)
+
+    # ---------------------- Request handling ----------------------
+    def _fault_for_next_request(self) -> Tuple[Optional[int], float]:
+        """(forced status or None, delay seconds) for the next API request."""
+        f = self.faults
+        with self._lock:
+            i = self._count
+            self._count += 1
+            delay = max(0.0, f.latency_ms + (self._rng.uniform(0, f.jitter_ms) if f.jitter_ms > 0 else 0.0)) / 1000.0
+            if f.burst_every > 0 and f.burst_length > 0 and i % f.burst_every >= f.burst_every - f.burst_length:
+                return 429, delay
+            if f.error_rate > 0 and self._rng.random() < f.error_rate:
+                return self._rng.choice((500, 502, 503)), delay
+        return None, delay
+
+    def _record(self, endpoint: str, status: int) -> None:
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["status"][str(status)] = self.stats["status"].get(str(status), 0) + 1
+            self.stats["endpoints"][endpoint] = self.stats["endpoints"].get(endpoint, 0) + 1
+
+    def route(self, path: str) -> Tuple[int, bytes, str]:
+        """(status, body, endpoint) for an /api/v3 path, without faults."""
+        parts = [p for p in path[len(API_PREFIX):].split("/") if p]
+        if not parts:
+            return 404, b'{"Error Message": "not found"}', "unknown"
+        head = parts[0]
+        if head == "historical-price-full" and len(parts) == 2:
+            return 200, _historical_payload(parts[1].upper(), self.bars, self.end), head
+        if head == "historical-chart" and len(parts) == 3:
+            return 200, _intraday_payload(parts[2].upper(), self.intraday_days, self.end), head
+        if head == "quote" and len(parts) == 2:
+            rows = []
+            for sym in parts[1].upper().split(","):
+                df = _daily(sym, self.bars, self.end)
+                last, prev = float(df["Close"].iloc[-1]), float(df["Close"].iloc[-2])
+                rows.append(
+                    {
+                        "symbol": sym,
+                        "price": last,
+                        "previousClose": prev,
+                        "changesPercentage": round((last / prev - 1.0) * 100.0, 4),
+                        "volume": int(df["Volume"].iloc[-1]),
+                    }
+                )
+            return 200, json.dumps(rows).encode(), head
+        if head == "profile" and len(parts) == 2:
+            rows = [
+                {
+                    "symbol": sym,
+                    "companyName": f"{sym} Synthetic Inc",
+                    "sector": _sector(sym),
+                    "industry": f"{_sector(sym)} Services",
+                    "mktCap": int(1e8 * (1 + zlib.crc32(sym.encode()) % 5000)),
+                }
+                for sym in parts[1].upper().split(",")
+            ]
+            return 200, json.dumps(rows).encode(), head
+        if head in INDEX_SIZES and len(parts) == 1:
+            rows = [{"symbol": s, "name": f"{s} Synthetic Inc", "sector": _sector(s)} for s in _symbols(INDEX_SIZES[head])]
+            return 200, json.dumps(rows).encode(), head
+        return 404, b'{"Error Message": "not found"}', head
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, fmt, *args):  # noqa: N802 (stdlib signature)
+                pass
+
+            def _send(self, status: int, body: bytes) -> None:
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):  # noqa: N802
+                path = urlsplit(self.path).path
+                if path == "/_control/stats":
+                    with server._lock:
+                        body = json.dumps({**server.stats, "faults": asdict(server.faults)}).encode()
+                    return self._send(200, body)
+                if not path.startswith(API_PREFIX):
+                    return self._send(404, b'{"Error Message": "not found"}')
+                forced, delay = server._fault_for_next_request()
+                if delay:
+                    time.sleep(delay)
+                if forced == 429:
+                    status, body, endpoint = 429, b'{"Error Message": "Limit Reach. Too Many Requests"}', "rate_limited"
+                elif forced is not None:
+                    status, body, endpoint = forced, b'{"Error Message": "upstream error"}', "error"
+                else:
+                    status, body, endpoint = server.route(path)
+                server._record(endpoint, status)
+                self._send(status, body)
+
+            def do_POST(self):  # noqa: N802
+                path = urlsplit(self.path).path
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    payload = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError:
+                    return self._send(400, b'{"error": "invalid json"}')
+                if path == "/_control/faults":
+                    server.configure(**payload)
+                    return self._send(200, json.dumps(asdict(server.faults)).encode())
+                if path == "/_control/reset":
+                    server.reset()
+                    return self._send(200, b'{"ok": true}')
+                self._send(404, b'{"error": "not found"}')
+
+        return Handler
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Serve a deterministic FMP-compatible fake provider.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--bars", type=int, default=750)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--burst-every", type=int, default=0)
+    parser.add_argument("--burst-length", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    faults = FaultConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        burst_every=args.burst_every,
+        burst_length=args.burst_length,
+        seed=args.seed,
+    )
+    server = FakeProviderServer(args.host, args.port, faults=faults, bars=args.bars)
+    print(f"Fake provider listening on {server.url}")
+    print(f"  MARKET_PROVIDER_TRANSPORT=http MARKET_PROVIDER_BASE_URL={server.url}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,299 @@
+"""
+Benchmark Suite
+===============
+
+Times market-data and FlexQuery hot paths on synthetic inputs and compares the
+throughput (items/second) against a stored baseline.
+
+- Scales (`small`, `medium`, `large`) size the universe, history and statement
+- Each case reports the best of `repeat` timed runs after one warm-up
+- `compare()` flags cases whose throughput fell more than `threshold` below
+  baseline; the CLI exits non-zero on any regression
+- DB-backed cases (`persist_price_bars`) need the local Postgres from
+  DATABASE_URL and are skipped with a reason when it is unreachable
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import platform
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from backend.benchmarks.synthetic import synthetic_flexquery_xml, synthetic_ohlcv, synthetic_universe
+
+logger = logging.getLogger(__name__)
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+DEFAULT_THRESHOLD = 0.30
+BENCH_DATA_SOURCE = "benchmark"
+
+SCALES: Dict[str, Dict[str, int]] = {
+    "small": {"symbols": 10, "bars": 400, "trades": 500, "positions": 25},
+    "medium": {"symbols": 50, "bars": 800, "trades": 5000, "positions": 100},
+    "large": {"symbols": 200, "bars": 1500, "trades": 25000, "positions": 400},
+}
+
+FLEXQUERY_PARSERS = (
+    "_parse_tax_lots",
+    "_parse_trades_from_xml",
+    "_parse_option_positions",
+    "_parse_enhanced_instruments",
+    "_parse_cash_transactions",
+    "_parse_account_information",
+    "_parse_interest_accruals",
+    "_parse_transfers",
+)
+
+
+@dataclass
+class BenchResult:
+    name: str
+    scale: str
+    items: int
+    seconds: float
+    runs: int
+    throughput: float
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}[{self.scale}]"
+
+
+@dataclass
+class Regression:
+    key: str
+    baseline: float
+    current: float
+
+    @property
+    def change(self) -> float:
+        return self.current / self.baseline - 1.0 if self.baseline else 0.0
+
+
+@dataclass
+class SuiteReport:
+    results: List[BenchResult] = field(default_factory=list)
+    skipped: Dict[str, str] = field(default_factory=dict)
+
+    def as_baseline(self) -> Dict[str, Any]:
+        return {
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "results": {r.key: asdict(r) for r in self.results},
+        }
+
+
+class BenchmarkSkipped(Exception):
+    """Raised by a case setup when its environment (e.g. Postgres) is unavailable."""
+
+
+# Case setup: (scale params) -> (callable to time, items processed per call, teardown or None)
+CaseSetup = Callable[[Dict[str, int]], Tuple[Callable[[], Any], int, Optional[Callable[[], None]]]]
+
+
+def _universe(params: Dict[str, int]) -> Dict[str, pd.DataFrame]:
+    return synthetic_universe(params["symbols"], params["bars"], gap_rate=0.01, split_every=250)
+
+
+def _case_core_indicators(params):
+    from backend.services.market.indicator_engine import compute_core_indicators
+
+    frames = list(_universe(params).values())
+    return (lambda: [compute_core_indicators(df) for df in frames]), len(frames), None
+
+
+def _case_snapshot_from_dataframe(params):
+    from backend.services.market.market_data_service import market_data_service
+
+    frames = [df.iloc[::-1] for df in _universe(params).values()]
+    return (lambda: [market_data_service._snapshot_from_dataframe(df) for df in frames]), len(frames), None
+
+
+def _case_weinstein_stage_series(params):
+    from backend.services.market.indicator_engine import compute_weinstein_stage_series_from_daily
+
+    frames = [df.iloc[::-1] for df in _universe(params).values()]
+    bench = synthetic_ohlcv("SPY", params["bars"]).iloc[::-1]
+    return (
+        (lambda: [compute_weinstein_stage_series_from_daily(df, bench) for df in frames]),
+        len(frames),
+        None,
+    )
+
+
+def _case_persist_price_bars(params):
+    from sqlalchemy import text
+
+    from backend.database import SessionLocal
+    from backend.models import PriceData
+    from backend.services.market.market_data_service import market_data_service
+
+    session = SessionLocal()
+    try:
+        session.execute(text("SELECT 1"))
+    except Exception as exc:
+        session.close()
+        raise BenchmarkSkipped(f"database unavailable: {exc.__class__.__name__}")
+
+    universe = _universe(params)
+    symbols = list(universe)
+
+    def cleanup() -> None:
+        session.query(PriceData).filter(
+            PriceData.symbol.in_(symbols), PriceData.data_source == BENCH_DATA_SOURCE
+        ).delete(synchronize_session=False)
+        session.commit()
+
+    def run() -> int:
+        # Fresh inserts every run so each timing measures the same work.
+        cleanup()
+        return sum(
+            market_data_service.persist_price_bars(session, sym, df, data_source=BENCH_DATA_SOURCE)
+            for sym, df in universe.items()
+        )
+
+    def teardown() -> None:
+        try:
+            cleanup()
+        finally:
+            session.close()
+
+    return run, sum(len(df) for df in universe.values()), teardown
+
+
+def _flexquery_case(method: str) -> CaseSetup:
+    def setup(params):
+        from backend.services.clients.ibkr_flexquery_client import IBKRFlexQueryClient
+
+        client = IBKRFlexQueryClient()
+        xml = synthetic_flexquery_xml(trades=params["trades"], positions=params["positions"])
+        parse = getattr(client, method)
+        # Every parser re-parses the whole statement, so items = records in the document.
+        return (lambda: parse(xml, "U0000001")), xml.count("/>"), None
+
+    return setup
+
+
+CASES: Dict[str, CaseSetup] = {
+    "compute_core_indicators": _case_core_indicators,
+    "snapshot_from_dataframe": _case_snapshot_from_dataframe,
+    "weinstein_stage_series": _case_weinstein_stage_series,
+    "persist_price_bars": _case_persist_price_bars,
+    **{f"flexquery.{m}": _flexquery_case(m) for m in FLEXQUERY_PARSERS},
+}
+
+
+def time_call(fn: Callable[[], Any], repeat: int = 3, warmup: int = 1, min_time: float = 0.05) -> float:
+    """Best per-call wall time (seconds) over `repeat` samples.
+
+    Each sample loops `fn` until it spans at least `min_time` (like
+    ``timeit.autorange``) so millisecond-scale cases are not dominated by
+    timer and scheduler noise.
+    """
+    for _ in range(max(0, warmup)):
+        start = time.perf_counter()
+        fn()
+        first = time.perf_counter() - start
+    if warmup <= 0:
+        start = time.perf_counter()
+        fn()
+        first = time.perf_counter() - start
+    number = max(1, int(min_time / first) + 1) if first < min_time else 1
+    best = float("inf")
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def run_suite(
+    scales: Sequence[str] = ("small",),
+    cases: Optional[Sequence[str]] = None,
+    repeat: int = 3,
+) -> SuiteReport:
+    report = SuiteReport()
+    selected = [c for c in CASES if not cases or c in cases]
+    # Parsers and services log per call; keep timings about the code, not the log handlers.
+    previous = logging.root.manager.disable
+    logging.disable(logging.WARNING)
+    try:
+        for scale in scales:
+            params = SCALES[scale]
+            for name in selected:
+                key = f"{name}[{scale}]"
+                try:
+                    fn, items, teardown = CASES[name](params)
+                except BenchmarkSkipped as exc:
+                    report.skipped[key] = str(exc)
+                    continue
+                try:
+                    seconds = time_call(fn, repeat=repeat)
+                finally:
+                    if teardown is not None:
+                        teardown()
+                report.results.append(
+                    BenchResult(
+                        name=name,
+                        scale=scale,
+                        items=items,
+                        seconds=round(seconds, 6),
+                        runs=repeat,
+                        throughput=round(items / seconds, 3) if seconds > 0 else float("inf"),
+                    )
+                )
+    finally:
+        logging.disable(previous)
+    return report
+
+
+def load_baseline(path: Path = BASELINE_PATH) -> Dict[str, Dict[str, Any]]:
+    try:
+        return json.loads(Path(path).read_text()).get("results", {})
+    except FileNotFoundError:
+        return {}
+
+
+def save_baseline(report: SuiteReport, path: Path = BASELINE_PATH) -> None:
+    """Merge `report` into the baseline file (other scales/cases are kept)."""
+    data = {"results": load_baseline(path)}
+    fresh = report.as_baseline()
+    data.update({k: v for k, v in fresh.items() if k != "results"})
+    data["results"].update(fresh["results"])
+    Path(path).write_text(json.dumps(data, indent=2, sort_keys=True) + "\n")
+
+
+def compare(
+    report: SuiteReport,
+    baseline: Dict[str, Dict[str, Any]],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> List[Regression]:
+    """Cases whose throughput dropped more than `threshold` (fraction) below baseline."""
+    regressions: List[Regression] = []
+    for r in report.results:
+        base = baseline.get(r.key)
+        if not base or not base.get("throughput"):
+            continue
+        if r.throughput < float(base["throughput"]) * (1.0 - threshold):
+            regressions.append(Regression(r.key, float(base["throughput"]), r.throughput))
+    return regressions
+
+
+def format_report(report: SuiteReport, baseline: Dict[str, Dict[str, Any]]) -> str:
+    lines = [f"{'case':<48} {'items':>8} {'best s':>10} {'items/s':>12} {'vs base':>9}"]
+    for r in report.results:
+        base = (baseline.get(r.key) or {}).get("throughput")
+        delta = f"{(r.throughput / base - 1.0) * 100:+.1f}%" if base else "new"
+        lines.append(f"{r.key:<48} {r.items:>8} {r.seconds:>10.4f} {r.throughput:>12.1f} {delta:>9}")
+    for key, reason in report.skipped.items():
+        lines.append(f"{key:<48} skipped: {reason}")
+    return "\n".join(lines)
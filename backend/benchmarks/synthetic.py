@@ -0,0 +1,289 @@
+"""
+Synthetic Market Data
+=====================
+
+Deterministic generators for benchmark inputs (no network, no provider keys).
+
+- `synthetic_ohlcv`: geometric random walk with intraday range, volume, optional
+  missing sessions (gaps) and unadjusted stock splits
+- `synthetic_universe`: N symbols of the above, each seeded from its ticker
+- `synthetic_flexquery_xml`: an IBKR FlexQuery statement with the sections the
+  `_parse_*` methods read (Trades, OpenPositions, CashTransactions, ...)
+
+The same arguments always produce the same output.
+"""
+
+from __future__ import annotations
+
+import zlib
+from typing import Dict, Optional
+from xml.sax.saxutils import quoteattr
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_END = "2025-12-31"
+
+
+def _rng(*parts: object) -> np.random.Generator:
+    # zlib.crc32 (unlike hash()) is stable across interpreter runs.
+    return np.random.default_rng(zlib.crc32("|".join(str(p) for p in parts).encode()))
+
+
+def synthetic_ohlcv(
+    symbol: str,
+    bars: int = 500,
+    *,
+    seed: int = 0,
+    end: str = DEFAULT_END,
+    gap_rate: float = 0.0,
+    split_every: Optional[int] = None,
+    split_ratio: float = 2.0,
+) -> pd.DataFrame:
+    """Daily OHLCV (oldest->newest, columns Open/High/Low/Close/Volume).
+
+    `gap_rate` drops that fraction of sessions; `split_every` applies an
+    unadjusted `split_ratio`:1 split every N bars (prices fall, volume rises).
+    """
+    rng = _rng(symbol, bars, seed)
+    n = max(1, int(bars))
+    index = pd.bdate_range(end=end, periods=n)
+
+    start = float(rng.uniform(10.0, 400.0))
+    drift = float(rng.normal(0.0003, 0.0002))
+    vol = float(rng.uniform(0.01, 0.035))
+    rets = rng.normal(drift, vol, n)
+    close = start * np.exp(np.cumsum(rets))
+    open_ = close * np.exp(rng.normal(0.0, vol / 3.0, n))
+    spread = np.abs(rng.normal(0.0, vol, n)) * close
+    high = np.maximum(open_, close) + spread
+    low = np.maximum(np.minimum(open_, close) - spread, 0.01)
+    volume = rng.lognormal(mean=14.0, sigma=0.5, size=n)
+
+    if split_every and split_every > 0:
+        # Bars at or after each split date trade at 1/ratio of the pre-split price.
+        factor = np.power(float(split_ratio), np.arange(n) // int(split_every))
+        open_, high, low, close = open_ / factor, high / factor, low / factor, close / factor
+        volume = volume * factor
+
+    df = pd.DataFrame(
+        {
+            "Open": open_.round(4),
+            "High": high.round(4),
+            "Low": low.round(4),
+            "Close": close.round(4),
+            "Volume": volume.astype("int64"),
+        },
+        index=index,
+    )
+    if gap_rate > 0:
+        keep = rng.random(n) >= float(gap_rate)
+        keep[-1] = True
+        df = df[keep]
+    return df
+
+
+def synthetic_universe(
+    symbols: int = 50,
+    bars: int = 500,
+    *,
+    seed: int = 0,
+    gap_rate: float = 0.0,
+    split_every: Optional[int] = None,
+    end: str = DEFAULT_END,
+) -> Dict[str, pd.DataFrame]:
+    """`{SYN0001: frame, ...}`; every fifth symbol gets splits when `split_every` is set."""
+    out: Dict[str, pd.DataFrame] = {}
+    for i in range(int(symbols)):
+        sym = f"SYN{i + 1:04d}"
+        out[sym] = synthetic_ohlcv(
+            sym,
+            bars,
+            seed=seed,
+            end=end,
+            gap_rate=gap_rate,
+            split_every=split_every if split_every and i % 5 == 0 else None,
+        )
+    return out
+
+
+def _attrs(**kwargs: object) -> str:
+    return " ".join(f"{k}={quoteattr(str(v))}" for k, v in kwargs.items())
+
+
+def synthetic_flexquery_xml(
+    account_id: str = "U0000001",
+    *,
+    trades: int = 1000,
+    positions: int = 50,
+    option_positions: int = 10,
+    cash_transactions: int = 200,
+    transfers: int = 20,
+    interest_rows: int = 12,
+    seed: int = 0,
+    year: int = 2025,
+) -> str:
+    """One-account FlexQuery statement sized by the section counts."""
+    rng = _rng("flexquery", account_id, trades, positions, seed)
+    symbols = [f"SYN{i + 1:04d}" for i in range(max(1, int(positions)))]
+    days = pd.bdate_range(f"{year}-01-01", f"{year}-12-31")
+
+    def day(i: int) -> str:
+        return days[i % len(days)].strftime("%Y%m%d")
+
+    trade_rows = []
+    for i in range(int(trades)):
+        sym = symbols[int(rng.integers(len(symbols)))]
+        # Mostly buys so lot reconstruction has open lots to sell against.
+        qty = int(rng.integers(1, 200)) * (1 if rng.random() < 0.7 else -1)
+        price = round(float(rng.uniform(10, 400)), 2)
+        trade_rows.append(
+            "<Trade "
+            + _attrs(
+                accountId=account_id,
+                symbol=sym,
+                description=f"{sym} COMMON",
+                assetCategory="STK",
+                currency="USD",
+                exchange="NASDAQ",
+                tradeID=100000 + i,
+                tradeDate=day(i),
+                quantity=qty,
+                tradePrice=price,
+                proceeds=round(-qty * price, 2),
+                ibCommission=-1.0,
+                buySell="BUY" if qty > 0 else "SELL",
+            )
+            + "/>"
+        )
+
+    position_rows = []
+    for i, sym in enumerate(symbols):
+        position_rows.append(
+            "<OpenPosition "
+            + _attrs(
+                accountId=account_id,
+                symbol=sym,
+                description=f"{sym} COMMON",
+                assetCategory="STK",
+                currency="USD",
+                listingExchange="NASDAQ",
+                position=int(rng.integers(1, 500)),
+                markPrice=round(float(rng.uniform(10, 400)), 2),
+                positionValue=round(float(rng.uniform(1e3, 1e5)), 2),
+                fifoPnlUnrealized=round(float(rng.normal(0, 500)), 2),
+            )
+            + "/>"
+        )
+    for i in range(int(option_positions)):
+        under = symbols[i % len(symbols)]
+        put_call = "C" if i % 2 == 0 else "P"
+        strike = 50 + 5 * i
+        position_rows.append(
+            "<OpenPosition "
+            + _attrs(
+                accountId=account_id,
+                symbol=f"{under} {year + 1}0117{put_call}{strike:05d}",
+                underlyingSymbol=under,
+                description=f"{under} OPTION",
+                assetCategory="OPT",
+                currency="USD",
+                listingExchange="CBOE",
+                putCall=put_call,
+                strike=strike,
+                expiry=f"{year + 1}0117",
+                multiplier=100,
+                position=int(rng.integers(1, 10)),
+                markPrice=round(float(rng.uniform(0.5, 20)), 2),
+                positionValue=round(float(rng.uniform(100, 5000)), 2),
+                fifoPnlUnrealized=round(float(rng.normal(0, 100)), 2),
+            )
+            + "/>"
+        )
+
+    cash_types = ["Dividends", "Withholding Tax", "Broker Interest Paid", "Other Fees", "Deposits/Withdrawals"]
+    cash_rows = []
+    for i in range(int(cash_transactions)):
+        cash_rows.append(
+            "<CashTransaction "
+            + _attrs(
+                accountId=account_id,
+                transactionID=500000 + i,
+                type=cash_types[i % len(cash_types)],
+                symbol=symbols[i % len(symbols)],
+                description="SYNTHETIC CASH",
+                currency="USD",
+                fxRateToBase=1,
+                amount=round(float(rng.normal(10, 50)), 2),
+                dateTime=day(i),
+                settleDate=day(i + 2),
+            )
+            + "/>"
+        )
+
+    transfer_rows = []
+    for i in range(int(transfers)):
+        transfer_rows.append(
+            "<Transfer "
+            + _attrs(
+                accountId=account_id,
+                transactionID=700000 + i,
+                type="ACATS" if i % 2 else "INTERNAL",
+                direction="IN" if i % 3 else "OUT",
+                symbol=symbols[i % len(symbols)],
+                description="SYNTHETIC TRANSFER",
+                date=day(i * 7),
+                settleDate=day(i * 7 + 2),
+                quantity=int(rng.integers(1, 100)),
+                transferPrice=round(float(rng.uniform(10, 400)), 2),
+                amount=round(float(rng.uniform(100, 10000)), 2),
+            )
+            + "/>"
+        )
+
+    interest_rows_xml = []
+    for i in range(int(interest_rows)):
+        month = (i % 12) + 1
+        interest_rows_xml.append(
+            "<InterestAccrualsCurrency "
+            + _attrs(
+                accountId=account_id,
+                currency="USD",
+                fromDate=f"{year}{month:02d}01",
+                toDate=f"{year}{month:02d}28",
+                startingAccrualBalance=round(float(rng.uniform(0, 50)), 2),
+                interestAccrued=round(float(rng.uniform(0, 20)), 2),
+                endingAccrualBalance=round(float(rng.uniform(0, 50)), 2),
+                rate=round(float(rng.uniform(0.01, 0.08)), 4),
+            )
+            + "/>"
+        )
+
+    account_info = "<AccountInformation " + _attrs(
+        accountId=account_id,
+        currency="USD",
+        baseCurrency="USD",
+        totalCashValue=round(float(rng.uniform(1e3, 1e5)), 2),
+        netLiquidation=round(float(rng.uniform(1e4, 1e6)), 2),
+        equity=round(float(rng.uniform(1e4, 1e6)), 2),
+    ) + "/>"
+
+    statement = (
+        "<FlexStatement "
+        + _attrs(accountId=account_id, fromDate=f"{year}0101", toDate=f"{year}1231", period="Custom")
+        + ">"
+        + f"<AccountInformation>{account_info}</AccountInformation>"
+        + f"<OpenPositions>{''.join(position_rows)}</OpenPositions>"
+        + f"<Trades>{''.join(trade_rows)}</Trades>"
+        + f"<CashTransactions>{''.join(cash_rows)}</CashTransactions>"
+        + f"<InterestAccruals>{''.join(interest_rows_xml)}</InterestAccruals>"
+        + f"<Transfers>{''.join(transfer_rows)}</Transfers>"
+        + "<OptionEAE/>"
+        + "</FlexStatement>"
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<FlexQueryResponse queryName="synthetic" type="AF">'
+        f'<FlexStatements count="1">{statement}</FlexStatements>'
+        "</FlexQueryResponse>"
+    )
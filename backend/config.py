@@ -14,6 +14,8 @@ class Settings(BaseSettings):
 
     # Redis Configuration (Docker defaults; override via env in non-Docker)
     REDIS_URL: str = "redis://:redispassword@redis:6379/0"
+    # Shared per-process Redis connection pool used by MarketDataService (API workers / Celery children)
+    REDIS_MAX_CONNECTIONS: int = 100
     CELERY_BROKER_URL: str = "redis://:redispassword@redis:6379/0"
     CELERY_RESULT_BACKEND: str = "redis://:redispassword@redis:6379/0"
 
@@ -40,6 +42,21 @@ class Settings(BaseSettings):
     IBKR_FLEX_LOOKBACK_YEARS: int = (
         10  # Intended history window; configure FlexQuery accordingly
     )
+    # Minimum spacing between FlexQuery report requests when syncing accounts in parallel
+    IBKR_FLEX_REQUEST_STAGGER_SECONDS: float = 5.0
+    # FlexQuery report store: reuse a stored report younger than this instead of re-fetching,
+    # keep N reports per account, and skip sync steps whose report sections are unchanged
+    IBKR_FLEX_REPORT_REUSE_SECONDS: int = 900
+    IBKR_FLEX_REPORT_RETENTION: int = 30
+    IBKR_FLEX_SKIP_UNCHANGED_SECTIONS: bool = True
+
+    # Multi-account sync orchestration: max accounts syncing at once, per broker
+    BROKER_SYNC_CONCURRENCY_IBKR: int = 3
+    BROKER_SYNC_CONCURRENCY_TASTYTRADE: int = 4
+    BROKER_SYNC_CONCURRENCY_SCHWAB: int = 4
+    # Activity tables refresh after a sync: the account's rows are rebuilt from
+    # min(earliest day the sync touched, today - N days) onward
+    ACTIVITY_REFRESH_LOOKBACK_DAYS: int = 35
 
     # Schwab (optional) - comma-separated account numbers for seeding
     SCHWAB_ACCOUNTS: Optional[str] = None
@@ -55,6 +72,8 @@ class Settings(BaseSettings):
     DISCORD_WEBHOOK_MORNING_BREW: Optional[str] = None  # Daily scans & market updates
     DISCORD_WEBHOOK_PLAYGROUND: Optional[str] = None  # Test notifications
     DISCORD_WEBHOOK_SYSTEM_STATUS: Optional[str] = None  # System status updates
+    # Seconds the dispatcher waits to coalesce embeds (up to 10 per message) per webhook
+    DISCORD_FLUSH_INTERVAL_SECONDS: float = 0.25
 
     # Discord Bot API (token + channel IDs). Prefer this for production-ready, scheduled messaging.
     DISCORD_BOT_TOKEN: Optional[str] = None
@@ -79,6 +98,9 @@ class Settings(BaseSettings):
     # Scanner Configuration
     MAX_SCANNER_TICKERS: int = 508  # Maximum tickers to scan in ATR Matrix
 
+    # ATR signals: skip a symbol's signal if the same type/level was raised within N hours
+    ATR_SIGNAL_DEDUPE_HOURS: int = 24
+
     # Logging Configuration
     LOG_LEVEL: str = "INFO"
 
@@ -92,6 +114,10 @@ class Settings(BaseSettings):
     MARKET_PROVIDER_POLICY: str = "paid"
     # Default cache TTL for market-data service (seconds)
     MARKET_DATA_CACHE_TTL: int = 300
+    # Universe digest (stage breadth, top RS, stage transitions): cached per as-of date,
+    # top-N list stored at this depth and sliced per caller
+    UNIVERSE_DIGEST_CACHE_TTL: int = 21600
+    UNIVERSE_DIGEST_TOP_N: int = 25
     # Daily backfill throughput controls (safe defaults; override via env in infra/env.dev)
     # - paid: higher concurrency (FMP is the primary provider)
     # - free: lower concurrency (avoid hammering free-tier sources)
@@ -101,6 +127,11 @@ class Settings(BaseSettings):
     # Provider retry/backoff (applies to transient provider failures like 429/5xx)
     MARKET_BACKFILL_RETRY_ATTEMPTS: int = 6
     MARKET_BACKFILL_RETRY_MAX_DELAY_SECONDS: float = 60.0
+    # Provider transport: "sdk" (fmpsdk) or "http" (pooled keep-alive REST to FMP, or to an
+    # FMP-compatible MARKET_PROVIDER_BASE_URL such as the local fake provider, which disables fallbacks)
+    MARKET_PROVIDER_TRANSPORT: str = "sdk"
+    MARKET_PROVIDER_BASE_URL: Optional[str] = None
+    MARKET_PROVIDER_TIMEOUT_SECONDS: float = 30.0
     # Toggle whether Coverage/Tracked sections are visible to all authenticated users
     MARKET_DATA_SECTION_PUBLIC: bool = False
     # Coverage UI sampling only (must NOT affect correctness/backfills).
@@ -111,10 +142,36 @@ class Settings(BaseSettings):
     # How many *trading days* to render in the UI histogram (frontend reads this from /market-data/coverage meta).
     COVERAGE_FILL_TRADING_DAYS_WINDOW: int = 50
 
+    # Chunked backfills (backfill_daily_since_date, snapshot history): symbols per chunk, and how
+    # long an unfinished run's checkpoint (backfill:* keys in Redis) stays resumable
+    BACKFILL_CHUNK_SIZE: int = 100
+    BACKFILL_CHECKPOINT_TTL_HOURS: int = 72
+
     # Snapshot computation window (daily bars). Needs to be large enough for:
     # - 200D SMA
     # - ~52-week RS computations on weekly resample
     SNAPSHOT_DAILY_BARS_LIMIT: int = 400
+    # Fundamentals store (symbol_fundamentals): rows older than the TTL are re-fetched in bulk
+    # by refresh_fundamentals; FMP profile requests carry this many comma-separated symbols.
+    FUNDAMENTALS_TTL_HOURS: int = 168
+    FUNDAMENTALS_REFRESH_BATCH: int = 50
+    # Per-run cap on per-symbol yfinance lookups for symbols FMP did not return.
+    FUNDAMENTALS_YF_FALLBACK_LIMIT: int = 25
+    # Tracked universe: per-version deltas (tracked:delta:{v}) are kept this long for
+    # incremental "changes since version N" reads; the in-process cache listens on
+    # tracked:invalidate when pub/sub is enabled, otherwise it checks tracked:version per read.
+    TRACKED_DELTA_TTL_HOURS: int = 168
+    TRACKED_UNIVERSE_PUBSUB: bool = True
+    # Prometheus text exposition at GET /metrics (API latency, providers, caches, tasks).
+    METRICS_ENABLED: bool = True
+    # Each process adds its metric deltas to the shared Redis totals at most this often
+    METRICS_FLUSH_SECONDS: float = 5.0
+    # Admin job history: exact JobRun counts stop at this many rows (planner estimate beyond),
+    # and per-task duration percentiles cover the last N days by default
+    JOB_HISTORY_EXACT_COUNT_LIMIT: int = 10000
+    JOB_HISTORY_STATS_DAYS: int = 30
+    # Evaluate user alert conditions once after each universe indicator refresh.
+    ALERT_EVALUATION_ON_REFRESH: bool = True
 
     # Source of truth should be runtime environment variables injected by Docker Compose
     # (`infra/env.dev` via Makefile). We keep optional env-file support only when explicitly
@@ -17,7 +17,7 @@ from .broker_account import BrokerAccount, BrokerType, AccountType, AccountStatu
 
 # Instruments & Market Data
 from .instrument import Instrument, InstrumentType
-from .market_data import PriceData, MarketSnapshot, MarketSnapshotHistory, JobRun
+from .market_data import PriceData, MarketSnapshot, MarketSnapshotHistory, JobRun, SymbolFundamentals
 from .index_constituent import IndexConstituent
 
 # Trading & Positions
@@ -45,6 +45,12 @@ from .transaction import Transaction, TransactionType, Dividend
 # Options Trading
 from .options import Option, OptionType
 
+# FlexQuery report store
+from .flexquery_report import FlexQueryReport, FlexQuerySectionState
+
+# User alerts
+from .alert import Alert, AlertCondition, AlertTemplate, AlertHistory
+
 # Essential models list
 __all__ = [
     "Base",
@@ -61,6 +67,7 @@ __all__ = [
     "MarketSnapshot",
     "MarketSnapshotHistory",
     "JobRun",
+    "SymbolFundamentals",
     "IndexConstituent",
     "Position",
     "PositionType",
@@ -78,6 +85,12 @@ __all__ = [
     "Dividend",
     "Option",
     "OptionType",
+    "FlexQueryReport",
+    "FlexQuerySectionState",
+    "Alert",
+    "AlertCondition",
+    "AlertTemplate",
+    "AlertHistory",
     "PortfolioSnapshot",
     "Category",
     "PositionCategory",
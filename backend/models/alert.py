@@ -9,6 +9,7 @@ from sqlalchemy import (
     Numeric,
     Text,
     JSON,
+    Index,
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -61,20 +62,22 @@ class Alert(Base):
         "AlertCondition", back_populates="alert", cascade="all, delete-orphan"
     )
 
+    __table_args__ = (Index("idx_alerts_active_symbol", "is_active", "symbol"),)
+
 
 class AlertCondition(Base):
     __tablename__ = "alert_conditions"
 
     id = Column(Integer, primary_key=True, index=True)
-    alert_id = Column(Integer, ForeignKey("alerts.id"), nullable=False)
+    alert_id = Column(Integer, ForeignKey("alerts.id"), nullable=False, index=True)
 
     # Condition details
     condition_type = Column(
         String(50), nullable=False
     )  # PRICE, ATR_DISTANCE, RSI, MACD, etc.
     operator = Column(
-        String(10), nullable=False
-    )  # GT, LT, EQ, CROSSES_ABOVE, CROSSES_BELOW
+        String(20), nullable=False
+    )  # GT, GTE, LT, LTE, EQ, CROSSES_ABOVE, CROSSES_BELOW
     target_value = Column(Float, nullable=False)
     current_value = Column(Float)
 
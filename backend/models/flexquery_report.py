@@ -0,0 +1,64 @@
+"""
+FlexQuery Report Store
+======================
+
+Persistent, content-addressed copies of IBKR FlexQuery reports plus the per-section
+hashes last applied by a successful sync. Lets every sync step share one stored report
+and skip sections that have not changed since the previous nightly run.
+"""
+
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    DateTime,
+    JSON,
+    LargeBinary,
+    UniqueConstraint,
+    Index,
+)
+from sqlalchemy.sql import func
+
+from . import Base
+
+
+class FlexQueryReport(Base):
+    """One stored FlexQuery report (zlib-compressed XML), addressed by content digest.
+
+    Table name: flexquery_reports
+    """
+
+    __tablename__ = "flexquery_reports"
+
+    id = Column(Integer, primary_key=True, index=True)
+    account_number = Column(String(50), nullable=False, index=True)
+    digest = Column(String(64), nullable=False)  # sha256 over per-section hashes
+    payload = Column(LargeBinary, nullable=False)  # zlib-compressed raw XML
+    raw_size = Column(Integer)  # uncompressed bytes
+    section_hashes = Column(JSON)  # {section_name: sha256}
+    fetched_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("account_number", "digest", name="uq_flexquery_report_digest"),
+        Index("idx_flexquery_report_account_time", "account_number", "fetched_at"),
+    )
+
+
+class FlexQuerySectionState(Base):
+    """Hash of each report section as of the last successful sync for an account.
+
+    Table name: flexquery_section_state
+    """
+
+    __tablename__ = "flexquery_section_state"
+
+    id = Column(Integer, primary_key=True, index=True)
+    account_number = Column(String(50), nullable=False, index=True)
+    section = Column(String(64), nullable=False)
+    section_hash = Column(String(64), nullable=False)
+    report_digest = Column(String(64))
+    synced_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("account_number", "section", name="uq_flexquery_section_state"),
+    )
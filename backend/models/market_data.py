@@ -300,9 +300,33 @@ class MarketSnapshotHistory(Base):
             "symbol", "analysis_type", "as_of_date", name="uq_symbol_type_asof"
         ),
         Index("idx_hist_symbol_date", "symbol", "as_of_date"),
+        # Cross-sectional reads: every symbol on one date, keyset-paginated by symbol.
+        Index("idx_hist_type_date_symbol", "analysis_type", "as_of_date", "symbol"),
     )
 
 
+class SymbolFundamentals(Base):
+    """Company profile fundamentals per symbol, refreshed in bulk on a TTL.
+
+    Snapshot computation joins against this table in memory instead of calling
+    providers inline. Table name: symbol_fundamentals
+    """
+
+    __tablename__ = "symbol_fundamentals"
+
+    id = Column(Integer, primary_key=True, index=True)
+    symbol = Column(String(20), nullable=False, unique=True, index=True)
+    name = Column(String(200))
+    sector = Column(String(100))
+    industry = Column(String(100))
+    sub_industry = Column(String(100))
+    market_cap = Column(Float)
+    source = Column(String(20))  # fmp | yfinance | snapshot
+    refreshed_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (Index("idx_fundamentals_refreshed", "refreshed_at"),)
+
+
 class JobRun(Base):
     """Persistent job run registry for task observability and auditing.
 
@@ -317,6 +341,7 @@ class JobRun(Base):
     status = Column(String(20), nullable=False, index=True)  # running|ok|error|cancelled
     counters = Column(JSON)  # arbitrary counters (e.g., processed, errors)
     error = Column(Text)  # error message/traceback if any
+    profile = Column(Text)  # folded stacks from the opt-in sampling profiler
     started_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     finished_at = Column(DateTime(timezone=True))
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -324,5 +349,6 @@ class JobRun(Base):
     __table_args__ = (
         Index("idx_jobrun_task_time", "task_name", "started_at"),
         Index("idx_jobrun_status_time", "status", "started_at"),
+        Index("idx_jobrun_started_id", "started_at", "id"),
     )
 
@@ -30,6 +30,8 @@ class TaxLotMethod(enum.Enum):
     LIFO = "lifo"  # Last In, First Out
     AVERAGE_COST = "average_cost"  # Average cost method
     SPECIFIC_ID = "specific_id"  # Specific identification
+    HIFO = "hifo"  # Highest In, First Out (highest cost basis first)
+    MIN_TAX = "min_tax"  # Lowest estimated tax per share first
     # Advanced tax optimization methods
     MAXIMIZE_LONG_TERM_GAIN = "mltg"  # Tax optimizer: maximize long-term gains
     MAXIMIZE_LONG_TERM_LOSS = "mltl"  # Tax optimizer: maximize long-term losses
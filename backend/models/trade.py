@@ -91,6 +91,7 @@ class Trade(Base):
         Index(
             "idx_trades_account_symbol_time", "account_id", "symbol", "execution_time"
         ),
+        Index("idx_trades_account_time", "account_id", "execution_time", "id"),
     )
 
 
@@ -143,3 +144,8 @@ class TradeSignal(Base):
 
     # Relationships
     trades = relationship("Trade", back_populates="signal")
+
+    __table_args__ = (
+        # Recent-signal dedupe lookups by strategy/symbol/time
+        Index("idx_trade_signals_strategy_symbol_time", "strategy_name", "symbol", "created_at"),
+    )
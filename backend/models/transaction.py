@@ -191,6 +191,7 @@ class Transaction(Base):
         Index("idx_transaction_date", "transaction_date"),
         Index("idx_external_id", "external_id"),
         Index("idx_account_symbol_date", "account_id", "symbol", "transaction_date"),
+        Index("idx_transactions_account_date", "account_id", "transaction_date", "id"),
     )
 
 
@@ -238,6 +239,7 @@ class Dividend(Base):
         Index("idx_ex_date", "ex_date"),
         Index("idx_pay_date", "pay_date"),
         Index("idx_account_symbol_exdate", "account_id", "symbol", "ex_date"),
+        Index("idx_dividends_account_exdate", "account_id", "ex_date", "id"),
     )
 
 
@@ -19,18 +19,23 @@ Handles ALL ATR calculations with research-based enhancements:
 """
 
 import asyncio
+import hashlib
+import json
 import logging
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 import aiohttp  # Added for API calls
 
 
 # Note: TechnicalIndicators class doesn't exist - removed for now
 from backend.database import SessionLocal
+from backend.models.index_constituent import IndexConstituent
+from backend.models.market_data import PriceData
 
 logger = logging.getLogger(__name__)
 
@@ -139,6 +144,10 @@ class ATREngine:
         self.batch_size = 50  # Process in batches for performance
         self.max_concurrent = 10  # Max concurrent calculations
 
+        # DB-first universe mode (bulk panel over price_data)
+        self.db_lookback_bars = 260  # ~1 trading year for volatility percentiles
+        self.universe_cache_ttl = 24 * 3600  # Redis TTL; key already pins last bar date
+
         # Cache for performance
         self.atr_cache = {}
         self.cache_duration = timedelta(hours=1)
@@ -305,17 +314,22 @@ class ATREngine:
     # =============================================================================
 
     async def process_major_indices(
-        self, indices: List[str] = None
+        self, indices: List[str] = None, source: str = "db"
     ) -> ATRUniverseResult:
         """
         Process ATR for all major indices stocks.
 
         Args:
             indices: List of index names ['SP500', 'NASDAQ100', 'RUSSELL2000']
+            source: "db" computes the whole universe from stored price_data bars in one
+                vectorized pass; "provider" fetches bars per symbol (legacy path).
         """
         if indices is None:
             indices = ["SP500", "NASDAQ100", "RUSSELL2000"]
 
+        if source == "db":
+            return await self.process_universe_from_db(indices=indices)
+
         logger.info(f"🚀 Processing ATR for major indices: {indices}")
         start_time = datetime.now()
 
@@ -329,11 +343,7 @@ class ATREngine:
 
         # Process in batches for performance
         results = []
-        successful = 0
         failed = 0
-        breakouts = 0
-        high_vol = 0
-        signals = 0
 
         for i in range(0, len(all_symbols), self.batch_size):
             batch = all_symbols[i : i + self.batch_size]
@@ -353,22 +363,31 @@ class ATREngine:
                     continue
 
                 if result.atr_value > 0:
-                    successful += 1
                     results.append(result)
-
-                    # Count interesting signals
-                    if result.is_breakout:
-                        breakouts += 1
-                    if result.volatility_level in ["HIGH", "EXTREME"]:
-                        high_vol += 1
-                    if result.is_breakout or result.volatility_level in [
-                        "HIGH",
-                        "EXTREME",
-                    ]:
-                        signals += 1
                 else:
                     failed += 1
 
+        # Store results in database
+        await self._store_atr_results(results)
+
+        return self._summarize_universe(total_symbols, results, failed, start_time)
+
+    def _summarize_universe(
+        self,
+        total_symbols: int,
+        results: List[ATRResult],
+        failed: int,
+        start_time: datetime,
+    ) -> ATRUniverseResult:
+        """Aggregate per-symbol results into an ATRUniverseResult."""
+        breakouts = sum(1 for r in results if r.is_breakout)
+        high_vol = sum(1 for r in results if r.volatility_level in ["HIGH", "EXTREME"])
+        signals = sum(
+            1
+            for r in results
+            if r.is_breakout or r.volatility_level in ["HIGH", "EXTREME"]
+        )
+
         # Calculate execution time
         execution_time = (datetime.now() - start_time).total_seconds()
 
@@ -385,11 +404,8 @@ class ATREngine:
             reverse=True,
         )[:10]
 
-        # Store results in database
-        await self._store_atr_results(results)
-
         logger.info(
-            f"✅ Processed {successful}/{total_symbols} symbols in {execution_time:.1f}s"
+            f"✅ Processed {len(results)}/{total_symbols} symbols in {execution_time:.1f}s"
         )
         logger.info(
             f"🚀 Found {breakouts} breakouts, {high_vol} high volatility stocks"
@@ -397,7 +413,7 @@ class ATREngine:
 
         return ATRUniverseResult(
             total_symbols=total_symbols,
-            successful_calculations=successful,
+            successful_calculations=len(results),
             failed_calculations=failed,
             breakouts_detected=breakouts,
             high_volatility_count=high_vol,
@@ -423,6 +439,316 @@ class ATREngine:
             ],
         )
 
+    # =============================================================================
+    # DB-FIRST UNIVERSE PROCESSING (vectorized over price_data)
+    # =============================================================================
+
+    async def process_universe_from_db(
+        self,
+        indices: List[str] = None,
+        symbols: Optional[List[str]] = None,
+        periods: int = None,
+        db: Optional[Session] = None,
+    ) -> ATRUniverseResult:
+        """
+        Compute ATR analysis for a whole universe from stored daily bars.
+
+        Bars for every constituent are loaded in one query and all indicators are
+        computed as column-wise panel operations. Results are cached in Redis under
+        the universe's last bar date, so repeat runs before new bars land are free.
+        No provider calls are made.
+        """
+        if periods is None:
+            periods = self.default_period
+        session = db or self.db
+        start_time = datetime.now()
+
+        if symbols is None:
+            symbols = self._db_index_symbols(session, indices or ["SP500", "NASDAQ100", "RUSSELL2000"])
+        symbols = sorted({str(s).upper() for s in symbols if s})
+        logger.info(f"🚀 Processing DB-first ATR for {len(symbols)} symbols")
+        if not symbols:
+            return self._summarize_universe(0, [], 0, start_time)
+
+        last_bar = (
+            session.query(func.max(PriceData.date))
+            .filter(PriceData.interval == "1d", PriceData.symbol.in_(symbols))
+            .scalar()
+        )
+        if last_bar is None:
+            logger.warning("No daily bars in price_data for requested universe")
+            return self._summarize_universe(len(symbols), [], len(symbols), start_time)
+
+        cache_key = self._universe_cache_key(symbols, periods, last_bar)
+        results = self._get_cached_universe(cache_key)
+        if results is None:
+            panel = self.load_price_panel(session, symbols, end=last_bar)
+            results = self.calculate_atr_panel(panel, periods)
+            self._set_cached_universe(cache_key, results)
+            await self._store_atr_results(results)
+        else:
+            logger.info(f"♻️ ATR universe cache hit ({cache_key})")
+
+        failed = len(symbols) - len(results)
+        return self._summarize_universe(len(symbols), results, failed, start_time)
+
+    def load_price_panel(
+        self,
+        db: Session,
+        symbols: List[str],
+        end: Optional[datetime] = None,
+        bars: Optional[int] = None,
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Load daily OHLC for many symbols as wide frames (rows = bar number, cols = symbol).
+
+        Each column is right-aligned on its own bars: the last row is the symbol's latest
+        bar and any missing history is leading NaN. That keeps Wilder smoothing and
+        "last N bars" windows identical to the per-symbol calculation.
+        """
+        bars = int(bars or self.db_lookback_bars)
+        q = db.query(
+            PriceData.symbol,
+            PriceData.date,
+            PriceData.open_price,
+            PriceData.high_price,
+            PriceData.low_price,
+            PriceData.close_price,
+        ).filter(PriceData.interval == "1d", PriceData.symbol.in_(symbols))
+        if end is not None:
+            # Calendar-day window comfortably covering `bars` trading days
+            q = q.filter(
+                PriceData.date >= end - timedelta(days=int(bars * 7 / 5) + 10),
+                PriceData.date <= end,
+            )
+        rows = q.all()
+        if not rows:
+            return {}
+
+        long = pd.DataFrame(
+            rows, columns=["symbol", "date", "open", "high", "low", "close"]
+        )
+        long = long.dropna(subset=["close"])
+        wide = {
+            col: long.pivot_table(
+                index="date", columns="symbol", values=col, aggfunc="last"
+            ).sort_index()
+            for col in ("open", "high", "low", "close")
+        }
+        close = wide["close"]
+        columns = close.columns
+        for col in ("open", "high", "low"):
+            wide[col] = wide[col].reindex(index=close.index, columns=columns).fillna(close)
+
+        # Right-align every column on its own bars (stable sort keeps bar order)
+        mask = close.notna().to_numpy()
+        order = np.argsort(mask, axis=0, kind="stable")
+        last_dates = pd.Series(
+            [close[c].last_valid_index() for c in columns], index=columns
+        )
+        panel: Dict[str, pd.DataFrame] = {}
+        for col, frame in wide.items():
+            arr = np.take_along_axis(frame.to_numpy(dtype=float), order, axis=0)
+            arr = np.where(np.take_along_axis(mask, order, axis=0), arr, np.nan)
+            panel[col] = pd.DataFrame(arr, columns=columns).tail(bars).reset_index(drop=True)
+        panel["last_date"] = last_dates
+        return panel
+
+    def calculate_atr_panel(
+        self, panel: Dict[str, pd.DataFrame], periods: int = None
+    ) -> List[ATRResult]:
+        """Vectorized ATR analysis over a price panel from `load_price_panel`."""
+        if periods is None:
+            periods = self.default_period
+        if not panel:
+            return []
+
+        open_, high, low, close = (panel[c] for c in ("open", "high", "low", "close"))
+        prev_close = close.shift(1)
+
+        # True Range (first bar falls back to high - low)
+        tr = pd.DataFrame(
+            np.fmax(
+                (high - low).to_numpy(),
+                np.fmax(
+                    (high - prev_close).abs().to_numpy(),
+                    (low - prev_close).abs().to_numpy(),
+                ),
+            ),
+            columns=close.columns,
+        ).where(close.notna())
+
+        # Wilder ATR: SMA seed of the first `periods` TRs, then (prev*(n-1) + tr) / n
+        seed = tr.rolling(periods, min_periods=periods).mean()
+        has_seed = seed.notna()
+        first_seed = has_seed & ~has_seed.shift(1, fill_value=False)
+        atr = tr.where(has_seed).mask(first_seed, seed)
+        atr = atr.ewm(alpha=1.0 / periods, adjust=False).mean()
+
+        current_atr = atr.iloc[-1]
+        current_tr = tr.iloc[-1]
+        current_price = close.iloc[-1]
+        valid_count = atr.notna().sum()
+        ok = (current_atr > 0) & current_price.notna() & (current_price > 0)
+        if not ok.any():
+            return []
+
+        # Volatility regime
+        percentile = atr.le(current_atr).sum() / valid_count.where(valid_count > 0) * 100
+        level = pd.Series(
+            np.select(
+                [
+                    percentile <= self.volatility_thresholds["LOW"],
+                    percentile <= self.volatility_thresholds["MEDIUM"],
+                    percentile <= self.volatility_thresholds["HIGH"],
+                ],
+                ["LOW", "MEDIUM", "HIGH"],
+                default="EXTREME",
+            ),
+            index=close.columns,
+        )
+        recent_avg = atr.tail(5).mean()
+        older_avg = atr.tail(20).head(10).mean()
+        trend = pd.Series(
+            np.select(
+                [recent_avg > older_avg * 1.15, recent_avg < older_avg * 0.85],
+                ["EXPANDING", "CONTRACTING"],
+                default="STABLE",
+            ),
+            index=close.columns,
+        )
+        hot = level.isin(["HIGH", "EXTREME"])
+        cycle = pd.Series(
+            np.select(
+                [
+                    (level == "LOW") & trend.isin(["CONTRACTING", "STABLE"]),
+                    hot & (trend == "EXPANDING"),
+                    hot & (trend == "CONTRACTING"),
+                ],
+                ["COMPRESSION", "EXPANSION", "EXHAUSTION"],
+                default="STABLE",
+            ),
+            index=close.columns,
+        )
+        thin = valid_count < 10
+        level[thin] = "MEDIUM"
+        percentile[thin] = 50.0
+        trend[thin] = "STABLE"
+        cycle[thin] = "STABLE"
+
+        # Breakouts, chandelier exits, ATR bands
+        multiple = current_tr / current_atr
+        is_breakout = multiple >= self.breakout_threshold
+        direction = pd.Series(
+            np.where(close.iloc[-1] > open_.iloc[-1], "UP", "DOWN"), index=close.columns
+        ).where(is_breakout, "NONE")
+        chandelier_long = high.tail(14).max() - self.chandelier_multiplier * current_atr
+        chandelier_short = low.tail(14).min() + self.chandelier_multiplier * current_atr
+        middle = close.tail(20).mean().where(close.tail(20).notna().sum() == 20)
+        bands_upper = middle + 2.0 * current_atr
+        bands_lower = middle - 2.0 * current_atr
+
+        # Confidence (history depth, reduced for stale bars) and data quality
+        bar_count = close.notna().sum()
+        confidence = (valid_count / (self.default_period * 2)).clip(upper=1.0)
+        last_dates = pd.to_datetime(panel.get("last_date", pd.Series(dtype="datetime64[ns]")))
+        days_old = (pd.Timestamp(datetime.now()) - last_dates).dt.days.reindex(close.columns)
+        stale_factor = (1 - days_old / 30).clip(lower=0.5).where(days_old > 5, 1.0).fillna(1.0)
+        confidence = confidence * stale_factor
+        data_quality = (bar_count / (periods * 2)).clip(upper=1.0)
+
+        now = datetime.now()
+        results: List[ATRResult] = []
+        for symbol in close.columns[ok.to_numpy()]:
+            atr_v = float(current_atr[symbol])
+            price = float(current_price[symbol])
+            vol_level = str(level[symbol])
+            options_strikes = self._calculate_options_strikes(price, atr_v)
+            trading_levels = self._calculate_trading_levels(price, atr_v)
+            results.append(
+                ATRResult(
+                    symbol=symbol,
+                    timeframe="1D",
+                    atr_value=atr_v,
+                    atr_percentage=atr_v / price * 100,
+                    true_range=float(current_tr[symbol]),
+                    volatility_level=vol_level,
+                    volatility_percentile=float(percentile[symbol]),
+                    volatility_trend=str(trend[symbol]),
+                    cycle_stage=str(cycle[symbol]),
+                    is_breakout=bool(is_breakout[symbol]),
+                    breakout_multiple=float(multiple[symbol]),
+                    breakout_direction=str(direction[symbol]),
+                    chandelier_long_exit=float(chandelier_long[symbol]),
+                    chandelier_short_exit=float(chandelier_short[symbol]),
+                    atr_bands_upper=float(bands_upper[symbol]),
+                    atr_bands_lower=float(bands_lower[symbol]),
+                    suggested_stop_loss=self._calculate_stop_loss(price, atr_v, vol_level),
+                    options_strike_otm=options_strikes["otm"],
+                    options_strike_itm=options_strikes["itm"],
+                    iv_rank_estimate=self._estimate_iv_rank(
+                        {"percentile": float(percentile[symbol])}
+                    ),
+                    entry_threshold=trading_levels["entry"],
+                    exhaustion_level=trading_levels["exhaustion"],
+                    scale_out_levels=trading_levels["scale_out"],
+                    data_quality=float(data_quality[symbol]),
+                    confidence=float(confidence[symbol]),
+                    calculation_date=now,
+                    periods_used=periods,
+                )
+            )
+        return results
+
+    def _db_index_symbols(self, db: Session, indices: List[str]) -> List[str]:
+        """Active constituents of the requested indices from index_constituents."""
+        rows = (
+            db.query(IndexConstituent.symbol)
+            .filter(
+                IndexConstituent.index_name.in_([i.upper() for i in indices]),
+                IndexConstituent.is_active.is_(True),
+            )
+            .distinct()
+            .all()
+        )
+        return [s for (s,) in rows if s]
+
+    def _universe_cache_key(
+        self, symbols: List[str], periods: int, last_bar: datetime
+    ) -> str:
+        digest = hashlib.sha1(",".join(symbols).encode("utf-8")).hexdigest()[:16]
+        return f"atr:universe:{periods}:{pd.Timestamp(last_bar).date().isoformat()}:{digest}"
+
+    def _get_cached_universe(self, cache_key: str) -> Optional[List[ATRResult]]:
+        try:
+            from backend.services.market.market_data_service import market_data_service
+
+            raw = market_data_service.redis_client.get(cache_key)
+            if not raw:
+                return None
+            results = []
+            for item in json.loads(raw):
+                item["calculation_date"] = datetime.fromisoformat(item["calculation_date"])
+                results.append(ATRResult(**item))
+            return results
+        except Exception as e:
+            logger.warning(f"ATR universe cache read failed: {e}")
+            return None
+
+    def _set_cached_universe(self, cache_key: str, results: List[ATRResult]) -> None:
+        try:
+            from backend.services.market.market_data_service import market_data_service
+
+            payload = [
+                {**asdict(r), "calculation_date": r.calculation_date.isoformat()}
+                for r in results
+            ]
+            market_data_service.redis_client.setex(
+                cache_key, self.universe_cache_ttl, json.dumps(payload)
+            )
+        except Exception as e:
+            logger.warning(f"ATR universe cache write failed: {e}")
+
     async def get_portfolio_atr(self, symbols: List[str]) -> Dict[str, ATRResult]:
         """Get ATR analysis for specific portfolio symbols (for Holdings UI)."""
         results = {}
@@ -618,10 +944,15 @@ class ATREngine:
     async def _get_market_data(
         self, symbol: str, timeframe: str, periods: int
     ) -> pd.DataFrame:
-        """Get market data using the existing market data service."""
+        """Get market data, preferring stored daily bars over provider calls."""
         try:
             from backend.services.market.market_data_service import market_data_service
 
+            if timeframe == "1D":
+                stored = self._get_db_market_data(symbol, periods)
+                if len(stored) >= periods:
+                    return stored
+
             # Convert periods to appropriate period string for API
             period_map = {
                 "1D": self._periods_to_yahoo_period(periods),
@@ -656,6 +987,23 @@ class ATREngine:
             logger.error(f"Error getting market data for {symbol}: {e}")
             return pd.DataFrame()
 
+    def _get_db_market_data(self, symbol: str, periods: int) -> pd.DataFrame:
+        """Latest `periods` daily bars from price_data (ascending, lowercase columns)."""
+        try:
+            from backend.services.market.market_data_service import market_data_service
+
+            df = market_data_service.get_db_history(
+                self.db,
+                symbol,
+                interval="1d",
+                start=datetime.now() - timedelta(days=int(periods * 7 / 5) + 10),
+            )
+            df.columns = [col.lower() for col in df.columns]
+            return df.tail(periods)
+        except Exception as e:
+            logger.warning(f"Stored bars unavailable for {symbol}: {e}")
+            return pd.DataFrame()
+
     def _periods_to_yahoo_period(self, periods: int) -> str:
         """Convert number of periods to Yahoo Finance period string."""
         if periods <= 7:
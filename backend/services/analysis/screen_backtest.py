@@ -0,0 +1,297 @@
+"""
+Screen Backtester
+=================
+
+Replays a screen expression over the `market_snapshot_history` ledger.
+
+- The ledger is loaded once into a columnar (field -> date x symbol) cache
+- Screens such as ``stage_label == "2" & atrx_sma_50 < 4`` are evaluated
+  vectorized across every date and symbol at once
+- Forward returns come from daily closes in `price_data`
+- Reports per-horizon hit rates plus an equal-weight, daily-rebalanced equity
+  curve against the universe average
+"""
+
+from __future__ import annotations
+
+import ast
+import logging
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from backend.database import SessionLocal
+from backend.models.market_data import MarketSnapshotHistory, PriceData
+
+logger = logging.getLogger(__name__)
+
+_LEDGER_TABLE = MarketSnapshotHistory.__table__
+_NUMERIC_TYPES = (int, float)
+_EXPRESSION_KEYWORDS = {"True", "False", "None"}
+
+
+@dataclass
+class LedgerPanel:
+    """Columnar ledger slice: one (dates x symbols) frame per field."""
+
+    dates: pd.DatetimeIndex
+    symbols: pd.Index
+    fields: Dict[str, pd.DataFrame]
+
+    def __getitem__(self, name: str) -> pd.DataFrame:
+        return self.fields[name]
+
+
+@dataclass
+class ScreenBacktestResult:
+    expression: str
+    start: Optional[datetime]
+    end: Optional[datetime]
+    dates: int
+    symbols: int
+    signals: int
+    horizons: Dict[int, Dict[str, Optional[float]]]
+    equity_curve: List[Dict[str, object]] = field(default_factory=list)
+    signals_per_date: List[Dict[str, object]] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "expression": self.expression,
+            "start": self.start.isoformat() if self.start else None,
+            "end": self.end.isoformat() if self.end else None,
+            "dates": self.dates,
+            "symbols": self.symbols,
+            "signals": self.signals,
+            "horizons": {str(h): v for h, v in self.horizons.items()},
+            "equity_curve": self.equity_curve,
+            "signals_per_date": self.signals_per_date,
+        }
+
+
+def expression_fields(expression: str) -> List[str]:
+    """Ledger fields referenced by a screen expression (validated against the model)."""
+    try:
+        tree = ast.parse(expression, mode="eval")
+    except SyntaxError as exc:
+        raise ValueError(f"Invalid screen expression: {exc.msg}") from exc
+    names: List[str] = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call):
+            raise ValueError("Function calls are not allowed in screen expressions")
+        if isinstance(node, ast.Attribute):
+            raise ValueError("Attribute access is not allowed in screen expressions")
+        if isinstance(node, ast.Name) and node.id not in _EXPRESSION_KEYWORDS and node.id not in names:
+            if node.id not in _LEDGER_TABLE.columns or node.id in ("id", "symbol", "analysis_type"):
+                raise ValueError(f"Unknown ledger field in screen: {node.id}")
+            names.append(node.id)
+    if not names:
+        raise ValueError("Screen expression does not reference any ledger field")
+    return names
+
+
+def _to_panel_values(values: np.ndarray, is_numeric: bool, shape: Tuple[int, int], rows, cols) -> np.ndarray:
+    if is_numeric:
+        out = np.full(shape, np.nan, dtype="float64")
+        out[rows, cols] = pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(dtype="float64")
+    else:
+        out = np.full(shape, None, dtype="object")
+        out[rows, cols] = values
+    return out
+
+
+class ScreenBacktester:
+    """Vectorized screen replay over the snapshot ledger with an in-process panel cache."""
+
+    def __init__(self, analysis_type: str = "technical_snapshot", max_cached: int = 4):
+        self.analysis_type = analysis_type
+        self.max_cached = max_cached
+        self._cache: Dict[tuple, LedgerPanel] = {}
+        self._lock = threading.Lock()
+
+    # ---------------------- Loading ----------------------
+    def _watermark(self, db: Session) -> tuple:
+        """Cheap ledger version: invalidates cached panels after backfills."""
+        row = db.execute(
+            select(func.count(MarketSnapshotHistory.id), func.max(MarketSnapshotHistory.analysis_timestamp)).where(
+                MarketSnapshotHistory.analysis_type == self.analysis_type
+            )
+        ).one()
+        return (int(row[0] or 0), row[1].isoformat() if row[1] is not None else None)
+
+    def load_ledger(
+        self,
+        db: Session,
+        fields: Sequence[str],
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        symbols: Optional[Sequence[str]] = None,
+    ) -> LedgerPanel:
+        """Load `fields` for every (date, symbol) in range with a single query."""
+        fields = sorted(set(fields))
+        syms = tuple(sorted({str(s).upper() for s in symbols})) if symbols else None
+        key = (tuple(fields), start, end, syms, self._watermark(db))
+        with self._lock:
+            cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        cols = [MarketSnapshotHistory.as_of_date, MarketSnapshotHistory.symbol] + [
+            _LEDGER_TABLE.columns[f] for f in fields
+        ]
+        stmt = select(*cols).where(MarketSnapshotHistory.analysis_type == self.analysis_type)
+        if start is not None:
+            stmt = stmt.where(MarketSnapshotHistory.as_of_date >= start)
+        if end is not None:
+            stmt = stmt.where(MarketSnapshotHistory.as_of_date <= end)
+        if syms:
+            stmt = stmt.where(MarketSnapshotHistory.symbol.in_(syms))
+        rows = db.execute(stmt).all()
+
+        if not rows:
+            panel = LedgerPanel(pd.DatetimeIndex([]), pd.Index([]), {f: pd.DataFrame() for f in fields})
+        else:
+            data = list(zip(*rows))
+            date_codes, dates = pd.factorize(pd.DatetimeIndex(data[0]).normalize(), sort=True)
+            sym_codes, sym_index = pd.factorize(pd.Index(data[1]), sort=True)
+            shape = (len(dates), len(sym_index))
+            panel_fields: Dict[str, pd.DataFrame] = {}
+            for i, name in enumerate(fields):
+                col = _LEDGER_TABLE.columns[name]
+                is_numeric = getattr(col.type, "python_type", str) in _NUMERIC_TYPES
+                values = np.asarray(data[2 + i], dtype="object")
+                panel_fields[name] = pd.DataFrame(
+                    _to_panel_values(values, is_numeric, shape, date_codes, sym_codes),
+                    index=dates,
+                    columns=sym_index,
+                )
+            panel = LedgerPanel(pd.DatetimeIndex(dates), pd.Index(sym_index), panel_fields)
+
+        with self._lock:
+            if len(self._cache) >= self.max_cached:
+                self._cache.pop(next(iter(self._cache)))
+            self._cache[key] = panel
+        return panel
+
+    def load_closes(
+        self,
+        db: Session,
+        symbols: Sequence[str],
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> pd.DataFrame:
+        """Daily closes as a (date x symbol) frame from `price_data`."""
+        if not len(symbols):
+            return pd.DataFrame()
+        stmt = select(PriceData.date, PriceData.symbol, PriceData.close_price).where(
+            PriceData.interval == "1d",
+            PriceData.symbol.in_(list(symbols)),
+        )
+        if start is not None:
+            stmt = stmt.where(PriceData.date >= start)
+        if end is not None:
+            stmt = stmt.where(PriceData.date <= end)
+        rows = db.execute(stmt).all()
+        if not rows:
+            return pd.DataFrame(columns=list(symbols), dtype="float64")
+        df = pd.DataFrame(rows, columns=["date", "symbol", "close"])
+        df["date"] = pd.to_datetime(df["date"]).dt.normalize()
+        closes = df.pivot_table(index="date", columns="symbol", values="close", aggfunc="last")
+        return closes.sort_index().astype("float64")
+
+    # ---------------------- Evaluation ----------------------
+    @staticmethod
+    def evaluate(expression: str, panel: LedgerPanel) -> pd.DataFrame:
+        """Boolean (date x symbol) mask for `expression`; missing data never matches."""
+        mask = pd.eval(expression, engine="python", local_dict=dict(panel.fields))
+        if not isinstance(mask, pd.DataFrame):
+            raise ValueError("Screen expression must evaluate to a per-symbol condition")
+        return mask.reindex(index=panel.dates, columns=panel.symbols).fillna(False).astype(bool)
+
+    @staticmethod
+    def forward_returns(closes: pd.DataFrame, horizon: int) -> pd.DataFrame:
+        """Close-to-close return from each bar to the bar `horizon` sessions later."""
+        return closes.shift(-horizon) / closes.replace(0, np.nan) - 1.0
+
+    def run(
+        self,
+        db: Session,
+        expression: str,
+        *,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        symbols: Optional[Sequence[str]] = None,
+        horizons: Sequence[int] = (1, 5, 20),
+    ) -> ScreenBacktestResult:
+        """Replay `expression` over the ledger and score it against forward returns."""
+        horizons = sorted({int(h) for h in horizons if int(h) > 0}) or [1]
+        panel = self.load_ledger(db, expression_fields(expression), start, end, symbols)
+        if panel.dates.empty:
+            return ScreenBacktestResult(expression, start, end, 0, 0, 0, {h: {} for h in horizons})
+
+        mask = self.evaluate(expression, panel)
+        closes = self.load_closes(db, list(panel.symbols), start=panel.dates[0])
+        closes = closes.reindex(columns=panel.symbols)
+
+        stats: Dict[int, Dict[str, Optional[float]]] = {}
+        for h in horizons:
+            fwd = self.forward_returns(closes, h).reindex(panel.dates)
+            picked = fwd.where(mask).to_numpy(dtype="float64")
+            universe = fwd.to_numpy(dtype="float64")
+            scored = picked[~np.isnan(picked)]
+            base = universe[~np.isnan(universe)]
+            stats[h] = {
+                "signals": int(scored.size),
+                "hit_rate": float((scored > 0).mean()) if scored.size else None,
+                "avg_return": float(scored.mean()) if scored.size else None,
+                "median_return": float(np.median(scored)) if scored.size else None,
+                "universe_avg_return": float(base.mean()) if base.size else None,
+                "edge": float(scored.mean() - base.mean()) if scored.size and base.size else None,
+            }
+
+        # Equal-weight, daily-rebalanced curve: hold each date's picks for one session.
+        next_ret = self.forward_returns(closes, 1).reindex(panel.dates)
+        strat = next_ret.where(mask).mean(axis=1).fillna(0.0)
+        bench = next_ret.mean(axis=1).fillna(0.0)
+        equity = (1.0 + strat).cumprod()
+        bench_equity = (1.0 + bench).cumprod()
+        counts = mask.sum(axis=1)
+
+        result = ScreenBacktestResult(
+            expression=expression,
+            start=panel.dates[0].to_pydatetime(),
+            end=panel.dates[-1].to_pydatetime(),
+            dates=len(panel.dates),
+            symbols=len(panel.symbols),
+            signals=int(counts.sum()),
+            horizons=stats,
+            equity_curve=[
+                {"date": d.date().isoformat(), "equity": float(e), "benchmark": float(b)}
+                for d, e, b in zip(panel.dates, equity.to_numpy(), bench_equity.to_numpy())
+            ],
+            signals_per_date=[
+                {"date": d.date().isoformat(), "count": int(c)} for d, c in zip(panel.dates, counts.to_numpy())
+            ],
+        )
+        logger.info(
+            f"📈 Screen backtest '{expression}': {result.dates} dates x {result.symbols} symbols, "
+            f"{result.signals} signals"
+        )
+        return result
+
+    def run_screen(self, expression: str, db: Session | None = None, **kwargs) -> ScreenBacktestResult:
+        session = db or SessionLocal()
+        try:
+            return self.run(session, expression, **kwargs)
+        finally:
+            if db is None:
+                session.close()
+
+
+# Global instance
+screen_backtester = ScreenBacktester()
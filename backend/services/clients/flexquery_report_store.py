@@ -0,0 +1,200 @@
+"""
+FlexQuery Report Store
+======================
+
+Postgres-backed, content-addressed store for IBKR FlexQuery reports.
+
+- Reports are stored zlib-compressed and addressed by a digest of their section hashes,
+  so re-fetching identical data (only `whenGenerated` differs) does not add a new row.
+- Each top-level statement section (Trades, CashTransactions, OpenPositions, Transfers,
+  ...) is hashed separately. The hashes applied by the last successful sync are kept in
+  `flexquery_section_state`, letting the sync service skip steps whose inputs are
+  unchanged.
+
+All writes go through the caller's session so state only advances when the sync
+transaction commits.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import xml.etree.ElementTree as ET
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy.orm import Session
+
+from backend.config import settings
+from backend.models.flexquery_report import FlexQueryReport, FlexQuerySectionState
+
+logger = logging.getLogger(__name__)
+
+# Marker hash for a section that is absent from a report (absent → absent is "unchanged").
+MISSING_SECTION_HASH = "-"
+
+
+def compute_section_hashes(xml_data: str, account_id: Optional[str] = None) -> Dict[str, str]:
+    """Hash every statement section of a FlexQuery report.
+
+    When the report holds several accounts, only statements for `account_id` are hashed
+    (all statements if none match), so activity in other accounts does not count as a
+    change. Statement attributes such as `whenGenerated` are ignored.
+    """
+    root = ET.fromstring(xml_data)
+    statements = root.findall(".//FlexStatement")
+    if account_id:
+        own = [s for s in statements if s.get("accountId", "") == account_id]
+        statements = own or statements
+
+    digests: dict = {}
+    for statement in statements:
+        acct = statement.get("accountId", "")
+        for section in statement:
+            h = digests.setdefault(section.tag, hashlib.sha256())
+            h.update(acct.encode("utf-8") + b"\0")
+            h.update(ET.tostring(section, encoding="utf-8"))
+    return {name: h.hexdigest() for name, h in sorted(digests.items())}
+
+
+def report_digest(section_hashes: Dict[str, str]) -> str:
+    """Content address of a report: sha256 over its ordered section hashes."""
+    h = hashlib.sha256()
+    for name in sorted(section_hashes):
+        h.update(f"{name}:{section_hashes[name]}\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+class FlexQueryReportStore:
+    """Persist FlexQuery reports and track per-section sync state."""
+
+    def __init__(self, retention: Optional[int] = None):
+        self.retention = int(
+            retention
+            if retention is not None
+            else getattr(settings, "IBKR_FLEX_REPORT_RETENTION", 30)
+        )
+
+    def put(self, db: Session, account_number: str, xml_data: str) -> FlexQueryReport:
+        """Store a report (deduplicated by content digest) and return its row."""
+        hashes = compute_section_hashes(xml_data, account_number)
+        digest = report_digest(hashes)
+        existing = (
+            db.query(FlexQueryReport)
+            .filter(
+                FlexQueryReport.account_number == account_number,
+                FlexQueryReport.digest == digest,
+            )
+            .first()
+        )
+        now = datetime.now(timezone.utc)
+        if existing:
+            existing.fetched_at = now
+            db.flush()
+            return existing
+
+        raw = xml_data.encode("utf-8")
+        row = FlexQueryReport(
+            account_number=account_number,
+            digest=digest,
+            payload=zlib.compress(raw, 6),
+            raw_size=len(raw),
+            section_hashes=hashes,
+            fetched_at=now,
+        )
+        db.add(row)
+        db.flush()
+        self._prune(db, account_number)
+        logger.info(
+            f"🗄️ Stored FlexQuery report {digest[:12]} for {account_number} "
+            f"({len(raw)} → {len(row.payload)} bytes)"
+        )
+        return row
+
+    def latest(
+        self, db: Session, account_number: str, max_age_seconds: Optional[float] = None
+    ) -> Optional[FlexQueryReport]:
+        """Most recently fetched report for an account, optionally bounded by age."""
+        q = db.query(FlexQueryReport).filter(
+            FlexQueryReport.account_number == account_number
+        )
+        if max_age_seconds is not None:
+            cutoff = datetime.now(timezone.utc) - timedelta(seconds=float(max_age_seconds))
+            q = q.filter(FlexQueryReport.fetched_at >= cutoff)
+        return q.order_by(FlexQueryReport.fetched_at.desc()).first()
+
+    @staticmethod
+    def load_xml(report: FlexQueryReport) -> str:
+        return zlib.decompress(report.payload).decode("utf-8")
+
+    def synced_hashes(self, db: Session, account_number: str) -> Dict[str, str]:
+        rows = (
+            db.query(FlexQuerySectionState.section, FlexQuerySectionState.section_hash)
+            .filter(FlexQuerySectionState.account_number == account_number)
+            .all()
+        )
+        return {section: section_hash for section, section_hash in rows}
+
+    def unchanged_sections(
+        self, db: Session, account_number: str, section_hashes: Dict[str, str]
+    ) -> set[str]:
+        """Sections whose hash equals the one applied by the last successful sync."""
+        synced = self.synced_hashes(db, account_number)
+        names = set(synced) | set(section_hashes)
+        return {
+            name
+            for name in names
+            if name in synced
+            and synced[name] == section_hashes.get(name, MISSING_SECTION_HASH)
+        }
+
+    def mark_synced(
+        self,
+        db: Session,
+        account_number: str,
+        section_hashes: Dict[str, str],
+        sections: Iterable[str],
+        report_digest_value: Optional[str] = None,
+    ) -> int:
+        """Record `sections` as applied. Absent sections are recorded as missing."""
+        existing = {
+            row.section: row
+            for row in db.query(FlexQuerySectionState)
+            .filter(FlexQuerySectionState.account_number == account_number)
+            .all()
+        }
+        now = datetime.now(timezone.utc)
+        written = 0
+        for name in sections:
+            value = section_hashes.get(name, MISSING_SECTION_HASH)
+            row = existing.get(name)
+            if row is None:
+                row = FlexQuerySectionState(account_number=account_number, section=name)
+                db.add(row)
+            row.section_hash = value
+            row.report_digest = report_digest_value
+            row.synced_at = now
+            written += 1
+        db.flush()
+        return written
+
+    def _prune(self, db: Session, account_number: str) -> None:
+        if self.retention <= 0:
+            return
+        stale_ids = [
+            rid
+            for (rid,) in db.query(FlexQueryReport.id)
+            .filter(FlexQueryReport.account_number == account_number)
+            .order_by(FlexQueryReport.fetched_at.desc())
+            .offset(self.retention)
+            .all()
+        ]
+        if stale_ids:
+            db.query(FlexQueryReport).filter(FlexQueryReport.id.in_(stale_ids)).delete(
+                synchronize_session=False
+            )
+
+
+# Global instance
+flexquery_report_store = FlexQueryReportStore()
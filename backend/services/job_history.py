@@ -0,0 +1,225 @@
+"""JobRun history reads for the admin Jobs and Schedules pages.
+
+- `page()`: keyset pagination on (started_at DESC, id DESC) with optional task/status
+  filters; large JSON/text columns (params, counters, error) can be left out
+- `count()`: planner estimate for the whole table once it is large, capped exact
+  counts for filtered views
+- `latest_by_task()`: newest run per task in one query (one index probe per task
+  via LATERAL when the names are known, DISTINCT ON otherwise)
+- `duration_stats()`: per-task run counts, error counts and duration percentiles
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, select, text, tuple_
+from sqlalchemy.orm import Session
+
+from backend.config import settings
+from backend.models.market_data import JobRun
+
+SUMMARY_COLUMNS = (JobRun.id, JobRun.task_name, JobRun.status, JobRun.started_at, JobRun.finished_at)
+PAYLOAD_COLUMNS = (JobRun.params, JobRun.counters, JobRun.error)
+PERCENTILES = (0.5, 0.9, 0.99)
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(row: Dict[str, Any]) -> str:
+    """Opaque cursor for the run a page ended on."""
+    raw = json.dumps([row["started_at"].isoformat(), int(row["id"])])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        started_at, job_id = json.loads(raw)
+        return datetime.fromisoformat(started_at), int(job_id)
+    except Exception as e:
+        raise ValueError(f"Invalid job cursor: {cursor!r}") from e
+
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+def _duration(started_at: Optional[datetime], finished_at: Optional[datetime]) -> Optional[float]:
+    if started_at is None or finished_at is None:
+        return None
+    return round(max((finished_at - started_at).total_seconds(), 0.0), 3)
+
+
+def serialize_run(row: Dict[str, Any]) -> Dict[str, Any]:
+    out = {
+        "id": row["id"],
+        "task_name": row["task_name"],
+        "status": row["status"],
+        "started_at": _iso(row["started_at"]),
+        "finished_at": _iso(row["finished_at"]),
+        "duration_s": _duration(row["started_at"], row["finished_at"]),
+    }
+    for key in ("params", "counters", "error"):
+        if key in row:
+            out[key] = row[key]
+    return out
+
+
+class JobHistoryService:
+    """Indexed reads over `job_run`."""
+
+    @staticmethod
+    def _filters(task_name: Optional[str], status: Optional[str]) -> list:
+        clauses = []
+        if task_name:
+            clauses.append(JobRun.task_name == task_name)
+        if status:
+            clauses.append(JobRun.status == status)
+        return clauses
+
+    def page(
+        self,
+        db: Session,
+        *,
+        task_name: Optional[str] = None,
+        status: Optional[str] = None,
+        cursor: Optional[str] = None,
+        offset: int = 0,
+        limit: int = 50,
+        include_payload: bool = True,
+    ) -> Dict[str, Any]:
+        """One page of runs, newest first. `cursor` (from `next_cursor`) takes precedence over `offset`.
+
+        Raises ValueError for a malformed cursor.
+        """
+        size = max(1, min(int(limit), MAX_PAGE_SIZE))
+        columns = SUMMARY_COLUMNS + (PAYLOAD_COLUMNS if include_payload else ())
+        stmt = select(*columns).where(*self._filters(task_name, status))
+        if cursor:
+            started_at, job_id = decode_cursor(cursor)
+            stmt = stmt.where(tuple_(JobRun.started_at, JobRun.id) < tuple_(started_at, job_id))
+        elif offset:
+            stmt = stmt.offset(int(offset))
+        result = db.execute(
+            stmt.order_by(JobRun.started_at.desc(), JobRun.id.desc()).limit(size + 1)
+        ).mappings().all()
+
+        rows = [dict(r) for r in result[:size]]
+        return {
+            "jobs": [serialize_run(r) for r in rows],
+            "next_cursor": encode_cursor(rows[-1]) if len(result) > size else None,
+            "limit": size,
+        }
+
+    def count(
+        self, db: Session, *, task_name: Optional[str] = None, status: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Row count as {"total", "estimated"}.
+
+        Unfiltered: the planner's row estimate once it passes JOB_HISTORY_EXACT_COUNT_LIMIT.
+        Filtered: an exact count that stops at the limit (`estimated` marks a capped value).
+        """
+        cap = int(getattr(settings, "JOB_HISTORY_EXACT_COUNT_LIMIT", 10000))
+        clauses = self._filters(task_name, status)
+        if not clauses:
+            estimate = db.execute(
+                text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass('job_run')")
+            ).scalar()
+            if estimate is not None and estimate >= cap:
+                return {"total": int(estimate), "estimated": True}
+        capped = select(JobRun.id).where(*clauses).limit(cap + 1).subquery()
+        total = int(db.execute(select(func.count()).select_from(capped)).scalar() or 0)
+        if total > cap:
+            return {"total": cap, "estimated": True}
+        return {"total": total, "estimated": False}
+
+    def latest_by_task(
+        self, db: Session, task_names: Optional[Iterable[str]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """Newest run per task name (without payload columns)."""
+        if task_names is not None:
+            names = sorted({n for n in task_names if n})
+            if not names:
+                return {}
+            result = db.execute(
+                text(
+                    """
+                    SELECT j.id, j.task_name, j.status, j.started_at, j.finished_at
+                    FROM unnest(CAST(:names AS text[])) AS t(name)
+                    CROSS JOIN LATERAL (
+                        SELECT id, task_name, status, started_at, finished_at
+                        FROM job_run
+                        WHERE task_name = t.name
+                        ORDER BY started_at DESC, id DESC
+                        LIMIT 1
+                    ) j
+                    """
+                ),
+                {"names": names},
+            ).mappings()
+        else:
+            result = db.execute(
+                select(*SUMMARY_COLUMNS)
+                .order_by(JobRun.task_name, JobRun.started_at.desc(), JobRun.id.desc())
+                .distinct(JobRun.task_name)
+            ).mappings()
+        return {r["task_name"]: serialize_run(dict(r)) for r in result}
+
+    def duration_stats(
+        self,
+        db: Session,
+        *,
+        since: Optional[datetime] = None,
+        task_names: Optional[Iterable[str]] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """Per-task runs, errors and duration percentiles (seconds) since `since`.
+
+        Defaults to the last JOB_HISTORY_STATS_DAYS days.
+        """
+        if since is None:
+            since = datetime.utcnow() - timedelta(days=int(getattr(settings, "JOB_HISTORY_STATS_DAYS", 30)))
+        duration = func.extract("epoch", JobRun.finished_at - JobRun.started_at)
+        stmt = (
+            select(
+                JobRun.task_name,
+                func.count().label("runs"),
+                func.count().filter(JobRun.status == "error").label("errors"),
+                func.avg(duration).label("mean"),
+                func.max(duration).label("max"),
+                *[
+                    func.percentile_cont(p).within_group(duration).label(f"p{int(p * 100)}")
+                    for p in PERCENTILES
+                ],
+            )
+            .where(JobRun.started_at >= since)
+            .group_by(JobRun.task_name)
+        )
+        if task_names is not None:
+            stmt = stmt.where(JobRun.task_name.in_(sorted({n for n in task_names if n})))
+        out: Dict[str, Dict[str, Any]] = {}
+        for r in db.execute(stmt).mappings():
+            out[r["task_name"]] = {
+                "runs": int(r["runs"]),
+                "errors": int(r["errors"]),
+                **{
+                    f"{key}_s": round(float(r[key]), 3) if r[key] is not None else None
+                    for key in ("mean", "max", "p50", "p90", "p99")
+                },
+            }
+        return out
+
+    def summary(self, db: Session, *, since: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """Latest run and duration stats for every task, sorted by task name."""
+        latest = self.latest_by_task(db)
+        stats = self.duration_stats(db, since=since)
+        return [
+            {"task_name": name, "last_run": latest.get(name), "stats": stats.get(name)}
+            for name in sorted(set(latest) | set(stats))
+        ]
+
+
+# Global instance
+job_history = JobHistoryService()
@@ -0,0 +1,425 @@
+"""Alert evaluation over the latest market snapshots.
+
+All active `AlertCondition` rows are evaluated together against one load of the
+`market_snapshot` columns they reference (plus the previous `market_snapshot_history`
+row for CROSSES_* operators), so a snapshot refresh costs one pass no matter how many
+alerts exist.
+
+Semantics:
+- A condition reads `condition_type` as a snapshot column (PRICE → current_price,
+  ATR_DISTANCE → atr_distance, RSI → rsi, ... or any numeric column name).
+- Conditions of an alert are grouped by `group_id`; a group is OR-ed if any of its
+  conditions says `logical_operator="OR"`, otherwise AND-ed. Groups are AND-ed.
+- An alert triggers on the refresh where its combined result turns true (edge), not on
+  every refresh while it stays true.
+- Snapshots are daily, so only alerts whose conditions all use a daily (or empty)
+  timeframe are evaluated; the rest are skipped whole.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from backend.database import SessionLocal
+from backend.models.alert import Alert, AlertCondition, AlertHistory
+from backend.models.market_data import MarketSnapshot, MarketSnapshotHistory
+
+logger = logging.getLogger(__name__)
+
+CONDITION_ALIASES = {
+    "PRICE": "current_price",
+    "ATR_DISTANCE": "atr_distance",
+    "ATR_PERCENT": "atr_percent",
+    "RSI": "rsi",
+    "MACD": "macd",
+    "MACD_SIGNAL": "macd_signal",
+    "RS": "rs_mansfield_pct",
+}
+DAILY_TIMEFRAMES = {None, "", "1D", "D", "DAILY"}
+
+_NUMERIC_TYPES = (float, int)
+
+
+def _numeric_columns(model) -> set[str]:
+    out = set()
+    for col in model.__table__.columns:
+        try:
+            if col.type.python_type in _NUMERIC_TYPES and not col.primary_key:
+                out.add(col.name)
+        except NotImplementedError:
+            continue
+    return out
+
+
+SNAPSHOT_COLUMNS = _numeric_columns(MarketSnapshot)
+HISTORY_COLUMNS = _numeric_columns(MarketSnapshotHistory)
+
+
+def resolve_condition_column(condition_type: str) -> Optional[str]:
+    """Snapshot column for a condition type, or None if it cannot be evaluated."""
+    key = str(condition_type or "").strip()
+    column = CONDITION_ALIASES.get(key.upper(), key.lower())
+    return column if column in SNAPSHOT_COLUMNS else None
+
+
+def evaluate_operators(
+    operator: np.ndarray, value: np.ndarray, prev: np.ndarray, target: np.ndarray
+) -> np.ndarray:
+    """Vectorized operator evaluation; missing values never satisfy a condition."""
+    with np.errstate(invalid="ignore"):
+        met = np.select(
+            [
+                operator == "GT",
+                operator == "GTE",
+                operator == "LT",
+                operator == "LTE",
+                operator == "EQ",
+                operator == "CROSSES_ABOVE",
+                operator == "CROSSES_BELOW",
+            ],
+            [
+                value > target,
+                value >= target,
+                value < target,
+                value <= target,
+                np.isclose(value, target),
+                (prev <= target) & (value > target),
+                (prev >= target) & (value < target),
+            ],
+            default=False,
+        )
+    return met & ~np.isnan(value)
+
+
+def _combine(conds: pd.DataFrame, met_col: str) -> pd.Series:
+    """Combine condition results per alert: groups by operator, then AND across groups."""
+    grouped = conds.groupby(["alert_id", "group"])
+    group_any = grouped[met_col].any()
+    group_all = grouped[met_col].all()
+    group_is_or = grouped["is_or"].any()
+    group_met = group_any.where(group_is_or, group_all)
+    return group_met.groupby(level="alert_id").all()
+
+
+class AlertEvaluator:
+    """Evaluate every active alert against the latest snapshots in one pass."""
+
+    def __init__(
+        self,
+        analysis_type: str = "technical_snapshot",
+        notifier: Optional[Callable[[List[Dict[str, Any]]], Dict[int, bool]]] = None,
+    ):
+        self.analysis_type = analysis_type
+        self.notifier = notifier or notify_discord
+
+    def evaluate(
+        self,
+        db: Session | None = None,
+        symbols: Optional[List[str]] = None,
+        notify: bool = True,
+    ) -> Dict[str, Any]:
+        session = db or SessionLocal()
+        try:
+            return self._evaluate(session, symbols, notify)
+        finally:
+            if db is None:
+                session.close()
+
+    def _evaluate(
+        self, db: Session, symbols: Optional[List[str]], notify: bool
+    ) -> Dict[str, Any]:
+        now = datetime.now(timezone.utc)
+        conds, skipped = self._load_conditions(db, symbols, now)
+        result = {
+            "conditions": len(conds),
+            "alerts": 0,
+            "skipped_alerts": len(skipped),
+            "triggered": 0,
+            "notified": 0,
+        }
+        if skipped:
+            logger.info(
+                f"⏭️ Skipping {len(skipped)} alerts with intraday or unmapped conditions: "
+                f"{sorted(skipped)[:10]}"
+            )
+        if conds.empty:
+            return result
+        result["alerts"] = int(conds["alert_id"].nunique())
+
+        current = self._load_current(db, conds)
+        previous = self._load_previous(db, conds, current)
+
+        keys = pd.MultiIndex.from_arrays([conds["symbol"], conds["column"]])
+        value = self._lookup(current, keys)
+        prev = self._lookup(previous, keys)
+        conds["value"] = value
+        conds["met"] = evaluate_operators(
+            conds["operator"].to_numpy(), value, prev, conds["target_value"].to_numpy(float)
+        )
+        conds["was_met"] = conds["is_met"].fillna(False).astype(bool)
+
+        alert_now = _combine(conds, "met")
+        alert_before = _combine(conds, "was_met")
+        alerts = conds.drop_duplicates("alert_id").set_index("alert_id")
+        fired = alert_now & ~alert_before.reindex(alert_now.index, fill_value=False)
+        fired_ids = [int(a) for a in fired[fired].index]
+
+        self._write_conditions(db, conds, now)
+        triggered = self._write_alerts(db, alerts, fired_ids, conds, now)
+        result["triggered"] = len(triggered)
+
+        if notify and triggered:
+            sent = {}
+            try:
+                sent = self.notifier(triggered) or {}
+            except Exception as e:
+                logger.warning(f"Alert notification failed: {e}")
+            for item in triggered:
+                if sent.get(item["alert_id"]):
+                    item["history"].discord_sent = True
+            result["notified"] = sum(1 for v in sent.values() if v)
+        db.commit()
+        logger.info(
+            f"🔔 Evaluated {result['conditions']} conditions / {result['alerts']} alerts: "
+            f"{result['triggered']} triggered"
+        )
+        return result
+
+    def _load_conditions(
+        self, db: Session, symbols: Optional[List[str]], now: datetime
+    ) -> Tuple[pd.DataFrame, Set[int]]:
+        """Conditions of evaluable alerts, plus the ids of alerts skipped entirely.
+
+        An alert is evaluated only when every one of its conditions is daily and maps
+        to a snapshot column; dropping just the unsupported conditions would let the
+        remaining ones fire the alert on their own.
+        """
+        q = (
+            db.query(
+                AlertCondition.id,
+                AlertCondition.alert_id,
+                AlertCondition.condition_type,
+                AlertCondition.operator,
+                AlertCondition.target_value,
+                AlertCondition.timeframe,
+                AlertCondition.logical_operator,
+                AlertCondition.group_id,
+                AlertCondition.is_met,
+                AlertCondition.times_met,
+                Alert.symbol,
+                Alert.name,
+                Alert.user_id,
+                Alert.is_repeating,
+                Alert.max_triggers,
+                Alert.current_triggers,
+                Alert.notify_discord,
+                Alert.priority,
+                Alert.custom_message,
+            )
+            .join(Alert, Alert.id == AlertCondition.alert_id)
+            .filter(Alert.is_active.is_(True))
+            .filter((Alert.expires_at.is_(None)) | (Alert.expires_at > now))
+        )
+        if symbols:
+            q = q.filter(Alert.symbol.in_([s.upper() for s in symbols]))
+        conds = pd.DataFrame(
+            q.all(),
+            columns=[
+                "id", "alert_id", "condition_type", "operator", "target_value",
+                "timeframe", "logical_operator", "group_id", "is_met", "times_met",
+                "symbol", "name", "user_id", "is_repeating", "max_triggers",
+                "current_triggers", "notify_discord", "priority", "custom_message",
+            ],
+        )
+        if conds.empty:
+            return conds, set()
+        conds["symbol"] = conds["symbol"].str.upper()
+        conds["operator"] = conds["operator"].fillna("").str.upper()
+        conds["column"] = conds["condition_type"].map(resolve_condition_column)
+        daily = conds["timeframe"].map(
+            lambda t: (str(t).upper() if t is not None else None) in DAILY_TIMEFRAMES
+        )
+        evaluable = daily & conds["column"].notna()
+        skipped = {int(a) for a in conds.loc[~evaluable, "alert_id"].unique()}
+        conds = conds[~conds["alert_id"].isin(skipped)].copy()
+        conds["group"] = conds["group_id"].fillna(0).astype(int)
+        conds["is_or"] = conds["logical_operator"].fillna("AND").str.upper() == "OR"
+        return conds.reset_index(drop=True), skipped
+
+    def _load_current(self, db: Session, conds: pd.DataFrame) -> pd.DataFrame:
+        columns = sorted(set(conds["column"]))
+        rows = (
+            db.query(
+                MarketSnapshot.symbol,
+                MarketSnapshot.as_of_timestamp,
+                *[getattr(MarketSnapshot, c) for c in columns],
+            )
+            .filter(
+                MarketSnapshot.analysis_type == self.analysis_type,
+                MarketSnapshot.symbol.in_(set(conds["symbol"])),
+            )
+            .order_by(MarketSnapshot.symbol, MarketSnapshot.analysis_timestamp.desc())
+            .distinct(MarketSnapshot.symbol)
+            .all()
+        )
+        return pd.DataFrame(rows, columns=["symbol", "as_of", *columns]).set_index("symbol")
+
+    def _load_previous(
+        self, db: Session, conds: pd.DataFrame, current: pd.DataFrame
+    ) -> pd.DataFrame:
+        """Latest history row strictly before each symbol's current snapshot date."""
+        cross = conds[conds["operator"].str.startswith("CROSSES")]
+        columns = sorted(set(cross["column"]) & HISTORY_COLUMNS)
+        if not columns or current.empty:
+            return pd.DataFrame()
+        as_of = pd.to_datetime(current["as_of"], utc=True).dt.tz_localize(None).dt.normalize()
+        as_of = as_of.fillna(pd.Timestamp(datetime.utcnow()).normalize())
+        rows = (
+            db.query(
+                MarketSnapshotHistory.symbol,
+                MarketSnapshotHistory.as_of_date,
+                *[getattr(MarketSnapshotHistory, c) for c in columns],
+            )
+            .filter(
+                MarketSnapshotHistory.analysis_type == self.analysis_type,
+                MarketSnapshotHistory.symbol.in_(set(cross["symbol"])),
+                MarketSnapshotHistory.as_of_date >= as_of.min() - timedelta(days=14),
+            )
+            .all()
+        )
+        hist = pd.DataFrame(rows, columns=["symbol", "as_of_date", *columns])
+        if hist.empty:
+            return hist
+        hist["cutoff"] = hist["symbol"].map(as_of)
+        hist = hist[pd.to_datetime(hist["as_of_date"]).dt.normalize() < hist["cutoff"]]
+        hist = hist.sort_values(["symbol", "as_of_date"]).drop_duplicates("symbol", keep="last")
+        return hist.set_index("symbol")[columns]
+
+    @staticmethod
+    def _lookup(frame: pd.DataFrame, keys: pd.MultiIndex) -> np.ndarray:
+        value_cols = [c for c in frame.columns if c != "as_of"]
+        if frame.empty or not value_cols:
+            return np.full(len(keys), np.nan)
+        long = frame[value_cols].apply(pd.to_numeric, errors="coerce").stack()
+        return long.reindex(keys).to_numpy(dtype=float)
+
+    def _write_conditions(self, db: Session, conds: pd.DataFrame, now: datetime) -> None:
+        newly_met = conds["met"] & ~conds["was_met"]
+        times_met = conds["times_met"].fillna(0).astype(int) + newly_met.astype(int)
+        rows = [
+            {
+                "id": int(cid),
+                "is_met": bool(met),
+                "times_met": int(tm),
+                "current_value": None if np.isnan(v) else float(v),
+                "last_checked": now,
+            }
+            for cid, met, tm, v in zip(conds["id"], conds["met"], times_met, conds["value"])
+        ]
+        db.execute(update(AlertCondition), rows)
+
+    def _write_alerts(
+        self,
+        db: Session,
+        alerts: pd.DataFrame,
+        fired_ids: List[int],
+        conds: pd.DataFrame,
+        now: datetime,
+    ) -> List[Dict[str, Any]]:
+        if not fired_ids:
+            return []
+        alert_rows = []
+        triggered = []
+        for alert_id in fired_ids:
+            a = alerts.loc[alert_id]
+            count = int(a["current_triggers"] or 0) + 1
+            exhausted = not bool(a["is_repeating"]) and count >= int(a["max_triggers"] or 1)
+            alert_rows.append(
+                {
+                    "id": alert_id,
+                    "current_triggers": count,
+                    "last_triggered": now,
+                    "is_active": not exhausted,
+                }
+            )
+            met = conds[(conds["alert_id"] == alert_id) & conds["met"]]
+            summary = "; ".join(
+                f"{r.condition_type} {r.operator} {r.target_value:g} (now {r.value:g})"
+                for r in met.itertuples()
+            )
+            history = AlertHistory(
+                alert_id=alert_id,
+                triggered_at=now,
+                trigger_value=float(met["value"].iloc[0]) if len(met) else None,
+                condition_met=summary[:200],
+                message_title=f"{a['name']} ({a['symbol']})"[:200],
+                message_body=a["custom_message"] or summary,
+            )
+            db.add(history)
+            triggered.append(
+                {
+                    "alert_id": alert_id,
+                    "user_id": int(a["user_id"]),
+                    "symbol": a["symbol"],
+                    "name": a["name"],
+                    "priority": a["priority"],
+                    "notify_discord": bool(a["notify_discord"]),
+                    "summary": summary,
+                    "message": a["custom_message"] or summary,
+                    "history": history,
+                }
+            )
+        db.execute(update(Alert), alert_rows)
+        db.flush()
+        return triggered
+
+
+def notify_discord(triggered: List[Dict[str, Any]]) -> Dict[int, bool]:
+    """Queue one embed per triggered alert and flush them as batched messages."""
+    from backend.services.notifications.discord_service import discord_notifier
+
+    wanted = [t for t in triggered if t.get("notify_discord")]
+    if not wanted or not discord_notifier.is_configured():
+        return {}
+    colors = {"CRITICAL": 0xEF4444, "HIGH": 0xF59E0B}
+
+    async def _send() -> Dict[int, bool]:
+        queued = {}
+        for t in wanted:
+            queued[t["alert_id"]] = await discord_notifier.send_custom_alert(
+                title=f"🔔 {t['name']}",
+                message=t["message"],
+                symbol=t["symbol"],
+                color=colors.get(str(t.get("priority") or "").upper(), 0x0099FF),
+                webhook_type="signals",
+                wait=False,
+            )
+        await discord_notifier.flush()
+        return queued
+
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(_send())
+    # Called from sync code on a running loop (e.g. an API handler): schedule the sends
+    # there instead of nesting a loop. Delivery is not confirmed, so nothing is marked sent.
+    task = loop.create_task(_send())
+    _pending_sends.add(task)
+    task.add_done_callback(_pending_sends.discard)
+    return {}
+
+
+# Keeps scheduled sends referenced until they finish
+_pending_sends: Set[asyncio.Task] = set()
+
+
+# Global instance
+alert_evaluator = AlertEvaluator()
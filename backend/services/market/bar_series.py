@@ -0,0 +1,188 @@
+"""
+Bar Series
+==========
+
+Columnar OHLCV for chart endpoints (`/history/{symbol}`, `/db/history`).
+
+- `BarSeries.from_frame()` pulls the Open/High/Low/Close/Volume columns into
+  numpy arrays once (ascending time); no per-row Python work
+- `downsample()` to a viewport-sized `max_points`:
+  - "ohlc": equal-count buckets folded into one candle each (first open, max
+    high, min low, last close, summed volume); keeps every extreme
+  - "lttb": Largest-Triangle-Three-Buckets on close; keeps original bars
+- Serializers: legacy row dicts, compact column arrays, NDJSON chunks
+- `series_etag()` keys conditional requests on the last bar timestamp and count
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+DOWNSAMPLE_METHODS = ("ohlc", "lttb")
+FIELDS = ("open", "high", "low", "close", "volume")
+_ALIASES = {
+    "open": ("Open", "open", "open_price"),
+    "high": ("High", "high", "high_price"),
+    "low": ("Low", "low", "low_price"),
+    "close": ("Close", "close", "close_price"),
+    "volume": ("Volume", "volume"),
+}
+
+
+def _column(df: pd.DataFrame, field: str) -> np.ndarray:
+    for name in _ALIASES[field]:
+        if name in df.columns:
+            return np.nan_to_num(pd.to_numeric(df[name], errors="coerce").to_numpy(dtype="float64"))
+    return np.zeros(len(df), dtype="float64")
+
+
+@dataclass
+class BarSeries:
+    index: pd.DatetimeIndex
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+    # Bars in the source range before downsampling
+    total: int = 0
+    downsample: Optional[str] = None
+
+    @classmethod
+    def from_frame(cls, df: Optional[pd.DataFrame]) -> "BarSeries":
+        if df is None or df.empty:
+            return cls(pd.DatetimeIndex([]), *(np.empty(0) for _ in FIELDS), total=0)
+        if not df.index.is_monotonic_increasing:
+            df = df.sort_index()
+        index = pd.DatetimeIndex(df.index)
+        return cls(index, *(_column(df, f) for f in FIELDS), total=len(df))
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    @property
+    def last_time(self) -> Optional[datetime]:
+        return self.index[-1].to_pydatetime() if len(self.index) else None
+
+    def epoch_seconds(self) -> np.ndarray:
+        """UNIX seconds; naive timestamps are taken as UTC (price_data convention)."""
+        idx = self.index.tz_convert("UTC") if self.index.tz is not None else self.index
+        return idx.asi8 // 10**9
+
+    def take(self, positions: np.ndarray) -> "BarSeries":
+        return BarSeries(
+            self.index[positions],
+            self.open[positions],
+            self.high[positions],
+            self.low[positions],
+            self.close[positions],
+            self.volume[positions],
+            total=self.total,
+            downsample=self.downsample,
+        )
+
+    # ---------------------- Downsampling ----------------------
+    def downsampled(self, max_points: Optional[int], method: str = "ohlc") -> "BarSeries":
+        n = len(self)
+        if not max_points or n <= int(max_points):
+            return self
+        if method == "lttb":
+            out = self.take(lttb_indices(self.epoch_seconds().astype("float64"), self.close, int(max_points)))
+        else:
+            out = self._ohlc_buckets(int(max_points))
+        out.downsample = method
+        return out
+
+    def _ohlc_buckets(self, buckets: int) -> "BarSeries":
+        n = len(self)
+        starts = np.unique(np.floor(np.arange(buckets) * (n / buckets)).astype(np.int64))
+        ends = np.append(starts[1:], n) - 1
+        return BarSeries(
+            self.index[starts],
+            self.open[starts],
+            np.maximum.reduceat(self.high, starts),
+            np.minimum.reduceat(self.low, starts),
+            self.close[ends],
+            np.add.reduceat(self.volume, starts),
+            total=self.total,
+        )
+
+    # ---------------------- Serialization ----------------------
+    def to_rows(self) -> List[Dict[str, Any]]:
+        """Legacy `[{time, open, high, low, close, volume}]` with ISO times."""
+        times = [ts.isoformat() for ts in self.index]
+        cols = [getattr(self, f).tolist() for f in FIELDS]
+        return [
+            {"time": t, "open": o, "high": h, "low": lo, "close": c, "volume": v}
+            for t, o, h, lo, c, v in zip(times, *cols)
+        ]
+
+    def to_columns(self) -> Dict[str, List[Any]]:
+        """`{time: [unix seconds], open: [...], ...}`."""
+        out: Dict[str, List[Any]] = {"time": self.epoch_seconds().tolist()}
+        for f in FIELDS:
+            out[f] = getattr(self, f).tolist()
+        return out
+
+    def iter_ndjson(self, header: Dict[str, Any], chunk_size: int = 2000) -> Iterator[bytes]:
+        """Header object line, then one `[time, open, high, low, close, volume]` line per bar."""
+        yield (json.dumps(header) + "\n").encode()
+        times = self.epoch_seconds().tolist()
+        cols = [getattr(self, f).tolist() for f in FIELDS]
+        for i in range(0, len(times), max(1, chunk_size)):
+            rows = zip(times[i : i + chunk_size], *(c[i : i + chunk_size] for c in cols))
+            yield "".join(json.dumps(list(r)) + "\n" for r in rows).encode()
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Positions chosen by Largest-Triangle-Three-Buckets (first and last always kept)."""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    every = (n - 2) / (threshold - 2)
+    # Bucket i (for the threshold-2 middle points) spans [edges[i], edges[i + 1]).
+    edges = np.floor(np.arange(threshold - 1) * every).astype(np.int64) + 1
+    edges[-1] = n - 1
+    out = np.empty(threshold, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        nxt_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:nxt_end].mean()
+        avg_y = y[end:nxt_end].mean()
+        xs, ys = x[start:end], y[start:end]
+        area = np.abs((x[a] - avg_x) * (ys - y[a]) - (x[a] - xs) * (avg_y - y[a]))
+        a = int(start + area.argmax())
+        out[i + 1] = a
+    return out
+
+
+def series_etag(
+    symbol: str,
+    interval: str,
+    last_time: Optional[datetime],
+    count: int,
+    params: Sequence[Any] = (),
+) -> str:
+    """Weak ETag from the newest bar timestamp, bar count and response-shaping params."""
+    raw = "|".join(
+        [symbol.upper(), interval, last_time.isoformat() if last_time else "-", str(int(count))]
+        + [str(p) for p in params]
+    )
+    return f'W/"{hashlib.sha1(raw.encode()).hexdigest()[:20]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [c.strip() for c in if_none_match.split(",")]
+    bare = etag[2:] if etag.startswith("W/") else etag
+    return "*" in candidates or any((c[2:] if c.startswith("W/") else c) == bare for c in candidates)
@@ -0,0 +1,250 @@
+"""
+Fundamentals Store
+==================
+
+Postgres-backed company profile fundamentals (`symbol_fundamentals`).
+
+- Snapshot computation reads fundamentals from this table (one bulk query per
+  universe pass) and never calls providers inline.
+- `refresh()` re-fetches rows that are missing or older than the TTL using FMP
+  multi-symbol profile requests, with a bounded per-symbol yfinance fallback.
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+import fmpsdk
+import yfinance as yf
+from sqlalchemy.orm import Session
+
+from backend.config import settings
+from backend.database import SessionLocal
+from backend.models.market_data import MarketSnapshot, SymbolFundamentals
+from backend.services.market.provider_transport import get_provider_transport
+from backend.services.metrics import provider_call
+
+logger = logging.getLogger(__name__)
+
+FUNDAMENTAL_FIELDS = ("name", "sector", "industry", "sub_industry", "market_cap")
+
+
+def _normalize(symbols: Iterable[str]) -> List[str]:
+    return sorted({str(s).upper() for s in (symbols or []) if s})
+
+
+def _has_values(info: Dict[str, Any]) -> bool:
+    return any(info.get(k) is not None for k in FUNDAMENTAL_FIELDS)
+
+
+def _from_fmp_profile(d: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "name": d.get("companyName") or d.get("company_name") or d.get("symbol"),
+        "sector": d.get("sector") or None,
+        "industry": d.get("industry") or None,
+        "sub_industry": d.get("subIndustry") or d.get("sub_industry"),
+        "market_cap": d.get("mktCap") or d.get("marketCap"),
+    }
+
+
+class FundamentalsStore:
+    """TTL-driven fundamentals table with bulk provider refresh."""
+
+    def __init__(self, ttl: Optional[timedelta] = None, batch_size: Optional[int] = None):
+        self.ttl = ttl or timedelta(hours=int(getattr(settings, "FUNDAMENTALS_TTL_HOURS", 168)))
+        self.batch_size = int(batch_size or getattr(settings, "FUNDAMENTALS_REFRESH_BATCH", 50))
+
+    # ---------------------- Reads ----------------------
+    def load(self, db: Session, symbols: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """Return {symbol: {name, sector, industry, sub_industry, market_cap}} in one query.
+
+        Symbols missing from the table fall back to the latest stored snapshot's
+        fundamentals, so callers always get whatever is known locally.
+        """
+        wanted = _normalize(symbols) if symbols is not None else None
+        q = db.query(SymbolFundamentals)
+        if wanted is not None:
+            if not wanted:
+                return {}
+            q = q.filter(SymbolFundamentals.symbol.in_(wanted))
+        out: Dict[str, Dict[str, Any]] = {}
+        for row in q.all():
+            info = {k: getattr(row, k) for k in FUNDAMENTAL_FIELDS if getattr(row, k) is not None}
+            if info:
+                out[row.symbol] = info
+
+        missing = [s for s in (wanted or []) if s not in out]
+        if missing:
+            out.update(self._from_snapshots(db, missing))
+        return out
+
+    def get(self, db: Session, symbol: str) -> Dict[str, Any]:
+        return self.load(db, [symbol]).get(str(symbol).upper(), {})
+
+    @staticmethod
+    def _from_snapshots(db: Session, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        rows = (
+            db.query(MarketSnapshot)
+            .filter(
+                MarketSnapshot.symbol.in_(symbols),
+                MarketSnapshot.analysis_type == "technical_snapshot",
+            )
+            .order_by(MarketSnapshot.symbol.asc(), MarketSnapshot.analysis_timestamp.desc())
+            .all()
+        )
+        out: Dict[str, Dict[str, Any]] = {}
+        for row in rows:
+            if row.symbol in out:
+                continue
+            info = {k: getattr(row, k) for k in FUNDAMENTAL_FIELDS if getattr(row, k, None) is not None}
+            if info.get("sector") or info.get("industry") or info.get("market_cap"):
+                out[row.symbol] = info
+        return out
+
+    def stale_symbols(self, db: Session, symbols: Iterable[str], now: Optional[datetime] = None) -> List[str]:
+        """Symbols with no row, an empty row, or a row older than the TTL."""
+        wanted = _normalize(symbols)
+        if not wanted:
+            return []
+        cutoff = (now or datetime.now(timezone.utc)) - self.ttl
+        fresh = {
+            s
+            for (s,) in db.query(SymbolFundamentals.symbol).filter(
+                SymbolFundamentals.symbol.in_(wanted),
+                SymbolFundamentals.refreshed_at >= cutoff,
+                (SymbolFundamentals.sector.isnot(None))
+                | (SymbolFundamentals.industry.isnot(None))
+                | (SymbolFundamentals.market_cap.isnot(None)),
+            )
+        }
+        return [s for s in wanted if s not in fresh]
+
+    # ---------------------- Writes ----------------------
+    def upsert(self, db: Session, records: Dict[str, Dict[str, Any]], source: str) -> int:
+        """Bulk upsert fundamentals; `None` values never overwrite known data. Does not commit."""
+        if not records:
+            return 0
+        from sqlalchemy import func
+        from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+        now = datetime.now(timezone.utc)
+        rows = [
+            {
+                "symbol": sym,
+                **{k: info.get(k) for k in FUNDAMENTAL_FIELDS},
+                "source": source,
+                "refreshed_at": now,
+            }
+            for sym, info in sorted(records.items())
+        ]
+        stmt = pg_insert(SymbolFundamentals).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[SymbolFundamentals.symbol],
+            set_={
+                **{
+                    k: func.coalesce(getattr(stmt.excluded, k), getattr(SymbolFundamentals, k))
+                    for k in FUNDAMENTAL_FIELDS
+                },
+                "source": stmt.excluded.source,
+                "refreshed_at": stmt.excluded.refreshed_at,
+            },
+        )
+        db.execute(stmt)
+        return len(rows)
+
+    # ---------------------- Provider fetch ----------------------
+    def fetch_fmp_profiles(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """One FMP profile request per `batch_size` symbols (comma-separated)."""
+        out: Dict[str, Dict[str, Any]] = {}
+        transport = get_provider_transport()
+        if not transport.configured or not symbols:
+            return out
+        for i in range(0, len(symbols), max(1, self.batch_size)):
+            batch = symbols[i : i + self.batch_size]
+            try:
+                with provider_call("fmp", "profile_batch") as call:
+                    profiles = transport.company_profile(",".join(batch))
+                    call.empty = not profiles
+            except Exception as exc:
+                logger.warning(f"⚠️ FMP profile batch failed ({len(batch)} symbols): {exc}")
+                continue
+            for d in profiles or []:
+                if not isinstance(d, dict) or not d.get("symbol"):
+                    continue
+                info = _from_fmp_profile(d)
+                if _has_values(info):
+                    out[str(d["symbol"]).upper()] = info
+        return out
+
+    @staticmethod
+    def fetch_yfinance_profile(symbol: str) -> Dict[str, Any]:
+        try:
+            with provider_call("yfinance", "profile"):
+                y = yf.Ticker(symbol).info
+        except Exception:
+            return {}
+        info = {
+            "name": y.get("shortName") or y.get("longName") or y.get("symbol"),
+            "sector": y.get("sector"),
+            "industry": y.get("industry"),
+            "sub_industry": y.get("subIndustry") or y.get("industry") or None,
+            "market_cap": y.get("marketCap"),
+        }
+        return info if _has_values(info) else {}
+
+    def refresh(
+        self,
+        db: Session,
+        symbols: Iterable[str],
+        *,
+        force: bool = False,
+        fallback_limit: Optional[int] = None,
+    ) -> Dict[str, int]:
+        """Refresh stale (or all, with `force`) symbols and commit; returns counters."""
+        wanted = _normalize(symbols)
+        stale = wanted if force else self.stale_symbols(db, wanted)
+        if not stale:
+            return {"symbols": len(wanted), "stale": 0, "fmp": 0, "yfinance": 0, "missing": 0}
+
+        fetched = self.fetch_fmp_profiles(stale)
+        upserted_fmp = self.upsert(db, fetched, source="fmp")
+
+        remaining = [s for s in stale if s not in fetched]
+        limit = int(
+            fallback_limit
+            if fallback_limit is not None
+            else getattr(settings, "FUNDAMENTALS_YF_FALLBACK_LIMIT", 25)
+        )
+        if get_provider_transport().exclusive:
+            limit = 0
+        fallback: Dict[str, Dict[str, Any]] = {}
+        for sym in remaining[: max(0, limit)]:
+            info = self.fetch_yfinance_profile(sym)
+            if info:
+                fallback[sym] = info
+        upserted_yf = self.upsert(db, fallback, source="yfinance")
+        db.commit()
+
+        res = {
+            "symbols": len(wanted),
+            "stale": len(stale),
+            "fmp": upserted_fmp,
+            "yfinance": upserted_yf,
+            "missing": len(stale) - upserted_fmp - upserted_yf,
+        }
+        logger.info(f"📇 Fundamentals refresh: {res}")
+        return res
+
+    def refresh_universe(self, symbols: Iterable[str], db: Session | None = None, **kwargs) -> Dict[str, int]:
+        session = db or SessionLocal()
+        try:
+            return self.refresh(session, symbols, **kwargs)
+        finally:
+            if db is None:
+                session.close()
+
+
+# Global instance
+fundamentals_store = FundamentalsStore()
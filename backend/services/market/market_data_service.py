@@ -24,6 +24,11 @@ from backend.database import SessionLocal
 from backend.models import MarketSnapshot
 from backend.models.market_data import PriceData
 from backend.models.index_constituent import IndexConstituent
+from backend.services.market.fundamentals_store import fundamentals_store
+from backend.services.market.provider_transport import ProviderTransport, get_provider_transport
+from backend.services.market.service_container import redis_pool
+from backend.services.market.universe import tracked_universe
+from backend.services.metrics import provider_call, record_cache
 from backend.services.market.indicator_engine import (
     calculate_performance_windows,
     classify_ma_bucket_from_ma,
@@ -61,8 +66,10 @@ class MarketDataService:
     - free: FMP (if key) + yfinance + Twelve Data (if key) + finnhub
     """
 
-    def __init__(self) -> None:
+    def __init__(self, transport: Optional[ProviderTransport] = None) -> None:
         self._redis_client = None
+        # None = process-wide transport from settings (see provider_transport)
+        self._transport = transport
         self.cache_ttl_seconds = int(getattr(settings, "MARKET_DATA_CACHE_TTL", 300))
 
         # Optional API clients
@@ -96,9 +103,14 @@ class MarketDataService:
             url = getattr(settings, "REDIS_URL", None)
             if not url:
                 raise RuntimeError("REDIS_URL is not configured")
-            self._redis_client = redis.from_url(url)
+            # Shared per-process pool: extra MarketDataService instances do not open new sockets.
+            self._redis_client = redis.Redis(connection_pool=redis_pool(url))
         return self._redis_client
 
+    @property
+    def transport(self) -> ProviderTransport:
+        return self._transport or get_provider_transport()
+
     # ---------------------- Internal helpers ----------------------
     def _visibility_scope(self) -> str:
         return "all_authenticated" if settings.MARKET_DATA_SECTION_PUBLIC else "admin_only"
@@ -255,7 +267,10 @@ class MarketDataService:
         data_type: "historical_data" | "real_time_quote" | "company_info"
         paid policy: [FMP, yfinance]
         free policy: [FMP?] + yfinance + [Twelve Data?] + finnhub
+        exclusive transport (http / local fake provider): [FMP] only
         """
+        if self.transport.exclusive:
+            return [APIProvider.FMP]
         policy = str(getattr(settings, "MARKET_PROVIDER_POLICY", "paid")).lower()
         has_fmp = bool(settings.FMP_API_KEY)
         has_td = bool(settings.TWELVE_DATA_API_KEY)
@@ -285,7 +300,7 @@ class MarketDataService:
 
     def _is_provider_available(self, provider: APIProvider) -> bool:
         if provider == APIProvider.FMP:
-            return bool(settings.FMP_API_KEY)
+            return self.transport.configured
         if provider == APIProvider.TWELVE_DATA:
             return self.twelve_data_client is not None
         if provider == APIProvider.FINNHUB:
@@ -368,6 +383,7 @@ class MarketDataService:
         """Get current price for a symbol with provider policy and 60s Redis cache."""
         cache_key = f"price:{symbol}"
         cached = self.redis_client.get(cache_key)
+        record_cache("price", bool(cached))
         if cached:
             try:
                 return float(cached)
@@ -378,12 +394,14 @@ class MarketDataService:
                 continue
             try:
                 price = None
-                if provider == APIProvider.FMP:
-                    q = fmpsdk.quote(apikey=settings.FMP_API_KEY, symbol=symbol)
-                    price = q and len(q) > 0 and q[0].get("price")
-                elif provider == APIProvider.YFINANCE:
-                    hist = yf.Ticker(symbol).history(period="1d", interval="1m")
-                    price = float(hist["Close"].iloc[-1]) if not hist.empty else None
+                with provider_call(provider.value, "quote") as call:
+                    if provider == APIProvider.FMP:
+                        q = self.transport.quote(symbol)
+                        price = q and len(q) > 0 and q[0].get("price")
+                    elif provider == APIProvider.YFINANCE:
+                        hist = yf.Ticker(symbol).history(period="1d", interval="1m")
+                        price = float(hist["Close"].iloc[-1]) if not hist.empty else None
+                    call.empty = price is None
                 if price is not None:
                     self.redis_client.setex(cache_key, 60, str(price))
                     return float(price)
@@ -391,6 +409,54 @@ class MarketDataService:
                 continue
         return None
 
+    async def get_current_prices(self, symbols: List[str], chunk_size: int = 100) -> Dict[str, float]:
+        """Current prices for many symbols: one Redis MGET, batched FMP quotes, then per-symbol fallback."""
+        unique = list(dict.fromkeys(s for s in symbols if s))
+        prices: Dict[str, float] = {}
+        if not unique:
+            return prices
+        try:
+            cached = self.redis_client.mget([f"price:{s}" for s in unique])
+        except Exception:
+            cached = [None] * len(unique)
+        for sym, raw in zip(unique, cached):
+            record_cache("price", raw is not None)
+            if raw is not None:
+                try:
+                    prices[sym] = float(raw)
+                except Exception:
+                    pass
+        missing = [s for s in unique if s not in prices]
+        if missing and self._is_provider_available(APIProvider.FMP):
+            for i in range(0, len(missing), max(1, chunk_size)):
+                chunk = missing[i : i + chunk_size]
+                try:
+                    with provider_call(APIProvider.FMP.value, "quote") as call:
+                        quotes = self.transport.quote(",".join(chunk)) or []
+                        call.empty = not quotes
+                except Exception as e:
+                    logger.warning(f"⚠️ Batched quote failed for {len(chunk)} symbols: {e}")
+                    continue
+                fresh = {
+                    q["symbol"]: float(q["price"])
+                    for q in quotes
+                    if isinstance(q, dict) and q.get("symbol") in chunk and q.get("price") is not None
+                }
+                if fresh:
+                    pipe = self.redis_client.pipeline()
+                    for sym, price in fresh.items():
+                        pipe.setex(f"price:{sym}", 60, str(price))
+                    try:
+                        pipe.execute()
+                    except Exception:
+                        pass
+                    prices.update(fresh)
+        for sym in [s for s in unique if s not in prices]:
+            price = await self.get_current_price(sym)
+            if price is not None:
+                prices[sym] = float(price)
+        return prices
+
     def get_fundamentals_info(self, symbol: str) -> Dict[str, Any]:
         """Return fundamentals for a symbol using FMP first, then yfinance.
 
@@ -398,8 +464,10 @@ class MarketDataService:
         """
         info: Dict[str, Any] = {}
         try:
-            if settings.FMP_API_KEY:
-                prof = fmpsdk.company_profile(apikey=settings.FMP_API_KEY, symbol=symbol)
+            if self.transport.configured:
+                with provider_call(APIProvider.FMP.value, "profile") as call:
+                    prof = self.transport.company_profile(symbol)
+                    call.empty = not prof
                 if prof and len(prof) > 0 and isinstance(prof[0], dict):
                     d = prof[0]
                     info = {
@@ -411,9 +479,10 @@ class MarketDataService:
                     }
         except Exception:
             pass
-        if not info:
+        if not info and not self.transport.exclusive:
             try:
-                y = yf.Ticker(symbol).info
+                with provider_call(APIProvider.YFINANCE.value, "profile"):
+                    y = yf.Ticker(symbol).info
                 info = {
                     "name": y.get("shortName") or y.get("longName") or y.get("symbol"),
                     "sector": y.get("sector"),
@@ -444,6 +513,7 @@ class MarketDataService:
         """
         cache_key = f"historical:{symbol}:{period}:{interval}"
         cached = self.redis_client.get(cache_key)
+        record_cache("historical", bool(cached))
         if cached:
             try:
                 df_cached = pd.read_json(cached, orient="index")
@@ -459,20 +529,22 @@ class MarketDataService:
                 continue
             provider_used = provider.value
             try:
-                if provider == APIProvider.FMP:
-                    # Support daily and intraday (5m) for FMP
-                    if interval == "5m":
-                        df = await self._call_blocking_with_retries(self._get_historical_fmp_5m_sync, symbol, period)
+                with provider_call(provider.value, "historical") as call:
+                    if provider == APIProvider.FMP:
+                        # Support daily and intraday (5m) for FMP
+                        if interval == "5m":
+                            df = await self._call_blocking_with_retries(self._get_historical_fmp_5m_sync, symbol, period)
+                        else:
+                            df = await self._call_blocking_with_retries(self._get_historical_fmp_sync, symbol, period, interval)
+                    elif provider == APIProvider.TWELVE_DATA:
+                        df = await self._call_blocking_with_retries(self._get_historical_twelve_data_sync, symbol, period, interval)
+                    elif provider == APIProvider.YFINANCE:
+                        df = await self._call_blocking_with_retries(self._get_historical_yfinance_sync, symbol, period, interval)
+                    elif provider == APIProvider.FINNHUB:
+                        df = None  # not implemented
                     else:
-                        df = await self._call_blocking_with_retries(self._get_historical_fmp_sync, symbol, period, interval)
-                elif provider == APIProvider.TWELVE_DATA:
-                    df = await self._call_blocking_with_retries(self._get_historical_twelve_data_sync, symbol, period, interval)
-                elif provider == APIProvider.YFINANCE:
-                    df = await self._call_blocking_with_retries(self._get_historical_yfinance_sync, symbol, period, interval)
-                elif provider == APIProvider.FINNHUB:
-                    df = None  # not implemented
-                else:
-                    df = None
+                        df = None
+                    call.empty = df is None or df.empty
                 if df is not None and not df.empty:
                     if max_bars and interval == "1d":
                         df = df.head(max_bars)
@@ -504,9 +576,7 @@ class MarketDataService:
         FMP returns newest-first timestamps. `period` is best-effort: we trim using days.
         """
         # FMP supports intervals like '5min'
-        data = fmpsdk.historical_chart(
-            apikey=settings.FMP_API_KEY, symbol=symbol, interval="5min"
-        )
+        data = self.transport.historical_chart(symbol, "5min")
         if isinstance(data, dict):
             # FMP sometimes returns error dicts; raise so retry/backoff kicks in.
             msg = data.get("Error Message") or data.get("error") or data.get("message") or str(data)
@@ -576,7 +646,7 @@ class MarketDataService:
     ) -> Optional[pd.DataFrame]:
         if interval != "1d":
             return None
-        raw = fmpsdk.historical_price_full(apikey=settings.FMP_API_KEY, symbol=symbol)
+        raw = self.transport.historical_price_full(symbol)
         # FMP can return either {"symbol": ..., "historical": [...]} or an error dict.
         if isinstance(raw, dict):
             if raw.get("Error Message") or raw.get("error") or raw.get("message"):
@@ -605,6 +675,7 @@ class MarketDataService:
         cache_key = f"index_constituents:{index_name}"
         # Redis cache
         cached = self.redis_client.get(cache_key)
+        record_cache("index_constituents", bool(cached))
         if cached:
             try:
                 obj = json.loads(cached)
@@ -616,10 +687,11 @@ class MarketDataService:
         ep = self.index_endpoints.get(idx, {}).get("fmp")
         symbols: List[str] = []
         # FMP
-        if settings.FMP_API_KEY and ep:
+        if self.transport.configured and ep:
             try:
-                fn = getattr(fmpsdk, ep, None)
-                data = fn(apikey=settings.FMP_API_KEY) if callable(fn) else []
+                with provider_call(APIProvider.FMP.value, "index_constituents") as call:
+                    data = self.transport.index_constituents(ep)
+                    call.empty = not data
             except Exception:
                 data = []
             if isinstance(data, list):
@@ -627,30 +699,32 @@ class MarketDataService:
         # Track which path we used
         provider_used = "fmp" if symbols else None
         # Wikipedia fallback
-        if not symbols:
+        if not symbols and not self.transport.exclusive:
             import pandas as _pd
             try:
-                if idx == "SP500":
-                    tables = _pd.read_html("https://en.wikipedia.org/wiki/List_of_S%26P_500_companies")
-                    if tables:
-                        df = tables[0]
-                        if "Symbol" in df.columns:
-                            symbols = [str(s).upper().replace('.', '-') for s in df["Symbol"].dropna().tolist()]
-                elif idx == "NASDAQ100":
-                    tables = _pd.read_html("https://en.wikipedia.org/wiki/Nasdaq-100")
-                    for t in tables:
-                        for col in ["Ticker", "Symbol", "Company", "Stock Symbol"]:
-                            if col in t.columns:
-                                symbols = [str(s).upper().replace('.', '-') for s in t[col].dropna().tolist()]
+                with provider_call("wikipedia", "index_constituents") as call:
+                    if idx == "SP500":
+                        tables = _pd.read_html("https://en.wikipedia.org/wiki/List_of_S%26P_500_companies")
+                        if tables:
+                            df = tables[0]
+                            if "Symbol" in df.columns:
+                                symbols = [str(s).upper().replace('.', '-') for s in df["Symbol"].dropna().tolist()]
+                    elif idx == "NASDAQ100":
+                        tables = _pd.read_html("https://en.wikipedia.org/wiki/Nasdaq-100")
+                        for t in tables:
+                            for col in ["Ticker", "Symbol", "Company", "Stock Symbol"]:
+                                if col in t.columns:
+                                    symbols = [str(s).upper().replace('.', '-') for s in t[col].dropna().tolist()]
+                                    break
+                            if symbols:
+                                break
+                    elif idx == "DOW30":
+                        tables = _pd.read_html("https://en.wikipedia.org/wiki/Dow_Jones_Industrial_Average")
+                        for t in tables:
+                            if "Symbol" in t.columns and len(t) <= 40:
+                                symbols = [str(s).upper().replace('.', '-') for s in t["Symbol"].dropna().tolist()]
                                 break
-                        if symbols:
-                            break
-                elif idx == "DOW30":
-                    tables = _pd.read_html("https://en.wikipedia.org/wiki/Dow_Jones_Industrial_Average")
-                    for t in tables:
-                        if "Symbol" in t.columns and len(t) <= 40:
-                            symbols = [str(s).upper().replace('.', '-') for s in t["Symbol"].dropna().tolist()]
-                            break
+                    call.empty = not symbols
             except Exception:
                 symbols = []
         fallback_used = False if provider_used == "fmp" and symbols else (True if not provider_used else False)
@@ -809,12 +883,15 @@ class MarketDataService:
         symbol: str,
         *,
         as_of_dt: datetime | None = None,
+        fundamentals: Dict[str, Any] | None = None,
     ) -> Dict[str, Any]:
         """Compute a snapshot purely from local PriceData (and enrich it) for speed and consistency.
 
         - Reads the last ~270 daily bars (newest->first) from price_data
         - Computes indicators locally (no provider calls)
-        - Also enriches with chart metrics and fundamentals before returning
+        - Also enriches with chart metrics and stored fundamentals before returning
+
+        Pass `fundamentals` (e.g. from `fundamentals_store.load`) to skip the per-symbol lookup.
         """
         from backend.models import PriceData
 
@@ -917,39 +994,97 @@ class MarketDataService:
                         pass
         except Exception:
             pass
-        # Fundamentals enrichment (reuse from latest snapshot if present; otherwise fetch once)
-        # Prefer fundamentals from the latest stored snapshot
-        try:
-            prev_row = (
-                db.query(MarketSnapshot)
-                .filter(
-                    MarketSnapshot.symbol == symbol,
-                    MarketSnapshot.analysis_type == "technical_snapshot",
-                )
-                .order_by(MarketSnapshot.analysis_timestamp.desc())
-                .first()
-            )
-            if prev_row and (prev_row.sector or prev_row.industry or prev_row.market_cap):
-                if prev_row.sector is not None:
-                    snapshot["sector"] = prev_row.sector
-                if prev_row.industry is not None:
-                    snapshot["industry"] = prev_row.industry
-                if prev_row.market_cap is not None:
-                    snapshot["market_cap"] = prev_row.market_cap
-        except Exception:
-            pass
-
-        if self._needs_fundamentals(snapshot):
+        # Fundamentals: in-memory join against symbol_fundamentals (falls back to the latest
+        # stored snapshot). Never calls providers here; refresh_fundamentals keeps it current.
+        if fundamentals is None:
             try:
-                info = self.get_fundamentals_info(symbol)
-                for k in ("name", "sector", "industry", "sub_industry", "market_cap"):
-                    if info.get(k) is not None:
-                        snapshot[k] = info.get(k)
+                fundamentals = fundamentals_store.get(db, symbol)
             except Exception:
-                pass
+                fundamentals = {}
+        for k, v in (fundamentals or {}).items():
+            if v is not None:
+                snapshot[k] = v
         # no broad except here; previous except already guarded
         return snapshot
 
+    def compute_snapshots_from_db(
+        self,
+        db: Session,
+        symbol: str,
+        as_of_dates: List[datetime],
+        *,
+        benchmark_df: pd.DataFrame | None = None,
+    ) -> Dict[datetime, Dict[str, Any]]:
+        """Compute as-of snapshots for several dates from one bar load and one series pass.
+
+        - Loads daily bars once (enough to cover every date plus the indicator lookback)
+        - Computes vectorized indicator/stage series once and reads each date's row
+        - Fundamentals come from the fundamentals store only (no provider calls)
+
+        `benchmark_df` (oldest->newest SPY bars) can be passed in to share one load across
+        symbols. Returns {normalized as-of date: snapshot}; dates with no bar on or before
+        them are omitted.
+        """
+        from backend.services.market.snapshot_history import (
+            normalize_daily_index,
+            ohlcv_frame_from_rows,
+            snapshots_at,
+        )
+
+        if not as_of_dates:
+            return {}
+        days = normalize_daily_index(list(as_of_dates))
+        first_dt, last_dt = days.min(), days.max()
+        limit_bars = int(getattr(settings, "SNAPSHOT_DAILY_BARS_LIMIT", 400))
+        # Trading days in the requested span never exceed calendar days.
+        span = max(0, (last_dt - first_dt).days) + 1
+        cols = (
+            PriceData.date,
+            PriceData.open_price,
+            PriceData.high_price,
+            PriceData.low_price,
+            PriceData.close_price,
+            PriceData.volume,
+        )
+        end_dt = last_dt.to_pydatetime() + timedelta(days=1)
+        rows = (
+            db.query(*cols)
+            .filter(PriceData.symbol == symbol, PriceData.interval == "1d", PriceData.date < end_dt)
+            .order_by(PriceData.date.desc())
+            .limit(limit_bars + span)
+            .all()
+        )
+        df = ohlcv_frame_from_rows(reversed(rows))
+        if df.empty:
+            return {}
+
+        if benchmark_df is None:
+            bm_rows = (
+                db.query(*cols)
+                .filter(PriceData.symbol == "SPY", PriceData.interval == "1d", PriceData.date < end_dt)
+                .order_by(PriceData.date.desc())
+                .limit(limit_bars + span)
+                .all()
+            )
+            benchmark_df = ohlcv_frame_from_rows(reversed(bm_rows))
+        elif not benchmark_df.empty:
+            benchmark_df = benchmark_df[benchmark_df.index <= last_dt]
+
+        snapshots = snapshots_at(df, days, benchmark_df=benchmark_df)
+        if not snapshots:
+            return {}
+
+        try:
+            fundamentals = fundamentals_store.get(db, symbol)
+        except Exception:
+            fundamentals = {}
+
+        out: Dict[datetime, Dict[str, Any]] = {}
+        for d, snap in snapshots.items():
+            snap.update(fundamentals)
+            out[d.to_pydatetime()] = snap
+        return out
+
     async def compute_snapshot_from_providers(self, symbol: str) -> Dict[str, Any]:
         """Compute a snapshot from provider OHLCV when DB path is missing (and enrich it).
 
@@ -1327,6 +1462,24 @@ class MarketDataService:
         )
         return {"status": "ok", "symbol": sym, "inserted": inserted, "provider": provider_used}
 
+    @staticmethod
+    def _db_history_query(
+        db: Session,
+        columns: List[Any],
+        symbol: str,
+        interval: str,
+        start: Optional[datetime],
+        end: Optional[datetime],
+    ):
+        from backend.models import PriceData
+
+        q = db.query(*columns).filter(PriceData.symbol == symbol.upper(), PriceData.interval == interval)
+        if start:
+            q = q.filter(PriceData.date >= start)
+        if end:
+            q = q.filter(PriceData.date <= end)
+        return q
+
     def get_db_history(
         self,
         db: Session,
@@ -1339,43 +1492,52 @@ class MarketDataService:
     ) -> pd.DataFrame:
         """Read OHLCV from price_data (ascending by time) for API consumers."""
         from backend.models import PriceData
-        q = (
-            db.query(
+        q = self._db_history_query(
+            db,
+            [
                 PriceData.date,
                 PriceData.open_price,
                 PriceData.high_price,
                 PriceData.low_price,
                 PriceData.close_price,
                 PriceData.volume,
-            )
-            .filter(PriceData.symbol == symbol.upper(), PriceData.interval == interval)
-        )
-        if start:
-            q = q.filter(PriceData.date >= start)
-        if end:
-            q = q.filter(PriceData.date <= end)
-        q = q.order_by(PriceData.date.asc())
+            ],
+            symbol,
+            interval,
+            start,
+            end,
+        ).order_by(PriceData.date.asc())
         if limit:
             q = q.limit(limit)
         rows = q.all()
         if not rows:
             return pd.DataFrame(columns=["Open", "High", "Low", "Close", "Volume"])
-        df = pd.DataFrame(
-            [
-                {
-                    "date": r[0],
-                    "Open": float(r[1]) if r[1] is not None else float(r[4]),
-                    "High": float(r[2]) if r[2] is not None else float(r[4]),
-                    "Low": float(r[3]) if r[3] is not None else float(r[4]),
-                    "Close": float(r[4]),
-                    "Volume": int(r[5] or 0),
-                }
-                for r in rows
-            ]
-        )
-        df.set_index("date", inplace=True)
+        df = pd.DataFrame.from_records(
+            rows, columns=["date", "Open", "High", "Low", "Close", "Volume"], coerce_float=True
+        ).set_index("date")
+        df["Close"] = df["Close"].astype("float64")
+        # Missing O/H/L fall back to close (bars persisted from close-only sources).
+        for col in ("Open", "High", "Low"):
+            df[col] = df[col].astype("float64").fillna(df["Close"])
+        df["Volume"] = df["Volume"].fillna(0).astype("int64")
         return df
 
+    def get_db_history_marker(
+        self,
+        db: Session,
+        symbol: str,
+        *,
+        interval: str = "1d",
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> tuple[Optional[datetime], int]:
+        """(newest bar timestamp, bar count) for the range; one indexed aggregate, no bars loaded."""
+        from backend.models import PriceData
+        last, count = self._db_history_query(
+            db, [func.max(PriceData.date), func.count(PriceData.id)], symbol, interval, start, end
+        ).one()
+        return last, int(count or 0)
+
     # ---------------------- High-level TA helpers for tests/integration ----------------------
     async def build_indicator_snapshot(self, symbol: str) -> Dict[str, Any]:
         """Build a technical snapshot from provider OHLCV (newest->first) with indicators."""
@@ -1496,18 +1658,14 @@ class MarketDataService:
                 .count()
             )
 
-        tracked_symbols: List[str] = []
-        tracked_from_redis = False
         try:
-            raw = self.redis_client.get("tracked:all")
-            tracked_symbols = json.loads(raw) if raw else []
+            tracked_symbols: List[str] = list(tracked_universe.get(self.redis_client))
         except Exception:
             tracked_symbols = []
-        tracked_symbols = [str(s).upper() for s in tracked_symbols if s]
         tracked_from_redis = bool(tracked_symbols)
-        tracked_total = len(set(tracked_symbols))
+        tracked_total = len(tracked_symbols)
         if tracked_total:
-            universe = sorted(set(tracked_symbols))
+            universe = tracked_symbols
         else:
             universe = sorted({str(s).upper() for (s,) in db.query(PriceData.symbol).distinct().all() if s})
         total_symbols = len(universe)
@@ -0,0 +1,184 @@
+"""
+Provider Transport
+==================
+
+The wire layer behind MarketDataService / FundamentalsStore provider calls.
+
+Callers ask for FMP-shaped payloads (lists/dicts exactly as FMP returns them)
+and keep all normalization, retry and fallback logic on their side:
+
+- `SdkTransport` (default, MARKET_PROVIDER_TRANSPORT="sdk"): `fmpsdk` functions,
+  with yfinance / Twelve Data / finnhub fallbacks left enabled
+- `HttpTransport` (MARKET_PROVIDER_TRANSPORT="http"): plain REST over a pooled
+  keep-alive `requests.Session`, against real FMP by default or an
+  FMP-compatible MARKET_PROVIDER_BASE_URL. A custom base URL is exclusive:
+  fallback providers are disabled so a load test against the local stand-in
+  (`python -m backend.benchmarks.fake_provider`) never leaks to real upstreams.
+
+HTTP errors surface as `requests.HTTPError` (with `.response.status_code`) so
+`_call_blocking_with_retries` backs off on 429/5xx like it does for the SDKs.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Any, Optional
+
+import fmpsdk
+import requests
+from requests.adapters import HTTPAdapter
+
+from backend.config import settings
+
+logger = logging.getLogger(__name__)
+
+FMP_BASE_URL = "https://financialmodelingprep.com/api/v3"
+
+# fmpsdk function name -> REST path (relative to the v3 base URL)
+INDEX_ENDPOINTS = {
+    "sp500_constituent": "sp500_constituent",
+    "nasdaq_constituent": "nasdaq_constituent",
+    "dowjones_constituent": "dowjones_constituent",
+}
+
+
+class ProviderTransport:
+    """FMP-shaped provider calls. Subclasses implement the wire protocol."""
+
+    name = "base"
+    # When True, callers must not fall back to other providers (yfinance, Twelve Data, ...).
+    exclusive = False
+
+    @property
+    def configured(self) -> bool:
+        return bool(settings.FMP_API_KEY)
+
+    def quote(self, symbol: str) -> Any:
+        raise NotImplementedError
+
+    def historical_price_full(self, symbol: str) -> Any:
+        raise NotImplementedError
+
+    def historical_chart(self, symbol: str, interval: str = "5min") -> Any:
+        raise NotImplementedError
+
+    def company_profile(self, symbol: str) -> Any:
+        """`symbol` may be a comma-separated batch."""
+        raise NotImplementedError
+
+    def index_constituents(self, endpoint: str) -> Any:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class SdkTransport(ProviderTransport):
+    """Delegates to `fmpsdk` (looked up at call time so tests can monkeypatch it)."""
+
+    name = "sdk"
+
+    def quote(self, symbol: str) -> Any:
+        return fmpsdk.quote(apikey=settings.FMP_API_KEY, symbol=symbol)
+
+    def historical_price_full(self, symbol: str) -> Any:
+        return fmpsdk.historical_price_full(apikey=settings.FMP_API_KEY, symbol=symbol)
+
+    def historical_chart(self, symbol: str, interval: str = "5min") -> Any:
+        return fmpsdk.historical_chart(apikey=settings.FMP_API_KEY, symbol=symbol, interval=interval)
+
+    def company_profile(self, symbol: str) -> Any:
+        return fmpsdk.company_profile(apikey=settings.FMP_API_KEY, symbol=symbol)
+
+    def index_constituents(self, endpoint: str) -> Any:
+        fn = getattr(fmpsdk, endpoint, None)
+        return fn(apikey=settings.FMP_API_KEY) if callable(fn) else []
+
+
+class HttpTransport(ProviderTransport):
+    """FMP-compatible REST client with a pooled, thread-safe session."""
+
+    name = "http"
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        *,
+        api_key: Optional[str] = None,
+        timeout: Optional[float] = None,
+        pool_size: Optional[int] = None,
+    ) -> None:
+        self.base_url = (base_url or settings.MARKET_PROVIDER_BASE_URL or FMP_BASE_URL).rstrip("/")
+        self.exclusive = self.base_url != FMP_BASE_URL
+        self.api_key = api_key if api_key is not None else (settings.FMP_API_KEY or "local")
+        self.timeout = float(timeout or settings.MARKET_PROVIDER_TIMEOUT_SECONDS)
+        # Size the pool for the highest backfill concurrency so threads never wait on a socket.
+        size = int(pool_size or settings.MARKET_BACKFILL_CONCURRENCY_MAX)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, size))
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    @property
+    def configured(self) -> bool:
+        return True
+
+    def _get(self, path: str, **params: Any) -> Any:
+        params["apikey"] = self.api_key
+        resp = self.session.get(f"{self.base_url}/{path}", params=params, timeout=self.timeout)
+        resp.raise_for_status()
+        return resp.json()
+
+    def quote(self, symbol: str) -> Any:
+        return self._get(f"quote/{symbol}")
+
+    def historical_price_full(self, symbol: str) -> Any:
+        return self._get(f"historical-price-full/{symbol}")
+
+    def historical_chart(self, symbol: str, interval: str = "5min") -> Any:
+        return self._get(f"historical-chart/{interval}/{symbol}")
+
+    def company_profile(self, symbol: str) -> Any:
+        return self._get(f"profile/{symbol}")
+
+    def index_constituents(self, endpoint: str) -> Any:
+        path = INDEX_ENDPOINTS.get(endpoint)
+        return self._get(path) if path else []
+
+    def close(self) -> None:
+        self.session.close()
+
+
+def build_provider_transport(kind: Optional[str] = None, base_url: Optional[str] = None) -> ProviderTransport:
+    kind = str(kind or settings.MARKET_PROVIDER_TRANSPORT or "sdk").lower()
+    if kind == "http":
+        transport = HttpTransport(base_url)
+        logger.info(f"🔌 Market provider transport: http ({transport.base_url})")
+        return transport
+    if kind != "sdk":
+        logger.warning(f"⚠️ Unknown MARKET_PROVIDER_TRANSPORT={kind!r}; using sdk")
+    return SdkTransport()
+
+
+_transport: Optional[ProviderTransport] = None
+_transport_lock = threading.Lock()
+
+
+def get_provider_transport() -> ProviderTransport:
+    """Process-wide transport built from settings on first use."""
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = build_provider_transport()
+    return _transport
+
+
+def set_provider_transport(transport: Optional[ProviderTransport]) -> Optional[ProviderTransport]:
+    """Swap the process-wide transport (None = rebuild from settings); returns the previous one."""
+    global _transport
+    with _transport_lock:
+        previous, _transport = _transport, transport
+    return previous
+
@@ -0,0 +1,134 @@
+"""
+Market Data Service Container
+=============================
+
+Process-wide owner of the MarketDataService and the connections behind it.
+
+- One `MarketDataService` per process (the module-level `market_data_service`);
+  API routes and services call `get_market_data_service()` instead of
+  constructing their own, so provider clients are built once
+- One Redis `ConnectionPool` per URL per process (`redis_pool()`), shared by every
+  MarketDataService redis client; redis-py re-creates it after a Celery fork
+- Provider HTTP keep-alive: the provider transport's pooled session (`http`
+  transport), plus the finnhub / Twelve Data clients' own sessions, which now
+  live as long as the process; yfinance keeps its own process-wide session
+
+`startup()` runs from FastAPI startup and Celery `worker_process_init`;
+`shutdown()` from FastAPI shutdown and `worker_process_shutdown`.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from typing import TYPE_CHECKING, Dict, Optional
+
+import redis
+
+from backend.config import settings
+
+if TYPE_CHECKING:
+    from backend.services.market.market_data_service import MarketDataService
+
+logger = logging.getLogger(__name__)
+
+_pools: Dict[str, redis.ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def redis_pool(url: Optional[str] = None) -> redis.ConnectionPool:
+    """Shared connection pool for `url` (default REDIS_URL)."""
+    url = url or settings.REDIS_URL
+    if not url:
+        raise RuntimeError("REDIS_URL is not configured")
+    pool = _pools.get(url)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(url)
+            if pool is None:
+                pool = redis.ConnectionPool.from_url(
+                    url,
+                    max_connections=int(settings.REDIS_MAX_CONNECTIONS),
+                    socket_keepalive=True,
+                    health_check_interval=30,
+                )
+                _pools[url] = pool
+    return pool
+
+
+def _client_session(client: object) -> Optional[object]:
+    """requests.Session held by a finnhub.Client or twelvedata.TDClient, if any."""
+    if client is None:
+        return None
+    http_client = getattr(getattr(client, "ctx", None), "http_client", None)
+    return getattr(client, "_session", None) or getattr(http_client, "session", None)
+
+
+class MarketDataContainer:
+    """Lifecycle hooks around the shared MarketDataService."""
+
+    def __init__(self) -> None:
+        self.started = False
+        self._lock = threading.Lock()
+
+    @property
+    def service(self) -> "MarketDataService":
+        from backend.services.market.market_data_service import market_data_service
+
+        return market_data_service
+
+    def startup(self) -> None:
+        """Warm the Redis pool and provider transport; safe to call more than once."""
+        from backend.services.market.provider_transport import get_provider_transport
+
+        with self._lock:
+            if self.started:
+                return
+            svc = self.service
+            try:
+                svc.redis_client.ping()
+            except Exception as exc:
+                logger.warning(f"⚠️ Market data Redis not reachable at startup: {exc}")
+            transport = get_provider_transport()
+            self.started = True
+        logger.info(
+            f"🔌 Market data container ready (redis pool max={settings.REDIS_MAX_CONNECTIONS}, "
+            f"transport={transport.name})"
+        )
+
+    def shutdown(self) -> None:
+        """Close pooled sockets; the next use lazily reconnects."""
+        from backend.services.market.provider_transport import set_provider_transport
+
+        with self._lock:
+            svc = self.service
+            previous = set_provider_transport(None)
+            if previous is not None:
+                try:
+                    previous.close()
+                except Exception as exc:
+                    logger.warning(f"⚠️ Provider transport close failed: {exc}")
+            for client in (svc.finnhub_client, svc.twelve_data_client):
+                session = _client_session(client)
+                if session is not None:
+                    try:
+                        session.close()
+                    except Exception:
+                        pass
+            with _pools_lock:
+                pools = list(_pools.values())
+                _pools.clear()
+            for pool in pools:
+                pool.disconnect()
+            svc._redis_client = None
+            self.started = False
+        logger.info("🔌 Market data container shut down")
+
+
+def get_market_data_service() -> "MarketDataService":
+    """The process-wide MarketDataService (use instead of `MarketDataService()`)."""
+    return market_data_container.service
+
+
+# Global instance
+market_data_container = MarketDataContainer()
@@ -0,0 +1,297 @@
+"""Vectorized materialization of `market_snapshot_history` rows.
+
+The history backfills compute indicator *series* once per symbol and then need one
+ledger row per (symbol, as_of_date). Building those rows with scalar `.loc` lookups is
+interpreter-bound; this module assembles the whole per-symbol output frame once,
+maps it onto the model schema once, and emits insert parameters from NumPy arrays.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from backend.models.market_data import MarketSnapshotHistory
+from backend.services.market.indicator_engine import (
+    compute_core_indicators_series,
+    compute_gap_counts,
+    compute_td_sequential_counts,
+    compute_trendline_counts,
+    compute_weinstein_stage_series_from_daily,
+)
+from backend.services.tracing import span
+
+# Identity / server-managed columns never written from computed frames.
+IDENTITY_COLUMNS = {"id", "symbol", "analysis_type", "as_of_date", "analysis_timestamp"}
+
+# Model columns a materialized frame may populate (resolved once at import time).
+HISTORY_COLUMNS: List[str] = [
+    c.name for c in MarketSnapshotHistory.__table__.columns if c.name not in IDENTITY_COLUMNS
+]
+
+# Legacy/flat column -> frame column it is sourced from.
+_ALIASES = {"atr_value": "atr_14"}
+
+_MA_BUCKET_SEQUENCE = ["price", "sma_5", "sma_8", "sma_21", "sma_50", "sma_100", "sma_200"]
+
+# Bars fed to the windowed chart metrics (TD Sequential, gaps, trendlines).
+CHART_METRICS_BARS = 120
+
+# Keep each multi-row INSERT well below Postgres' 65535 bind-parameter limit.
+INSERT_BATCH_ROWS = 500
+
+
+def normalize_daily_index(index: Iterable) -> pd.DatetimeIndex:
+    """Normalize timestamps to naive midnight UTC (matches `price_data.date` keys)."""
+    return pd.to_datetime(index, utc=True, errors="coerce").tz_convert(None).normalize()
+
+
+def ohlcv_frame_from_rows(rows: Iterable) -> pd.DataFrame:
+    """Build an oldest->newest OHLCV frame from `(date, open, high, low, close, volume)` rows.
+
+    Missing open/high/low fall back to close, mirroring the per-row logic used elsewhere.
+    """
+    rows = list(rows or [])
+    if not rows:
+        return pd.DataFrame()
+    dates, o, h, l, c, v = zip(*rows)
+    close = np.asarray(c, dtype="float64")
+
+    def _or_close(values) -> np.ndarray:
+        arr = np.asarray([np.nan if x is None else x for x in values], dtype="float64")
+        return np.where(np.isnan(arr), close, arr)
+
+    df = pd.DataFrame(
+        {
+            "Open": _or_close(o),
+            "High": _or_close(h),
+            "Low": _or_close(l),
+            "Close": close,
+            "Volume": np.asarray([int(x or 0) for x in v], dtype="int64"),
+        },
+        index=normalize_daily_index(list(dates)),
+    )
+    df.index.name = "date"
+    return df[~df.index.duplicated(keep="last")]
+
+
+def ma_bucket_series(frame: pd.DataFrame) -> pd.Series:
+    """Vectorized equivalent of `classify_ma_bucket_from_ma` over every row of `frame`."""
+    cols = [frame[c] if c in frame.columns else pd.Series(np.nan, index=frame.index) for c in _MA_BUCKET_SEQUENCE]
+    values = np.column_stack([c.to_numpy(dtype="float64") for c in cols])
+    known = ~np.isnan(values).any(axis=1)
+    with np.errstate(invalid="ignore"):
+        desc = (values[:, :-1] > values[:, 1:]).all(axis=1)
+        asc = (values[:, :-1] < values[:, 1:]).all(axis=1)
+    bucket = np.select(
+        [~known, desc, asc],
+        ["UNKNOWN", "LEADING", "LAGGING"],
+        default="NEUTRAL",
+    )
+    return pd.Series(bucket, index=frame.index, dtype="object")
+
+
+def performance_windows_series(close: pd.Series) -> pd.DataFrame:
+    """Vectorized `calculate_performance_windows` evaluated at every bar of `close` (oldest->newest)."""
+    out = pd.DataFrame(index=close.index)
+    base = close.replace(0, np.nan)
+    for n in (1, 3, 5, 20, 60, 120, 252):
+        out[f"perf_{n}d"] = (base / base.shift(n) - 1.0) * 100.0
+
+    # MTD/QTD/YTD: reference close is the bar nearest the period start (within 7 days).
+    idx = pd.DatetimeIndex(close.index)
+    values = base.to_numpy(dtype="float64")
+    for key, freq in (("perf_mtd", "M"), ("perf_qtd", "Q"), ("perf_ytd", "Y")):
+        starts = idx.to_period(freq).start_time
+        pos = idx.get_indexer(starts, method="nearest", tolerance=pd.Timedelta(days=7))
+        ref = np.where(pos >= 0, values[np.clip(pos, 0, None)], np.nan) if len(values) else values
+        out[key] = (values / ref - 1.0) * 100.0
+    return out
+
+
+def compute_history_frame(df: pd.DataFrame, benchmark_df: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """Compute every ledger field for every bar of `df` (oldest->newest OHLCV).
+
+    Returns a frame indexed like `df` whose columns are named after
+    `MarketSnapshotHistory` columns (plus `price`). Stage/RS columns are present
+    only when a benchmark frame is supplied.
+    """
+    if df is None or df.empty:
+        return pd.DataFrame()
+
+    with span("core"):
+        core = compute_core_indicators_series(df)
+    price = df["Close"]
+    out = core.copy()
+    out["price"] = price
+    out["current_price"] = price
+
+    atr14 = out["atr_14"]
+    atr30 = out["atr_30"]
+
+    def range_pos(window: int) -> pd.Series:
+        hi = df["High"].rolling(window).max()
+        lo = df["Low"].rolling(window).min()
+        denom = (hi - lo).replace(0, np.nan)
+        return ((price - lo) / denom) * 100.0
+
+    out["range_pos_20d"] = range_pos(20)
+    out["range_pos_50d"] = range_pos(50)
+    out["range_pos_52w"] = range_pos(252)
+
+    out["atrp_14"] = (atr14 / price) * 100.0
+    out["atrp_30"] = (atr30 / price) * 100.0
+    out["atr_distance"] = (price - out["sma_50"]) / atr14
+    for n in (21, 50, 100, 150):
+        out[f"atrx_sma_{n}"] = (price - out[f"sma_{n}"]) / atr14
+
+    out["atr_percent"] = out["atrp_14"]
+
+    nonzero_atr = atr14.replace(0, np.nan)
+    ema200 = out["ema_200"].fillna(out["sma_200"])
+    for key, ma in (("ema8", out["ema_8"]), ("ema21", out["ema_21"]), ("ema200", ema200)):
+        ma = ma.replace(0, np.nan)
+        out[f"pct_dist_{key}"] = (price / ma - 1.0) * 100.0
+        out[f"atr_dist_{key}"] = (price - ma) / nonzero_atr
+
+    out = out.join(performance_windows_series(price))
+    out["ma_bucket"] = ma_bucket_series(out)
+
+    # Stage / RS (best-effort; NaN early when weekly history is insufficient)
+    if benchmark_df is not None and not benchmark_df.empty:
+        with span("stage"):
+            stage = compute_weinstein_stage_series_from_daily(df.iloc[::-1].copy(), benchmark_df.iloc[::-1].copy())
+        if not stage.empty and "stage_label" in stage.columns:
+            stage = stage.reindex(out.index)
+            for col in ("stage_slope_pct", "stage_dist_pct", "rs_mansfield_pct"):
+                if col in stage.columns:
+                    out[col] = stage[col]
+            labels = stage["stage_label"]
+            out["stage_label"] = labels.where(labels.map(lambda v: isinstance(v, str)))
+            out["stage_label_5d_ago"] = out["stage_label"].shift(5)
+
+    for target, source in _ALIASES.items():
+        if source in out.columns:
+            out[target] = out[source]
+    return out
+
+
+def chart_metrics_at(df: pd.DataFrame, position: int) -> Dict[str, Optional[int]]:
+    """Chart metrics over the `CHART_METRICS_BARS` bars ending at `position` (oldest->newest `df`)."""
+    window = df.iloc[max(0, position - CHART_METRICS_BARS + 1) : position + 1]
+    if window.empty:
+        return {}
+    newest = window.iloc[::-1]
+    out: Dict[str, Optional[int]] = {}
+    out.update(compute_td_sequential_counts(newest["Close"].tolist()))
+    out.update(compute_gap_counts(newest))
+    out.update(compute_trendline_counts(window.copy()))
+    return out
+
+
+def snapshots_at(
+    df: pd.DataFrame,
+    as_of_dates: Iterable,
+    benchmark_df: Optional[pd.DataFrame] = None,
+    frame: Optional[pd.DataFrame] = None,
+) -> Dict[pd.Timestamp, Dict[str, object]]:
+    """Snapshot dicts for each requested as-of date from a single series computation.
+
+    Each date resolves to the latest bar on or before it (like `as_of_dt` in
+    `compute_snapshot_from_db`); dates before the first bar are omitted. Keys follow
+    the `MarketSnapshotHistory` schema plus `as_of_timestamp` and chart metrics.
+    """
+    if df is None or df.empty:
+        return {}
+    if frame is None:
+        frame = compute_history_frame(df, benchmark_df)
+    columns = [c for c in HISTORY_COLUMNS if c in frame.columns]
+    values = frame[columns].astype("object").where(frame[columns].notna(), None)
+
+    out: Dict[pd.Timestamp, Dict[str, object]] = {}
+    chart_cache: Dict[int, Dict[str, Optional[int]]] = {}
+    for raw in as_of_dates:
+        d = normalize_daily_index([raw])[0]
+        pos = int(frame.index.searchsorted(d, side="right")) - 1
+        if pos < 0:
+            continue
+        snap = dict(zip(columns, values.iloc[pos].tolist()))
+        bar_ts = frame.index[pos]
+        snap["as_of_timestamp"] = bar_ts.isoformat()
+        if pos not in chart_cache:
+            chart_cache[pos] = chart_metrics_at(df, pos)
+        snap.update(chart_cache[pos])
+        out[d] = snap
+    return out
+
+
+def _column_values(series: pd.Series) -> np.ndarray:
+    """Object array (Python scalars) with NaN/NaT replaced by None, one pass per column."""
+    arr = series.to_numpy(dtype="object", copy=True)
+    arr[pd.isna(arr)] = None
+    return arr
+
+
+def history_rows(
+    frame: pd.DataFrame,
+    symbol: str,
+    dates: Optional[Iterable] = None,
+    analysis_type: str = "technical_snapshot",
+    extra: Optional[Dict[str, object]] = None,
+) -> List[Dict[str, object]]:
+    """Materialize insert parameters for `frame` rows at `dates` (all rows if None).
+
+    Every row carries the same key set (all model columns the frame provides plus
+    `extra` constants) so the result can feed a single multi-row INSERT.
+    """
+    if frame is None or frame.empty:
+        return []
+    sub = frame
+    if dates is not None:
+        wanted = pd.DatetimeIndex(list(dates))
+        sub = frame[frame.index.isin(wanted)]
+    sub = sub[~sub.index.duplicated(keep="last")]
+    if sub.empty:
+        return []
+
+    columns = [c for c in HISTORY_COLUMNS if c in sub.columns and c not in (extra or {})]
+    keys = ["symbol", "analysis_type", "as_of_date", *columns, *(extra or {})]
+    n = len(sub)
+    arrays = [
+        [symbol] * n,
+        [analysis_type] * n,
+        [ts.to_pydatetime() for ts in sub.index],
+        *(_column_values(sub[c]) for c in columns),
+        *([v] * n for v in (extra or {}).values()),
+    ]
+    return [dict(zip(keys, values)) for values in zip(*arrays)]
+
+
+def iter_insert_batches(rows: List[Dict[str, object]], batch_rows: int = INSERT_BATCH_ROWS) -> Iterator[List[Dict[str, object]]]:
+    """Yield `rows` in chunks sized for a multi-row INSERT."""
+    size = max(1, int(batch_rows))
+    for i in range(0, len(rows), size):
+        yield rows[i : i + size]
+
+
+def upsert_history_rows(session, rows: List[Dict[str, object]], batch_rows: int = INSERT_BATCH_ROWS) -> int:
+    """Upsert materialized rows on (symbol, analysis_type, as_of_date); returns rows written.
+
+    Only the columns present in the rows are updated on conflict. Does not commit.
+    """
+    if not rows:
+        return 0
+    from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+    written = 0
+    for batch in iter_insert_batches(rows, batch_rows):
+        stmt = pg_insert(MarketSnapshotHistory).values(batch)
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_symbol_type_asof",
+            set_={k: getattr(stmt.excluded, k) for k in batch[0].keys() if k not in IDENTITY_COLUMNS},
+        )
+        session.execute(stmt)
+        written += len(batch)
+    return written
@@ -0,0 +1,254 @@
+"""Point-in-time cross-sectional reads over the `market_snapshot_history` ledger.
+
+Answers "every symbol on date D" and "symbols whose stage changed between D1 and D2"
+with column projection, server-side filters on the wide columns and keyset
+pagination on symbol. Date-first access is served by the
+`(analysis_type, as_of_date, symbol)` index.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, select
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy.sql import ColumnElement
+
+from backend.models.market_data import MarketSnapshotHistory
+
+DEFAULT_ANALYSIS_TYPE = "technical_snapshot"
+MAX_PAGE_SIZE = 5000
+
+# Display order for ledger payloads; remaining model columns follow in table order.
+PREFERRED_COLUMNS = [
+    "symbol",
+    "analysis_type",
+    "analysis_timestamp",
+    "as_of_date",
+    "current_price",
+    "market_cap",
+    "sector",
+    "industry",
+    "sub_industry",
+    "stage_label",
+    "stage_label_5d_ago",
+    "rs_mansfield_pct",
+    "sma_5",
+    "sma_14",
+    "sma_21",
+    "sma_50",
+    "sma_100",
+    "sma_150",
+    "sma_200",
+    "atr_14",
+    "atr_30",
+    "atrp_14",
+    "atrp_30",
+    "atr_distance",
+    "atr_value",
+    "atr_percent",
+    "range_pos_20d",
+    "range_pos_50d",
+    "range_pos_52w",
+    "rsi",
+    "macd",
+    "macd_signal",
+]
+
+_TABLE_COLUMNS = MarketSnapshotHistory.__table__.columns
+LEDGER_COLUMNS: List[str] = [k for k in PREFERRED_COLUMNS if k in _TABLE_COLUMNS] + [
+    c.name for c in _TABLE_COLUMNS if c.name not in set(PREFERRED_COLUMNS) and c.name != "id"
+]
+
+_OPERATORS = {
+    "eq": lambda c, v: c == v,
+    "ne": lambda c, v: c.is_distinct_from(v),
+    "gt": lambda c, v: c > v,
+    "gte": lambda c, v: c >= v,
+    "lt": lambda c, v: c < v,
+    "lte": lambda c, v: c <= v,
+    "in": lambda c, v: c.in_(v),
+    "isnull": lambda c, v: c.is_(None),
+    "notnull": lambda c, v: c.isnot(None),
+}
+
+
+def _column(name: str):
+    if name not in LEDGER_COLUMNS:
+        raise ValueError(f"Unknown snapshot field: {name}")
+    return _TABLE_COLUMNS[name]
+
+
+def _coerce(col, raw: str) -> Any:
+    python_type = getattr(col.type, "python_type", str)
+    if python_type is bool:
+        return str(raw).strip().lower() in ("1", "true", "yes")
+    if python_type is datetime:
+        return datetime.fromisoformat(raw)
+    return python_type(raw)
+
+
+def parse_filter(spec: str) -> Tuple[str, str, Any]:
+    """Parse `field:op:value` (value optional for isnull/notnull; `in` takes `a|b|c`)."""
+    parts = str(spec).split(":", 2)
+    if len(parts) < 2:
+        raise ValueError(f"Invalid filter (expected field:op:value): {spec}")
+    field, op = parts[0].strip(), parts[1].strip().lower()
+    if op not in _OPERATORS:
+        raise ValueError(f"Unsupported filter operator: {op}")
+    col = _column(field)
+    if op in ("isnull", "notnull"):
+        return field, op, None
+    if len(parts) < 3:
+        raise ValueError(f"Filter is missing a value: {spec}")
+    try:
+        if op == "in":
+            value = [_coerce(col, v) for v in parts[2].split("|") if v != ""]
+        else:
+            value = _coerce(col, parts[2])
+    except (TypeError, ValueError) as exc:
+        raise ValueError(f"Invalid value for {field}: {parts[2]}") from exc
+    return field, op, value
+
+
+def _filter_clauses(table, filters: Iterable[str] | None) -> List[ColumnElement]:
+    clauses = []
+    for spec in filters or []:
+        field, op, value = parse_filter(spec)
+        clauses.append(_OPERATORS[op](getattr(table, field), value))
+    return clauses
+
+
+def _projection(fields: Sequence[str] | None) -> List[str]:
+    if not fields:
+        return list(LEDGER_COLUMNS)
+    out = ["symbol"]
+    for name in fields:
+        _column(name)
+        if name not in out:
+            out.append(name)
+    return out
+
+
+def _page_limit(limit: int) -> int:
+    return max(1, min(int(limit), MAX_PAGE_SIZE))
+
+
+def latest_as_of_date(db: Session, analysis_type: str = DEFAULT_ANALYSIS_TYPE) -> Optional[datetime]:
+    return db.execute(
+        select(MarketSnapshotHistory.as_of_date)
+        .where(MarketSnapshotHistory.analysis_type == analysis_type)
+        .order_by(MarketSnapshotHistory.as_of_date.desc())
+        .limit(1)
+    ).scalar()
+
+
+def cross_section(
+    db: Session,
+    as_of_date: Optional[datetime] = None,
+    *,
+    fields: Sequence[str] | None = None,
+    filters: Iterable[str] | None = None,
+    symbols: Sequence[str] | None = None,
+    cursor: Optional[str] = None,
+    limit: int = 500,
+    analysis_type: str = DEFAULT_ANALYSIS_TYPE,
+) -> Dict[str, Any]:
+    """All symbols' ledger rows on one date (latest available when `as_of_date` is None).
+
+    Rows are ordered by symbol; pass the returned `next_cursor` back as `cursor` to
+    continue. Raises ValueError for unknown fields or malformed filters.
+    """
+    columns = _projection(fields)
+    clauses = _filter_clauses(MarketSnapshotHistory, filters)
+    if as_of_date is None:
+        as_of_date = latest_as_of_date(db, analysis_type)
+    if as_of_date is None:
+        return {"as_of_date": None, "columns": columns, "count": 0, "rows": [], "next_cursor": None}
+
+    size = _page_limit(limit)
+    stmt = select(*[_TABLE_COLUMNS[c] for c in columns]).where(
+        MarketSnapshotHistory.analysis_type == analysis_type,
+        MarketSnapshotHistory.as_of_date == as_of_date,
+        *clauses,
+    )
+    if symbols:
+        stmt = stmt.where(MarketSnapshotHistory.symbol.in_([str(s).upper() for s in symbols]))
+    if cursor:
+        stmt = stmt.where(MarketSnapshotHistory.symbol > cursor)
+    result = db.execute(stmt.order_by(MarketSnapshotHistory.symbol.asc()).limit(size + 1)).all()
+
+    rows = [dict(zip(columns, r)) for r in result[:size]]
+    return {
+        "as_of_date": as_of_date,
+        "columns": columns,
+        "count": len(rows),
+        "rows": rows,
+        "next_cursor": rows[-1]["symbol"] if len(result) > size else None,
+    }
+
+
+def stage_transitions(
+    db: Session,
+    from_date: datetime,
+    to_date: datetime,
+    *,
+    from_stage: Optional[str] = None,
+    to_stage: Optional[str] = None,
+    fields: Sequence[str] | None = None,
+    filters: Iterable[str] | None = None,
+    cursor: Optional[str] = None,
+    limit: int = 500,
+    analysis_type: str = DEFAULT_ANALYSIS_TYPE,
+) -> Dict[str, Any]:
+    """Symbols whose `stage_label` differs between `from_date` and `to_date`.
+
+    Projected `fields` and `filters` apply to the `to_date` row; each result row also
+    carries `stage_from` / `stage_to`.
+    """
+    columns = _projection(fields or ["current_price", "stage_label"])
+    start = aliased(MarketSnapshotHistory)
+    end = aliased(MarketSnapshotHistory)
+    clauses = _filter_clauses(end, filters)
+    if from_stage is not None:
+        clauses.append(start.stage_label == from_stage)
+    if to_stage is not None:
+        clauses.append(end.stage_label == to_stage)
+
+    size = _page_limit(limit)
+    stmt = (
+        select(start.stage_label, end.stage_label, *[getattr(end, c) for c in columns])
+        .select_from(end)
+        .join(
+            start,
+            and_(
+                start.symbol == end.symbol,
+                start.analysis_type == end.analysis_type,
+                start.as_of_date == from_date,
+            ),
+        )
+        .where(
+            end.analysis_type == analysis_type,
+            end.as_of_date == to_date,
+            start.stage_label.is_distinct_from(end.stage_label),
+            *clauses,
+        )
+    )
+    if cursor:
+        stmt = stmt.where(end.symbol > cursor)
+    result = db.execute(stmt.order_by(end.symbol.asc()).limit(size + 1)).all()
+
+    rows = []
+    for r in result[:size]:
+        row = dict(zip(columns, r[2:]))
+        row["stage_from"], row["stage_to"] = r[0], r[1]
+        rows.append(row)
+    return {
+        "from_date": from_date,
+        "to_date": to_date,
+        "columns": columns,
+        "count": len(rows),
+        "rows": rows,
+        "next_cursor": rows[-1]["symbol"] if len(result) > size else None,
+    }
@@ -3,18 +3,36 @@
 Single source of truth for:
 - prefer Redis `tracked:all` if present (UI/source-of-truth)
 - otherwise derive from DB: active index constituents ∪ portfolio symbols
+
+`tracked_universe` keeps a versioned, in-process copy of `tracked:all`:
+- `publish()` (update_tracked_symbol_cache) bumps `tracked:version`, stores the
+  per-version delta and broadcasts on `tracked:invalidate`
+- readers get a frozen, pre-normalized tuple; JSON is only parsed when the
+  version changes
+- `changes_since(version)` returns net additions/removals for incremental jobs
 """
 
 from __future__ import annotations
 
 import json
-from typing import Iterable, List
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from sqlalchemy.orm import Session
 
+from backend.config import settings
 from backend.models import Position
 from backend.models.index_constituent import IndexConstituent
 
+logger = logging.getLogger(__name__)
+
+TRACKED_ALL_KEY = "tracked:all"
+TRACKED_NEW_KEY = "tracked:new"
+TRACKED_VERSION_KEY = "tracked:version"
+TRACKED_DELTA_KEY = "tracked:delta:{version}"
+TRACKED_CHANNEL = "tracked:invalidate"
+
 
 def _normalize_symbols(symbols: Iterable[str]) -> list[str]:
     return sorted({str(s).upper() for s in (symbols or []) if s})
@@ -41,20 +59,206 @@ def tracked_symbols_from_db(db: Session) -> list[str]:
     return sorted(syms)
 
 
-def tracked_symbols(db: Session, *, redis_client) -> list[str]:
-    """Return the tracked universe symbols, preferring Redis tracked:all."""
+def _decode(raw: Any) -> Any:
+    if isinstance(raw, (bytes, bytearray)):
+        raw = raw.decode()
+    return raw
+
+
+def _parse_symbols(raw: Any) -> Tuple[str, ...]:
+    if not raw:
+        return ()
     try:
-        raw = redis_client.get("tracked:all")
-        if raw:
-            if isinstance(raw, (bytes, bytearray)):
-                raw = raw.decode()
-            parsed = json.loads(raw)
-            if isinstance(parsed, list):
-                out = _normalize_symbols(parsed)
-                if out:
-                    return out
+        parsed = json.loads(_decode(raw))
     except Exception:
-        pass
-    return tracked_symbols_from_db(db)
+        return ()
+    if not isinstance(parsed, list):
+        return ()
+    return tuple(_normalize_symbols(parsed))
+
+
+def _parse_version(raw: Any) -> Optional[int]:
+    try:
+        return int(_decode(raw)) if raw is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class TrackedUniverse:
+    """Versioned in-process cache of the Redis tracked universe."""
+
+    def __init__(self, delta_ttl_hours: Optional[int] = None, use_pubsub: Optional[bool] = None):
+        self.delta_ttl_seconds = int(
+            (delta_ttl_hours or getattr(settings, "TRACKED_DELTA_TTL_HOURS", 168)) * 3600
+        )
+        self.use_pubsub = (
+            bool(getattr(settings, "TRACKED_UNIVERSE_PUBSUB", True)) if use_pubsub is None else use_pubsub
+        )
+        self._lock = threading.Lock()
+        self._version: Optional[int] = None
+        self._symbols: Tuple[str, ...] = ()
+        self._generation = 0
+        self._listener: Optional[threading.Thread] = None
+        # Set once Redis confirms the subscription; publishes before that are not seen
+        self._subscribed = threading.Event()
+
+    # ---------------------- Cache ----------------------
+    def invalidate(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._version = None
+            self._symbols = ()
+
+    def _listening(self) -> bool:
+        return self._subscribed.is_set() and self._listener is not None and self._listener.is_alive()
+
+    def _listen(self, redis_client) -> None:
+        try:
+            pubsub = redis_client.pubsub()
+            pubsub.subscribe(TRACKED_CHANNEL)
+            for message in pubsub.listen():
+                kind = (message or {}).get("type")
+                if kind == "message":
+                    self.invalidate()
+                elif kind == "subscribe":
+                    # Anything cached before this point may have missed a publish
+                    self.invalidate()
+                    self._subscribed.set()
+        except Exception as exc:
+            logger.warning(f"⚠️ Tracked universe listener stopped: {exc}")
+        finally:
+            # Without a live listener readers fall back to a version check per read.
+            self._subscribed.clear()
+            self.invalidate()
+
+    def _ensure_listener(self, redis_client) -> None:
+        # Started at most once per process; a dead listener degrades to version checks.
+        if not self.use_pubsub or self._listener is not None or not hasattr(redis_client, "pubsub"):
+            return
+        with self._lock:
+            if self._listener is not None:
+                return
+            self._listener = threading.Thread(
+                target=self._listen, args=(redis_client,), name="tracked-universe-listener", daemon=True
+            )
+            self._listener.start()
+
+    def version(self, redis_client) -> Optional[int]:
+        try:
+            return _parse_version(redis_client.get(TRACKED_VERSION_KEY))
+        except Exception:
+            return None
+
+    def get(self, redis_client, db: Session | None = None) -> Tuple[str, ...]:
+        """Tracked symbols as a sorted tuple (DB-derived when Redis has none and `db` is given).
+
+        Once the pub/sub subscription is confirmed (and while the listener is alive) a
+        cached version is served without any Redis round trip; otherwise one GET of
+        `tracked:version` validates the cache.
+        Universes written without a version (legacy writers) are parsed on every read.
+        """
+        if self._version is not None and self._listening():
+            return self._symbols
+
+        symbols: Tuple[str, ...] = ()
+        try:
+            self._ensure_listener(redis_client)
+            generation = self._generation
+            version = self.version(redis_client)
+            with self._lock:
+                if version is not None and version == self._version:
+                    return self._symbols
+            symbols = _parse_symbols(redis_client.get(TRACKED_ALL_KEY))
+            with self._lock:
+                # Skip caching if an invalidation arrived while we were reading.
+                if version is not None and symbols and generation == self._generation:
+                    self._version, self._symbols = version, symbols
+        except Exception:
+            symbols = ()
+        if not symbols and db is not None:
+            symbols = tuple(tracked_symbols_from_db(db))
+        return symbols
+
+    # ---------------------- Writes ----------------------
+    def publish(self, redis_client, symbols: Iterable[str]) -> Dict[str, Any]:
+        """Store a new universe; bumps the version only when membership changed."""
+        current = tuple(_normalize_symbols(symbols))
+        previous = _parse_symbols(redis_client.get(TRACKED_ALL_KEY))
+        prev_set, cur_set = set(previous), set(current)
+        added = [s for s in current if s not in prev_set]
+        removed = [s for s in previous if s not in cur_set]
+        version = self.version(redis_client)
+
+        if added or removed or version is None:
+            version = int(redis_client.incr(TRACKED_VERSION_KEY))
+            pipe = redis_client.pipeline()
+            pipe.setex(
+                TRACKED_DELTA_KEY.format(version=version),
+                self.delta_ttl_seconds,
+                json.dumps({"added": added, "removed": removed}),
+            )
+            pipe.set(TRACKED_ALL_KEY, json.dumps(list(current)))
+            pipe.setex(TRACKED_NEW_KEY, 24 * 3600, json.dumps(added))
+            pipe.execute()
+            redis_client.publish(TRACKED_CHANNEL, str(version))
+            logger.info(
+                f"🗂️ Tracked universe v{version}: {len(current)} symbols (+{len(added)} / -{len(removed)})"
+            )
+        else:
+            redis_client.setex(TRACKED_NEW_KEY, 24 * 3600, json.dumps(added))
+
+        with self._lock:
+            self._version, self._symbols = version, current
+        return {"version": version, "symbols": len(current), "added": added, "removed": removed}
+
+    # ---------------------- Incremental reads ----------------------
+    def changes_since(self, redis_client, version: int) -> Dict[str, Any]:
+        """Net symbols added/removed after `version`.
+
+        `complete` is False when an intermediate delta has expired; callers should
+        then treat `added` (the full current universe) as a resync.
+        """
+        current = self.version(redis_client) or 0
+        since = max(0, int(version))
+        if since >= current:
+            return {"from_version": since, "version": current, "added": [], "removed": [], "complete": True}
+
+        raws = redis_client.mget([TRACKED_DELTA_KEY.format(version=v) for v in range(since + 1, current + 1)])
+        if any(r is None for r in raws):
+            return {
+                "from_version": since,
+                "version": current,
+                "added": list(self.get(redis_client)),
+                "removed": [],
+                "complete": False,
+            }
+        added: set[str] = set()
+        removed: set[str] = set()
+        for raw in raws:
+            delta = json.loads(_decode(raw))
+            for s in delta.get("added") or []:
+                if s in removed:
+                    removed.discard(s)
+                else:
+                    added.add(s)
+            for s in delta.get("removed") or []:
+                if s in added:
+                    added.discard(s)
+                else:
+                    removed.add(s)
+        return {
+            "from_version": since,
+            "version": current,
+            "added": sorted(added),
+            "removed": sorted(removed),
+            "complete": True,
+        }
+
+
+def tracked_symbols(db: Session, *, redis_client) -> list[str]:
+    """Return the tracked universe symbols, preferring Redis tracked:all."""
+    return list(tracked_universe.get(redis_client, db=db))
 
 
+# Global instance
+tracked_universe = TrackedUniverse()
@@ -0,0 +1,235 @@
+"""Universe digest: stage breadth, top relative strength and stage transitions.
+
+One digest per as-of date, aggregated in SQL and cached in Redis so the Discord post
+and the dashboard share a single computation:
+- live digest (`as_of=None`): latest `MarketSnapshot` per tracked symbol, keyed by
+  today's UTC date and invalidated when indicators are recomputed
+- historical digest (`as_of=date`): `market_snapshot_history` rows for that date
+- transitions always compare against the last history date before the as-of date
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import and_, func, select
+from sqlalchemy.orm import Session, aliased
+
+from backend.config import settings
+from backend.models.market_data import MarketSnapshot, MarketSnapshotHistory
+from backend.services.market.universe import tracked_symbols
+
+logger = logging.getLogger(__name__)
+
+ANALYSIS_TYPE = "technical_snapshot"
+CACHE_KEY = "digest:universe:{source}:{as_of}"
+UNKNOWN_STAGE = "UNKNOWN"
+
+
+def _day_bounds(day: date) -> tuple[datetime, datetime]:
+    start = datetime.combine(day, time.min)
+    return start, start + timedelta(days=1)
+
+
+class UniverseDigestService:
+    """Builds and caches the tracked-universe digest."""
+
+    def __init__(self, redis_client=None) -> None:
+        self._redis = redis_client
+
+    @property
+    def redis_client(self):
+        if self._redis is None:
+            from backend.services.market.service_container import get_market_data_service
+
+            self._redis = get_market_data_service().redis_client
+        return self._redis
+
+    # ---------------------------------------------------------------- cache
+
+    @staticmethod
+    def cache_key(as_of: Optional[date] = None) -> str:
+        if as_of is None:
+            return CACHE_KEY.format(source="snapshot", as_of=datetime.utcnow().date().isoformat())
+        return CACHE_KEY.format(source="history", as_of=as_of.isoformat())
+
+    def _cache_get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            raw = self.redis_client.get(key)
+        except Exception as e:
+            logger.warning(f"⚠️ Universe digest cache read failed: {e}")
+            return None
+        if not raw:
+            return None
+        try:
+            return json.loads(raw.decode() if isinstance(raw, (bytes, bytearray)) else raw)
+        except Exception:
+            return None
+
+    def _cache_set(self, key: str, digest: Dict[str, Any]) -> None:
+        try:
+            ttl = int(getattr(settings, "UNIVERSE_DIGEST_CACHE_TTL", 21600))
+            self.redis_client.setex(key, ttl, json.dumps(digest, default=str))
+        except Exception as e:
+            logger.warning(f"⚠️ Universe digest cache write failed: {e}")
+
+    def invalidate(self, as_of: Optional[date] = None) -> None:
+        """Drop a cached digest (today's live digest by default)."""
+        try:
+            self.redis_client.delete(self.cache_key(as_of))
+        except Exception as e:
+            logger.warning(f"⚠️ Universe digest cache invalidation failed: {e}")
+
+    # ---------------------------------------------------------------- build
+
+    def get(
+        self,
+        db: Session,
+        as_of: Optional[date] = None,
+        *,
+        limit: Optional[int] = None,
+        refresh: bool = False,
+    ) -> Dict[str, Any]:
+        """Cached digest for `as_of` (live when None); `limit` trims the top-RS list."""
+        key = self.cache_key(as_of)
+        digest = None if refresh else self._cache_get(key)
+        if digest is None:
+            digest = self.build(db, as_of)
+            if digest["universe"]:
+                self._cache_set(key, digest)
+        if limit is not None:
+            digest = {**digest, "top_rs": digest["top_rs"][: max(0, int(limit))]}
+        return digest
+
+    def _current_rows(self, as_of: Optional[date], tracked: List[str]):
+        """Subquery with one (symbol, stage_label, rs_mansfield_pct, current_price) row per symbol."""
+        if as_of is None:
+            return (
+                select(
+                    MarketSnapshot.symbol,
+                    MarketSnapshot.stage_label,
+                    MarketSnapshot.rs_mansfield_pct,
+                    MarketSnapshot.current_price,
+                )
+                .where(
+                    MarketSnapshot.analysis_type == ANALYSIS_TYPE,
+                    MarketSnapshot.symbol.in_(tracked),
+                )
+                .order_by(MarketSnapshot.symbol.asc(), MarketSnapshot.analysis_timestamp.desc())
+                .distinct(MarketSnapshot.symbol)
+                .subquery("cur")
+            )
+        start, end = _day_bounds(as_of)
+        return (
+            select(
+                MarketSnapshotHistory.symbol,
+                MarketSnapshotHistory.stage_label,
+                MarketSnapshotHistory.rs_mansfield_pct,
+                MarketSnapshotHistory.current_price,
+            )
+            .where(
+                MarketSnapshotHistory.analysis_type == ANALYSIS_TYPE,
+                MarketSnapshotHistory.as_of_date >= start,
+                MarketSnapshotHistory.as_of_date < end,
+                MarketSnapshotHistory.symbol.in_(tracked),
+            )
+            .subquery("cur")
+        )
+
+    def build(self, db: Session, as_of: Optional[date] = None) -> Dict[str, Any]:
+        """Aggregate the digest in SQL (uncached)."""
+        day = as_of or datetime.utcnow().date()
+        tracked = tracked_symbols(db, redis_client=self.redis_client)
+        digest: Dict[str, Any] = {
+            "as_of": day.isoformat(),
+            "source": "snapshot" if as_of is None else "history",
+            "generated_at": datetime.utcnow().replace(microsecond=0).isoformat() + "Z",
+            "universe": len(tracked),
+            "with_snapshot": 0,
+            "stage_counts": [],
+            "top_rs": [],
+            "transitions": {"previous_as_of": None, "total": 0, "counts": []},
+        }
+        if not tracked:
+            return digest
+
+        cur = self._current_rows(as_of, tracked)
+        stage = func.coalesce(cur.c.stage_label, UNKNOWN_STAGE)
+        stage_rows = db.execute(
+            select(stage, func.count()).select_from(cur).group_by(stage).order_by(func.count().desc(), stage)
+        ).all()
+        digest["stage_counts"] = [{"stage": s, "count": int(n)} for s, n in stage_rows]
+        digest["with_snapshot"] = sum(row["count"] for row in digest["stage_counts"])
+
+        top_n = int(getattr(settings, "UNIVERSE_DIGEST_TOP_N", 25))
+        top_rows = db.execute(
+            select(cur.c.symbol, cur.c.rs_mansfield_pct, cur.c.stage_label, cur.c.current_price)
+            .order_by(cur.c.rs_mansfield_pct.desc().nullslast(), cur.c.symbol)
+            .limit(top_n)
+        ).all()
+        digest["top_rs"] = [
+            {"symbol": sym, "rs_mansfield_pct": rs, "stage_label": stg, "current_price": px}
+            for sym, rs, stg, px in top_rows
+        ]
+
+        previous = db.execute(
+            select(func.max(MarketSnapshotHistory.as_of_date)).where(
+                MarketSnapshotHistory.analysis_type == ANALYSIS_TYPE,
+                MarketSnapshotHistory.as_of_date < _day_bounds(day)[0],
+            )
+        ).scalar()
+        if previous is not None:
+            prev = aliased(MarketSnapshotHistory)
+            prev_stage = func.coalesce(prev.stage_label, UNKNOWN_STAGE)
+            transition_rows = db.execute(
+                select(prev_stage, stage, func.count())
+                .select_from(cur)
+                .join(
+                    prev,
+                    and_(
+                        prev.symbol == cur.c.symbol,
+                        prev.analysis_type == ANALYSIS_TYPE,
+                        prev.as_of_date == previous,
+                    ),
+                )
+                .where(prev.stage_label.is_distinct_from(cur.c.stage_label))
+                .group_by(prev_stage, stage)
+                .order_by(func.count().desc(), prev_stage, stage)
+            ).all()
+            counts = [{"from": f, "to": t, "count": int(n)} for f, t, n in transition_rows]
+            digest["transitions"] = {
+                "previous_as_of": previous.date().isoformat(),
+                "total": sum(c["count"] for c in counts),
+                "counts": counts,
+            }
+        return digest
+
+
+def format_discord(digest: Dict[str, Any], limit: int = 12) -> str:
+    """Plain-text digest for the Discord bot."""
+    lines = [
+        f"QuantMatrix — MarketSnapshot digest ({digest['generated_at']})",
+        f"Universe: {digest['with_snapshot']}/{digest['universe']} symbols have snapshots",
+    ]
+    if digest["stage_counts"]:
+        lines.append("Stage distribution:")
+        lines.extend(f"- {row['stage']}: {row['count']}" for row in digest["stage_counts"])
+    transitions = digest["transitions"]
+    if transitions["counts"]:
+        lines.append(f"Stage changes since {transitions['previous_as_of']}: {transitions['total']}")
+        lines.extend(f"- {row['from']} → {row['to']}: {row['count']}" for row in transitions["counts"][:8])
+    top = digest["top_rs"][: int(limit)]
+    if top:
+        lines.append(f"Top RS (Mansfield vs SPY, top {len(top)}):")
+        for row in top:
+            rs = row["rs_mansfield_pct"]
+            rs_fmt = f"{float(rs):.1f}%" if rs is not None else "—"
+            lines.append(f"- {row['symbol']}: RS {rs_fmt} • Stage {row['stage_label'] or '?'}")
+    return "\n".join(lines)
+
+
+# Global instance
+universe_digest = UniverseDigestService()
@@ -0,0 +1,369 @@
+"""
+Metrics
+=======
+
+Prometheus exposition for the API process, provider calls, Redis caches and tasks.
+
+- Counters / gauges / histograms are rendered in the text exposition format (0.0.4)
+  by `GET /metrics`
+- `MetricsMiddleware` records per-route latency (route template, not raw path)
+  and in-flight requests
+- The registered metrics are shared: every process (each uvicorn worker, each Celery
+  worker) adds its deltas to one Redis hash per metric (`metrics:<name>`), and
+  `/metrics` renders those totals, so any API worker answers a scrape with the same
+  numbers. This assumes all processes use the same Redis (REDIS_URL).
+- Deltas are buffered in-process and flushed at most every METRICS_FLUSH_SECONDS
+  (task durations are written through, since a prefork child may exit right after),
+  so a scrape can lag other processes by that interval. Without Redis each process
+  reports only its own values.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from backend.config import settings
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PROVIDER_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+TASK_BUCKETS = (1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0, 3600.0, 7200.0)
+TASK_DURATION_KEY = "metrics:task_duration_seconds"
+
+
+def _escape(value: object) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_str(names: Sequence[str], values: Sequence[str], extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _fmt(value: float) -> str:
+    value = float(value)
+    if value == float("inf"):
+        return "+Inf"
+    return str(int(value)) if value.is_integer() and abs(value) < 1e15 else repr(value)
+
+
+def _redis():
+    from backend.services.market.market_data_service import market_data_service
+
+    return market_data_service.redis_client
+
+
+class _Metric:
+    """Values per label tuple, each a row of float slots (see `slots`).
+
+    With `shared=True` the row deltas are also buffered and added to the Redis hash
+    `key` (default `metrics:<name>`, fields `<label>|...|<slot>`), which `samples()`
+    then reads back as the cross-process total.
+    """
+
+    kind = "untyped"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        *,
+        shared: bool = False,
+        key: Optional[str] = None,
+        flush_seconds: Optional[float] = None,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.shared = shared
+        self.key = key or f"metrics:{name}"
+        self.flush_seconds = flush_seconds
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+        self._pending: Dict[Tuple[str, ...], List[float]] = {}
+        self._last_flush = 0.0
+
+    @property
+    def slots(self) -> Tuple[str, ...]:
+        return ("v",)
+
+    def _key(self, labels: Dict[str, object]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def _add(self, key: Tuple[str, ...], deltas: Dict[int, float]) -> None:
+        width = len(self.slots)
+        with self._lock:
+            for target in (self._values, self._pending) if self.shared else (self._values,):
+                row = target.get(key)
+                if row is None:
+                    row = target[key] = [0.0] * width
+                for i, delta in deltas.items():
+                    row[i] += delta
+        if self.shared:
+            interval = self.flush_seconds
+            if interval is None:
+                interval = float(getattr(settings, "METRICS_FLUSH_SECONDS", 5.0))
+            if time.monotonic() - self._last_flush >= interval:
+                self.flush()
+
+    def flush(self) -> None:
+        """Add buffered deltas to the shared Redis hash (kept for the next try on failure)."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+        if not pending:
+            return
+        try:
+            pipe = _redis().pipeline()
+            for key, row in pending.items():
+                for slot, delta in zip(self.slots, row):
+                    if delta:
+                        pipe.hincrbyfloat(self.key, "|".join(key + (slot,)), delta)
+            pipe.execute()
+        except Exception as exc:
+            logger.debug(f"Metric {self.name} not flushed: {exc}")
+            with self._lock:
+                for key, row in pending.items():
+                    buffered = self._pending.setdefault(key, [0.0] * len(row))
+                    for i, delta in enumerate(row):
+                        buffered[i] += delta
+
+    def _shared_rows(self) -> Optional[List[Tuple[Tuple[str, ...], List[float]]]]:
+        self.flush()
+        try:
+            raw = _redis().hgetall(self.key) or {}
+        except Exception:
+            return None
+        index = {slot: i for i, slot in enumerate(self.slots)}
+        rows: Dict[Tuple[str, ...], List[float]] = {}
+        n = len(self.labelnames)
+        for field, value in raw.items():
+            field = field.decode() if isinstance(field, (bytes, bytearray)) else str(field)
+            parts = field.split("|")
+            if len(parts) != n + 1 or parts[n] not in index:
+                continue
+            row = rows.setdefault(tuple(parts[:n]), [0.0] * len(self.slots))
+            row[index[parts[n]]] = float(value)
+        return sorted(rows.items())
+
+    def _rows(self) -> List[Tuple[Tuple[str, ...], List[float]]]:
+        if self.shared:
+            rows = self._shared_rows()
+            if rows is not None:
+                return rows
+        with self._lock:
+            return sorted((k, list(v)) for k, v in self._values.items())
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        return "\n".join(self.header() + self.samples())
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: object) -> None:
+        self._add(self._key(labels), {0: float(amount)})
+
+    def value(self, **labels: object) -> float:
+        """This process's value (shared totals are only read when rendering)."""
+        row = self._values.get(self._key(labels))
+        return row[0] if row else 0.0
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{_label_str(self.labelnames, k)} {_fmt(row[0])}" for k, row in self._rows()]
+
+
+class Gauge(Counter):
+    """Gauge built from increments, so shared values sum across processes."""
+
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels: object) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: object) -> None:
+        self.inc(float(value) - self.value(**labels), **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets=DEFAULT_BUCKETS, **kwargs):
+        super().__init__(name, documentation, labelnames, **kwargs)
+        self.buckets = tuple(sorted(float(b) for b in buckets)) + (float("inf"),)
+
+    @property
+    def slots(self) -> Tuple[str, ...]:
+        # cumulative bucket counts..., sum, count
+        return tuple(f"b{i}" for i in range(len(self.buckets))) + ("sum", "count")
+
+    def observe(self, value: float, **labels: object) -> None:
+        deltas = {i: 1.0 for i, bound in enumerate(self.buckets) if value <= bound}
+        deltas[len(self.buckets)] = float(value)
+        deltas[len(self.buckets) + 1] = 1.0
+        self._add(self._key(labels), deltas)
+
+    @contextmanager
+    def time(self, **labels: object) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels: object) -> float:
+        row = self._values.get(self._key(labels))
+        return row[-1] if row else 0.0
+
+    def samples(self) -> List[str]:
+        out: List[str] = []
+        for key, row in self._rows():
+            for i, bound in enumerate(self.buckets):
+                le = (("le", _fmt(bound)),)
+                out.append(f"{self.name}_bucket{_label_str(self.labelnames, key, le)} {_fmt(row[i])}")
+            out.append(f"{self.name}_sum{_label_str(self.labelnames, key)} {_fmt(row[-2])}")
+            out.append(f"{self.name}_count{_label_str(self.labelnames, key)} {_fmt(row[-1])}")
+        return out
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(m.render() for m in self._metrics.values()) + "\n"
+
+
+registry = MetricsRegistry()
+
+HTTP_REQUEST_DURATION = registry.register(
+    Histogram(
+        "quantmatrix_http_request_duration_seconds",
+        "API request latency by route template.",
+        ("method", "route", "status"),
+        shared=True,
+    )
+)
+HTTP_REQUESTS_IN_FLIGHT = registry.register(
+    Gauge(
+        "quantmatrix_http_requests_in_flight",
+        "API requests currently being served.",
+        ("method",),
+        shared=True,
+    )
+)
+PROVIDER_REQUESTS = registry.register(
+    Counter(
+        "quantmatrix_provider_requests_total",
+        "Market data provider calls by provider and outcome (ok, empty, error).",
+        ("provider", "operation", "status"),
+        shared=True,
+    )
+)
+PROVIDER_REQUEST_DURATION = registry.register(
+    Histogram(
+        "quantmatrix_provider_request_duration_seconds",
+        "Market data provider call latency.",
+        ("provider", "operation"),
+        buckets=PROVIDER_BUCKETS,
+        shared=True,
+    )
+)
+CACHE_REQUESTS = registry.register(
+    Counter(
+        "quantmatrix_cache_requests_total",
+        "Redis market data cache lookups by cache and result (hit, miss).",
+        ("cache", "result"),
+        shared=True,
+    )
+)
+TASK_DURATION = registry.register(
+    Histogram(
+        "quantmatrix_task_duration_seconds",
+        "Celery task run duration by task and final status.",
+        ("task", "status"),
+        buckets=TASK_BUCKETS,
+        shared=True,
+        key=TASK_DURATION_KEY,
+        flush_seconds=0,
+    )
+)
+
+
+class _ProviderCall:
+    def __init__(self) -> None:
+        self.empty = False
+
+
+@contextmanager
+def provider_call(provider: str, operation: str) -> Iterator[_ProviderCall]:
+    """Time one provider call; set `call.empty = True` when it returned no data."""
+    call = _ProviderCall()
+    start = time.perf_counter()
+    status = "error"
+    try:
+        yield call
+        status = "empty" if call.empty else "ok"
+    finally:
+        PROVIDER_REQUEST_DURATION.observe(time.perf_counter() - start, provider=provider, operation=operation)
+        PROVIDER_REQUESTS.inc(provider=provider, operation=operation, status=status)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def render_latest() -> str:
+    return registry.render()
+
+
+class MetricsMiddleware:
+    """ASGI middleware: per-route latency histogram and in-flight gauge."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope.get("type") != "http":
+            await self.app(scope, receive, send)
+            return
+        method = scope.get("method", "GET")
+        status: Dict[str, Optional[int]] = {"code": None}
+
+        async def _send(message) -> None:
+            if message.get("type") == "http.response.start":
+                status["code"] = message.get("status")
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc(method=method)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec(method=method)
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - start,
+                method=method,
+                route=route,
+                status=str(status["code"] or 500),
+            )
@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Tuple, Union
+
+import httpx
+from discord_webhook import DiscordEmbed
+
+from backend.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Discord limits per webhook message.
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_CHARS_PER_MESSAGE = 6000
+
+
+# Public DiscordEmbed attributes that make up the embed JSON
+EMBED_ATTRS = (
+    "title", "description", "url", "timestamp", "color",
+    "footer", "image", "thumbnail", "video", "provider", "author", "fields",
+)
+
+
+def _embed_payload(embed: Union[DiscordEmbed, Dict[str, Any]]) -> Dict[str, Any]:
+    if isinstance(embed, dict):
+        data = embed
+    elif callable(getattr(embed, "get_embed", None)):
+        data = embed.get_embed()
+    else:
+        data = {k: getattr(embed, k) for k in EMBED_ATTRS if hasattr(embed, k)} or vars(embed)
+    return {k: v for k, v in data.items() if v is not None}
+
+
+def _embed_chars(embed: Dict[str, Any]) -> int:
+    """Characters Discord counts toward the 6000-per-message embed budget."""
+    total = len(embed.get("title") or "") + len(embed.get("description") or "")
+    total += len((embed.get("footer") or {}).get("text") or "")
+    total += len((embed.get("author") or {}).get("name") or "")
+    for f in embed.get("fields") or []:
+        total += len(f.get("name") or "") + len(f.get("value") or "")
+    return total
+
+
+@dataclass
+class _WebhookQueue:
+    """Pending embeds and rate-limit bucket state for one webhook URL."""
+
+    pending: Deque[Tuple[Dict[str, Any], asyncio.Future]] = field(default_factory=deque)
+    remaining: Optional[int] = None
+    reset_at: float = 0.0
+    worker: Optional[asyncio.Task] = None
+
+
+class DiscordDispatcher:
+    """Non-blocking Discord webhook delivery.
+
+    Embeds are queued per webhook URL and a background worker per webhook posts them
+    in messages of up to 10 embeds. Each worker honours Discord's `X-RateLimit-*`
+    headers for its own bucket, so a busy channel does not slow the others down.
+
+    Queues are bound to the running event loop; Celery tasks that wrap work in
+    `asyncio.run` get a fresh dispatcher state per run and should `flush()` before
+    returning.
+    """
+
+    def __init__(
+        self,
+        *,
+        flush_interval_s: Optional[float] = None,
+        timeout_s: float = 10.0,
+        max_attempts: int = 3,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> None:
+        self.flush_interval_s = float(
+            flush_interval_s
+            if flush_interval_s is not None
+            else getattr(settings, "DISCORD_FLUSH_INTERVAL_SECONDS", 0.25)
+        )
+        self.timeout_s = float(timeout_s)
+        self.max_attempts = int(max_attempts)
+        self.transport = transport
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queues: Dict[str, _WebhookQueue] = {}
+        self._client: Optional[httpx.AsyncClient] = None
+        self.stats = {"messages": 0, "embeds": 0, "rate_limited": 0, "failed": 0}
+
+    def _bind_loop(self) -> asyncio.AbstractEventLoop:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Previous loop (e.g. an earlier asyncio.run) is gone; its tasks and client with it.
+            self._loop = loop
+            self._queues = {}
+            self._client = None
+        return loop
+
+    def enqueue(
+        self, webhook_url: str, embed: Union[DiscordEmbed, Dict[str, Any]]
+    ) -> asyncio.Future:
+        """Queue an embed and return a future resolving to True once delivered."""
+        loop = self._bind_loop()
+        fut: asyncio.Future = loop.create_future()
+        queue = self._queues.setdefault(webhook_url, _WebhookQueue())
+        queue.pending.append((_embed_payload(embed), fut))
+        if queue.worker is None or queue.worker.done():
+            queue.worker = loop.create_task(self._drain(webhook_url, queue))
+        return fut
+
+    async def send(
+        self, webhook_url: str, embed: Union[DiscordEmbed, Dict[str, Any]]
+    ) -> bool:
+        """Queue an embed and wait for its delivery."""
+        return await self.enqueue(webhook_url, embed)
+
+    async def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued embed has been delivered (or dropped)."""
+        if self._loop is not asyncio.get_running_loop():
+            return True
+        workers = [q.worker for q in self._queues.values() if q.worker and not q.worker.done()]
+        if not workers:
+            return True
+        done, pending = await asyncio.wait(workers, timeout=timeout)
+        return not pending
+
+    def _take_batch(self, queue: _WebhookQueue) -> List[Tuple[Dict[str, Any], asyncio.Future]]:
+        batch: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        chars = 0
+        while queue.pending and len(batch) < MAX_EMBEDS_PER_MESSAGE:
+            size = _embed_chars(queue.pending[0][0])
+            if batch and chars + size > MAX_EMBED_CHARS_PER_MESSAGE:
+                break
+            batch.append(queue.pending.popleft())
+            chars += size
+        return batch
+
+    async def _drain(self, webhook_url: str, queue: _WebhookQueue) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            # Let callers that fire several notifications at once land in the same message.
+            await asyncio.sleep(self.flush_interval_s)
+            while queue.pending:
+                batch = self._take_batch(queue)
+                ok = await self._post(webhook_url, queue, [e for e, _ in batch], loop)
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_result(ok)
+        except Exception as e:
+            logger.error(f"Discord dispatcher worker failed: {e}")
+            while queue.pending:
+                _, fut = queue.pending.popleft()
+                if not fut.done():
+                    fut.set_result(False)
+        finally:
+            if not any(
+                q.pending or (q.worker and q.worker is not asyncio.current_task() and not q.worker.done())
+                for q in self._queues.values()
+            ):
+                await self._close_client()
+
+    async def _post(
+        self,
+        webhook_url: str,
+        queue: _WebhookQueue,
+        embeds: List[Dict[str, Any]],
+        loop: asyncio.AbstractEventLoop,
+    ) -> bool:
+        client = self._get_client()
+        attempt = 0
+        while True:
+            attempt += 1
+            if queue.remaining == 0 and queue.reset_at > loop.time():
+                await asyncio.sleep(queue.reset_at - loop.time())
+            try:
+                resp = await client.post(
+                    webhook_url, params={"wait": "true"}, json={"embeds": embeds}
+                )
+            except Exception as e:
+                if attempt >= self.max_attempts:
+                    logger.error(f"Discord webhook post failed after {attempt} attempts: {e}")
+                    self.stats["failed"] += 1
+                    return False
+                await asyncio.sleep(0.6 * attempt)
+                continue
+
+            self._update_bucket(queue, resp, loop)
+            if resp.status_code == 429:
+                self.stats["rate_limited"] += 1
+                try:
+                    retry_after = float(resp.json().get("retry_after", 1.0))
+                except Exception:
+                    retry_after = float(resp.headers.get("Retry-After", 1.0))
+                if attempt >= self.max_attempts:
+                    logger.warning(f"Discord rate limited; giving up after {attempt} attempts")
+                    self.stats["failed"] += 1
+                    return False
+                await asyncio.sleep(min(max(retry_after, 0.0), 30.0))
+                continue
+            if resp.status_code >= 400:
+                logger.error(f"Discord webhook failed: {resp.status_code}")
+                self.stats["failed"] += 1
+                return False
+
+            self.stats["messages"] += 1
+            self.stats["embeds"] += len(embeds)
+            return True
+
+    @staticmethod
+    def _update_bucket(
+        queue: _WebhookQueue, resp: httpx.Response, loop: asyncio.AbstractEventLoop
+    ) -> None:
+        remaining = resp.headers.get("X-RateLimit-Remaining")
+        reset_after = resp.headers.get("X-RateLimit-Reset-After")
+        try:
+            if remaining is not None:
+                queue.remaining = int(remaining)
+            if reset_after is not None:
+                queue.reset_at = loop.time() + float(reset_after)
+        except ValueError:
+            pass
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.timeout_s, transport=self.transport)
+        return self._client
+
+    async def _close_client(self) -> None:
+        client, self._client = self._client, None
+        if client is not None:
+            await client.aclose()
+
+
+# Global instance
+discord_dispatcher = DiscordDispatcher()
@@ -1,10 +1,10 @@
-import asyncio
 import logging
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from datetime import datetime
-from discord_webhook import DiscordWebhook, DiscordEmbed
+from discord_webhook import DiscordEmbed
 
 from backend.config import settings
+from backend.services.notifications.discord_dispatcher import discord_dispatcher
 
 logger = logging.getLogger(__name__)
 
@@ -28,8 +28,8 @@ class DiscordNotifier:
             settings.DISCORD_WEBHOOK_SYSTEM_STATUS
         )  # System health & alerts
 
-        self.rate_limit_delay = 1.0  # 1 second between messages to avoid rate limits
-        self.last_message_time = 0
+        # Per-webhook queues, embed batching and rate limiting live in the dispatcher
+        self.dispatcher = discord_dispatcher
 
     async def send_entry_signal(
         self,
@@ -398,8 +398,9 @@ class DiscordNotifier:
         fields: Dict[str, Any] = None,
         color: int = 0x0099FF,
         webhook_type: str = "alerts",
-    ):
-        """Send custom alert notification."""
+        wait: bool = True,
+    ) -> bool:
+        """Send custom alert notification (`wait=False` only queues it; see `flush()`)."""
         embed = DiscordEmbed(title=title, description=message, color=color)
 
         if symbol:
@@ -412,6 +413,34 @@ class DiscordNotifier:
         embed.set_footer(text="QuantMatrix • Custom Alert")
         embed.set_timestamp()
 
+        webhook_url = self._webhook_for(webhook_type)
+        return await self._send_webhook(embed, webhook_url=webhook_url, wait=wait)
+
+    async def send_signal_alert(
+        self,
+        message: str,
+        channel: str = "signals",
+        signal_data: Dict[str, Any] = None,
+        wait: bool = False,
+    ) -> bool:
+        """Queue a signal notification; batched with other signals for the channel.
+
+        With `wait=False` this returns as soon as the embed is queued; call `flush()`
+        once the whole run has been queued.
+        """
+        signal_data = signal_data or {}
+        embed = DiscordEmbed(
+            title=f"{signal_data.get('signal_type', 'signal').upper()} • {signal_data.get('symbol', '')}",
+            description=message,
+            color=0x0099FF,
+        )
+        embed.set_footer(text="QuantMatrix • ATR Signals")
+        embed.set_timestamp()
+
+        webhook_url = self._webhook_for(channel)
+        return await self._send_webhook(embed, webhook_url=webhook_url, wait=wait)
+
+    def _webhook_for(self, webhook_type: str) -> str:
         webhook_map = {
             "signals": self.signals_webhook,
             "portfolio": self.portfolio_webhook,
@@ -419,42 +448,34 @@ class DiscordNotifier:
             "playground": self.playground_webhook,
             "system_status": self.system_status_webhook,
         }
+        return webhook_map.get(webhook_type) or self.playground_webhook
 
-        webhook_url = webhook_map.get(webhook_type, self.playground_webhook)
-        await self._send_webhook(embed, webhook_url=webhook_url)
-
-    async def _send_webhook(self, embed: DiscordEmbed, webhook_url: str = None):
-        """Send webhook message with rate limiting."""
+    async def _send_webhook(
+        self, embed: DiscordEmbed, webhook_url: str = None, wait: bool = True
+    ) -> bool:
+        """Hand the embed to the dispatcher; optionally wait for delivery."""
         if not webhook_url:
             webhook_url = self.playground_webhook
 
         if not webhook_url:
             logger.warning("No Discord webhook URL configured")
-            return
+            return False
 
         try:
-            # Rate limiting
-            current_time = asyncio.get_event_loop().time()
-            time_since_last = current_time - self.last_message_time
-
-            if time_since_last < self.rate_limit_delay:
-                await asyncio.sleep(self.rate_limit_delay - time_since_last)
-
-            webhook = DiscordWebhook(url=webhook_url)
-            webhook.add_embed(embed)
-
-            # Execute webhook
-            response = webhook.execute()
-
-            if response.status_code == 200:
+            if not wait:
+                self.dispatcher.enqueue(webhook_url, embed)
+                return True
+            sent = await self.dispatcher.send(webhook_url, embed)
+            if sent:
                 logger.info("Discord notification sent successfully")
-            else:
-                logger.error(f"Discord webhook failed: {response.status_code}")
-
-            self.last_message_time = asyncio.get_event_loop().time()
-
+            return sent
         except Exception as e:
             logger.error(f"Error sending Discord notification: {e}")
+            return False
+
+    async def flush(self, timeout: float = None) -> bool:
+        """Wait for all queued notifications to be delivered."""
+        return await self.dispatcher.flush(timeout=timeout)
 
     async def test_webhooks(self):
         """Test all configured webhooks."""
@@ -488,11 +509,10 @@ class DiscordNotifier:
         results = []
         for name, url in webhooks_to_test:
             if url:
-                try:
-                    await self._send_webhook(test_embed, webhook_url=url)
+                if await self._send_webhook(test_embed, webhook_url=url):
                     results.append(f"✅ {name}: Success")
-                except Exception as e:
-                    results.append(f"❌ {name}: Failed - {e}")
+                else:
+                    results.append(f"❌ {name}: Failed")
             else:
                 results.append(f"⚠️ {name}: Not configured")
 
@@ -505,8 +525,13 @@ class DiscordNotifier:
         economic_calendar: List[Dict],
         market_sentiment: Dict,
         trading_outlook: str,
+        universe_digest: Optional[Dict] = None,
     ):
-        """Send comprehensive morning market brew with real data."""
+        """Send comprehensive morning market brew with real data.
+
+        An optional `universe_digest` (the cached payload from `UniverseDigestService.get`)
+        adds a stage-breadth section; no scheduled job passes one today.
+        """
         # Auto-detect today's date and day of week
         today = datetime.now()
         date_str = today.strftime("%A, %B %d, %Y")  # "Thursday, July 17, 2025"
@@ -602,6 +627,19 @@ class DiscordNotifier:
                 name="📅 Economic Calendar (Live)", value=calendar_text, inline=False
             )
 
+        # Universe breadth from the shared digest
+        if universe_digest and universe_digest.get("stage_counts"):
+            breadth_text = " | ".join(
+                f"**{row['stage']}**: {row['count']}" for row in universe_digest["stage_counts"]
+            )
+            transitions = universe_digest.get("transitions") or {}
+            if transitions.get("total"):
+                breadth_text += f"\n🔄 {transitions['total']} stage changes since {transitions['previous_as_of']}"
+            leaders = ", ".join(row["symbol"] for row in universe_digest.get("top_rs", [])[:5])
+            if leaders:
+                breadth_text += f"\n💪 **RS Leaders:** {leaders}"
+            embed.add_embed_field(name="🧭 Universe Stage Breadth", value=breadth_text, inline=False)
+
         # Market Sentiment Analysis
         sentiment_text = f"📰 **News Sentiment:** {market_sentiment['news_sentiment']}% bullish ({market_sentiment['articles_analyzed']} articles)\n"
         sentiment_text += f"😱 **Fear & Greed Index:** {market_sentiment['fear_greed_index']}/100 ({market_sentiment['fear_greed_label']})\n"
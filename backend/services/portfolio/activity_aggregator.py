@@ -1,42 +1,311 @@
 from __future__ import annotations
 
-from datetime import datetime, date
-from typing import Any, Dict, List, Optional, Tuple
+import base64
+import json
+import logging
+import time
+from datetime import datetime, date, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
+from backend.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Per-source columns: (alias, table, timestamp column, SELECT list)
+_SOURCES: Tuple[Tuple[str, str, str, str], ...] = (
+    (
+        "t",
+        "trades",
+        "execution_time",
+        """
+            t.execution_time AS ts,
+            DATE(t.execution_time) AS day,
+            t.account_id,
+            t.symbol,
+            UPPER(t.symbol) AS symbol_upper,
+            'TRADE'::text AS category,
+            t.side AS side,
+            t.quantity::numeric AS quantity,
+            t.price::numeric AS price,
+            t.total_value::numeric AS amount,
+            NULL::numeric AS net_amount,
+            (COALESCE(t.commission,0) + COALESCE(t.fees,0))::numeric AS commission,
+            'trades'::text AS src,
+            t.id AS src_id,
+            t.execution_id AS external_id
+        """,
+    ),
+    (
+        "tr",
+        "transactions",
+        "transaction_date",
+        """
+            tr.transaction_date AS ts,
+            DATE(tr.transaction_date) AS day,
+            tr.account_id,
+            tr.symbol,
+            UPPER(tr.symbol) AS symbol_upper,
+            tr.transaction_type::text AS category,
+            CASE WHEN tr.transaction_type::text IN ('BUY','SELL') THEN tr.action ELSE NULL END AS side,
+            tr.quantity::numeric AS quantity,
+            tr.trade_price::numeric AS price,
+            tr.amount::numeric AS amount,
+            tr.net_amount::numeric AS net_amount,
+            COALESCE(tr.commission,0)::numeric AS commission,
+            'transactions'::text AS src,
+            tr.id AS src_id,
+            tr.external_id AS external_id
+        """,
+    ),
+    (
+        "d",
+        "dividends",
+        "ex_date",
+        """
+            d.ex_date AS ts,
+            DATE(d.ex_date) AS day,
+            d.account_id,
+            d.symbol,
+            UPPER(d.symbol) AS symbol_upper,
+            'DIVIDEND'::text AS category,
+            NULL::text AS side,
+            d.shares_held::numeric AS quantity,
+            d.dividend_per_share::numeric AS price,
+            d.total_dividend::numeric AS amount,
+            d.net_dividend::numeric AS net_amount,
+            COALESCE(d.tax_withheld,0)::numeric AS commission,
+            'dividends'::text AS src,
+            d.id AS src_id,
+            d.external_id AS external_id
+        """,
+    ),
+)
+
+ACTIVITY_COLUMNS = (
+    "ts, day, account_id, symbol, symbol_upper, category, side, quantity, price, amount, "
+    "net_amount, commission, src, src_id, external_id"
+)
+# Feed order and keyset cursor: newest first, ties broken by the unique (src, src_id)
+FEED_ORDER = "ORDER BY ts DESC, src DESC, src_id DESC"
+
+DAILY_AGGREGATES = """
+    COUNT(*) FILTER (WHERE category = 'TRADE') AS trade_count,
+    COUNT(*) FILTER (WHERE category = 'TRADE' AND UPPER(COALESCE(side,'-')) = 'BUY') AS buy_count,
+    COUNT(*) FILTER (WHERE category = 'TRADE' AND UPPER(COALESCE(side,'-')) = 'SELL') AS sell_count,
+    COALESCE(SUM(quantity) FILTER (WHERE category = 'TRADE' AND UPPER(COALESCE(side,'-')) = 'BUY'), 0) AS buy_qty,
+    COALESCE(SUM(quantity) FILTER (WHERE category = 'TRADE' AND UPPER(COALESCE(side,'-')) = 'SELL'), 0) AS sell_qty,
+    COALESCE(SUM(COALESCE(net_amount, amount)) FILTER (
+        WHERE (category = 'TRADE' AND UPPER(COALESCE(side,'-')) = 'SELL')
+           OR category IN ('DIVIDEND','BROKER_INTEREST_RECEIVED','TAX_REFUND','DEPOSIT')
+    ), 0) AS money_in,
+    COALESCE(SUM(ABS(COALESCE(net_amount, amount))) FILTER (
+        WHERE (category = 'TRADE' AND UPPER(COALESCE(side,'-')) = 'BUY')
+           OR category IN ('COMMISSION','OTHER_FEE','BROKER_INTEREST_PAID','WITHDRAWAL','TRANSFER')
+    ), 0) AS money_out
+"""
+
+# Scratch table holding one refresh's rebuilt rows
+REFRESH_TABLE = "portfolio_activity_refresh_rows"
+
+# Existence cache: hits are kept for the process, misses re-checked after this many seconds
+_MISSING_RECHECK_SECONDS = 60.0
+_table_cache: Dict[str, Tuple[bool, float]] = {}
+
+
+def activity_union_sql(account_ids: bool = False, since: bool = False) -> str:
+    """Live UNION ALL over trades, transactions and dividends.
+
+    `account_ids` / `since` add `:account_ids` / `:since` filters inside each branch so
+    the source indexes are used.
+    """
+    branches = []
+    for alias, table, ts_col, columns in _SOURCES:
+        # Rows without a timestamp have no place in the time-ordered feed
+        filters = [f"{alias}.{ts_col} IS NOT NULL"]
+        if account_ids:
+            filters.append(f"{alias}.account_id = ANY(:account_ids)")
+        if since:
+            filters.append(f"{alias}.{ts_col} >= :since")
+        where = f"WHERE {' AND '.join(filters)}"
+        branches.append(f"SELECT {columns} FROM {table} {alias} {where}")
+    return "\nUNION ALL\n".join(branches)
+
+
+def encode_cursor(row: Dict[str, Any]) -> str:
+    """Opaque cursor for the row a page ended on."""
+    raw = json.dumps([row["ts"].isoformat(), row["src"], int(row["src_id"])])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        ts, src, src_id = json.loads(raw)
+        return datetime.fromisoformat(ts), str(src), int(src_id)
+    except Exception as e:
+        raise ValueError(f"Invalid activity cursor: {cursor!r}") from e
+
+
+def reset_table_cache() -> None:
+    _table_cache.clear()
+
 
 class ActivityAggregatorService:
     """
     Aggregates portfolio activity across trades, transactions, and dividends.
-    Prefers materialized views when available; falls back to live UNION ALL.
+
+    Reads come from two tables maintained incrementally after syncs:
+    - `portfolio_activity`: one row per source row, keyed by (src, src_id)
+    - `portfolio_activity_daily`: per (account_id, day) counts and money in/out
+    `refresh()` rebuilds only the given accounts from `since` onward inside one
+    transaction, so readers keep seeing the previous rows until it commits.
+    Falls back to the live UNION ALL when the tables are not migrated.
     """
 
     def __init__(self) -> None:
-        self.activity_mv = "portfolio_activity_mv"
-        self.daily_mv = "portfolio_activity_daily_mv"
+        self.activity_table = "portfolio_activity"
+        self.daily_table = "portfolio_activity_daily"
+
+    def _table_exists(self, db: Session, name: str) -> bool:
+        cached = _table_cache.get(name)
+        now = time.monotonic()
+        if cached and (cached[0] or now - cached[1] < _MISSING_RECHECK_SECONDS):
+            return cached[0]
+        row = db.execute(text("SELECT to_regclass(:name) IS NOT NULL AS exists;"), {"name": name}).first()
+        exists = bool(row and row[0])
+        _table_cache[name] = (exists, now)
+        return exists
 
-    def _mv_exists(self, db: Session, name: str) -> bool:
-        sql = text(
-            "SELECT to_regclass(:name) IS NOT NULL AS exists;"
+    # ---------------------- Maintenance ----------------------
+    def refresh(
+        self,
+        db: Session,
+        account_ids: Optional[Iterable[int]] = None,
+        since: Optional[date] = None,
+    ) -> Dict[str, Any]:
+        """Rebuild activity rows (all accounts when `account_ids` is None) from `since` onward."""
+        if not (self._table_exists(db, self.activity_table) and self._table_exists(db, self.daily_table)):
+            return {"refreshed": [], "errors": ["activity tables not migrated"]}
+        ids = None if account_ids is None else sorted({int(a) for a in account_ids})
+        if ids == []:
+            return {"refreshed": [], "errors": [], "rows": 0, "days": 0}
+
+        params: Dict[str, Any] = {}
+        filters: List[str] = []
+        if ids is not None:
+            filters.append("account_id = ANY(:account_ids)")
+            params["account_ids"] = ids
+        if since is not None:
+            filters.append("day >= :since")
+            params["since"] = since
+        scope = " AND ".join(filters) if filters else "TRUE"
+        started = time.perf_counter()
+        try:
+            # Serialize refreshes; plain readers are never blocked
+            db.execute(text("SELECT pg_advisory_xact_lock(hashtext('portfolio_activity_refresh'))"))
+            db.execute(
+                text(
+                    f"CREATE TEMP TABLE {REFRESH_TABLE} ON COMMIT DROP AS "
+                    f"SELECT {ACTIVITY_COLUMNS} FROM ("
+                    f"{activity_union_sql(account_ids=ids is not None, since=since is not None)}) u"
+                ),
+                params,
+            )
+            # Also drop rows whose source moved into the window (or to another account):
+            # their old aggregate row sits outside `scope` but shares the (src, src_id) key.
+            removed = db.execute(
+                text(
+                    f"DELETE FROM {self.activity_table} WHERE ({scope}) "
+                    f"OR (src, src_id) IN (SELECT src, src_id FROM {REFRESH_TABLE}) "
+                    "RETURNING account_id, day"
+                ),
+                params,
+            ).all()
+            rows = db.execute(
+                text(
+                    f"INSERT INTO {self.activity_table} ({ACTIVITY_COLUMNS}) "
+                    f"SELECT {ACTIVITY_COLUMNS} FROM {REFRESH_TABLE}"
+                )
+            ).rowcount
+            db.execute(text(f"DROP TABLE {REFRESH_TABLE}"))
+
+            # Days outside the window that lost a moved row need their totals rebuilt too
+            stale = sorted(
+                {
+                    (account_id, day)
+                    for account_id, day in removed
+                    if day is not None
+                    and ((ids is not None and account_id not in ids) or (since is not None and day < since))
+                }
+            )
+            daily_scope = f"({scope})"
+            if stale:
+                daily_scope += (
+                    " OR (account_id, day) IN (SELECT * FROM unnest("
+                    "CAST(:stale_accounts AS integer[]), CAST(:stale_days AS date[])))"
+                )
+                params["stale_accounts"] = [a for a, _ in stale]
+                params["stale_days"] = [d for _, d in stale]
+            db.execute(text(f"DELETE FROM {self.daily_table} WHERE {daily_scope}"), params)
+            days = db.execute(
+                text(
+                    f"INSERT INTO {self.daily_table} "
+                    f"SELECT day, account_id, {DAILY_AGGREGATES} FROM {self.activity_table} "
+                    f"WHERE ({daily_scope}) AND day IS NOT NULL GROUP BY day, account_id"
+                ),
+                params,
+            ).rowcount
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"❌ Activity refresh failed: {e}")
+            return {"refreshed": [], "errors": [str(e)]}
+        seconds = time.perf_counter() - started
+        logger.info(
+            f"🔄 Activity refreshed for {'all' if ids is None else len(ids)} accounts"
+            f"{f' since {since}' if since else ''}: {rows} rows, {days} days in {seconds:.2f}s"
         )
-        row = db.execute(sql, {"name": name}).first()
-        return bool(row and row[0])
-
-    def refresh_materialized_views(self, db: Session) -> Dict[str, Any]:
-        """Refresh activity materialized views. Safe to call periodically."""
-        refreshed = []
-        errors: List[str] = []
-        for mv in [self.activity_mv, self.daily_mv]:
-            try:
-                if self._mv_exists(db, mv):
-                    db.execute(text(f"REFRESH MATERIALIZED VIEW {mv};"))
-                    refreshed.append(mv)
-            except Exception as e:
-                errors.append(f"{mv}: {e}")
-        return {"refreshed": refreshed, "errors": errors}
+        return {
+            "refreshed": [self.activity_table, self.daily_table],
+            "errors": [],
+            "account_ids": ids,
+            "since": since.isoformat() if since else None,
+            "rows": rows,
+            "days": days,
+            "seconds": round(seconds, 3),
+        }
 
+    def refresh_after_sync(self, db: Session, account_id: int, sync_started: datetime) -> Dict[str, Any]:
+        """Refresh one account from the earliest activity day the sync touched (bounded by the lookback).
+
+        `sync_started` should be timezone-aware UTC, matching the sources' timestamps.
+        """
+        since = datetime.now(timezone.utc).date() - timedelta(days=int(settings.ACTIVITY_REFRESH_LOOKBACK_DAYS))
+        try:
+            row = db.execute(
+                text(
+                    """
+                    SELECT LEAST(
+                        (SELECT MIN(DATE(execution_time)) FROM trades
+                          WHERE account_id = :account_id AND GREATEST(created_at, updated_at) >= :started),
+                        (SELECT MIN(DATE(transaction_date)) FROM transactions
+                          WHERE account_id = :account_id AND GREATEST(created_at, updated_at) >= :started)
+                    )
+                    """
+                ),
+                {"account_id": account_id, "started": sync_started},
+            ).first()
+            if row and row[0] is not None:
+                since = min(since, row[0])
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"⚠️ Could not find days touched by sync of account {account_id}: {e}")
+        return self.refresh(db, account_ids=[account_id], since=since)
+
+    # ---------------------- Reads ----------------------
     def get_activity(
         self,
         db: Session,
@@ -50,98 +319,91 @@ class ActivityAggregatorService:
         offset: int = 0,
         use_mv: bool = True,
     ) -> List[Dict[str, Any]]:
-        """Return unified activity rows."""
+        """Return unified activity rows (see `get_activity_page` for cursor paging)."""
+        return self.get_activity_page(
+            db,
+            account_id=account_id,
+            start=start,
+            end=end,
+            symbol=symbol,
+            category=category,
+            side=side,
+            limit=limit,
+            offset=offset,
+            use_mv=use_mv,
+        )["rows"]
+
+    def get_activity_page(
+        self,
+        db: Session,
+        account_id: Optional[int] = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        symbol: Optional[str] = None,
+        category: Optional[str] = None,
+        side: Optional[str] = None,
+        limit: int = 200,
+        cursor: Optional[str] = None,
+        offset: int = 0,
+        use_mv: bool = True,
+    ) -> Dict[str, Any]:
+        """One page of activity, newest first, plus `next_cursor` for the following page.
+
+        With a cursor the page starts strictly after the cursor row (keyset on
+        ts, src, src_id), so every page costs an index range scan of `limit` rows.
+        `offset` is only honoured without a cursor.
+        """
         params: Dict[str, Any] = {}
         where_clauses: List[str] = []
-        order = "ORDER BY ts DESC"
 
-        if use_mv and self._mv_exists(db, self.activity_mv):
-            base = f"SELECT * FROM {self.activity_mv}"
+        if use_mv and self._table_exists(db, self.activity_table):
+            base = f"SELECT * FROM {self.activity_table}"
         else:
-            base = """
-            SELECT * FROM (
-                SELECT
-                    t.execution_time AS ts,
-                    DATE(t.execution_time) AS day,
-                    t.account_id,
-                    t.symbol,
-                    'TRADE'::text AS category,
-                    t.side AS side,
-                    t.quantity::numeric AS quantity,
-                    t.price::numeric AS price,
-                    t.total_value::numeric AS amount,
-                    NULL::numeric AS net_amount,
-                    (COALESCE(t.commission,0) + COALESCE(t.fees,0))::numeric AS commission,
-                    'trades'::text AS src,
-                    t.execution_id AS external_id
-                FROM trades t
-                UNION ALL
-                SELECT
-                    tr.transaction_date AS ts,
-                    DATE(tr.transaction_date) AS day,
-                    tr.account_id,
-                    tr.symbol,
-                    tr.transaction_type::text AS category,
-                    CASE WHEN tr.transaction_type::text IN ('BUY','SELL') THEN tr.action ELSE NULL END AS side,
-                    tr.quantity::numeric AS quantity,
-                    tr.trade_price::numeric AS price,
-                    tr.amount::numeric AS amount,
-                    tr.net_amount::numeric AS net_amount,
-                    COALESCE(tr.commission,0)::numeric AS commission,
-                    'transactions'::text AS src,
-                    tr.external_id AS external_id
-                FROM transactions tr
-                UNION ALL
-                SELECT
-                    d.ex_date AS ts,
-                    DATE(d.ex_date) AS day,
-                    d.account_id,
-                    d.symbol,
-                    'DIVIDEND'::text AS category,
-                    NULL::text AS side,
-                    d.shares_held::numeric AS quantity,
-                    d.dividend_per_share::numeric AS price,
-                    d.total_dividend::numeric AS amount,
-                    d.net_dividend::numeric AS net_amount,
-                    COALESCE(d.tax_withheld,0)::numeric AS commission,
-                    'dividends'::text AS src,
-                    d.external_id AS external_id
-                FROM dividends d
-            ) u
-            """
+            base = f"SELECT * FROM ({activity_union_sql()}) u"
 
         if account_id is not None:
             where_clauses.append("account_id = :account_id")
             params["account_id"] = account_id
+        # Day bounds as ts ranges so the (…, ts, src, src_id) indexes bound the scan
         if start is not None:
-            where_clauses.append("day >= :start")
-            params["start"] = start
+            where_clauses.append("ts >= :start_ts")
+            params["start_ts"] = datetime.combine(start, datetime.min.time())
         if end is not None:
-            where_clauses.append("day <= :end")
-            params["end"] = end
+            where_clauses.append("ts < :end_ts")
+            params["end_ts"] = datetime.combine(end + timedelta(days=1), datetime.min.time())
         if symbol:
-            where_clauses.append("UPPER(symbol) = :symbol")
-            params["symbol"] = symbol.upper()
+            where_clauses.append("symbol_upper = :symbol")
+            params["symbol"] = symbol.strip().upper()
         if category:
             where_clauses.append("category = :category")
             params["category"] = category
         if side:
             where_clauses.append("side = :side")
             params["side"] = side.upper()
+        if cursor:
+            ts, src, src_id = decode_cursor(cursor)
+            where_clauses.append("(ts, src, src_id) < (:cursor_ts, :cursor_src, :cursor_src_id)")
+            params.update(cursor_ts=ts, cursor_src=src, cursor_src_id=src_id)
 
         where = f"WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
-        paging = "LIMIT :limit OFFSET :offset"
-        params["limit"] = min(max(limit, 1), 1000)
-        params["offset"] = max(offset, 0)
+        limit = min(max(limit, 1), 1000)
+        params["limit"] = limit + 1
+        paging = "LIMIT :limit"
+        if offset and not cursor:
+            paging += " OFFSET :offset"
+            params["offset"] = max(offset, 0)
 
         sql = text(f"""
             {base}
             {where}
-            {order}
+            {FEED_ORDER}
             {paging}
         """)
-        rows = db.execute(sql, params).mappings().all()
-        return [dict(r) for r in rows]
+        rows = [dict(r) for r in db.execute(sql, params).mappings().all()]
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]) if has_more and rows else None
+        return {"rows": rows, "next_cursor": next_cursor}
 
     def get_daily_summary(
         self,
@@ -156,77 +418,6 @@ class ActivityAggregatorService:
         params: Dict[str, Any] = {}
         where_clauses: List[str] = []
 
-        if use_mv and self._mv_exists(db, self.daily_mv):
-            base = f"SELECT * FROM {self.daily_mv}"
-        else:
-            base = """
-            SELECT * FROM (
-                WITH activity AS (
-                    SELECT * FROM (
-                        SELECT
-                            t.execution_time AS ts,
-                            DATE(t.execution_time) AS day,
-                            t.account_id,
-                            t.symbol,
-                            'TRADE'::text AS category,
-                            t.side AS side,
-                            t.quantity::numeric AS quantity,
-                            t.price::numeric AS price,
-                            t.total_value::numeric AS amount,
-                            NULL::numeric AS net_amount,
-                            (COALESCE(t.commission,0) + COALESCE(t.fees,0))::numeric AS commission
-                        FROM trades t
-                        UNION ALL
-                        SELECT
-                            tr.transaction_date AS ts,
-                            DATE(tr.transaction_date) AS day,
-                            tr.account_id,
-                            tr.symbol,
-                            tr.transaction_type::text AS category,
-                            CASE WHEN tr.transaction_type::text IN ('BUY','SELL') THEN tr.action ELSE NULL END AS side,
-                            tr.quantity::numeric AS quantity,
-                            tr.trade_price::numeric AS price,
-                            tr.amount::numeric AS amount,
-                            tr.net_amount::numeric AS net_amount,
-                            COALESCE(tr.commission,0)::numeric AS commission
-                        FROM transactions tr
-                        UNION ALL
-                        SELECT
-                            d.ex_date AS ts,
-                            DATE(d.ex_date) AS day,
-                            d.account_id,
-                            d.symbol,
-                            'DIVIDEND'::text AS category,
-                            NULL::text AS side,
-                            d.shares_held::numeric AS quantity,
-                            d.dividend_per_share::numeric AS price,
-                            d.total_dividend::numeric AS amount,
-                            d.net_dividend::numeric AS net_amount,
-                            COALESCE(d.tax_withheld,0)::numeric AS commission
-                        FROM dividends d
-                    ) u
-                )
-                SELECT
-                    day,
-                    account_id,
-                    COUNT(*) FILTER (WHERE category = 'TRADE') AS trade_count,
-                    COUNT(*) FILTER (WHERE category = 'TRADE' AND UPPER(COALESCE(side,'-')) = 'BUY') AS buy_count,
-                    COUNT(*) FILTER (WHERE category = 'TRADE' AND UPPER(COALESCE(side,'-')) = 'SELL') AS sell_count,
-                    COALESCE(SUM(quantity) FILTER (WHERE category = 'TRADE' AND UPPER(COALESCE(side,'-')) = 'BUY'), 0) AS buy_qty,
-                    COALESCE(SUM(quantity) FILTER (WHERE category = 'TRADE' AND UPPER(COALESCE(side,'-')) = 'SELL'), 0) AS sell_qty,
-                    COALESCE(SUM(COALESCE(net_amount, amount)) FILTER (
-                        WHERE (category = 'TRADE' AND UPPER(COALESCE(side,'-')) = 'SELL')
-                           OR category IN ('DIVIDEND','BROKER_INTEREST_RECEIVED','TAX_REFUND','DEPOSIT')
-                    ), 0) AS money_in,
-                    COALESCE(SUM(ABS(COALESCE(net_amount, amount))) FILTER (
-                        WHERE (category = 'TRADE' AND UPPER(COALESCE(side,'-')) = 'BUY')
-                           OR category IN ('COMMISSION','OTHER_FEE','BROKER_INTEREST_PAID','WITHDRAWAL','TRANSFER')
-                    ), 0) AS money_out
-                FROM activity
-                GROUP BY day, account_id
-            ) s
-            """
-
         if account_id is not None:
             where_clauses.append("account_id = :account_id")
             params["account_id"] = account_id
@@ -236,21 +427,26 @@ class ActivityAggregatorService:
         if end is not None:
             where_clauses.append("day <= :end")
             params["end"] = end
-        if symbol:
-            where_clauses.append("UPPER(symbol) = :symbol")
-            params["symbol"] = symbol.upper()
 
-        where = f"WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
-        order = "ORDER BY day DESC"
-        # Apply WHERE to an outer SELECT when not using MVs to avoid syntax errors after GROUP BY
-        if use_mv and self._mv_exists(db, self.daily_mv):
-            sql = text(f"{base} {where} {order}")
+        # The daily table has no symbol; per-symbol summaries aggregate activity rows
+        if use_mv and not symbol and self._table_exists(db, self.daily_table):
+            where = f"WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
+            sql = text(f"SELECT * FROM {self.daily_table} {where} ORDER BY day DESC")
         else:
-            sql = text(f"{base} {where} {order}")
+            if symbol:
+                where_clauses.append("symbol_upper = :symbol")
+                params["symbol"] = symbol.strip().upper()
+            if use_mv and self._table_exists(db, self.activity_table):
+                source = self.activity_table
+            else:
+                source = f"({activity_union_sql()}) u"
+            where = f"WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
+            sql = text(
+                f"SELECT day, account_id, {DAILY_AGGREGATES} FROM {source} {where} "
+                "GROUP BY day, account_id ORDER BY day DESC"
+            )
         rows = db.execute(sql, params).mappings().all()
         return [dict(r) for r in rows]
 
 
 activity_aggregator = ActivityAggregatorService()
-
-
@@ -10,12 +10,13 @@ from any supported broker, while keeping the core models broker-neutral.
 import logging
 import asyncio
 from typing import Dict
-from datetime import datetime
+from datetime import datetime, timezone
 
 from backend.database import SessionLocal
 from backend.models import BrokerAccount
 from backend.services.portfolio.ibkr_sync_service import IBKRSyncService
 from backend.services.portfolio.tastytrade_sync_service import TastyTradeSyncService
+from backend.services.portfolio.activity_aggregator import activity_aggregator
 from backend.models.broker_account import BrokerType
 
 logger = logging.getLogger(__name__)
@@ -63,6 +64,18 @@ class BrokerSyncService:
         # Unsupported non-enum broker markers should raise
         raise ValueError(f"Unsupported broker: {broker_type}")
 
+    def _refresh_activity(self, session, account_id: int, sync_started: datetime) -> None:
+        """Rebuild the synced account's recent activity rows; never fails the sync."""
+        try:
+            res = activity_aggregator.refresh_after_sync(session, account_id, sync_started)
+            if res.get("errors"):
+                logger.warning(
+                    f"⚠️ Activity refresh for account {account_id} skipped: {res['errors']}"
+                )
+        except Exception as e:
+            session.rollback()
+            logger.warning(f"⚠️ Activity refresh for account {account_id} failed: {e}")
+
     def sync_account(
         self, account_id: str, db=None, sync_type: str = "comprehensive"
     ) -> Dict:
@@ -121,6 +134,7 @@ class BrokerSyncService:
                 raise ValueError(
                     f"Unsupported broker service implementation for: {broker_account.broker}"
                 )
+            sync_started = datetime.now(timezone.utc)
             result = _run(
                 service.sync_account_comprehensive(
                     broker_account.account_number, session
@@ -134,6 +148,7 @@ class BrokerSyncService:
             broker_account.sync_status = SyncStatus.SUCCESS
             broker_account.sync_error_message = None
             session.commit()
+            self._refresh_activity(session, broker_account.id, sync_started)
 
             return result
 
@@ -204,6 +219,7 @@ class BrokerSyncService:
                     f"Unsupported broker service implementation for: {broker_account.broker}"
                 )
 
+            sync_started = datetime.now(timezone.utc)
             maybe_coro = service.sync_account_comprehensive(
                 broker_account.account_number, session
             )
@@ -217,6 +233,7 @@ class BrokerSyncService:
             broker_account.sync_status = SyncStatus.SUCCESS
             broker_account.sync_error_message = None
             session.commit()
+            self._refresh_activity(session, broker_account.id, sync_started)
             return result
 
         except ValueError:
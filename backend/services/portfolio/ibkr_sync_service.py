@@ -43,10 +43,29 @@ from backend.models.tax_lot import TaxLotSource
 from backend.models.options import Option
 
 # Import the services we need
+from backend.config import settings
 from backend.services.clients.ibkr_flexquery_client import IBKRFlexQueryClient
+from backend.services.clients.flexquery_report_store import (
+    compute_section_hashes,
+    flexquery_report_store,
+    report_digest,
+)
 
 logger = logging.getLogger(__name__)
 
+# FlexQuery report sections each sync step reads. A step is skipped when all of its
+# sections hash the same as at the last successful sync.
+FLEX_STEP_SECTIONS: Dict[str, tuple] = {
+    "instruments": ("OpenPositions", "Trades", "OptionEAE", "CashTransactions"),
+    "tax_lots": ("Trades", "OpenPositions"),
+    "option_positions": ("OpenPositions",),
+    "trades": ("Trades",),
+    "cash_transactions": ("CashTransactions",),
+    "account_balances": ("AccountInformation",),
+    "margin_interest": ("InterestAccruals",),
+    "transfers": ("Transfers",),
+}
+
 
 def serialize_for_json(data):
     """Convert datetime objects to ISO strings for JSON serialization."""
@@ -65,11 +84,15 @@ class IBKRSyncService:
 
     def __init__(self):
         self.flexquery_client = IBKRFlexQueryClient()
+        self.report_store = flexquery_report_store
         # NOTE: IBKRClient may need singleton pattern - will handle connection carefully
         # Account mapping removed - now retrieved dynamically from database/config
 
     async def sync_comprehensive_portfolio(
-        self, account_number: str = "U19491234", db_session: Session | None = None
+        self,
+        account_number: str = "U19491234",
+        db_session: Session | None = None,
+        force_full: bool = False,
     ) -> Dict:
         """
         MAIN METHOD: Comprehensive sync of all portfolio data.
@@ -82,6 +105,10 @@ class IBKRSyncService:
         5. PriceData (current market prices)
         6. Positions (detailed position data)
         7. PortfolioSnapshot (daily portfolio snapshot)
+
+        The report is persisted in the FlexQuery report store and shared by every step.
+        Steps whose report sections are unchanged since the last successful sync are
+        skipped unless `force_full` is set.
         """
         db = db_session or SessionLocal()
         results = {}
@@ -104,37 +131,53 @@ class IBKRSyncService:
             if not broker_account:
                 return {"error": "not found in database"}
 
-            # Fetch single FlexQuery report once to avoid IN_PROGRESS collisions
-            report_xml = await self.flexquery_client.get_full_report(account_number)
+            # Fetch single FlexQuery report once (or reuse a recently stored one) so every
+            # step shares it and we avoid IN_PROGRESS collisions.
+            report_xml = await self._get_report_xml(db, account_number)
             if not report_xml:
                 logger.error("❌ FlexQuery report not ready")
                 return {"error": "flexquery_not_ready"}
 
-            # Step 1: Sync Instruments (securities master data)
-            instruments_result = await self._sync_instruments(
-                db, account_number, report_xml
+            section_hashes, unchanged = self._section_change_state(
+                db, account_number, report_xml, force_full
             )
-            results["instruments"] = instruments_result
 
-            # Step 2: Sync TaxLots with REAL cost basis from FlexQuery.
-            # Prefer the client's canonical tax-lots endpoint over parsing the full report XML,
-            # since report formats can vary and the client normalizes the structure.
-            tax_lots_result = await self._sync_tax_lots_from_flexquery(
-                db, broker_account, account_number
-            )
-            results["tax_lots"] = tax_lots_result
+            def _unchanged(step: str) -> bool:
+                return all(sec in unchanged for sec in FLEX_STEP_SECTIONS[step])
+
+            # Step 1: Sync Instruments (securities master data)
+            if _unchanged("instruments"):
+                results["instruments"] = {"skipped": "unchanged"}
+            else:
+                results["instruments"] = await self._sync_instruments(
+                    db, account_number, report_xml
+                )
+
+            # Step 2: Sync TaxLots with REAL cost basis from the shared report
+            if _unchanged("tax_lots"):
+                results["tax_lots"] = {"skipped": "unchanged"}
+            else:
+                results["tax_lots"] = await self._sync_tax_lots_from_flexquery(
+                    db, broker_account, account_number, report_xml
+                )
 
             # Step 3: Sync Option Positions from FlexQuery OpenPositions
-            options_result = await self._sync_option_positions_from_flexquery(
-                db, broker_account, account_number, report_xml
-            )
-            results["option_positions"] = options_result
+            if _unchanged("option_positions"):
+                results["option_positions"] = {"skipped": "unchanged"}
+            else:
+                results["option_positions"] = (
+                    await self._sync_option_positions_from_flexquery(
+                        db, broker_account, account_number, report_xml
+                    )
+                )
 
             # Step 4: Sync historical Trades from FlexQuery
-            trades_result = await self._sync_trades_from_flexquery(
-                db, broker_account, account_number, report_xml
-            )
-            results["trades"] = trades_result
+            if _unchanged("trades"):
+                results["trades"] = {"skipped": "unchanged"}
+            else:
+                results["trades"] = await self._sync_trades_from_flexquery(
+                    db, broker_account, account_number, report_xml
+                )
             # Step 5: Sync current Positions (aggregated from tax lots, uses BrokerAccount)
             positions_result = await self._sync_position_from_tax_lots(
                 db, broker_account
@@ -158,31 +201,24 @@ class IBKRSyncService:
             )
             results["detailed_positions"] = detailed_positions_result
 
-            # Step 8: Sync cash transactions including dividends
-            cash_transactions_result = await self._sync_cash_transactions(
-                db, broker_account, account_number, report_xml
-            )
-            results["cash_transactions"] = cash_transactions_result
-
-            # Step 9: Sync account balances
-            account_balances_result = await self._sync_account_balances(
-                db, broker_account, account_number, report_xml
-            )
-            results["account_balances"] = account_balances_result
-
-            # Step 10: Sync margin interest
-            margin_interest_result = await self._sync_margin_interest(
-                db, broker_account, account_number, report_xml
+            # Steps 8-11: cash transactions (incl. dividends), balances, margin interest,
+            # transfers – each keyed to its own report section.
+            section_steps = (
+                ("cash_transactions", self._sync_cash_transactions),
+                ("account_balances", self._sync_account_balances),
+                ("margin_interest", self._sync_margin_interest),
+                ("transfers", self._sync_transfers),
             )
-            results["margin_interest"] = margin_interest_result
-
-            # Step 11: Sync transfers
-            transfers_result = await self._sync_transfers(
-                db, broker_account, account_number, report_xml
-            )
-            results["transfers"] = transfers_result
+            for step, sync_fn in section_steps:
+                if _unchanged(step):
+                    results[step] = {"skipped": "unchanged"}
+                else:
+                    results[step] = await sync_fn(
+                        db, broker_account, account_number, report_xml
+                    )
 
-            # Commit all changes
+            # Record which sections were applied, then commit all changes together
+            self._mark_sections_synced(db, account_number, section_hashes, results)
             db.commit()
 
             # Calculate summary
@@ -226,6 +262,78 @@ class IBKRSyncService:
         """Adapter to align with broker-agnostic sync interface."""
         return await self.sync_comprehensive_portfolio(account_number, db_session=db_session)
 
+    async def _get_report_xml(self, db: Session, account_number: str) -> str | None:
+        """Return the account's FlexQuery XML, reusing a recently stored report if any."""
+        reuse_s = float(getattr(settings, "IBKR_FLEX_REPORT_REUSE_SECONDS", 0) or 0)
+        if reuse_s > 0:
+            try:
+                stored = self.report_store.latest(
+                    db, account_number, max_age_seconds=reuse_s
+                )
+                if stored is not None:
+                    logger.info(
+                        f"♻️ Reusing stored FlexQuery report {stored.digest[:12]} for {account_number}"
+                    )
+                    return self.report_store.load_xml(stored)
+            except Exception as e:
+                logger.warning(f"FlexQuery report store lookup failed: {e}")
+
+        report_xml = await self.flexquery_client.get_full_report(account_number)
+        if report_xml:
+            try:
+                self.report_store.put(db, account_number, report_xml)
+            except Exception as e:
+                logger.warning(f"FlexQuery report not persisted: {e}")
+        return report_xml
+
+    def _section_change_state(
+        self, db: Session, account_number: str, report_xml: str, force_full: bool
+    ) -> tuple[Dict[str, str], set]:
+        """Per-section hashes of the report and the sections unchanged since last sync."""
+        try:
+            section_hashes = compute_section_hashes(report_xml, account_number)
+        except Exception as e:
+            logger.warning(f"FlexQuery section hashing failed; running all steps: {e}")
+            return {}, set()
+        if force_full or not getattr(settings, "IBKR_FLEX_SKIP_UNCHANGED_SECTIONS", True):
+            return section_hashes, set()
+        try:
+            unchanged = self.report_store.unchanged_sections(
+                db, account_number, section_hashes
+            )
+        except Exception as e:
+            logger.warning(f"FlexQuery section state unavailable; running all steps: {e}")
+            return section_hashes, set()
+        if unchanged:
+            logger.info(
+                f"🧮 {account_number}: unchanged FlexQuery sections {sorted(unchanged)}"
+            )
+        return section_hashes, unchanged
+
+    def _mark_sections_synced(
+        self, db: Session, account_number: str, section_hashes: Dict[str, str], results: Dict
+    ) -> None:
+        """Advance section state for sections whose consuming steps all succeeded."""
+        if not section_hashes:
+            return
+        failed_sections = {
+            sec
+            for step, res in results.items()
+            if isinstance(res, dict) and res.get("error")
+            for sec in FLEX_STEP_SECTIONS.get(step, ())
+        }
+        sections = {sec for secs in FLEX_STEP_SECTIONS.values() for sec in secs}
+        try:
+            self.report_store.mark_synced(
+                db,
+                account_number,
+                section_hashes,
+                sorted(sections - failed_sections),
+                report_digest_value=report_digest(section_hashes),
+            )
+        except Exception as e:
+            logger.warning(f"FlexQuery section state not updated: {e}")
+
     async def _sync_instruments(
         self, db: Session, account_number: str, report_xml: str | None = None
     ) -> Dict:
@@ -1461,11 +1569,11 @@ class IBKRSyncService:
 
     async def _refresh_prices_for_account(self, db: Session, broker_account: BrokerAccount) -> Dict:
         """Refresh current prices for positions and tax lots of a broker account."""
-        from backend.services.market.market_data_service import MarketDataService
+        from backend.services.market.service_container import get_market_data_service
         from backend.models.tax_lot import TaxLot
         from backend.models.position import Position
 
-        market_service = MarketDataService()
+        market_service = get_market_data_service()
 
         # Load target positions
         positions = (
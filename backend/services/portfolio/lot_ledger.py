@@ -0,0 +1,425 @@
+"""
+Lot Ledger
+==========
+
+In-memory, columnar view of a user's tax lots for portfolio-wide what-ifs.
+
+- `LotLedger.load()` reads every `TaxLot` row for the user in one query into
+  numpy arrays (symbol codes, quantity, cost per share, acquisition day)
+- Lot selection (FIFO / LIFO / HIFO / min-tax) runs across all symbols at once:
+  one lexsort by (symbol, method key), a per-symbol running total and a clip
+- Wash-sale check: losses are disallowed in proportion to shares of the same
+  symbol bought in the 30 days before the sale that are still held afterwards
+- `harvest_candidates()` ranks loss lots by estimated tax saved
+- Prices come in as one `{symbol: price}` mapping (see
+  `MarketDataService.get_current_prices`); unpriced symbols are left untouched
+
+    ledger = LotLedger.load(db, user_id)
+    sim = ledger.trim(0.10, prices, method="hifo")
+    sim.to_dict()["totals"]["estimated_tax"]
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Union
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from backend.models.tax_lot import TaxLot, TaxLotMethod
+
+# Simplified flat rates (same assumptions as TaxLotService._estimate_tax_impact)
+SHORT_TERM_RATE = 0.37
+LONG_TERM_RATE = 0.20
+LONG_TERM_DAYS = 365
+WASH_SALE_DAYS = 30
+
+LOT_METHODS = (
+    TaxLotMethod.FIFO,
+    TaxLotMethod.LIFO,
+    TaxLotMethod.HIFO,
+    TaxLotMethod.MIN_TAX,
+)
+
+_EPOCH = np.datetime64("1970-01-01", "D")
+# Sort key for lots without an acquisition date (always selected last)
+_NO_DATE = np.iinfo(np.int64).max // 4
+
+
+def _day(value: date) -> int:
+    return int((np.datetime64(value, "D") - _EPOCH).astype(np.int64))
+
+
+def resolve_lot_method(method: Union[str, TaxLotMethod]) -> TaxLotMethod:
+    """Accept a TaxLotMethod or its value ("fifo", "lifo", "hifo", "min_tax")."""
+    m = method if isinstance(method, TaxLotMethod) else TaxLotMethod(str(method).lower())
+    if m not in LOT_METHODS:
+        raise ValueError(f"Unsupported lot method for simulation: {m.value}")
+    return m
+
+
+def estimate_tax(short_term_pnl: float, long_term_pnl: float) -> Dict[str, float]:
+    """Tax on net short/long-term gains at the flat rates (losses floor at 0)."""
+    short_term_tax = max(0.0, short_term_pnl * SHORT_TERM_RATE)
+    long_term_tax = max(0.0, long_term_pnl * LONG_TERM_RATE)
+    return {
+        "short_term_tax": short_term_tax,
+        "long_term_tax": long_term_tax,
+        "total_estimated_tax": short_term_tax + long_term_tax,
+    }
+
+
+class LotLedger:
+    """Columnar tax lots; one row per lot, symbols encoded as integer codes."""
+
+    def __init__(
+        self,
+        lot_ids: Sequence[int],
+        symbols: Sequence[str],
+        quantity: Sequence[float],
+        cost_per_share: Sequence[float],
+        acquired: Sequence[Optional[date]],
+        account_ids: Optional[Sequence[int]] = None,
+    ):
+        n = len(lot_ids)
+        self.lot_ids = np.asarray(lot_ids, dtype=np.int64)
+        self.symbols, self.codes = np.unique(np.asarray(symbols, dtype=object).astype(str), return_inverse=True)
+        self.codes = self.codes.astype(np.int64)
+        self.quantity = np.clip(np.asarray(quantity, dtype=np.float64), 0.0, None)
+        self.cost = np.nan_to_num(np.asarray(cost_per_share, dtype=np.float64))
+        acq = np.array(acquired, dtype="datetime64[D]") if n else np.empty(0, dtype="datetime64[D]")
+        self.has_date = ~np.isnat(acq)
+        self.acquired_day = np.where(self.has_date, (acq - _EPOCH).astype(np.int64), _NO_DATE)
+        self.account_ids = (
+            np.asarray(account_ids, dtype=np.int64) if account_ids is not None else np.zeros(n, dtype=np.int64)
+        )
+        self._symbol_index = {s: i for i, s in enumerate(self.symbols.tolist())}
+
+    # ---------------------- Construction ----------------------
+    @classmethod
+    def load(
+        cls,
+        db: Session,
+        user_id: int,
+        account_id: Optional[int] = None,
+        symbols: Optional[Iterable[str]] = None,
+    ) -> "LotLedger":
+        """All open lots for the user (optionally one account / a symbol subset)."""
+        query = db.query(
+            TaxLot.id,
+            TaxLot.symbol,
+            TaxLot.quantity,
+            TaxLot.cost_per_share,
+            TaxLot.cost_basis,
+            TaxLot.acquisition_date,
+            TaxLot.account_id,
+        ).filter(TaxLot.user_id == user_id, TaxLot.quantity > 0)
+        if account_id is not None:
+            query = query.filter(TaxLot.account_id == account_id)
+        if symbols is not None:
+            query = query.filter(TaxLot.symbol.in_(list(symbols)))
+        rows = query.all()
+        return cls.from_rows(rows)
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Sequence[Any]]) -> "LotLedger":
+        """Rows of (id, symbol, quantity, cost_per_share, cost_basis, acquisition_date, account_id)."""
+        if not rows:
+            return cls([], [], [], [], [], [])
+        ids, symbols, qty, cps, basis, acquired, accounts = zip(*rows)
+        qty_arr = np.asarray(qty, dtype=np.float64)
+        cps_arr = np.asarray([np.nan if v is None else v for v in cps], dtype=np.float64)
+        basis_arr = np.asarray([np.nan if v is None else v for v in basis], dtype=np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            derived = np.where(qty_arr > 0, basis_arr / qty_arr, np.nan)
+        cps_arr = np.where(np.isnan(cps_arr), derived, cps_arr)
+        return cls(ids, symbols, qty_arr, cps_arr, acquired, accounts)
+
+    def __len__(self) -> int:
+        return len(self.lot_ids)
+
+    # ---------------------- Vector helpers ----------------------
+    def symbol_totals(self, values: Optional[np.ndarray] = None) -> np.ndarray:
+        """Per-symbol sum of `values` (default: quantity)."""
+        weights = self.quantity if values is None else values
+        return np.bincount(self.codes, weights=weights, minlength=len(self.symbols))
+
+    def per_symbol(self, mapping: Mapping[str, float], default: float = np.nan) -> np.ndarray:
+        """Per-symbol vector from a `{symbol: value}` mapping."""
+        out = np.full(len(self.symbols), default, dtype=np.float64)
+        for sym, value in mapping.items():
+            i = self._symbol_index.get(sym)
+            if i is not None and value is not None:
+                out[i] = float(value)
+        return out
+
+    def days_held(self, as_of: date) -> np.ndarray:
+        """Days held at `as_of` per lot (0 when the acquisition date is unknown)."""
+        return np.where(self.has_date, _day(as_of) - self.acquired_day, 0)
+
+    def is_long_term(self, as_of: date) -> np.ndarray:
+        return self.has_date & (self.days_held(as_of) > LONG_TERM_DAYS)
+
+    def _rates(self, as_of: date) -> np.ndarray:
+        return np.where(self.is_long_term(as_of), LONG_TERM_RATE, SHORT_TERM_RATE)
+
+    def _recent(self, as_of: date) -> np.ndarray:
+        held = self.days_held(as_of)
+        return self.has_date & (held >= 0) & (held <= WASH_SALE_DAYS)
+
+    def _order(self, method: TaxLotMethod, lot_price: np.ndarray, as_of: date) -> np.ndarray:
+        """Lot positions sorted by symbol, then in the order the method sells them."""
+        if method == TaxLotMethod.FIFO:
+            key = self.acquired_day
+        elif method == TaxLotMethod.LIFO:
+            key = np.where(self.has_date, -self.acquired_day, _NO_DATE)
+        elif method == TaxLotMethod.HIFO:
+            key = -self.cost
+        else:
+            # Lowest tax per share first: biggest short-term losses, then
+            # long-term losses, long-term gains and short-term gains last.
+            key = np.nan_to_num((lot_price - self.cost) * self._rates(as_of), nan=np.inf)
+        return np.lexsort((self.lot_ids, key, self.codes))
+
+    # ---------------------- Simulation ----------------------
+    def select(
+        self,
+        targets: np.ndarray,
+        method: Union[str, TaxLotMethod] = TaxLotMethod.FIFO,
+        prices: Optional[np.ndarray] = None,
+        as_of: Optional[date] = None,
+    ) -> np.ndarray:
+        """Shares taken from each lot to sell `targets[symbol]` shares per symbol."""
+        method = resolve_lot_method(method)
+        as_of = as_of or date.today()
+        n = len(self)
+        if n == 0:
+            return np.zeros(0)
+        lot_price = prices[self.codes] if prices is not None else np.full(n, np.nan)
+        order = self._order(method, lot_price, as_of)
+        qty = self.quantity[order]
+        codes = self.codes[order]
+        running = np.cumsum(qty)
+        before = running - qty
+        starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+        before = before - np.repeat(before[starts], np.diff(np.r_[starts, n]))
+        taken_sorted = np.clip(np.asarray(targets, dtype=np.float64)[codes] - before, 0.0, qty)
+        taken = np.empty(n, dtype=np.float64)
+        taken[order] = taken_sorted
+        return taken
+
+    def simulate(
+        self,
+        shares: Mapping[str, float],
+        prices: Mapping[str, float],
+        method: Union[str, TaxLotMethod] = TaxLotMethod.FIFO,
+        as_of: Optional[date] = None,
+    ) -> "SaleSimulation":
+        """Sell `shares[symbol]` of each symbol at `prices[symbol]` (unpriced symbols are skipped)."""
+        price_vec = self.per_symbol(prices)
+        targets = np.clip(self.per_symbol(shares, default=0.0), 0.0, None)
+        targets = np.where(np.isnan(price_vec), 0.0, targets)
+        return self._simulate(targets, price_vec, method, as_of)
+
+    def trim(
+        self,
+        fraction: float,
+        prices: Mapping[str, float],
+        method: Union[str, TaxLotMethod] = TaxLotMethod.FIFO,
+        as_of: Optional[date] = None,
+    ) -> "SaleSimulation":
+        """Sell `fraction` of every priced position."""
+        if not 0 < fraction <= 1:
+            raise ValueError("fraction must be in (0, 1]")
+        price_vec = self.per_symbol(prices)
+        targets = np.where(np.isnan(price_vec), 0.0, self.symbol_totals() * float(fraction))
+        return self._simulate(targets, price_vec, method, as_of)
+
+    def _simulate(
+        self,
+        targets: np.ndarray,
+        price_vec: np.ndarray,
+        method: Union[str, TaxLotMethod],
+        as_of: Optional[date],
+    ) -> "SaleSimulation":
+        method = resolve_lot_method(method)
+        as_of = as_of or date.today()
+        taken = self.select(targets, method, price_vec, as_of)
+        lot_price = np.nan_to_num(price_vec[self.codes]) if len(self) else np.zeros(0)
+        proceeds = taken * lot_price
+        basis = taken * self.cost
+        realized = proceeds - basis
+        disallowed = self._wash_sale_disallowed(taken, realized, as_of)
+        unfilled = np.clip(targets - self.symbol_totals(taken), 0.0, None)
+        return SaleSimulation(
+            ledger=self,
+            method=method,
+            as_of=as_of,
+            targets=targets,
+            prices=price_vec,
+            shares=taken,
+            proceeds=proceeds,
+            cost_basis=basis,
+            realized=realized,
+            disallowed=disallowed,
+            long_term=self.is_long_term(as_of),
+            unfilled=unfilled,
+        )
+
+    def _wash_sale_disallowed(self, taken: np.ndarray, realized: np.ndarray, as_of: date) -> np.ndarray:
+        """Per-lot loss disallowed by replacement shares bought in the last 30 days."""
+        loss_lot = (realized < 0) & (taken > 0)
+        loss_shares = self.symbol_totals(np.where(loss_lot, taken, 0.0))
+        replacement = self.symbol_totals(np.where(self._recent(as_of), self.quantity - taken, 0.0))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            washed = np.where(loss_shares > 0, np.minimum(replacement, loss_shares) / loss_shares, 0.0)
+        return np.where(loss_lot, -realized * washed[self.codes], 0.0)
+
+    # ---------------------- Harvesting ----------------------
+    def harvest_candidates(
+        self,
+        prices: Mapping[str, float],
+        as_of: Optional[date] = None,
+        min_loss: float = 0.0,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Loss lots ranked by estimated tax saved; wash-sale-exposed lots rank last."""
+        as_of = as_of or date.today()
+        if len(self) == 0:
+            return []
+        lot_price = self.per_symbol(prices)[self.codes]
+        unrealized = self.quantity * (lot_price - self.cost)
+        rates = self._rates(as_of)
+        savings = -unrealized * rates
+        recent = self._recent(as_of)
+        other_recent = self.symbol_totals(np.where(recent, self.quantity, 0.0))[self.codes] - np.where(
+            recent, self.quantity, 0.0
+        )
+        wash_risk = other_recent > 1e-9
+        mask = ~np.isnan(unrealized) & (unrealized < -abs(min_loss)) & (self.quantity > 0)
+        idx = np.flatnonzero(mask)
+        idx = idx[np.lexsort((-savings[idx], wash_risk[idx]))]
+        if limit is not None:
+            idx = idx[: int(limit)]
+        held = self.days_held(as_of)
+        long_term = self.is_long_term(as_of)
+        rebuy_after = (as_of + timedelta(days=WASH_SALE_DAYS + 1)).isoformat()
+        return [
+            {
+                "lot_id": int(self.lot_ids[i]),
+                "symbol": str(self.symbols[self.codes[i]]),
+                "account_id": int(self.account_ids[i]),
+                "quantity": float(self.quantity[i]),
+                "cost_per_share": float(self.cost[i]),
+                "price": float(lot_price[i]),
+                "market_value": float(self.quantity[i] * lot_price[i]),
+                "unrealized_pnl": float(unrealized[i]),
+                "days_held": int(held[i]),
+                "is_long_term": bool(long_term[i]),
+                "estimated_tax_savings": float(savings[i]),
+                "wash_sale_risk": bool(wash_risk[i]),
+                "rebuy_after": rebuy_after,
+            }
+            for i in idx.tolist()
+        ]
+
+
+@dataclass
+class SaleSimulation:
+    """Per-lot result arrays of a simulated sale (aligned with the ledger rows)."""
+
+    ledger: LotLedger
+    method: TaxLotMethod
+    as_of: date
+    targets: np.ndarray
+    prices: np.ndarray
+    shares: np.ndarray
+    proceeds: np.ndarray
+    cost_basis: np.ndarray
+    realized: np.ndarray
+    disallowed: np.ndarray
+    long_term: np.ndarray
+    unfilled: np.ndarray
+
+    @property
+    def adjusted(self) -> np.ndarray:
+        """Realized P&L after disallowing washed losses."""
+        return self.realized + self.disallowed
+
+    def totals(self) -> Dict[str, Any]:
+        adjusted = self.adjusted
+        short_term = float(adjusted[~self.long_term].sum())
+        long_term = float(adjusted[self.long_term].sum())
+        return {
+            "shares_sold": float(self.shares.sum()),
+            "proceeds": float(self.proceeds.sum()),
+            "cost_basis": float(self.cost_basis.sum()),
+            "realized_pnl": float(self.realized.sum()),
+            "wash_sale_disallowed": float(self.disallowed.sum()),
+            "short_term_pnl": short_term,
+            "long_term_pnl": long_term,
+            "estimated_tax": estimate_tax(short_term, long_term),
+        }
+
+    def by_symbol(self) -> List[Dict[str, Any]]:
+        led = self.ledger
+        sums = {
+            name: led.symbol_totals(values)
+            for name, values in (
+                ("shares_sold", self.shares),
+                ("proceeds", self.proceeds),
+                ("cost_basis", self.cost_basis),
+                ("realized_pnl", self.realized),
+                ("wash_sale_disallowed", self.disallowed),
+                ("short_term_pnl", np.where(self.long_term, 0.0, self.adjusted)),
+                ("long_term_pnl", np.where(self.long_term, self.adjusted, 0.0)),
+            )
+        }
+        active = np.flatnonzero((self.targets > 0) | (sums["shares_sold"] > 0))
+        return [
+            {
+                "symbol": str(led.symbols[i]),
+                "price": None if np.isnan(self.prices[i]) else float(self.prices[i]),
+                **{name: float(values[i]) for name, values in sums.items()},
+                "unfilled": float(self.unfilled[i]),
+            }
+            for i in active.tolist()
+        ]
+
+    def lots(self) -> List[Dict[str, Any]]:
+        led = self.ledger
+        held = led.days_held(self.as_of)
+        return [
+            {
+                "lot_id": int(led.lot_ids[i]),
+                "symbol": str(led.symbols[led.codes[i]]),
+                "account_id": int(led.account_ids[i]),
+                "shares_sold": float(self.shares[i]),
+                "cost_per_share": float(led.cost[i]),
+                "cost_basis": float(self.cost_basis[i]),
+                "proceeds": float(self.proceeds[i]),
+                "realized_pnl": float(self.realized[i]),
+                "wash_sale_disallowed": float(self.disallowed[i]),
+                "days_held": int(held[i]),
+                "is_long_term": bool(self.long_term[i]),
+            }
+            for i in np.flatnonzero(self.shares > 0).tolist()
+        ]
+
+    def unpriced_symbols(self) -> List[str]:
+        return [str(s) for s in self.ledger.symbols[np.isnan(self.prices)]]
+
+    def to_dict(self, include_lots: bool = False) -> Dict[str, Any]:
+        out: Dict[str, Any] = {
+            "method": self.method.value,
+            "as_of": self.as_of.isoformat(),
+            "lots_considered": len(self.ledger),
+            "totals": self.totals(),
+            "symbols": self.by_symbol(),
+            "unpriced_symbols": self.unpriced_symbols(),
+        }
+        if include_lots:
+            out["lots"] = self.lots()
+        return out
@@ -5,6 +5,7 @@ Provides comprehensive portfolio analysis, performance metrics, and insights.
 """
 
 import logging
+import numpy as np
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 from dataclasses import dataclass
@@ -230,51 +231,54 @@ class PortfolioAnalyticsService:
     async def _find_tax_opportunities(
         self, tax_lots: List[Dict]
     ) -> List[TaxOptimizationOpportunity]:
-        """Find tax optimization opportunities."""
-        opportunities = []
+        """Find tax optimization opportunities (masks over all lots at once)."""
+        if not tax_lots:
+            return []
 
-        for lot in tax_lots:
-            symbol = lot.get("symbol", "")
-            unrealized_pnl = lot.get("unrealized_pnl", 0)
-            days_held = lot.get("days_held", 0)
-            current_value = lot.get("market_value", 0)
+        def column(key: str) -> np.ndarray:
+            return np.array([lot.get(key) or 0 for lot in tax_lots], dtype=np.float64)
 
-            # Tax loss harvesting opportunity
-            if unrealized_pnl < -1000:  # $1000+ loss
-                estimated_tax_savings = (
-                    abs(unrealized_pnl) * 0.24
-                )  # Assume 24% tax rate
+        unrealized_pnl = column("unrealized_pnl")
+        days_held = column("days_held").astype(np.int64)
+        market_value = column("market_value")
 
+        # Tax loss harvesting: $1000+ loss, 24% assumed rate
+        harvest = unrealized_pnl < -1000
+        # Long-term capital gains opportunity (approaching 1 year)
+        ltcg = ~harvest & (days_held >= 300) & (days_held <= 365) & (unrealized_pnl > 0)
+
+        opportunities = []
+        for i in np.flatnonzero(harvest | ltcg).tolist():
+            pnl = float(unrealized_pnl[i])
+            held = int(days_held[i])
+            if harvest[i]:
                 opportunities.append(
                     TaxOptimizationOpportunity(
-                        symbol=symbol,
+                        symbol=tax_lots[i].get("symbol", ""),
                         opportunity_type="tax_loss_harvest",
-                        market_value=current_value,
-                        unrealized_pnl=unrealized_pnl,
-                        days_held=days_held,
-                        estimated_tax_impact=estimated_tax_savings,
-                        recommendation=f"Consider harvesting ${abs(unrealized_pnl):,.0f} loss for tax savings",
+                        market_value=float(market_value[i]),
+                        unrealized_pnl=pnl,
+                        days_held=held,
+                        estimated_tax_impact=abs(pnl) * 0.24,
+                        recommendation=f"Consider harvesting ${abs(pnl):,.0f} loss for tax savings",
                         confidence=0.8,
                     )
                 )
-
-            # Long-term capital gains opportunity (approaching 1 year)
-            elif 300 <= days_held <= 365 and unrealized_pnl > 0:
+            else:
                 opportunities.append(
                     TaxOptimizationOpportunity(
-                        symbol=symbol,
+                        symbol=tax_lots[i].get("symbol", ""),
                         opportunity_type="ltcg_opportunity",
-                        market_value=current_value,
-                        unrealized_pnl=unrealized_pnl,
-                        days_held=days_held,
+                        market_value=float(market_value[i]),
+                        unrealized_pnl=pnl,
+                        days_held=held,
                         estimated_tax_impact=0,
-                        recommendation=f"Wait {365 - days_held} days for long-term capital gains treatment",
+                        recommendation=f"Wait {365 - held} days for long-term capital gains treatment",
                         confidence=0.9,
                     )
                 )
 
-            # Wash sale warning (if we had transaction history)
-            # This would require checking for recent sales of the same security
+        # Wash sale checks need lot acquisition dates; see LotLedger.harvest_candidates
 
         return opportunities
 
@@ -0,0 +1,222 @@
+"""
+Multi-Account Sync Orchestrator
+===============================
+
+Runs comprehensive syncs for many broker accounts concurrently instead of one after
+another. Each broker gets its own concurrency budget (IBKR FlexQuery throttles hard,
+TastyTrade/Schwab tolerate more), IBKR report requests are staggered so they do not
+collide, and every account reuses the same broker service instance so credentials and
+authenticated client sessions are shared across accounts.
+
+Each account runs in its own DB session (unless the caller passes one in); the report
+includes per-account timings so a slow account is visible instead of hidden inside a
+single total.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Dict, Iterable, List, Optional
+
+from backend.config import settings
+from backend.database import SessionLocal
+from backend.models import BrokerAccount
+from backend.models.broker_account import BrokerType
+from backend.services.portfolio.broker_sync_service import (
+    BrokerSyncService,
+    broker_sync_service,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _default_concurrency() -> Dict[BrokerType, int]:
+    return {
+        BrokerType.IBKR: int(getattr(settings, "BROKER_SYNC_CONCURRENCY_IBKR", 3)),
+        BrokerType.TASTYTRADE: int(
+            getattr(settings, "BROKER_SYNC_CONCURRENCY_TASTYTRADE", 4)
+        ),
+        BrokerType.SCHWAB: int(getattr(settings, "BROKER_SYNC_CONCURRENCY_SCHWAB", 4)),
+    }
+
+
+def _default_stagger() -> Dict[BrokerType, float]:
+    return {
+        BrokerType.IBKR: float(
+            getattr(settings, "IBKR_FLEX_REQUEST_STAGGER_SECONDS", 5.0)
+        ),
+    }
+
+
+class _BrokerGate:
+    """Concurrency cap plus minimum spacing between account starts for one broker."""
+
+    def __init__(self, limit: int, stagger_seconds: float):
+        self.limit = max(1, int(limit))
+        self.semaphore = asyncio.Semaphore(self.limit)
+        self.stagger_seconds = max(0.0, float(stagger_seconds or 0.0))
+        self._start_lock = asyncio.Lock()
+        self._last_start: Optional[float] = None
+
+    async def wait_turn(self) -> None:
+        """Space out starts so report requests never fire in the same instant."""
+        if self.stagger_seconds <= 0:
+            return
+        async with self._start_lock:
+            now = time.monotonic()
+            if self._last_start is not None:
+                wait = self._last_start + self.stagger_seconds - now
+                if wait > 0:
+                    await asyncio.sleep(wait)
+            self._last_start = time.monotonic()
+
+
+class SyncOrchestrator:
+    """Parallel multi-account sync with per-broker concurrency limits."""
+
+    def __init__(
+        self,
+        broker_sync: BrokerSyncService | None = None,
+        concurrency: Dict[BrokerType, int] | None = None,
+        stagger_seconds: Dict[BrokerType, float] | None = None,
+    ):
+        self.broker_sync = broker_sync or broker_sync_service
+        self.concurrency = {**_default_concurrency(), **(concurrency or {})}
+        self.stagger_seconds = {**_default_stagger(), **(stagger_seconds or {})}
+
+    def _load_accounts(
+        self,
+        account_ids: Optional[Iterable[int]] = None,
+        broker: Optional[BrokerType] = None,
+        user_id: Optional[int] = None,
+        db=None,
+    ) -> List[Dict]:
+        """Resolve the accounts to sync as plain dicts (no ORM objects cross sessions)."""
+        session = db or SessionLocal()
+        try:
+            query = session.query(BrokerAccount).filter(
+                BrokerAccount.is_enabled == True  # noqa: E712
+            )
+            if account_ids is not None:
+                query = query.filter(BrokerAccount.id.in_(list(account_ids)))
+            if broker is not None:
+                query = query.filter(BrokerAccount.broker == broker)
+            if user_id is not None:
+                query = query.filter(BrokerAccount.user_id == user_id)
+            return [
+                {
+                    "id": acct.id,
+                    "account_number": acct.account_number,
+                    "broker": acct.broker,
+                }
+                for acct in query.order_by(BrokerAccount.id.asc()).all()
+            ]
+        finally:
+            if db is None:
+                session.close()
+
+    async def _sync_one(
+        self, account: Dict, gate: _BrokerGate, run_started: float, db=None
+    ) -> Dict:
+        broker: BrokerType = account["broker"]
+        key = f"{broker.value}_{account['account_number']}"
+        async with gate.semaphore:
+            await gate.wait_turn()
+            started = time.monotonic()
+            session = db or SessionLocal()
+            try:
+                result = await self.broker_sync.sync_account_async(
+                    account["id"], db=session
+                )
+                if isinstance(result, dict) and (
+                    result.get("status") == "error" or result.get("error")
+                ):
+                    status = "error"
+                else:
+                    status = "success"
+            except ValueError as ve:
+                # Unsupported broker implementation: skip, consistent with sync_all_accounts
+                result, status = {"status": "skipped", "reason": str(ve)}, "skipped"
+            except Exception as e:
+                logger.error(f"❌ Orchestrated sync failed for {key}: {e}")
+                result, status = {"status": "error", "error": str(e)}, "error"
+            finally:
+                if db is None:
+                    session.close()
+            finished = time.monotonic()
+        timing = {
+            "account_key": key,
+            "account_id": account["id"],
+            "broker": broker.value,
+            "status": status,
+            "started_offset_s": round(started - run_started, 3),
+            "duration_s": round(finished - started, 3),
+        }
+        logger.info(
+            f"⏱️ {key} sync {status} in {timing['duration_s']:.1f}s "
+            f"(started +{timing['started_offset_s']:.1f}s)"
+        )
+        return {"key": key, "result": result, "timing": timing}
+
+    async def sync_accounts(
+        self,
+        account_ids: Optional[Iterable[int]] = None,
+        broker: Optional[BrokerType] = None,
+        user_id: Optional[int] = None,
+        db=None,
+    ) -> Dict:
+        """Sync all matching enabled accounts concurrently and report per-account timing.
+
+        Args:
+            account_ids: Restrict to these BrokerAccount ids (default: all enabled)
+            broker: Restrict to one broker
+            user_id: Restrict to one user's accounts
+            db: Optional shared session (tests); by default each account gets its own
+        """
+        accounts = self._load_accounts(
+            account_ids=account_ids, broker=broker, user_id=user_id, db=db
+        )
+        gates: Dict[BrokerType, _BrokerGate] = {}
+        for acct in accounts:
+            b = acct["broker"]
+            if b not in gates:
+                gates[b] = _BrokerGate(
+                    self.concurrency.get(b, 1), self.stagger_seconds.get(b, 0.0)
+                )
+
+        run_started = time.monotonic()
+        outcomes = await asyncio.gather(
+            *(
+                self._sync_one(acct, gates[acct["broker"]], run_started, db=db)
+                for acct in accounts
+            )
+        )
+        wall = time.monotonic() - run_started
+
+        results = {o["key"]: o["result"] for o in outcomes}
+        timings = sorted((o["timing"] for o in outcomes), key=lambda t: -t["duration_s"])
+        statuses = [t["status"] for t in timings]
+        report = {
+            "status": "ok" if "error" not in statuses else "partial",
+            "accounts": len(accounts),
+            "succeeded": statuses.count("success"),
+            "failed": statuses.count("error"),
+            "skipped": statuses.count("skipped"),
+            "wall_seconds": round(wall, 3),
+            "serial_seconds": round(sum(t["duration_s"] for t in timings), 3),
+            "slowest_account": timings[0]["account_key"] if timings else None,
+            "concurrency": {b.value: g.limit for b, g in gates.items()},
+            "timings": timings,
+            "results": results,
+        }
+        logger.info(
+            f"✅ Orchestrated sync of {len(accounts)} accounts in {wall:.1f}s "
+            f"(serial would be {report['serial_seconds']:.1f}s)"
+        )
+        return report
+
+
+# Global instance
+sync_orchestrator = SyncOrchestrator()
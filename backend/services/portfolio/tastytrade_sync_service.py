@@ -44,9 +44,11 @@ class TastyTradeSyncService:
     ) -> Dict[str, int]:
         """Sync ALL objects for the given broker account. Returns row counts."""
         counts: Dict[str, int] = {}
-        # Ensure connection prior to any fetches
+        # Ensure connection prior to any fetches; reuse the shared session when several
+        # accounts sync concurrently instead of re-authenticating per account.
         try:
-            await self.client.connect_with_retry()
+            if getattr(self.client, "connected", False) is not True:
+                await self.client.connect_with_retry()
         except Exception:
             pass
 
@@ -7,15 +7,22 @@ Handles tax lot calculations, cost basis, and tax optimization strategies.
 """
 
 import logging
+import numpy as np
 from typing import Dict, List, Optional
 from datetime import datetime
 
 from backend.models.tax_lot import TaxLot, TaxLotMethod, TaxLotSource
 from backend.models.broker_account import BrokerAccount
 from backend.database import SessionLocal
+from backend.services.portfolio.lot_ledger import (
+    LONG_TERM_RATE,
+    SHORT_TERM_RATE,
+    LotLedger,
+    estimate_tax,
+)
 
 # Service imports
-from backend.services.market.market_data_service import MarketDataService
+from backend.services.market.service_container import get_market_data_service
 
 logger = logging.getLogger(__name__)
 
@@ -28,7 +35,7 @@ class TaxLotService:
 
     def __init__(self, db_session: Optional[SessionLocal] = None):
         self.db = db_session or SessionLocal()
-        self.market_service = MarketDataService()
+        self.market_service = get_market_data_service()
 
     def _parse_acquisition_date(self, value: Optional[str]) -> Optional[datetime]:
         if not value:
@@ -319,92 +326,70 @@ class TaxLotService:
     ) -> Dict:
         """Simulate a sale to show tax impact before execution (version)"""
 
-        query = self.db.query(TaxLot).filter(
-            TaxLot.user_id == user_id,
-            TaxLot.symbol == symbol,
+        ledger = LotLedger.load(
+            self.db, user_id, account_id=account_id, symbols=[symbol]
         )
-
-        if account_id:
-            query = query.filter(TaxLot.account_id == account_id)
-
-        tax_lots = query.all()
-
-        if not tax_lots:
+        if len(ledger) == 0:
             raise ValueError(f"No tax lots found for {symbol}")
 
-        # Sort lots based on method
-        if lot_method == TaxLotMethod.FIFO:
-            tax_lots.sort(key=lambda x: x.acquisition_date)
-        elif lot_method == TaxLotMethod.LIFO:
-            tax_lots.sort(key=lambda x: x.acquisition_date, reverse=True)
-        elif lot_method == TaxLotMethod.HIFO:
-            tax_lots.sort(key=lambda x: x.cost_per_share, reverse=True)
-
-        remaining_to_sell = shares_to_sell
-        affected_lots = []
-        total_cost_basis = 0
-        total_proceeds = shares_to_sell * sale_price
-
-        for lot in tax_lots:
-            if remaining_to_sell <= 0:
-                break
-
-            shares_from_lot = min(remaining_to_sell, lot.remaining_quantity)
-            cost_basis = shares_from_lot * lot.cost_per_share
-            proceeds = shares_from_lot * sale_price
-            realized_pnl = proceeds - cost_basis
-
-            affected_lots.append(
-                {
-                    "lot_id": lot.id,
-                    "acquisition_date": lot.acquisition_date.isoformat(),
-                    "shares_sold": float(shares_from_lot),
-                    "cost_per_share": float(lot.cost_per_share),
-                    "cost_basis": float(cost_basis),
-                    "proceeds": float(proceeds),
-                    "realized_pnl": float(realized_pnl),
-                    "is_long_term": lot.days_held >= 365,
-                    "days_held": lot.days_held,
-                    "account_id": lot.account_id,
-                    "tax_treatment": (
-                        lot.tax_treatment.value if lot.tax_treatment else "taxable"
-                    ),
-                }
-            )
-
-            total_cost_basis += cost_basis
-            remaining_to_sell -= shares_from_lot
-
-        if remaining_to_sell > 0:
+        sim = ledger.simulate({symbol: shares_to_sell}, {symbol: sale_price}, lot_method)
+        unfilled = float(sim.unfilled.sum())
+        if unfilled > 1e-9:
             raise ValueError(
-                f"Not enough shares to sell. Need {shares_to_sell}, available {shares_to_sell - remaining_to_sell}"
+                f"Not enough shares to sell. Need {shares_to_sell}, available {shares_to_sell - unfilled}"
             )
 
-        total_realized_pnl = total_proceeds - total_cost_basis
-        short_term_pnl = sum(
-            lot["realized_pnl"] for lot in affected_lots if not lot["is_long_term"]
-        )
-        long_term_pnl = sum(
-            lot["realized_pnl"] for lot in affected_lots if lot["is_long_term"]
-        )
-
+        totals = sim.totals()
         return {
             "user_id": user_id,
             "symbol": symbol,
             "shares_sold": shares_to_sell,
             "sale_price": sale_price,
-            "total_proceeds": total_proceeds,
-            "total_cost_basis": total_cost_basis,
-            "total_realized_pnl": total_realized_pnl,
-            "short_term_pnl": short_term_pnl,
-            "long_term_pnl": long_term_pnl,
-            "lot_method": lot_method.value,
-            "affected_lots": affected_lots,
+            "total_proceeds": totals["proceeds"],
+            "total_cost_basis": totals["cost_basis"],
+            "total_realized_pnl": totals["realized_pnl"],
+            "wash_sale_disallowed": totals["wash_sale_disallowed"],
+            "short_term_pnl": totals["short_term_pnl"],
+            "long_term_pnl": totals["long_term_pnl"],
+            "lot_method": sim.method.value,
+            "affected_lots": sim.lots(),
             "estimated_tax_impact": self._estimate_tax_impact(
-                short_term_pnl, long_term_pnl
+                totals["short_term_pnl"], totals["long_term_pnl"]
             ),
         }
 
+    async def simulate_trim(
+        self,
+        user_id: int,
+        fraction: float = 0.10,
+        lot_method: TaxLotMethod = TaxLotMethod.FIFO,
+        account_id: Optional[int] = None,
+        prices: Optional[Dict[str, float]] = None,
+        include_lots: bool = False,
+    ) -> Dict:
+        """Tax impact of selling `fraction` of every position, across all symbols at once."""
+        ledger = LotLedger.load(self.db, user_id, account_id=account_id)
+        if prices is None:
+            prices = await self.market_service.get_current_prices(ledger.symbols.tolist())
+        sim = ledger.trim(fraction, prices, lot_method)
+        result = sim.to_dict(include_lots=include_lots)
+        result.update({"user_id": user_id, "fraction": fraction})
+        return result
+
+    async def harvest_candidates(
+        self,
+        user_id: int,
+        account_id: Optional[int] = None,
+        prices: Optional[Dict[str, float]] = None,
+        min_loss: float = 0.0,
+        limit: Optional[int] = None,
+    ) -> List[Dict]:
+        """Loss lots across the portfolio ranked by estimated tax savings."""
+        ledger = LotLedger.load(self.db, user_id, account_id=account_id)
+        if prices is None:
+            prices = await self.market_service.get_current_prices(ledger.symbols.tolist())
+        return ledger.harvest_candidates(prices, min_loss=min_loss, limit=limit)
+
     # NOTE: TaxLotSale model not defined in current models set; keep method signature generic
     async def execute_sale(
         self,
@@ -490,31 +475,57 @@ class TaxLotService:
             raise
 
     async def update_market_values(self, user_id: int, symbol: Optional[str] = None):
-        """Update market values for tax lots"""
+        """Update market values for tax lots (one batched price lookup, one bulk update)"""
         try:
-            query = self.db.query(TaxLot).filter(TaxLot.user_id == user_id)
+            query = self.db.query(
+                TaxLot.id, TaxLot.symbol, TaxLot.quantity, TaxLot.cost_per_share, TaxLot.cost_basis
+            ).filter(TaxLot.user_id == user_id)
 
             if symbol:
                 query = query.filter(TaxLot.symbol == symbol)
 
-            tax_lots = query.all()
-
-            # Group by symbol to minimize price lookups
-            symbols_to_update = set(lot.symbol for lot in tax_lots)
-
-            for symbol in symbols_to_update:
-                try:
-                    current_price = await self.market_service.get_current_price(symbol)
-                    if current_price:
-                        symbol_lots = [lot for lot in tax_lots if lot.symbol == symbol]
-                        for lot in symbol_lots:
-                            lot.update_market_values(current_price)
-                except Exception as e:
-                    logger.warning(f"⚠️ Could not update price for {symbol}: {e}")
-
+            rows = query.all()
+            if not rows:
+                return
+
+            ids, symbols, qty, cps, basis = zip(*rows)
+            prices = await self.market_service.get_current_prices(list(set(symbols)))
+            price = np.array([prices.get(s, np.nan) for s in symbols], dtype=np.float64)
+            qty_arr = np.asarray(qty, dtype=np.float64)
+            cost = np.array(
+                [
+                    b if b is not None else (c or 0.0) * q
+                    for b, c, q in zip(basis, cps, qty_arr)
+                ],
+                dtype=np.float64,
+            )
+            market_value = qty_arr * price
+            pnl = market_value - cost
+            with np.errstate(divide="ignore", invalid="ignore"):
+                pnl_pct = np.where(cost != 0, pnl / np.abs(cost) * 100, 0.0)
+
+            now = datetime.now()
+            priced = np.flatnonzero(~np.isnan(price))
+            self.db.bulk_update_mappings(
+                TaxLot,
+                [
+                    {
+                        "id": ids[i],
+                        "current_price": float(price[i]),
+                        "market_value": float(market_value[i]),
+                        "unrealized_pnl": float(pnl[i]),
+                        "unrealized_pnl_pct": float(pnl_pct[i]),
+                        "last_price_update": now,
+                    }
+                    for i in priced.tolist()
+                ],
+            )
             self.db.commit()
+            missing = set(symbols) - set(prices)
+            if missing:
+                logger.warning(f"⚠️ No price for {len(missing)} symbols: {sorted(missing)[:10]}")
             logger.info(
-                f"✅ Updated market values for {len(symbols_to_update)} symbols"
+                f"✅ Updated market values for {len(prices)} symbols ({len(priced)} lots)"
             )
 
         except Exception as e:
@@ -635,19 +646,11 @@ class TaxLotService:
     def _estimate_tax_impact(self, short_term_pnl: float, long_term_pnl: float) -> Dict:
         """Estimate tax impact (simplified calculation)"""
         # Simplified tax rates - in reality this would be much more complex
-        short_term_rate = 0.37  # Assume highest bracket for short-term
-        long_term_rate = 0.20  # Long-term capital gains rate
-
-        short_term_tax = max(0, short_term_pnl * short_term_rate)
-        long_term_tax = max(0, long_term_pnl * long_term_rate)
-
         return {
-            "short_term_tax": short_term_tax,
-            "long_term_tax": long_term_tax,
-            "total_estimated_tax": short_term_tax + long_term_tax,
+            **estimate_tax(short_term_pnl, long_term_pnl),
             "assumptions": {
-                "short_term_rate": short_term_rate,
-                "long_term_rate": long_term_rate,
+                "short_term_rate": SHORT_TERM_RATE,
+                "long_term_rate": LONG_TERM_RATE,
                 "note": "Simplified calculation - consult tax professional",
             },
         }
@@ -3,112 +3,250 @@
 QuantMatrix V1 - SINGLE ATR Signal Generator
 ===========================================
 
-CONSOLIDATES ALL ATR logic into ONE service:
-- Uses the sophisticated atr_calculator.py engine
-- Adds signal generation logic from atr_matrix.py  
-- Saves signals to database (signals.py model)
-- Sends Discord alerts
-- Runs on cron schedule
-
-REPLACES:
-❌ backend/core/strategies/atr_matrix.py (17KB)
-❌ backend/services/strategies/atr_options_service.py (31KB)  
-❌ Multiple scattered ATR calculations
-
-NOW: ONE place for ALL ATR signals with database persistence!
+ATR Matrix signals evaluated from stored snapshots:
+- Reads the already-computed ATR-matrix fields (`atrx_sma_50`, `atr_14`, `atrp_14`,
+  `range_pos_20d`, SMAs, `stage_label`) from `MarketSnapshot` in one query
+- Evaluates entry / scale-out / exit / risk rules as vectorized masks
+- Bulk-inserts `TradeSignal` rows, skipping signals already raised recently
+- Queues Discord alerts and flushes them once per run
+
+No provider calls: snapshots are refreshed by `recompute_indicators_universe`.
 """
 
-import asyncio
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional
-from sqlalchemy.orm import Session
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
 
-# Import the SINGLE ATR calculator
-from backend.services.analysis.atr_calculator import (
-    atr_calculator,
-    ATRResult,
-    ATRMatrixData,
-)
+import numpy as np
+import pandas as pd
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
 
-# Database models
-from backend.models.signals import Signal, SignalType, SignalStatus, DiscordChannel
-from backend.models.user import User
-from backend.models.market_data import Instrument
+from backend.config import settings
 from backend.database import SessionLocal
+from backend.models.market_data import MarketSnapshot
+from backend.models.position import Position
+from backend.models.trade import TradeSignal
+from backend.models.user import User
 
 # Services
-from backend.services.notifications.discord_notifier import discord_notifier
+from backend.services.notifications.discord_service import discord_notifier
 
 logger = logging.getLogger(__name__)
 
+STRATEGY_NAME = "atr_matrix"
+ANALYSIS_TYPE = "technical_snapshot"
+
+SNAPSHOT_FIELDS = [
+    "symbol",
+    "name",
+    "sector",
+    "market_cap",
+    "current_price",
+    "sma_21",
+    "sma_50",
+    "sma_100",
+    "atr_14",
+    "atrp_14",
+    "atrx_sma_50",
+    "range_pos_20d",
+    "stage_label",
+    "rsi",
+    "macd",
+]
+
+# Weinstein stage → confidence; entries need at least `min_confidence`
+STAGE_CONFIDENCE = {
+    "1": 0.65,
+    "2": 0.85,
+    "2A": 0.90,
+    "2B": 0.85,
+    "2C": 0.75,
+    "3": 0.55,
+    "4": 0.40,
+}
+DEFAULT_CONFIDENCE = 0.65
+
+# kind → (signal_type, Discord channel, lifetime)
+SIGNAL_KINDS = {
+    "entry": ("ENTRY", "signals", timedelta(days=1)),
+    "scale_out": ("SCALE_OUT", "signals", timedelta(hours=6)),
+    "support_break": ("EXIT", "system_status", timedelta(hours=12)),
+    "overextended": ("RISK_WARNING", "system_status", timedelta(hours=24)),
+}
+
+
+def _col(frame: pd.DataFrame, name: str) -> np.ndarray:
+    return pd.to_numeric(frame[name], errors="coerce").to_numpy(dtype=float)
+
+
+def evaluate_atr_rules(
+    frame: pd.DataFrame,
+    *,
+    entry_max_distance: float = 4.0,
+    scale_out_levels: tuple = (7.0, 8.0, 9.0, 10.0),
+    overextended_distance: float = 12.0,
+    stop_loss_multiplier: float = 1.5,
+    min_atr_percent: float = 3.0,
+    min_price_position: float = 50.0,
+    min_risk_reward: float = 2.0,
+    min_confidence: float = 0.65,
+) -> pd.DataFrame:
+    """Evaluate ATR Matrix rules for every snapshot row at once.
+
+    At most one signal per symbol, by priority: support break (price < SMA50) →
+    overextended (> 12x ATR from SMA50) → scale-out (highest level reached) → entry.
+    Returns the signalling rows with `kind` and the computed levels.
+    """
+    if frame.empty:
+        return frame.assign(kind=pd.Series(dtype=object))
+    price = _col(frame, "current_price")
+    sma_21 = _col(frame, "sma_21")
+    sma_50 = _col(frame, "sma_50")
+    sma_100 = _col(frame, "sma_100")
+    atrp = _col(frame, "atrp_14")
+    atr = _col(frame, "atr_14")
+    atr = np.where(np.isfinite(atr), atr, atrp * price / 100.0)
+    range_pos = _col(frame, "range_pos_20d")
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        dist = _col(frame, "atrx_sma_50")
+        dist = np.where(np.isfinite(dist), dist, (price - sma_50) / atr)
+        valid = (price > 0) & (atr > 0) & np.isfinite(sma_50) & np.isfinite(dist)
+
+        ma_aligned = (sma_21 > sma_50) & (sma_50 > sma_100)
+        strong_range = range_pos > min_price_position
+        good_vol = atrp >= min_atr_percent
+        confidence = (
+            frame["stage_label"].map(STAGE_CONFIDENCE).fillna(DEFAULT_CONFIDENCE).to_numpy(dtype=float)
+        )
+
+        stop = price - stop_loss_multiplier * atr
+        target_1 = sma_50 + 7 * atr
+        risk_reward = (target_1 - price) / (price - stop)
+        entry_strength = 0.60 + 0.20 * ma_aligned + 0.10 * strong_range + 0.10 * good_vol
+        entry = (
+            valid
+            & (dist >= 0)
+            & (dist <= entry_max_distance)
+            & (price > sma_21)
+            & (risk_reward >= min_risk_reward)
+            & (confidence >= min_confidence)
+        )
+
+        levels = np.asarray(scale_out_levels, dtype=float)
+        level_idx = np.searchsorted(levels, np.nan_to_num(dist, nan=-np.inf), side="right") - 1
+        scale_level = np.where(level_idx >= 0, levels[np.clip(level_idx, 0, None)], np.nan)
+        scale_out = valid & (level_idx >= 0)
+        scale_strength = 0.70 + np.minimum((dist - scale_level) * 0.05, 0.25)
+
+        support_break = valid & (price < sma_50)
+        overextended = valid & (dist > overextended_distance)
+
+    kind = np.select(
+        [support_break, overextended, scale_out, entry],
+        ["support_break", "overextended", "scale_out", "entry"],
+        default="",
+    )
+    strength = np.select(
+        [kind == "support_break", kind == "overextended", kind == "scale_out", kind == "entry"],
+        [0.90, 0.75, scale_strength, entry_strength],
+        default=np.nan,
+    )
+    time_horizon = np.select(
+        [kind == "entry", kind == "overextended"],
+        [np.select([dist <= 2, dist <= 3], ["2-3 weeks", "1-2 weeks"], default="1-3 days"), "1-2 days"],
+        default="Immediate",
+    )
+    out = frame.assign(
+        kind=kind,
+        signal_strength=np.round(strength, 3),
+        confidence=confidence,
+        atr_value=atr,
+        atr_distance=np.round(dist, 2),
+        ma_aligned=ma_aligned,
+        strong_range=strong_range,
+        good_vol=good_vol,
+        stop_loss=np.where(kind == "entry", np.round(stop, 2), np.nan),
+        target_price=np.select(
+            [kind == "entry", kind == "scale_out"],
+            [np.round(target_1, 2), np.round(sma_50 + scale_level * atr, 2)],
+            default=np.nan,
+        ),
+        target_2=np.round(sma_50 + 10 * atr, 2),
+        target_3=np.round(sma_50 + 12 * atr, 2),
+        risk_reward_ratio=np.where(kind == "entry", np.round(risk_reward, 2), np.nan),
+        scale_level=np.where(kind == "scale_out", scale_level, np.nan),
+        time_horizon=time_horizon,
+    )
+    return out[out["kind"] != ""].reset_index(drop=True)
+
+
+def _num(value) -> Optional[float]:
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return value if np.isfinite(value) else None
+
 
 class ATRSignalGenerator:
     """
     SINGLE ATR Signal Generator for QuantMatrix V1.
 
     Combines:
-    - Sophisticated ATR calculations (from atr_calculator.py)
-    - TradingView ATR Matrix signal logic (from atr_matrix.py)
-    - Database persistence (signals.py)
+    - Stored ATR-matrix snapshot fields (MarketSnapshot)
+    - TradingView ATR Matrix signal logic, vectorized over the portfolio
+    - Database persistence (trade_signals)
     - Discord notifications
     - Scheduled execution
     """
 
     def __init__(self):
-        self.atr_calculator = atr_calculator
-
         # ATR Matrix Strategy Parameters (from TradingView script)
         self.entry_max_distance = 4.0  # Max ATR distance for entry
-        self.scale_out_levels = [7.0, 8.0, 9.0, 10.0]  # ATR distances for scale-out
+        self.scale_out_levels = (7.0, 8.0, 9.0, 10.0)  # ATR distances for scale-out
+        self.overextended_distance = 12.0  # ATR distance flagged as overextended
         self.stop_loss_multiplier = 1.5  # ATR multiplier for stop loss
         self.min_atr_percent = 3.0  # Minimum ATR % for volatility
         self.min_price_position = 50.0  # Min position in 20D range
         self.min_risk_reward = 2.0  # Minimum R:R ratio
         self.min_confidence = 0.65  # Minimum confidence for signal generation
 
-        # Discord channels for different signal types
-        self.signal_channels = {
-            SignalType.ENTRY: DiscordChannel.SIGNALS,
-            SignalType.SCALE_OUT: DiscordChannel.SIGNALS,
-            SignalType.EXIT: DiscordChannel.ALERTS,
-            SignalType.RISK_WARNING: DiscordChannel.ALERTS,
-        }
-
     async def generate_portfolio_signals(
-        self, user_id: int, symbols: Optional[List[str]] = None
-    ) -> Dict[str, any]:
+        self,
+        user_id: int,
+        symbols: Optional[List[str]] = None,
+        db: Session | None = None,
+        notify: bool = True,
+    ) -> Dict[str, Any]:
         """
         Generate ATR signals for user's portfolio or specified symbols.
 
         Main entry point for scheduled signal generation.
         """
-        db = SessionLocal()
-
+        session = db or SessionLocal()
+        started = time.perf_counter()
         try:
-            # Get user
-            user = db.query(User).filter(User.id == user_id).first()
+            user = session.query(User).filter(User.id == user_id).first()
             if not user:
                 logger.error(f"User {user_id} not found")
                 return {"error": "User not found"}
 
-            # Get symbols to analyze
             if not symbols:
-                symbols = await self._get_user_portfolio_symbols(db, user_id)
-
+                symbols = self._get_user_portfolio_symbols(session, user_id)
+            symbols = sorted({str(s).upper() for s in symbols or [] if s})
             if not symbols:
                 logger.warning(f"No symbols found for user {user_id}")
                 return {"symbols_analyzed": 0, "signals_generated": 0}
 
-            logger.info(
-                f"🔍 Generating ATR signals for {len(symbols)} symbols for user {user.username}"
-            )
-
-            # Generate signals for all symbols
             results = {
                 "user_id": user_id,
                 "symbols_analyzed": len(symbols),
+                "snapshots_missing": 0,
                 "signals_generated": 0,
+                "duplicates_skipped": 0,
                 "entry_signals": 0,
                 "scale_out_signals": 0,
                 "exit_signals": 0,
@@ -117,528 +255,244 @@ class ATRSignalGenerator:
                 "execution_time": datetime.now().isoformat(),
             }
 
-            # Process symbols in batches for performance
-            batch_size = 10
-            for i in range(0, len(symbols), batch_size):
-                batch = symbols[i : i + batch_size]
-
-                # Process batch concurrently
-                batch_tasks = [
-                    self._generate_symbol_signals(db, user_id, symbol)
-                    for symbol in batch
-                ]
-                batch_results = await asyncio.gather(
-                    *batch_tasks, return_exceptions=True
-                )
+            snapshots = self._load_snapshots(session, symbols)
+            results["snapshots_missing"] = len(symbols) - len(snapshots)
+            candidates = evaluate_atr_rules(
+                snapshots,
+                entry_max_distance=self.entry_max_distance,
+                scale_out_levels=self.scale_out_levels,
+                overextended_distance=self.overextended_distance,
+                stop_loss_multiplier=self.stop_loss_multiplier,
+                min_atr_percent=self.min_atr_percent,
+                min_price_position=self.min_price_position,
+                min_risk_reward=self.min_risk_reward,
+                min_confidence=self.min_confidence,
+            )
+
+            rows = self._signal_rows(candidates, user_id)
+            fresh = self._drop_recent_duplicates(session, rows, user_id)
+            results["duplicates_skipped"] = len(rows) - len(fresh)
+            if fresh:
+                session.execute(insert(TradeSignal), fresh)
+            session.commit()
+
+            counters = {
+                "ENTRY": "entry_signals",
+                "SCALE_OUT": "scale_out_signals",
+                "EXIT": "exit_signals",
+                "RISK_WARNING": "risk_warnings",
+            }
+            for row in fresh:
+                results[counters[row["signal_type"]]] += 1
+            results["signals_generated"] = len(fresh)
 
-                # Collect results
-                for symbol, result in zip(batch, batch_results):
-                    if isinstance(result, Exception):
-                        logger.error(f"Error generating signals for {symbol}: {result}")
-                        continue
-
-                    if result:
-                        results["signals_generated"] += len(result)
-
-                        # Count by signal type
-                        for signal in result:
-                            if signal.signal_type == SignalType.ENTRY:
-                                results["entry_signals"] += 1
-                            elif signal.signal_type == SignalType.SCALE_OUT:
-                                results["scale_out_signals"] += 1
-                            elif signal.signal_type == SignalType.EXIT:
-                                results["exit_signals"] += 1
-                            elif signal.signal_type == SignalType.RISK_WARNING:
-                                results["risk_warnings"] += 1
-
-                        # Send Discord notifications
-                        for signal in result:
-                            notification_sent = await self._send_signal_notification(
-                                signal
-                            )
-                            if notification_sent:
-                                results["notifications_sent"] += 1
-
-            db.commit()
+            if notify and fresh:
+                results["notifications_sent"] = await self._send_notifications(fresh)
 
+            results["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 2)
             logger.info(f"✅ Signal generation complete: {results}")
             return results
 
         except Exception as e:
-            db.rollback()
+            session.rollback()
             logger.error(f"Error generating portfolio signals: {e}")
             return {"error": str(e)}
         finally:
-            db.close()
-
-    async def _generate_symbol_signals(
-        self, db: Session, user_id: int, symbol: str
-    ) -> List[Signal]:
-        """Generate ATR signals for a single symbol."""
-        try:
-            # Get comprehensive ATR data
-            atr_result = await self.atr_calculator._calculate_single_atr_result(symbol)
-            matrix_data = await self.atr_calculator.calculate_matrix_atr(symbol)
-
-            if atr_result.atr_value == 0 or atr_result.confidence < self.min_confidence:
-                logger.warning(
-                    f"⚠️ Insufficient ATR data for {symbol} (confidence: {atr_result.confidence:.2f})"
-                )
-                return []
-
-            # Get market data for additional analysis
-            market_data = await self._get_enhanced_market_data(symbol)
-
-            if not market_data:
-                logger.warning(f"⚠️ No market data for {symbol}")
-                return []
-
-            # Generate signals based on ATR Matrix strategy
-            signals = []
-
-            # 1. Check for ENTRY signals
-            entry_signal = await self._check_entry_signal(
-                db, user_id, symbol, atr_result, matrix_data, market_data
-            )
-            if entry_signal:
-                signals.append(entry_signal)
-
-            # 2. Check for SCALE_OUT signals
-            scale_signals = await self._check_scale_out_signals(
-                db, user_id, symbol, atr_result, matrix_data, market_data
-            )
-            signals.extend(scale_signals)
-
-            # 3. Check for EXIT/RISK signals
-            exit_signal = await self._check_exit_signals(
-                db, user_id, symbol, atr_result, matrix_data, market_data
-            )
-            if exit_signal:
-                signals.append(exit_signal)
-
-            # Save valid signals to database
-            valid_signals = []
-            for signal in signals:
-                # Validate signal quality
-                if self._validate_signal_quality(signal, atr_result):
-                    db.add(signal)
-                    valid_signals.append(signal)
-                    logger.info(
-                        f"💡 Generated {signal.signal_type.value} signal for {symbol}: strength={signal.signal_strength}"
-                    )
-
-            return valid_signals
-
-        except Exception as e:
-            logger.error(f"Error generating signals for {symbol}: {e}")
-            return []
-
-    async def _check_entry_signal(
-        self,
-        db: Session,
-        user_id: int,
-        symbol: str,
-        atr_result: ATRResult,
-        matrix_data: ATRMatrixData,
-        market_data: Dict,
-    ) -> Optional[Signal]:
-        """Check for ATR Matrix ENTRY signal conditions."""
-        try:
-            current_price = market_data.get("close", 0)
-            sma_21 = market_data.get("sma_21", market_data.get("sma_20", 0))
-            sma_50 = market_data.get("sma_50", 0)
-            atr_distance = market_data.get("atr_distance", 0)
-            ma_aligned = market_data.get("ma_aligned", False)
-            price_position_20d = market_data.get("price_position_20d", 0)
-
-            # ATR Matrix Entry Conditions (from TradingView script)
-            conditions_met = []
-            strength = 0.0
-
-            # 1. Core condition: ATR Distance between 0 and 4 (buy zone)
-            if 0 <= atr_distance <= self.entry_max_distance:
-                conditions_met.append(f"ATR distance {atr_distance:.1f}x in buy zone")
-                strength += 0.35
-            else:
-                return None  # Hard requirement
-
-            # 2. Core condition: Price above SMA21 (canonical)
-            if current_price > sma_21:
-                conditions_met.append("Price above SMA21")
-                strength += 0.25
-            else:
-                return None  # Hard requirement
-
-            # 3. Moving average alignment (highly preferred)
-            if ma_aligned:
-                conditions_met.append("Moving averages aligned")
-                strength += 0.20
-
-            # 4. Position in 20-day range (above 50%)
-            if price_position_20d > self.min_price_position:
-                conditions_met.append(
-                    f"Strong 20D position ({price_position_20d:.0f}%)"
-                )
-                strength += 0.10
-
-            # 5. ATR volatility sufficient
-            if atr_result.atr_percentage >= self.min_atr_percent:
-                conditions_met.append(
-                    f"Good volatility ({atr_result.atr_percentage:.1f}%)"
-                )
-                strength += 0.10
-
-            # Must meet minimum strength threshold
-            if strength < 0.60:  # Require strong signals only
-                return None
-
-            # Calculate targets and stop loss
-            stop_loss = current_price - (
-                self.stop_loss_multiplier * atr_result.atr_value
+            if db is None:
+                session.close()
+
+    def _load_snapshots(self, db: Session, symbols: List[str]) -> pd.DataFrame:
+        """Latest technical snapshot per symbol, ATR-matrix columns only."""
+        stmt = (
+            select(*[getattr(MarketSnapshot, name) for name in SNAPSHOT_FIELDS])
+            .where(
+                MarketSnapshot.analysis_type == ANALYSIS_TYPE,
+                MarketSnapshot.symbol.in_(symbols),
             )
-            target_1 = sma_50 + (7 * atr_result.atr_value)  # 7 ATR target
-            target_2 = sma_50 + (10 * atr_result.atr_value)  # 10 ATR target
-            target_3 = sma_50 + (12 * atr_result.atr_value)  # 12 ATR target
-
-            # Risk/reward ratio
-            risk = current_price - stop_loss
-            reward = target_1 - current_price
-            rr_ratio = reward / risk if risk > 0 else 0
-
-            if rr_ratio < self.min_risk_reward:
-                return None  # Insufficient risk/reward
-
-            # Calculate time horizon based on ATR distance
-            if atr_distance <= 2:
-                time_horizon = "2-3 weeks"
-                time_horizon_days = 18
-            elif atr_distance <= 3:
-                time_horizon = "1-2 weeks"
-                time_horizon_days = 10
-            else:
-                time_horizon = "1-3 days"
-                time_horizon_days = 2
-
-            # Get instrument ID
-            instrument = (
-                db.query(Instrument).filter(Instrument.symbol == symbol).first()
-            )
-            if not instrument:
-                logger.warning(f"Instrument {symbol} not found")
-                return None
-
-            # Create entry signal
-            signal = Signal(
-                user_id=user_id,
-                instrument_id=instrument.id,
-                symbol=symbol,
-                signal_type=SignalType.ENTRY,
-                status=SignalStatus.ACTIVE,
-                signal_strength=round(strength, 3),
-                confidence_score=round(atr_result.confidence, 3),
-                entry_price=round(current_price, 2),
-                current_price=round(current_price, 2),
-                stop_loss=round(stop_loss, 2),
-                take_profit=round(target_1, 2),
-                targets=[round(target_1, 2), round(target_2, 2), round(target_3, 2)],
-                atr_distance=round(atr_distance, 2),
-                risk_reward_ratio=round(rr_ratio, 2),
-                time_horizon=time_horizon,
-                time_horizon_days=time_horizon_days,
-                company_name=market_data.get("company_name", ""),
-                sector=market_data.get("sector", ""),
-                market_cap_category=self._classify_market_cap(
-                    market_data.get("market_cap", 0)
-                ),
-                signal_metadata={
-                    "atr_value": atr_result.atr_value,
-                    "atr_percentage": atr_result.atr_percentage,
-                    "volatility_level": atr_result.volatility_level,
-                    "ma_aligned": ma_aligned,
-                    "price_position_20d": price_position_20d,
-                    "conditions_met": conditions_met,
-                    "entry_reason": "; ".join(conditions_met),
-                },
-                expires_at=datetime.now()
-                + timedelta(days=1),  # Signal expires in 1 day
-            )
-
-            return signal
-
-        except Exception as e:
-            logger.error(f"Error checking entry signal for {symbol}: {e}")
-            return None
-
-    async def _check_scale_out_signals(
-        self,
-        db: Session,
-        user_id: int,
-        symbol: str,
-        atr_result: ATRResult,
-        matrix_data: ATRMatrixData,
-        market_data: Dict,
-    ) -> List[Signal]:
-        """Check for SCALE_OUT signal conditions."""
-        signals = []
-
-        try:
-            current_price = market_data.get("close", 0)
-            sma_50 = market_data.get("sma_50", 0)
-            atr_distance = market_data.get("atr_distance", 0)
-
-            if not all([current_price, sma_50, atr_distance]):
-                return signals
-
-            # Check each scale-out level
-            for level in self.scale_out_levels:
-                if atr_distance >= level:
-                    # Calculate target price for this level
-                    target_price = sma_50 + (level * atr_result.atr_value)
-
-                    # Calculate signal strength (higher for bigger overshoots)
-                    overshoot = atr_distance - level
-                    strength = 0.70 + min(overshoot * 0.05, 0.25)
-
-                    # Get instrument
-                    instrument = (
-                        db.query(Instrument).filter(Instrument.symbol == symbol).first()
-                    )
-                    if not instrument:
-                        continue
-
-                    signal = Signal(
-                        user_id=user_id,
-                        instrument_id=instrument.id,
-                        symbol=symbol,
-                        signal_type=SignalType.SCALE_OUT,
-                        status=SignalStatus.ACTIVE,
-                        signal_strength=round(strength, 3),
-                        confidence_score=round(atr_result.confidence, 3),
-                        entry_price=round(current_price, 2),
-                        current_price=round(current_price, 2),
-                        take_profit=round(target_price, 2),
-                        atr_distance=round(atr_distance, 2),
-                        time_horizon="Immediate",
-                        time_horizon_days=1,
-                        signal_metadata={
-                            "scale_level": level,
-                            "target_price": target_price,
-                            "overshoot": overshoot,
-                            "reason": f"ATR distance {atr_distance:.1f}x reached {level}x scale-out level",
-                        },
-                        expires_at=datetime.now() + timedelta(hours=6),
-                    )
-
-                    signals.append(signal)
-
-            return signals
-
-        except Exception as e:
-            logger.error(f"Error checking scale-out signals for {symbol}: {e}")
-            return []
-
-    async def _check_exit_signals(
-        self,
-        db: Session,
-        user_id: int,
-        symbol: str,
-        atr_result: ATRResult,
-        matrix_data: ATRMatrixData,
-        market_data: Dict,
-    ) -> Optional[Signal]:
-        """Check for EXIT/RISK signal conditions."""
-        try:
-            current_price = market_data.get("close", 0)
-            sma_50 = market_data.get("sma_50", 0)
-            atr_distance = market_data.get("atr_distance", 0)
-
-            if not all([current_price, sma_50]):
-                return None
-
-            # Critical: Price below SMA50
-            if current_price < sma_50:
-                instrument = (
-                    db.query(Instrument).filter(Instrument.symbol == symbol).first()
-                )
-                if not instrument:
-                    return None
-
-                return Signal(
-                    user_id=user_id,
-                    instrument_id=instrument.id,
-                    symbol=symbol,
-                    signal_type=SignalType.RISK_WARNING,
-                    status=SignalStatus.ACTIVE,
-                    signal_strength=0.90,
-                    confidence_score=round(atr_result.confidence, 3),
-                    entry_price=round(current_price, 2),
-                    current_price=round(current_price, 2),
-                    atr_distance=round(atr_distance, 2) if atr_distance else None,
-                    time_horizon="Immediate",
-                    time_horizon_days=1,
-                    signal_metadata={
-                        "risk_reason": "Price below SMA50 - Major support break",
-                        "urgency": "HIGH",
-                        "recommended_action": "Consider position reduction or exit",
-                    },
-                    expires_at=datetime.now() + timedelta(hours=12),
-                )
-
-            # Overextended: Very high ATR distance
-            if atr_distance and atr_distance > 12:
-                instrument = (
-                    db.query(Instrument).filter(Instrument.symbol == symbol).first()
-                )
-                if not instrument:
-                    return None
-
-                return Signal(
-                    user_id=user_id,
-                    instrument_id=instrument.id,
-                    symbol=symbol,
-                    signal_type=SignalType.RISK_WARNING,
-                    status=SignalStatus.ACTIVE,
-                    signal_strength=0.75,
-                    confidence_score=round(atr_result.confidence, 3),
-                    entry_price=round(current_price, 2),
-                    current_price=round(current_price, 2),
-                    atr_distance=round(atr_distance, 2),
-                    time_horizon="1-2 days",
-                    time_horizon_days=2,
-                    signal_metadata={
-                        "risk_reason": f"Extremely overextended at {atr_distance:.1f}x ATR distance",
-                        "urgency": "MEDIUM",
-                        "recommended_action": "High probability of pullback",
+            .order_by(MarketSnapshot.symbol.asc(), MarketSnapshot.analysis_timestamp.desc())
+            .distinct(MarketSnapshot.symbol)
+        )
+        return pd.DataFrame(db.execute(stmt).all(), columns=SNAPSHOT_FIELDS)
+
+    def _signal_rows(self, candidates: pd.DataFrame, user_id: int) -> List[Dict[str, Any]]:
+        now = datetime.now(timezone.utc)
+        rows = []
+        for rec in candidates.to_dict("records"):
+            kind = rec["kind"]
+            signal_type, _channel, lifetime = SIGNAL_KINDS[kind]
+            price = round(float(rec["current_price"]), 2)
+            conditions = self._conditions(rec)
+            rows.append(
+                {
+                    "symbol": rec["symbol"],
+                    "signal_type": signal_type,
+                    "strategy_name": STRATEGY_NAME,
+                    "signal_strength": _num(rec["signal_strength"]),
+                    "trigger_price": price,
+                    "recommended_price": price,
+                    "stop_loss": _num(rec["stop_loss"]),
+                    "target_price": _num(rec["target_price"]),
+                    "atr_distance": _num(rec["atr_distance"]),
+                    "atr_value": _num(rec["atr_value"]),
+                    "ma_alignment": bool(rec["ma_aligned"]),
+                    "price_position_20d": _num(rec["range_pos_20d"]),
+                    "risk_reward_ratio": _num(rec["risk_reward_ratio"]),
+                    "rsi": _num(rec["rsi"]),
+                    "macd": _num(rec["macd"]),
+                    "is_valid": True,
+                    "expires_at": now + lifetime,
+                    "conditions_met": conditions,
+                    "market_conditions": {
+                        "kind": kind,
+                        "user_id": user_id,
+                        "stage_label": rec["stage_label"],
+                        "confidence": _num(rec["confidence"]),
+                        "atr_percent": _num(rec["atrp_14"]),
+                        "scale_level": _num(rec["scale_level"]),
+                        "targets": [
+                            t for t in (_num(rec["target_price"]), _num(rec["target_2"]), _num(rec["target_3"])) if t
+                        ]
+                        if kind == "entry"
+                        else None,
+                        "time_horizon": rec["time_horizon"],
+                        "company_name": rec["name"],
+                        "sector": rec["sector"],
+                        "market_cap_category": self._classify_market_cap(_num(rec["market_cap"]) or 0),
                     },
-                    expires_at=datetime.now() + timedelta(hours=24),
-                )
-
-            return None
-
-        except Exception as e:
-            logger.error(f"Error checking exit signals for {symbol}: {e}")
-            return None
-
-    async def _send_signal_notification(self, signal: Signal) -> bool:
-        """Send Discord notification for generated signal."""
-        try:
-            # Determine Discord channel
-            channel = self.signal_channels.get(
-                signal.signal_type, DiscordChannel.SIGNALS
+                    "notes": "; ".join(conditions),
+                }
             )
-
-            # Format message based on signal type
-            if signal.signal_type == SignalType.ENTRY:
-                message = self._format_entry_message(signal)
-            elif signal.signal_type == SignalType.SCALE_OUT:
-                message = self._format_scale_out_message(signal)
-            elif signal.signal_type == SignalType.RISK_WARNING:
-                message = self._format_risk_message(signal)
-            else:
-                message = self._format_generic_message(signal)
-
-            # Send Discord notification
-            success = await discord_notifier.send_signal_alert(
-                message=message,
-                channel=channel,
-                signal_data={
-                    "symbol": signal.symbol,
-                    "signal_type": signal.signal_type.value,
-                    "strength": signal.signal_strength,
-                    "price": signal.current_price,
-                    "time_horizon": signal.time_horizon,
-                },
+        return rows
+
+    def _conditions(self, rec: Dict[str, Any]) -> List[str]:
+        kind, dist = rec["kind"], rec["atr_distance"]
+        if kind == "support_break":
+            return ["Price below SMA50 - Major support break"]
+        if kind == "overextended":
+            return [f"Extremely overextended at {dist:.1f}x ATR distance"]
+        if kind == "scale_out":
+            return [f"ATR distance {dist:.1f}x reached {rec['scale_level']:.0f}x scale-out level"]
+        out = [f"ATR distance {dist:.1f}x in buy zone", "Price above SMA21"]
+        if rec["ma_aligned"]:
+            out.append("Moving averages aligned")
+        if rec["strong_range"]:
+            out.append(f"Strong 20D position ({rec['range_pos_20d']:.0f}%)")
+        if rec["good_vol"]:
+            out.append(f"Good volatility ({rec['atrp_14']:.1f}%)")
+        return out
+
+    def _drop_recent_duplicates(
+        self, db: Session, rows: List[Dict[str, Any]], user_id: int
+    ) -> List[Dict[str, Any]]:
+        """Skip signals this user already got within ATR_SIGNAL_DEDUPE_HOURS (same symbol/type/level)."""
+        if not rows:
+            return rows
+        hours = int(getattr(settings, "ATR_SIGNAL_DEDUPE_HOURS", 24))
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=hours)
+        # TradeSignal has no user column; the owner is stored in market_conditions
+        recent = db.execute(
+            select(TradeSignal.symbol, TradeSignal.signal_type, TradeSignal.market_conditions).where(
+                TradeSignal.strategy_name == STRATEGY_NAME,
+                TradeSignal.symbol.in_({row["symbol"] for row in rows}),
+                TradeSignal.market_conditions["user_id"].as_integer() == user_id,
+                TradeSignal.created_at >= cutoff,
+                TradeSignal.is_valid.is_(True),
             )
-
-            if success:
-                signal.discord_sent = True
-                signal.discord_channel = channel
-                logger.info(
-                    f"📢 Sent {signal.signal_type.value} notification for {signal.symbol}"
+        ).all()
+
+        def key(symbol, signal_type, conditions):
+            conditions = conditions or {}
+            level = conditions.get("scale_level") if signal_type == "SCALE_OUT" else None
+            return conditions.get("user_id"), symbol, signal_type, level
+
+        seen = {key(*r) for r in recent}
+        return [
+            row
+            for row in rows
+            if key(row["symbol"], row["signal_type"], row["market_conditions"]) not in seen
+        ]
+
+    async def _send_notifications(self, rows: List[Dict[str, Any]]) -> int:
+        """Queue one Discord alert per signal, then flush the batch once."""
+        queued = 0
+        for row in rows:
+            kind = row["market_conditions"]["kind"]
+            channel = SIGNAL_KINDS[kind][1]
+            try:
+                ok = await discord_notifier.send_signal_alert(
+                    message=self._format_message(row),
+                    channel=channel,
+                    signal_data={
+                        "symbol": row["symbol"],
+                        "signal_type": row["signal_type"].lower(),
+                        "strength": row["signal_strength"],
+                        "price": row["trigger_price"],
+                        "time_horizon": row["market_conditions"]["time_horizon"],
+                    },
                 )
+            except Exception as e:
+                logger.error(f"Error sending signal notification: {e}")
+                ok = False
+            queued += int(bool(ok))
+        if queued:
+            await discord_notifier.flush()
+        return queued
+
+    def _format_message(self, row: Dict[str, Any]) -> str:
+        kind = row["market_conditions"]["kind"]
+        if kind == "entry":
+            return self._format_entry_message(row)
+        if kind == "scale_out":
+            return self._format_scale_out_message(row)
+        return self._format_risk_message(row)
+
+    def _format_entry_message(self, row: Dict[str, Any]) -> str:
+        """Format Discord message for ENTRY signals."""
+        price, target = row["trigger_price"], row["target_price"]
+        upside_pct = ((target - price) / price) * 100
+        return f"""🚀 **ENTRY Signal: {row['symbol']}**
 
-            return success
+💰 **Price**: ${price:.2f}
+🎯 **Target**: ${target:.2f} ({upside_pct:+.1f}%)
+🛑 **Stop Loss**: ${row['stop_loss']:.2f}
+📊 **Risk/Reward**: {row['risk_reward_ratio']:.1f}:1
+⏱️ **Time Horizon**: {row['market_conditions']['time_horizon']}
+💪 **Strength**: {row['signal_strength']*100:.0f}%
+📈 **ATR Distance**: {row['atr_distance']:.1f}x
 
-        except Exception as e:
-            logger.error(f"Error sending signal notification: {e}")
-            return False
+📝 **Reason**: {row['notes']}"""
 
-    def _format_entry_message(self, signal: Signal) -> str:
-        """Format Discord message for ENTRY signals."""
-        upside_pct = (
-            (signal.take_profit - signal.current_price) / signal.current_price
-        ) * 100
-
-        return f"""🚀 **ENTRY Signal: {signal.symbol}** 
-        
-💰 **Price**: ${signal.current_price:.2f}
-🎯 **Target**: ${signal.take_profit:.2f} ({upside_pct:+.1f}%)
-🛑 **Stop Loss**: ${signal.stop_loss:.2f}
-📊 **Risk/Reward**: {signal.risk_reward_ratio:.1f}:1
-⏱️ **Time Horizon**: {signal.time_horizon}
-💪 **Strength**: {signal.signal_strength*100:.0f}%
-📈 **ATR Distance**: {signal.atr_distance:.1f}x
-
-📝 **Reason**: {signal.signal_metadata.get('entry_reason', 'ATR Matrix entry conditions met')}"""
-
-    def _format_scale_out_message(self, signal: Signal) -> str:
+    def _format_scale_out_message(self, row: Dict[str, Any]) -> str:
         """Format Discord message for SCALE_OUT signals."""
-        level = signal.signal_metadata.get("scale_level", 0)
+        level = row["market_conditions"]["scale_level"] or 0
+        return f"""📈 **SCALE-OUT Alert: {row['symbol']}**
 
-        return f"""📈 **SCALE-OUT Alert: {signal.symbol}**
-        
-🎯 **Current**: ${signal.current_price:.2f}
-📏 **ATR Distance**: {signal.atr_distance:.1f}x (reached {level:.0f}x level)
-💪 **Strength**: {signal.signal_strength*100:.0f}%
+🎯 **Current**: ${row['trigger_price']:.2f}
+📏 **ATR Distance**: {row['atr_distance']:.1f}x (reached {level:.0f}x level)
+💪 **Strength**: {row['signal_strength']*100:.0f}%
 
 ⚡ **Action**: Consider taking partial profits"""
 
-    def _format_risk_message(self, signal: Signal) -> str:
-        """Format Discord message for RISK_WARNING signals."""
-        risk_reason = signal.signal_metadata.get(
-            "risk_reason", "Risk condition detected"
-        )
-        urgency = signal.signal_metadata.get("urgency", "MEDIUM")
-
-        urgency_emoji = "🚨" if urgency == "HIGH" else "⚠️"
+    def _format_risk_message(self, row: Dict[str, Any]) -> str:
+        """Format Discord message for EXIT / RISK_WARNING signals."""
+        urgent = row["signal_type"] == "EXIT"
+        action = "Consider position reduction or exit" if urgent else "High probability of pullback"
+        return f"""{'🚨' if urgent else '⚠️'} **RISK Alert: {row['symbol']}**
 
-        return f"""{urgency_emoji} **RISK Alert: {signal.symbol}**
-        
-💰 **Price**: ${signal.current_price:.2f}
-📈 **ATR Distance**: {signal.atr_distance:.1f}x
-🚨 **Risk**: {risk_reason}
-⚡ **Action**: {signal.signal_metadata.get('recommended_action', 'Review position')}"""
-
-    def _format_generic_message(self, signal: Signal) -> str:
-        """Format generic Discord message."""
-        return f"""📊 **{signal.signal_type.value.upper()} Signal: {signal.symbol}**
-        
-💰 **Price**: ${signal.current_price:.2f}
-💪 **Strength**: {signal.signal_strength*100:.0f}%
-⏱️ **Time Horizon**: {signal.time_horizon}"""
+💰 **Price**: ${row['trigger_price']:.2f}
+📈 **ATR Distance**: {row['atr_distance']:.1f}x
+🚨 **Risk**: {row['notes']}
+⚡ **Action**: {action}"""
 
     # Helper Methods
-    async def _get_user_portfolio_symbols(self, db: Session, user_id: int) -> List[str]:
-        """Get symbols from user's portfolio for analysis."""
-        # TODO: Implement based on user's actual holdings
-        # For now, return major tech stocks
-        return ["AAPL", "MSFT", "NVDA", "GOOGL", "TSLA", "AMZN", "META", "NFLX"]
-
-    async def _get_enhanced_market_data(self, symbol: str) -> Dict:
-        """Get enhanced market data including moving averages and technical indicators."""
-        # TODO: Implement with actual market data service
-        # For now, return mock data structure
-        return {
-            "close": 180.0,
-            "sma_20": 175.0,
-            "sma_50": 170.0,
-            "atr_distance": 2.5,
-            "ma_aligned": True,
-            "price_position_20d": 75.0,
-            "company_name": f"{symbol} Inc",
-            "sector": "Technology",
-            "market_cap": 1000000000,
-        }
+    def _get_user_portfolio_symbols(self, db: Session, user_id: int) -> List[str]:
+        """Symbols the user currently holds."""
+        return [
+            s
+            for (s,) in db.query(Position.symbol)
+            .filter(Position.user_id == user_id, Position.quantity != 0)
+            .distinct()
+        ]
 
     def _classify_market_cap(self, market_cap: float) -> str:
         """Classify market cap category."""
@@ -653,19 +507,6 @@ class ATRSignalGenerator:
         else:
             return "micro"
 
-    def _validate_signal_quality(self, signal: Signal, atr_result: ATRResult) -> bool:
-        """Validate signal meets quality thresholds."""
-        if signal.signal_strength < 0.60:
-            return False
-        if signal.confidence_score < 0.65:
-            return False
-        if (
-            signal.signal_type == SignalType.ENTRY
-            and signal.risk_reward_ratio < self.min_risk_reward
-        ):
-            return False
-        return True
-
 
 # =============================================================================
 # GLOBAL INSTANCE & SCHEDULED EXECUTION
@@ -0,0 +1,203 @@
+"""
+Task Tracing
+============
+
+Stage spans and an opt-in sampling profiler for task runs.
+
+- `task_run` activates a `RunTrace` per execution; tasks and the services they
+  call mark stages with `span("name")` (context manager or decorator)
+- Each stage aggregates calls, wall/CPU seconds, rows and SQL statements executed
+  while it was open; nested spans are keyed by path (``indicators/stage``)
+- Outside a traced run spans are no-ops, so services can be instrumented freely
+- `SamplingProfiler` samples the traced thread and emits collapsed ("folded")
+  stacks that flamegraph.pl and speedscope read directly
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import ContextDecorator, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, Iterator, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_current_trace: ContextVar[Optional["RunTrace"]] = ContextVar("task_trace", default=None)
+_span_stack: ContextVar[Tuple["Span", ...]] = ContextVar("task_span_stack", default=())
+_listener_lock = threading.Lock()
+_listener_installed = False
+
+
+@dataclass
+class StageStats:
+    calls: int = 0
+    wall_s: float = 0.0
+    cpu_s: float = 0.0
+    rows: int = 0
+    queries: int = 0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "calls": self.calls,
+            "wall_s": round(self.wall_s, 4),
+            "cpu_s": round(self.cpu_s, 4),
+            "rows": self.rows,
+            "queries": self.queries,
+        }
+
+
+def _count_query(conn, cursor, statement, parameters, context, executemany) -> None:
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.queries += 1
+
+
+def _install_query_counter() -> None:
+    global _listener_installed
+    if _listener_installed:
+        return
+    with _listener_lock:
+        if not _listener_installed:
+            event.listen(Engine, "before_cursor_execute", _count_query)
+            _listener_installed = True
+
+
+class RunTrace:
+    """Per-run stage aggregates."""
+
+    def __init__(self) -> None:
+        self.stages: Dict[str, StageStats] = {}
+        self.queries = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def activate(self) -> Iterator["RunTrace"]:
+        _install_query_counter()
+        token = _current_trace.set(self)
+        stack_token = _span_stack.set(())
+        try:
+            yield self
+        finally:
+            _span_stack.reset(stack_token)
+            _current_trace.reset(token)
+
+    def record(self, path: str, wall_s: float, cpu_s: float, rows: int, queries: int) -> None:
+        with self._lock:
+            st = self.stages.setdefault(path, StageStats())
+            st.calls += 1
+            st.wall_s += wall_s
+            st.cpu_s += cpu_s
+            st.rows += rows
+            st.queries += queries
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {path: st.as_dict() for path, st in self.stages.items()}
+
+
+class Span(ContextDecorator):
+    """A named stage; use `with span("upsert") as s: s.add_rows(n)` or `@span("upsert")`."""
+
+    def __init__(self, name: str, rows: int = 0) -> None:
+        self.name = name
+        self.rows = int(rows or 0)
+        self._trace: Optional[RunTrace] = None
+        self._token = None
+
+    def _recreate_cm(self) -> "Span":
+        # Decorated functions may recurse or run concurrently: one span per call.
+        return Span(self.name)
+
+    def add_rows(self, n: int) -> None:
+        self.rows += int(n or 0)
+
+    def __enter__(self) -> "Span":
+        trace = _current_trace.get()
+        if trace is None:
+            return self
+        stack = _span_stack.get()
+        self._path = "/".join([s.name for s in stack] + [self.name])
+        self._token = _span_stack.set(stack + (self,))
+        self._trace = trace
+        self._q0 = trace.queries
+        self._c0 = time.process_time()
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        trace = self._trace
+        if trace is None:
+            return False
+        wall = time.perf_counter() - self._t0
+        cpu = time.process_time() - self._c0
+        _span_stack.reset(self._token)
+        trace.record(self._path, wall, cpu, self.rows, trace.queries - self._q0)
+        self._trace = None
+        return False
+
+
+def span(name: str, rows: int = 0) -> Span:
+    return Span(name, rows=rows)
+
+
+def add_rows(n: int) -> None:
+    """Attribute `n` rows to the innermost open span (no-op when untraced)."""
+    stack = _span_stack.get()
+    if stack:
+        stack[-1].add_rows(n)
+
+
+def current_trace() -> Optional[RunTrace]:
+    return _current_trace.get()
+
+
+class SamplingProfiler:
+    """Wall-clock stack sampler for one thread, aggregated as folded stacks."""
+
+    def __init__(self, interval_s: float = 0.01, max_depth: int = 128, max_stacks: int = 5000) -> None:
+        self.interval_s = max(0.001, float(interval_s))
+        self.max_depth = int(max_depth)
+        self.max_stacks = int(max_stacks)
+        self.samples = 0
+        self._counts: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._target: Optional[int] = None
+
+    def start(self, thread_id: Optional[int] = None) -> "SamplingProfiler":
+        self._target = thread_id or threading.get_ident()
+        self._thread = threading.Thread(target=self._run, name="task-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+
+    @staticmethod
+    def _label(frame) -> str:
+        code = frame.f_code
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ":")
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            frame = sys._current_frames().get(self._target)
+            if frame is None:
+                continue
+            labels = []
+            while frame is not None and len(labels) < self.max_depth:
+                labels.append(self._label(frame))
+                frame = frame.f_back
+            self._counts[";".join(reversed(labels))] += 1
+            self.samples += 1
+
+    def folded(self) -> str:
+        """`frame;frame;frame count` lines, heaviest stacks first."""
+        return "\n".join(f"{stack} {n}" for stack, n in self._counts.most_common(self.max_stacks))
@@ -4,7 +4,8 @@ from celery import shared_task
 import asyncio
 from backend.database import SessionLocal
 from backend.services.portfolio.broker_sync_service import broker_sync_service
-from backend.models.broker_account import BrokerAccount, BrokerType
+from backend.services.portfolio.sync_orchestrator import sync_orchestrator
+from backend.models.broker_account import BrokerType
 
 
 @shared_task(name="backend.tasks.account_sync.sync_account_task")
@@ -31,33 +32,21 @@ def sync_account_task(account_id: int, sync_type: str = "comprehensive") -> dict
 
 @shared_task(name="backend.tasks.account_sync.sync_all_ibkr_accounts")
 def sync_all_ibkr_accounts() -> dict:
-    """Enqueue sync tasks for all enabled IBKR accounts."""
-    session = SessionLocal()
+    """Sync all enabled IBKR accounts in parallel (capped + staggered FlexQuery requests).
+
+    Runs in-process through the sync orchestrator instead of fanning out one Celery task
+    per account, so concurrent FlexQuery requests stay within IBKR's throttling limits.
+    """
     try:
-        accounts = (
-            session.query(BrokerAccount)
-            .filter(
-                BrokerAccount.broker == BrokerType.IBKR,
-                BrokerAccount.is_enabled == True,
-            )
-            .all()
-        )
-        enqueued = 0
-        results = []
-        for acct in accounts:
-            try:
-                # Use existing Celery task to perform the heavy sync
-                from backend.tasks.celery_app import celery_app
-
-                task = celery_app.send_task(
-                    "backend.tasks.account_sync.sync_account_task",
-                    args=[acct.id, "comprehensive"],
-                )
-                results.append({"account_id": acct.id, "task_id": task.id})
-                enqueued += 1
-            except Exception as e:
-                results.append({"account_id": acct.id, "error": str(e)})
-
-        return {"status": "queued", "enqueued": enqueued, "results": results}
-    finally:
-        session.close()
+        return asyncio.run(sync_orchestrator.sync_accounts(broker=BrokerType.IBKR))
+    except Exception as e:
+        return {"status": "error", "error": str(e)}
+
+
+@shared_task(name="backend.tasks.account_sync.sync_all_accounts_task")
+def sync_all_accounts_task() -> dict:
+    """Sync every enabled account across all brokers with per-broker concurrency caps."""
+    try:
+        return asyncio.run(sync_orchestrator.sync_accounts())
+    except Exception as e:
+        return {"status": "error", "error": str(e)}
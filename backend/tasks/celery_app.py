@@ -1,6 +1,9 @@
 from celery import Celery
 from celery.schedules import crontab
+from celery.signals import worker_init, worker_process_init, worker_process_shutdown, worker_shutdown
+from kombu import Queue
 from backend.config import settings
+from backend.tasks.queues import ALL_QUEUES, QUEUE_DEFAULT, task_routes
 import os
 
 USE_REDBEAT = True
@@ -21,10 +24,10 @@ celery_app.conf.result_backend = settings.CELERY_RESULT_BACKEND
 
 # Celery configuration
 celery_app.conf.update(
-    # Task routing
-    task_routes={
-        "backend.tasks.account_sync.*": {"queue": "account_sync"},
-    },
+    # Task routing (see backend/tasks/queues.py); workers pick queues with -Q
+    task_queues=[Queue(name) for name in ALL_QUEUES],
+    task_default_queue=QUEUE_DEFAULT,
+    task_routes=task_routes(),
     # Worker configuration
     worker_max_tasks_per_child=1000,
     worker_prefetch_multiplier=1,
@@ -97,3 +100,44 @@ if USE_REDBEAT:
 
 # Preserve schedule object
 celery_app.conf.beat_schedule = celery_app.conf.beat_schedule
+
+
+# -------------------- Worker process lifecycle --------------------
+# Each prefork child owns one MarketDataService with pooled Redis/provider connections.
+# Threads/gevent pools (the io worker) run tasks in the main process, which never
+# fires worker_process_init, so those start the container at worker init instead.
+def _is_prefork(worker) -> bool:
+    pool_cls = getattr(worker, "pool_cls", None)
+    return "prefork" in str(getattr(pool_cls, "__module__", pool_cls) or "prefork")
+
+
+@worker_init.connect
+def _init_market_data_container_in_process(sender=None, **_kwargs):
+    if _is_prefork(sender):
+        return
+    from backend.services.market.service_container import market_data_container
+
+    market_data_container.startup()
+
+
+@worker_shutdown.connect
+def _shutdown_market_data_container_in_process(sender=None, **_kwargs):
+    if _is_prefork(sender):
+        return
+    from backend.services.market.service_container import market_data_container
+
+    market_data_container.shutdown()
+
+
+@worker_process_init.connect
+def _init_market_data_container(**_kwargs):
+    from backend.services.market.service_container import market_data_container
+
+    market_data_container.startup()
+
+
+@worker_process_shutdown.connect
+def _shutdown_market_data_container(**_kwargs):
+    from backend.services.market.service_container import market_data_container
+
+    market_data_container.shutdown()
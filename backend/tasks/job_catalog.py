@@ -3,6 +3,7 @@ from __future__ import annotations
 from dataclasses import dataclass, asdict
 from typing import Any, Dict, List, Optional
 
+from backend.tasks.queues import QUEUE_ACCOUNT_SYNC, QUEUE_BULK, QUEUE_DEFAULT, QUEUE_IO
 from backend.tasks.schedule_helpers import build_crontab_schedule
 from backend.tasks.schedule_metadata import (
     HookConfig,
@@ -31,7 +32,7 @@ class JobTemplate:
     retries: int = 0
     backoff_s: int = 0
     maintenance_windows: List[Dict[str, str]] | None = None
-    queue: Optional[str] = None
+    queue: Optional[str] = None  # see backend/tasks/queues.py
 
     def to_dict(self) -> Dict[str, Any]:
         return asdict(self)
@@ -46,6 +47,7 @@ CATALOG: List[JobTemplate] = [
         description="Fetch SP500 / NASDAQ100 / DOW30 constituents and update DB",
         default_cron="0 2 * * *",
         default_tz="UTC",
+        queue=QUEUE_IO,
     ),
     JobTemplate(
         id="ibkr-daily-flex-sync",
@@ -55,7 +57,7 @@ CATALOG: List[JobTemplate] = [
         description="IBKR FlexQuery daily sync",
         default_cron="15 2 * * *",
         default_tz="UTC",
-        queue="account_sync",
+        queue=QUEUE_ACCOUNT_SYNC,
     ),
     JobTemplate(
         id="update-tracked-symbol-cache",
@@ -65,6 +67,17 @@ CATALOG: List[JobTemplate] = [
         description="Compute union of tracked symbols and publish deltas",
         default_cron="30 2 * * *",
         default_tz="UTC",
+        queue=QUEUE_DEFAULT,
+    ),
+    JobTemplate(
+        id="refresh-fundamentals",
+        display_name="Refresh Fundamentals",
+        group="market_data",
+        task="backend.tasks.market_data_tasks.refresh_fundamentals",
+        description="Bulk-refresh stale company profiles (name/sector/industry/market cap)",
+        default_cron="45 2 * * *",
+        default_tz="UTC",
+        queue=QUEUE_IO,
     ),
     JobTemplate(
         id="restore-daily-coverage-tracked",
@@ -75,6 +88,7 @@ CATALOG: List[JobTemplate] = [
         default_cron="0 3 * * *",
         default_tz="UTC",
         kwargs={"history_days": 5, "history_batch_size": 25},
+        queue=QUEUE_BULK,
     ),
     JobTemplate(
         id="record-daily-history",
@@ -84,6 +98,7 @@ CATALOG: List[JobTemplate] = [
         description="Record immutable daily analysis history",
         default_cron="20 3 * * *",
         default_tz="UTC",
+        queue=QUEUE_BULK,
     ),
     JobTemplate(
         id="recompute-indicators-universe",
@@ -93,6 +108,18 @@ CATALOG: List[JobTemplate] = [
         description="Recompute indicators for tracked universe from DB",
         default_cron="35 3 * * *",
         default_tz="UTC",
+        queue=QUEUE_BULK,
+    ),
+    JobTemplate(
+        id="send-universe-digest",
+        display_name="Universe Digest (Discord)",
+        group="market_data",
+        task="backend.tasks.market_data_tasks.send_universe_digest",
+        description="Rebuild the cached universe digest (stage breadth, top RS, stage changes) and post it to Discord",
+        default_cron="0 4 * * *",
+        default_tz="UTC",
+        kwargs={"limit": 12},
+        queue=QUEUE_DEFAULT,
     ),
     JobTemplate(
         id="backfill-5m-d1",
@@ -103,6 +130,7 @@ CATALOG: List[JobTemplate] = [
         default_cron="10 4 * * *",
         default_tz="UTC",
         kwargs={"n_days": 1, "batch_size": 50},
+        queue=QUEUE_BULK,
     ),
     JobTemplate(
         id="monitor-coverage-health",
@@ -112,6 +140,7 @@ CATALOG: List[JobTemplate] = [
         description="Snapshot coverage freshness and persist stale symbol metrics",
         default_cron="0 * * * *",
         default_tz="UTC",
+        queue=QUEUE_DEFAULT,
     ),
 ]
 
@@ -13,12 +13,11 @@ All tasks are safe to run repeatedly (idempotent writes; ON CONFLICT for bars).
 
 from celery import shared_task
 import asyncio
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import List, Set, Dict, Optional
 
 from backend.database import SessionLocal
 from backend.models import PriceData
-from sqlalchemy.dialects.postgresql import insert as pg_insert
 from backend.models.market_data import MarketSnapshotHistory, MarketSnapshot
 from backend.models import IndexConstituent
 from backend.services.market.market_data_service import (
@@ -26,10 +25,14 @@ from backend.services.market.market_data_service import (
     compute_coverage_status,
 )
 from backend.services.market.backfill_params import daily_backfill_params
-from backend.services.market.universe import tracked_symbols_from_db
+from backend.services.market.universe import tracked_symbols_from_db, tracked_universe
+from backend.services.market.alert_evaluation import alert_evaluator
+from backend.services.market.universe_digest import format_discord, universe_digest
+from backend.services.market.fundamentals_store import fundamentals_store
+from backend.services.tracing import span
 from backend.models import Position
 from backend.config import settings
-from .task_utils import task_run
+from .task_utils import StepCheckpoint, chunk_runner, execute_chunk, run_chunked, task_run
 
 import json
 
@@ -90,10 +93,9 @@ def refresh_single_symbol(symbol: str) -> dict:
 @shared_task(name="backend.tasks.market_data_tasks.enrich_index_fundamentals")
 @task_run("enrich_index_fundamentals")
 def enrich_index_fundamentals(indices: List[str] | None = None, limit_per_run: int = 500) -> dict:
-    """Fill sector/industry/market_cap on IndexConstituent using DB-first snapshots.
+    """Fill sector/industry/market_cap on IndexConstituent from the fundamentals store.
 
-    - Reads latest MarketSnapshot for a symbol; if missing, computes snapshot from DB
-    - Only if still missing, fetch fundamentals via providers (FMP/yfinance fallback)
+    - Bulk-refreshes stale/missing symbols in `symbol_fundamentals` (FMP multi-symbol profiles)
     - Updates IndexConstituent rows with any available fundamentals
     """
     _set_task_status("enrich_index_fundamentals", "running")
@@ -113,32 +115,12 @@ def enrich_index_fundamentals(indices: List[str] | None = None, limit_per_run: i
             .limit(limit_per_run)
             .all()
         )
+        symbols = sorted({(r.symbol or "").upper() for r in rows if r.symbol})
+        refresh = fundamentals_store.refresh(session, symbols) if symbols else {}
+        funda = fundamentals_store.load(session, symbols) if symbols else {}
         updated = 0
         for r in rows:
-            sym = (r.symbol or "").upper()
-            if not sym:
-                continue
-            # Use snapshot if present; else compute from DB (fast)
-            snap = market_data_service.get_snapshot_from_store(session, sym)
-            if not snap:
-                snap = market_data_service.compute_snapshot_from_db(session, sym)
-            # If still missing, compute from providers (slow path) but only for fundamentals
-            if not snap or (snap.get("sector") is None and snap.get("industry") is None and snap.get("market_cap") is None):
-                try:
-                    # Reuse provider fundamentals logic by triggering provider snapshot compute
-                    # but we won't persist unless needed downstream
-                    loop = _setup_event_loop()
-                    try:
-                        prov = loop.run_until_complete(market_data_service.compute_snapshot_from_providers(sym))
-                    finally:
-                        loop.close()
-                    if prov:
-                        for k in ("sector", "industry", "market_cap"):
-                            if prov.get(k) is not None:
-                                snap = snap or {}
-                                snap[k] = prov.get(k)
-                except Exception:
-                    pass
+            snap = funda.get((r.symbol or "").upper())
             if not snap:
                 continue
             changed = False
@@ -159,7 +141,12 @@ def enrich_index_fundamentals(indices: List[str] | None = None, limit_per_run: i
                 updated += 1
         if updated:
             session.commit()
-        res = {"status": "ok", "inspected": len(rows), "updated": updated}
+        res = {
+            "status": "ok",
+            "inspected": len(rows),
+            "updated": updated,
+            "fundamentals_refreshed": int(refresh.get("fmp", 0)) + int(refresh.get("yfinance", 0)),
+        }
         _set_task_status("enrich_index_fundamentals", "ok", res)
         return res
     finally:
@@ -174,8 +161,8 @@ def enrich_index_fundamentals(indices: List[str] | None = None, limit_per_run: i
 def fill_missing_snapshot_fundamentals(limit_per_run: int = 500) -> dict:
     """Fill missing sector/industry/market_cap on MarketSnapshot rows.
 
-    DB-first: try compute_snapshot_from_db; if still missing, fallback to providers.
-    Persists updated snapshot via market_data_service.persist_snapshot.
+    Bulk-refreshes the affected symbols in the fundamentals store, then merges stored
+    fundamentals into each snapshot via market_data_service.persist_snapshot.
     """
     _set_task_status("fill_missing_snapshot_fundamentals", "running")
     session = SessionLocal()
@@ -196,31 +183,13 @@ def fill_missing_snapshot_fundamentals(limit_per_run: int = 500) -> dict:
             .limit(limit_per_run)
             .all()
         )
+        symbols = sorted({(r.symbol or "").upper() for r in rows if r.symbol})
+        refresh = fundamentals_store.refresh(session, symbols) if symbols else {}
+        funda = fundamentals_store.load(session, symbols) if symbols else {}
         updated = 0
         for r in rows:
             sym = (r.symbol or "").upper()
-            if not sym:
-                continue
-            # Build from DB first (no external calls)
-            snap = market_data_service.compute_snapshot_from_db(session, sym)
-            # If fundamentals still missing, fetch fundamentals only (FMP-first, no price fetch)
-            needs_funda = (
-                not snap
-                or (
-                    snap.get("name") is None
-                    and snap.get("sector") is None
-                    and snap.get("industry") is None
-                    and snap.get("sub_industry") is None
-                    and snap.get("market_cap") is None
-                )
-            )
-            if needs_funda:
-                funda = market_data_service.get_fundamentals_info(sym)
-                if funda:
-                    snap = snap or {}
-                    for k in ("name", "sector", "industry", "sub_industry", "market_cap"):
-                        if funda.get(k) is not None:
-                            snap[k] = funda.get(k)
+            snap = funda.get(sym)
             if not snap:
                 continue
             # Persist only if something new available
@@ -233,12 +202,34 @@ def fill_missing_snapshot_fundamentals(limit_per_run: int = 500) -> dict:
             ):
                 market_data_service.persist_snapshot(session, sym, {**(r.raw_analysis or {}), **snap})
                 updated += 1
-        res = {"status": "ok", "inspected": len(rows), "updated": updated}
+        res = {
+            "status": "ok",
+            "inspected": len(rows),
+            "updated": updated,
+            "fundamentals_refreshed": int(refresh.get("fmp", 0)) + int(refresh.get("yfinance", 0)),
+        }
         _set_task_status("fill_missing_snapshot_fundamentals", "ok", res)
         return res
     finally:
         session.close()
 
+
+@shared_task(name="backend.tasks.market_data_tasks.refresh_fundamentals")
+@task_run("refresh_fundamentals")
+def refresh_fundamentals(symbols: List[str] | None = None, force: bool = False) -> dict:
+    """Bulk-refresh `symbol_fundamentals` for the tracked universe (or `symbols`).
+
+    Only rows missing or older than FUNDAMENTALS_TTL_HOURS are fetched unless `force`.
+    """
+    session = SessionLocal()
+    try:
+        if not symbols:
+            symbols = _tracked_universe(session)
+        res = fundamentals_store.refresh(session, symbols, force=force)
+        return {"status": "ok", **res}
+    finally:
+        session.close()
+
 # ============================= Task Status Helper =============================
 
 
@@ -274,14 +265,25 @@ def _get_tracked_universe_from_db(session: SessionLocal) -> set[str]:
     return set(tracked_symbols_from_db(session))
 
 
+def _tracked_universe(session: SessionLocal) -> List[str]:
+    """Tracked symbols from the versioned Redis cache, falling back to the DB-derived universe."""
+    try:
+        symbols = list(tracked_universe.get(market_data_service.redis_client))
+    except Exception:
+        symbols = []
+    return symbols or sorted({s.upper() for s in _get_tracked_universe_from_db(session)})
+
+
 @shared_task(name="backend.tasks.market_data_tasks.update_tracked_symbol_cache")
 @task_run("update_tracked_symbol_cache")
 def update_tracked_symbol_cache() -> dict:
     """Compute union of tracked symbols (index_constituents ∪ portfolio) and publish deltas.
 
-    Writes two Redis keys:
+    Writes (via `tracked_universe.publish`):
     - tracked:all → full sorted list of tracked symbols
     - tracked:new → new additions since last run (expires 24h)
+    - tracked:version / tracked:delta:{v} → bumped only when membership changes,
+      with an invalidation broadcast on tracked:invalidate
     """
     _set_task_status("update_tracked_symbol_cache", "running")
     session = SessionLocal()
@@ -322,18 +324,14 @@ def update_tracked_symbol_cache() -> dict:
             finally:
                 if loop:
                     loop.close()
-        prev_raw = redis.get("tracked:all")
-        prev = []
-        if prev_raw:
-            try:
-                prev = json.loads(prev_raw)
-            except Exception:
-                prev = []
-        prev_set = set(s.upper() for s in prev)
-        additions = [s for s in current if s not in prev_set]
-        redis.set("tracked:all", json.dumps(current))
-        redis.setex("tracked:new", 24 * 3600, json.dumps(additions))
-        res = {"status": "ok", "tracked_all": len(current), "new": len(additions)}
+        published = tracked_universe.publish(redis, current)
+        res = {
+            "status": "ok",
+            "tracked_all": len(current),
+            "new": len(published["added"]),
+            "removed": len(published["removed"]),
+            "version": published["version"],
+        }
         _set_task_status("update_tracked_symbol_cache", "ok", res)
         return res
     finally:
@@ -704,44 +702,22 @@ def refresh_index_constituents() -> dict:
         session.close()
 
 
-@shared_task(name="backend.tasks.market_data_tasks.backfill_daily_since_date")
-@task_run("backfill_daily_since_date")
-def backfill_daily_since_date(since_date: str = "2021-01-01", batch_size: int = 25) -> dict:
-    """One-time (or occasional) deep backfill of DAILY bars since a given date for the tracked universe.
+@chunk_runner("backfill_daily_since_date")
+def _backfill_daily_since_chunk(symbols: List[str], params: dict) -> dict:
+    """One symbol range of backfill_daily_since_date (idempotent via ON CONFLICT)."""
+    import pandas as pd
 
-    This fetches provider daily history (FMP-first in paid mode) and persists into price_data.
-    It is intentionally separate from the fast 'last 200 bars' flows.
-    """
-    _set_task_status("backfill_daily_since_date", "running", {"since_date": since_date})
+    since_dt = pd.to_datetime(params["since_date"], utc=True).tz_convert(None).normalize()
     session = SessionLocal()
     try:
-        import pandas as pd
-
-        since_dt = pd.to_datetime(since_date, utc=True, errors="coerce")
-        if since_dt is None or pd.isna(since_dt):
-            raise ValueError(f"Invalid since_date: {since_date!r}")
-        since_dt = since_dt.tz_convert(None).normalize()
-
         loop = _setup_event_loop()
         try:
-            # Universe: prefer Redis tracked:all; fallback to DB-derived tracked universe.
-            tracked: List[str] = []
-            try:
-                raw = market_data_service.redis_client.get("tracked:all")
-                tracked = json.loads(raw) if raw else []
-            except Exception:
-                tracked = []
-            symbols = sorted({str(s).upper() for s in (tracked or []) if s})
-            if not symbols:
-                symbols = sorted({s.upper() for s in _get_tracked_universe_from_db(session)})
-
-            concurrency = _daily_backfill_concurrency()
             fetched = loop.run_until_complete(
                 _fetch_daily_for_symbols(
                     symbols=symbols,
                     period="max",
                     max_bars=None,
-                    concurrency=concurrency,
+                    concurrency=_daily_backfill_concurrency(),
                 )
             )
         finally:
@@ -753,10 +729,7 @@ def backfill_daily_since_date(since_date: str = "2021-01-01", batch_size: int =
             since_dt=since_dt,
             use_delta_after=False,  # deep backfill; idempotent via ON CONFLICT
         )
-        res = {
-            "status": "ok" if persist["errors"] == 0 else "error",
-            "since_date": since_date,
-            "symbols": len(symbols),
+        return {
             "processed_symbols": persist["processed_ok"],
             "bars_attempted_total": persist["bars_attempted_total"],
             "bars_inserted_total": persist["bars_inserted_total"],
@@ -764,12 +737,70 @@ def backfill_daily_since_date(since_date: str = "2021-01-01", batch_size: int =
             "error_samples": persist["error_samples"],
             "provider_usage": persist["provider_usage"],
         }
-        _set_task_status("backfill_daily_since_date", "ok" if persist["errors"] == 0 else "error", res)
-        return res
     finally:
         session.close()
 
 
+@shared_task(name="backend.tasks.market_data_tasks.backfill_daily_since_date")
+@task_run("backfill_daily_since_date")
+def backfill_daily_since_date(
+    since_date: str = "2021-01-01",
+    batch_size: int = 25,
+    chunk_size: int | None = None,
+    fan_out: bool = False,
+    restart: bool = False,
+) -> dict:
+    """One-time (or occasional) deep backfill of DAILY bars since a given date for the tracked universe.
+
+    This fetches provider daily history (FMP-first in paid mode) and persists into price_data.
+    It is intentionally separate from the fast 'last 200 bars' flows.
+
+    The universe is processed in checkpointed symbol-range chunks (task_utils.run_chunked):
+    re-running the same since_date after an interruption resumes from the last completed
+    chunk (restart=True starts over); fan_out=True spreads the chunks across bulk workers.
+    `chunk_size` defaults to BACKFILL_CHUNK_SIZE. `batch_size` is deprecated and ignored;
+    it stays in the signature so queued calls and older API clients keep working.
+    """
+    _set_task_status("backfill_daily_since_date", "running", {"since_date": since_date})
+    import pandas as pd
+
+    since_dt = pd.to_datetime(since_date, utc=True, errors="coerce")
+    if since_dt is None or pd.isna(since_dt):
+        raise ValueError(f"Invalid since_date: {since_date!r}")
+
+    session = SessionLocal()
+    try:
+        symbols = _tracked_universe(session)
+    finally:
+        session.close()
+
+    res = {
+        "since_date": since_date,
+        **run_chunked(
+            "backfill_daily_since_date",
+            symbols,
+            params={"since_date": since_date},
+            chunk_size=chunk_size,
+            fan_out=fan_out,
+            restart=restart,
+            on_progress=lambda progress: _set_task_status(
+                "backfill_daily_since_date", "running", {"since_date": since_date, **progress}
+            ),
+        ),
+    }
+    _set_task_status("backfill_daily_since_date", res["status"], res)
+    return res
+
+
+@shared_task(name="backend.tasks.market_data_tasks.run_backfill_chunk")
+def run_backfill_chunk(task_name: str, checkpoint_key: str, index: int) -> dict:
+    """One chunk of a fanned-out backfill (task_utils.run_chunked); safe to redeliver.
+
+    The chunk that completes last closes the parent JobRun with the aggregated counters.
+    """
+    return execute_chunk(task_name, checkpoint_key, index)
+
+
 # ============================= Coverage Restore (Daily, Tracked Universe) =============================
 @shared_task(name="backend.tasks.market_data_tasks.bootstrap_daily_coverage_tracked")
 @task_run("bootstrap_daily_coverage_tracked", lock_key=lambda: "bootstrap_daily_coverage_tracked")
@@ -810,40 +841,56 @@ def bootstrap_daily_coverage_tracked(history_days: int = 5, history_batch_size:
         return data.get("status", "ok")
 
     rollup: dict = {"steps": []}
+    # Completed steps of today's run are checkpointed: a run restarted mid-chain
+    # (worker restart, redelivery) skips them and reuses their results.
+    checkpoint = StepCheckpoint(
+        "bootstrap_daily_coverage_tracked",
+        {
+            "date": datetime.utcnow().date().isoformat(),
+            "history_days": int(history_days),
+            "history_batch_size": int(history_batch_size),
+        },
+    )
 
-    def _append(step_name: str, result: dict) -> None:
+    def _step(step_name: str, fn, **kwargs) -> dict:
+        result = checkpoint.get(step_name)
+        resumed = result is not None
+        if not resumed:
+            result = fn(**kwargs)
+            if isinstance(result, dict) and result.get("status") != "error":
+                checkpoint.save(step_name, result)
+        step = {"name": step_name, "summary": _summarize(step_name, result), "result": result}
+        if resumed:
+            step["resumed"] = True
+        rollup["steps"].append(step)
+        return result
+
+    _step("refresh_index_constituents", refresh_index_constituents)
+    _step("update_tracked_symbol_cache", update_tracked_symbol_cache)
+    _step("backfill_last_bars", backfill_last_bars, days=200)
+    _step("recompute_indicators_universe", recompute_indicators_universe, batch_size=50)
+
+    # Historical ledger: last N trading days into MarketSnapshotHistory (itself chunked and
+    # resumable). This is best-effort: if it fails, still refresh coverage so the operator
+    # sees the latest state.
+    try:
+        _step(
+            "backfill_snapshot_history_last_n_days",
+            backfill_snapshot_history_last_n_days,
+            days=int(history_days),
+            batch_size=int(history_batch_size),
+        )
+    except Exception as exc:
         rollup["steps"].append(
             {
-                "name": step_name,
-                "summary": _summarize(step_name, result),
-                "result": result,
+                "name": "backfill_snapshot_history_last_n_days",
+                "summary": "error",
+                "result": {"status": "error", "error": str(exc)},
             }
         )
 
-    res1 = refresh_index_constituents()
-    _append("refresh_index_constituents", res1)
-
-    res2 = update_tracked_symbol_cache()
-    _append("update_tracked_symbol_cache", res2)
-
-    res3 = backfill_last_bars(days=200)
-    _append("backfill_last_bars", res3)
-
-    res4 = recompute_indicators_universe(batch_size=50)
-    _append("recompute_indicators_universe", res4)
-
-    # Historical ledger: last N trading days into MarketSnapshotHistory.
-    # This is best-effort: if it fails, still refresh coverage so the operator sees the latest state.
-    try:
-        res5 = backfill_snapshot_history_last_n_days(
-            days=int(history_days), batch_size=int(history_batch_size)
-        )
-    except Exception as exc:
-        res5 = {"status": "error", "error": str(exc)}
-    _append("backfill_snapshot_history_last_n_days", res5)
-
-    res6 = monitor_coverage_health()
-    _append("monitor_coverage_health", res6)
+    _step("monitor_coverage_health", monitor_coverage_health)
+    checkpoint.clear()
 
     rollup["status"] = "ok"
     rollup["overall_summary"] = "; ".join(
@@ -864,16 +911,7 @@ def backfill_stale_daily_tracked() -> dict:
     _set_task_status("backfill_stale_daily_tracked", "running")
     session = SessionLocal()
     try:
-        # Universe: prefer Redis tracked:all; fallback to DB-derived tracked universe.
-        tracked: List[str] = []
-        try:
-            raw = market_data_service.redis_client.get("tracked:all")
-            tracked = json.loads(raw) if raw else []
-        except Exception:
-            tracked = []
-        tracked = sorted({str(s).upper() for s in (tracked or []) if s})
-        if not tracked:
-            tracked = sorted({s.upper() for s in _get_tracked_universe_from_db(session)})
+        tracked = _tracked_universe(session)
 
         # Compute stale+missing using the same bucketing logic as coverage.
         section, stale_full = market_data_service._compute_interval_coverage_for_symbols(
@@ -931,28 +969,24 @@ def recompute_indicators_universe(batch_size: int = 50) -> dict:
     _set_task_status("recompute_indicators_universe", "running")
     session = SessionLocal()
     try:
-        # Universe: prefer Redis tracked:all (source of truth for UI), fallback to DB-derived.
-        tracked: List[str] = []
-        try:
-            raw = market_data_service.redis_client.get("tracked:all")
-            tracked = json.loads(raw) if raw else []
-        except Exception:
-            tracked = []
-        ordered = sorted({str(s).upper() for s in (tracked or []) if s})
-        if not ordered:
-            ordered = sorted({s.upper() for s in _get_tracked_universe_from_db(session)})
+        ordered = _tracked_universe(session)
 
         processed_ok = 0
         skipped_no_data = 0
         errors = 0
         error_samples: list[dict] = []
 
+        # One fundamentals read for the whole universe; joined per symbol in memory.
+        funda = fundamentals_store.load(session, ordered)
+
         # Chunking by batch_size
         for i in range(0, len(ordered), max(1, batch_size)):
             chunk = ordered[i : i + batch_size]
             for sym in chunk:
                 try:
-                    snap = market_data_service.compute_snapshot_from_db(session, sym)
+                    snap = market_data_service.compute_snapshot_from_db(
+                        session, sym, fundamentals=funda.get(sym, {})
+                    )
                     if not snap:
                         skipped_no_data += 1
                         continue
@@ -971,6 +1005,18 @@ def recompute_indicators_universe(batch_size: int = 50) -> dict:
             "errors": errors,
             "error_samples": error_samples,
         }
+        if settings.ALERT_EVALUATION_ON_REFRESH and processed_ok:
+            # One vectorized alert pass per snapshot refresh
+            try:
+                alerts = alert_evaluator.evaluate(session)
+                res["alerts_evaluated"] = alerts["alerts"]
+                res["alerts_triggered"] = alerts["triggered"]
+            except Exception as exc:
+                session.rollback()
+                error_samples.append({"symbol": "*alerts*", "error": str(exc)})
+        if processed_ok:
+            # Snapshots changed: the next digest reader rebuilds today's digest
+            universe_digest.invalidate()
         if error_samples:
             # Non-fatal, bounded summary captured into JobRun.error by task_run()
             res["error"] = "Sample errors:\n" + "\n".join(
@@ -982,36 +1028,123 @@ def recompute_indicators_universe(batch_size: int = 50) -> dict:
         session.close()
 
 
+@shared_task(name="backend.tasks.market_data_tasks.evaluate_alerts")
+@task_run("evaluate_alerts")
+def evaluate_alerts(symbols: List[str] | None = None) -> dict:
+    """Evaluate all active user alerts against the latest snapshots and notify."""
+    session = SessionLocal()
+    try:
+        res = alert_evaluator.evaluate(session, symbols=symbols)
+        return {"status": "ok", **res}
+    finally:
+        session.close()
+
+
+@shared_task(name="backend.tasks.market_data_tasks.send_universe_digest")
+@task_run("send_universe_digest")
+def send_universe_digest(channel_id: str | None = None, limit: int = 12, send: bool = True) -> dict:
+    """Rebuild and cache today's universe digest, then post it via the Discord bot.
+
+    The dashboard reads the cached digest this task warms.
+    """
+    from backend.services.notifications.discord_bot import discord_bot_client
+
+    session = SessionLocal()
+    try:
+        digest = universe_digest.get(session, refresh=True)
+    finally:
+        session.close()
+    res = {
+        "status": "ok",
+        "as_of": digest["as_of"],
+        "symbols": digest["universe"],
+        "snapshots": digest["with_snapshot"],
+        "stage_changes": digest["transitions"]["total"],
+        "sent": False,
+    }
+    resolved_channel = channel_id or getattr(settings, "DISCORD_BOT_DEFAULT_CHANNEL_ID", None)
+    if not send or not digest["universe"]:
+        return res
+    if not discord_bot_client.is_configured() or not resolved_channel:
+        res["skipped"] = "discord bot not configured"
+        return res
+    loop = _setup_event_loop()
+    try:
+        res["sent"] = bool(
+            loop.run_until_complete(
+                discord_bot_client.send_message(
+                    channel_id=resolved_channel, content=format_discord(digest, limit=limit)
+                )
+            )
+        )
+    finally:
+        loop.close()
+    return res
+
+
 # ============================= Snapshot History Backfill =============================
 
 
 @shared_task(name="backend.tasks.market_data_tasks.backfill_snapshot_history_for_date")
 @task_run("backfill_snapshot_history_for_date")
-def backfill_snapshot_history_for_date(as_of_date: str, batch_size: int = 50) -> dict:
-    """Backfill `market_snapshot_history` for a specific as-of date from local `price_data`.
+def backfill_snapshot_history_for_date(
+    as_of_date: str | None = None,
+    batch_size: int = 50,
+    as_of_dates: List[str] | None = None,
+) -> dict:
+    """Backfill `market_snapshot_history` for one or more as-of dates from local `price_data`.
 
-    This is useful when history was not recorded for a day but OHLCV exists, and we want
-    snapshot coverage dots to reflect that day.
+    This is useful when history was not recorded for some days but OHLCV exists, and we want
+    snapshot coverage dots to reflect those days. Each symbol's bars are loaded and its
+    indicator series computed once for all requested dates.
 
     Notes:
     - DB-first only (no provider calls)
     - Does NOT update `market_snapshot` (latest cache)
     """
+    from backend.services.market.snapshot_history import (
+        HISTORY_COLUMNS,
+        ohlcv_frame_from_rows,
+        upsert_history_rows,
+    )
+
     session = SessionLocal()
     try:
-        # Parse date (YYYY-MM-DD) into a naive timestamp to match price_data.date semantics.
-        as_of_dt = datetime.fromisoformat(as_of_date).replace(hour=0, minute=0, second=0, microsecond=0)
+        # Parse dates (YYYY-MM-DD) into naive timestamps to match price_data.date semantics.
+        requested = [d for d in ([as_of_date] if as_of_date else []) + list(as_of_dates or []) if d]
+        if not requested:
+            return {"status": "error", "error": "as_of_date or as_of_dates is required"}
+        as_of_dts = sorted(
+            {
+                datetime.fromisoformat(str(d)).replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=None)
+                for d in requested
+            }
+        )
 
-        # Universe: prefer Redis tracked:all (source of truth for UI), fallback to DB-derived.
-        tracked: List[str] = []
-        try:
-            raw = market_data_service.redis_client.get("tracked:all")
-            tracked = json.loads(raw) if raw else []
-        except Exception:
-            tracked = []
-        ordered = sorted({str(s).upper() for s in (tracked or []) if s})
-        if not ordered:
-            ordered = sorted({s.upper() for s in _get_tracked_universe_from_db(session)})
+        ordered = _tracked_universe(session)
+
+        # Benchmark bars are shared by every symbol: load them once.
+        limit_bars = int(getattr(settings, "SNAPSHOT_DAILY_BARS_LIMIT", 400))
+        span = (as_of_dts[-1] - as_of_dts[0]).days + 1
+        bm_rows = (
+            session.query(
+                PriceData.date,
+                PriceData.open_price,
+                PriceData.high_price,
+                PriceData.low_price,
+                PriceData.close_price,
+                PriceData.volume,
+            )
+            .filter(
+                PriceData.symbol == "SPY",
+                PriceData.interval == "1d",
+                PriceData.date < as_of_dts[-1] + timedelta(days=1),
+            )
+            .order_by(PriceData.date.desc())
+            .limit(limit_bars + span)
+            .all()
+        )
+        benchmark_df = ohlcv_frame_from_rows(reversed(bm_rows))
 
         processed_ok = 0
         skipped_no_data = 0
@@ -1023,66 +1156,26 @@ def backfill_snapshot_history_for_date(as_of_date: str, batch_size: int = 50) ->
             chunk = ordered[i : i + batch_size]
             for sym in chunk:
                 try:
-                    snap = market_data_service.compute_snapshot_from_db(session, sym, as_of_dt=as_of_dt)
-                    if not snap:
+                    snaps = market_data_service.compute_snapshots_from_db(
+                        session, sym, as_of_dts, benchmark_df=benchmark_df
+                    )
+                    if not snaps:
                         skipped_no_data += 1
                         continue
                     processed_ok += 1
 
                     # Upsert into history keyed by (symbol, type, as_of_date)
-                    existing = (
-                        session.query(MarketSnapshotHistory)
-                        .filter(
-                            MarketSnapshotHistory.symbol == sym,
-                            MarketSnapshotHistory.analysis_type == "technical_snapshot",
-                            MarketSnapshotHistory.as_of_date == as_of_dt,
-                        )
-                        .first()
-                    )
-                    if existing:
-                        existing.current_price = snap.get("current_price")
-                        existing.rsi = snap.get("rsi")
-                        existing.atr_value = snap.get("atr_value")
-                        existing.sma_50 = snap.get("sma_50")
-                        existing.macd = snap.get("macd")
-                        existing.macd_signal = snap.get("macd_signal")
-                        for k, v in (snap or {}).items():
-                            if hasattr(existing, k):
-                                setattr(existing, k, v)
-                    else:
-                        _reserved = {
-                            "id",
-                            "symbol",
-                            "analysis_type",
-                            "as_of_date",
-                            "analysis_timestamp",
-                            "current_price",
-                            "rsi",
-                            "atr_value",
-                            "sma_50",
-                            "macd",
-                            "macd_signal",
+                    rows = [
+                        {
+                            "symbol": sym,
+                            "analysis_type": "technical_snapshot",
+                            "as_of_date": d,
+                            **{k: v for k, v in snap.items() if k in HISTORY_COLUMNS},
                         }
-                        session.add(
-                            MarketSnapshotHistory(
-                                symbol=sym,
-                                analysis_type="technical_snapshot",
-                                as_of_date=as_of_dt,
-                                current_price=snap.get("current_price"),
-                                rsi=snap.get("rsi"),
-                                atr_value=snap.get("atr_value"),
-                                sma_50=snap.get("sma_50"),
-                                macd=snap.get("macd"),
-                                macd_signal=snap.get("macd_signal"),
-                                **{
-                                    k: v
-                                    for k, v in (snap or {}).items()
-                                    if k not in _reserved and hasattr(MarketSnapshotHistory, k)
-                                },
-                            )
-                        )
+                        for d, snap in snaps.items()
+                    ]
+                    upserted += upsert_history_rows(session, rows)
                     session.commit()
-                    upserted += 1
                 except Exception as exc:
                     session.rollback()
                     errors += 1
@@ -1092,6 +1185,7 @@ def backfill_snapshot_history_for_date(as_of_date: str, batch_size: int = 50) ->
         res = {
             "status": "ok",
             "as_of_date": as_of_date,
+            "as_of_dates": [d.date().isoformat() for d in as_of_dts],
             "symbols": len(ordered),
             "processed_ok": processed_ok,
             "skipped_no_data": skipped_no_data,
@@ -1108,429 +1202,214 @@ def backfill_snapshot_history_for_date(as_of_date: str, batch_size: int = 50) ->
         session.close()
 
 
-@shared_task(name="backend.tasks.market_data_tasks.backfill_snapshot_history_last_n_days")
-@task_run("backfill_snapshot_history_last_n_days")
-def backfill_snapshot_history_last_n_days(
-    days: int = 200,
-    batch_size: int = 25,
-    since_date: str | None = None,
-) -> dict:
-    """Backfill `market_snapshot_history` for the last N trading days (SPY calendar) from local DB prices.
+def _snapshot_history_calendar(
+    session: SessionLocal, days: int, since_dt: datetime | None
+) -> tuple[str, list]:
+    """Trading-day calendar for snapshot history: (calendar symbol, raw dates oldest->newest).
 
-    This computes and stores indicators per day (ledger) so you can later view/backtest
-    historical snapshots. `market_snapshot` remains the fast latest-view.
+    Prefer SPY dates as canonical, but fall back to any symbol with 1d bars in the DB.
+    This keeps the backfill robust even when SPY isn't present yet.
     """
-    session = SessionLocal()
-    try:
-        # Universe: prefer Redis tracked:all (source of truth for UI), fallback to DB-derived.
-        tracked: List[str] = []
-        try:
-            raw = market_data_service.redis_client.get("tracked:all")
-            tracked = json.loads(raw) if raw else []
-        except Exception:
-            tracked = []
-        ordered = sorted({str(s).upper() for s in (tracked or []) if s})
-        if not ordered:
-            ordered = sorted({s.upper() for s in _get_tracked_universe_from_db(session)})
-
-        # Trading-day calendar:
-        # Prefer SPY dates as canonical, but fall back to any symbol with 1d bars in the DB.
-        # This keeps the backfill robust even when SPY isn't present yet.
-        calendar_symbol = "SPY"
-        since_dt = None
-        if since_date:
-            try:
-                import pandas as _pd
+    from sqlalchemy import func
 
-                since_dt = _pd.to_datetime(since_date, utc=True).tz_convert(None).normalize().to_pydatetime()
-            except Exception:
-                since_dt = None
-        cal_dates = (
+    def _dates(symbol: str) -> list:
+        rows = (
             session.query(PriceData.date)
-            .filter(PriceData.symbol == calendar_symbol, PriceData.interval == "1d")
+            .filter(PriceData.symbol == symbol, PriceData.interval == "1d")
             .order_by(PriceData.date.desc())
             .limit(6000 if since_dt is not None else max(1, int(days)))
             .all()
         )
-        as_of_dates = [r[0] for r in cal_dates if r and r[0] is not None and (since_dt is None or r[0] >= since_dt)]
-        if not as_of_dates:
-            from sqlalchemy import func
-
-            alt = (
-                session.query(PriceData.symbol, func.count(PriceData.date).label("n"))
-                .filter(PriceData.interval == "1d")
-                .group_by(PriceData.symbol)
-                .order_by(func.count(PriceData.date).desc())
-                .limit(1)
-                .all()
-            )
-            if alt:
-                calendar_symbol = str(alt[0][0] or "")
-                cal_dates = (
-                    session.query(PriceData.date)
-                    .filter(PriceData.symbol == calendar_symbol, PriceData.interval == "1d")
-                    .order_by(PriceData.date.desc())
-                    .limit(6000 if since_dt is not None else max(1, int(days)))
-                    .all()
-                )
-                as_of_dates = [r[0] for r in cal_dates if r and r[0] is not None and (since_dt is None or r[0] >= since_dt)]
-
-        if not as_of_dates:
-            err = "No daily bars found in price_data to establish a trading-day calendar (expected SPY or any 1d bars)."
-            _set_task_status("backfill_snapshot_history_last_n_days", "error", {"status": "error", "error": err})
-            return {"status": "error", "error": err}
-
-        # Oldest->newest list (raw timestamps) + normalized midnight UTC keys (naive).
-        as_of_dates = sorted(as_of_dates)
-        start_dt = as_of_dates[0]
+        return [r[0] for r in rows if r and r[0] is not None and (since_dt is None or r[0] >= since_dt)]
+
+    calendar_symbol = "SPY"
+    as_of_dates = _dates(calendar_symbol)
+    if not as_of_dates:
+        alt = (
+            session.query(PriceData.symbol, func.count(PriceData.date).label("n"))
+            .filter(PriceData.interval == "1d")
+            .group_by(PriceData.symbol)
+            .order_by(func.count(PriceData.date).desc())
+            .limit(1)
+            .all()
+        )
+        if alt:
+            calendar_symbol = str(alt[0][0] or "")
+            as_of_dates = _dates(calendar_symbol)
+    return calendar_symbol, sorted(as_of_dates)
 
-        import pandas as pd
 
-        def _norm_midnight_utc(dt: object) -> datetime:
-            # Ensure DatetimeIndex-compatible keys while avoiding tz mismatches.
-            ts = pd.to_datetime(dt, utc=True, errors="coerce")
-            if ts is None or pd.isna(ts):
-                raise ValueError(f"Invalid as_of_date value: {dt!r}")
-            return ts.tz_convert(None).normalize().to_pydatetime()
+@chunk_runner("backfill_snapshot_history_last_n_days")
+def _snapshot_history_chunk(symbols: List[str], params: dict) -> dict:
+    """Snapshot history rows for one symbol range (idempotent upserts keyed by symbol/type/date)."""
+    import pandas as pd
 
-        as_of_days = [_norm_midnight_utc(d) for d in as_of_dates if d is not None]
+    from backend.services.market.snapshot_history import (
+        compute_history_frame,
+        history_rows,
+        ohlcv_frame_from_rows,
+        upsert_history_rows,
+    )
 
-        # Progress/observability: estimate total rows upfront (upper bound).
-        estimated_rows = int(len(ordered) * len(as_of_days))
-        _set_task_status(
-            "backfill_snapshot_history_last_n_days",
-            "running",
-            {
-                "days": int(days),
-                "since_date": since_date,
-                "symbols": len(ordered),
-                "estimated_rows": estimated_rows,
-                "processed_symbols": 0,
-                "written_rows": 0,
-                "errors": 0,
-            },
-        )
+    start_dt = datetime.fromisoformat(params["start_dt"])
+    as_of_index = pd.DatetimeIndex([datetime.fromisoformat(d) for d in params["as_of_days"]])
+    bar_columns = (
+        PriceData.date,
+        PriceData.open_price,
+        PriceData.high_price,
+        PriceData.low_price,
+        PriceData.close_price,
+        PriceData.volume,
+    )
 
-        processed_symbols = 0
-        written_rows = 0
-        skipped_no_data = 0
-        errors = 0
-        error_samples: list[dict] = []
+    processed_symbols = 0
+    written_rows = 0
+    skipped_no_data = 0
+    errors = 0
+    error_samples: list[dict] = []
 
-        # Preload calendar bars covering the window (+ buffer for weekly stage)
+    session = SessionLocal()
+    try:
+        # Calendar bars covering the window (+ buffer for weekly stage)
         spy_rows = (
-            session.query(
-                PriceData.date,
-                PriceData.open_price,
-                PriceData.high_price,
-                PriceData.low_price,
-                PriceData.close_price,
-                PriceData.volume,
+            session.query(*bar_columns)
+            .filter(
+                PriceData.symbol == params["calendar_symbol"],
+                PriceData.interval == "1d",
+                PriceData.date >= start_dt,
             )
-            .filter(PriceData.symbol == calendar_symbol, PriceData.interval == "1d", PriceData.date >= start_dt)
             .order_by(PriceData.date.asc())
             .all()
         )
-        import pandas as pd
-        import numpy as np
-        from datetime import time as _time
-        from sqlalchemy.dialects.postgresql import insert as pg_insert
-        from backend.models.market_data import MarketSnapshotHistory
-        from backend.services.market.indicator_engine import (
-            compute_core_indicators_series,
-            compute_weinstein_stage_series_from_daily,
-            classify_ma_bucket_from_ma,
-        )
+        spy_df = ohlcv_frame_from_rows(spy_rows)
 
-        if spy_rows:
-            spy_df = pd.DataFrame(
-                [
-                    {
-                        "date": r[0],
-                        "Open": float(r[1]) if r[1] is not None else float(r[4]),
-                        "High": float(r[2]) if r[2] is not None else float(r[4]),
-                        "Low": float(r[3]) if r[3] is not None else float(r[4]),
-                        "Close": float(r[4]),
-                        "Volume": int(r[5] or 0),
-                    }
-                    for r in spy_rows
-                ]
-            ).set_index("date")
-            # Normalize to midnight UTC (naive) so membership checks align with as_of_days.
-            spy_df.index = pd.to_datetime(spy_df.index, utc=True, errors="coerce").tz_convert(None).normalize()
-        else:
-            spy_df = pd.DataFrame()
-
-        last_progress_emit = 0
-        for i in range(0, len(ordered), max(1, batch_size)):
-            chunk = ordered[i : i + batch_size]
-            for sym in chunk:
-                try:
+        for sym in symbols:
+            try:
+                with span("load_prices") as sp:
                     rows = (
-                        session.query(
-                            PriceData.date,
-                            PriceData.open_price,
-                            PriceData.high_price,
-                            PriceData.low_price,
-                            PriceData.close_price,
-                            PriceData.volume,
-                        )
+                        session.query(*bar_columns)
                         .filter(PriceData.symbol == sym, PriceData.interval == "1d", PriceData.date >= start_dt)
                         .order_by(PriceData.date.asc())
                         .all()
                     )
-                    if not rows:
-                        skipped_no_data += 1
-                        continue
+                    sp.add_rows(len(rows))
+                    df = ohlcv_frame_from_rows(rows)
+                if df.empty:
+                    skipped_no_data += 1
+                    continue
 
-                    df = pd.DataFrame(
-                        [
-                            {
-                                "date": r[0],
-                                "Open": float(r[1]) if r[1] is not None else float(r[4]),
-                                "High": float(r[2]) if r[2] is not None else float(r[4]),
-                                "Low": float(r[3]) if r[3] is not None else float(r[4]),
-                                "Close": float(r[4]),
-                                "Volume": int(r[5] or 0),
-                            }
-                            for r in rows
-                        ]
-                    ).set_index("date")
-                    # Normalize to midnight UTC (naive) so membership checks align with as_of_days.
-                    df.index = pd.to_datetime(df.index, utc=True, errors="coerce").tz_convert(None).normalize()
-                    if df.empty:
-                        skipped_no_data += 1
-                        continue
+                # One vectorized pass per symbol; rows for the last N trading days only.
+                with span("indicators", rows=len(df)):
+                    frame = compute_history_frame(df, spy_df)
+                with span("materialize") as sp:
+                    payload_rows = history_rows(frame, sym, dates=as_of_index)
+                    sp.add_rows(len(payload_rows))
+                if not payload_rows:
+                    skipped_no_data += 1
+                    continue
 
-                    core = compute_core_indicators_series(df)
-                    # Derived daily fields
-                    close = df["Close"]
-                    price = close
-                    atr14 = core.get("atr_14")
-                    atr30 = core.get("atr_30")
-                    sma21 = core.get("sma_21")
-                    sma50 = core.get("sma_50")
-                    sma100 = core.get("sma_100")
-                    sma150 = core.get("sma_150")
-                    sma200 = core.get("sma_200")
-
-                    def range_pos(window: int) -> pd.Series:
-                        hi = df["High"].rolling(window).max()
-                        lo = df["Low"].rolling(window).min()
-                        denom = (hi - lo).replace(0, np.nan)
-                        return ((price - lo) / denom) * 100.0
-
-                    range20 = range_pos(20)
-                    range50 = range_pos(50)
-                    range252 = range_pos(252)
-
-                    atrp14 = (atr14 / price) * 100.0
-                    atrp30 = (atr30 / price) * 100.0
-                    atr_distance = (price - sma50) / atr14
-
-                    atrx_sma21 = (price - sma21) / atr14
-                    atrx_sma50 = (price - sma50) / atr14
-                    atrx_sma100 = (price - sma100) / atr14
-                    atrx_sma150 = (price - sma150) / atr14
-
-                    # Stage / RS (best-effort; may be NaN early if insufficient weekly history)
-                    stage_daily = pd.DataFrame(index=df.index)
-                    if not spy_df.empty:
-                        stage_daily = compute_weinstein_stage_series_from_daily(
-                            df.iloc[::-1].copy(),
-                            spy_df.iloc[::-1].copy(),
-                        )
+                with span("upsert", rows=len(payload_rows)):
+                    upsert_history_rows(session, payload_rows)
+                    session.commit()
+                written_rows += len(payload_rows)
+                processed_symbols += 1
+            except Exception as exc:
+                session.rollback()
+                errors += 1
+                if len(error_samples) < 25:
+                    error_samples.append({"symbol": sym, "error": str(exc)})
+    finally:
+        session.close()
 
-                    # Build per-date payload rows for last N trading days
-                    wanted = [d for d in as_of_days if d in df.index]
-                    if not wanted:
-                        skipped_no_data += 1
-                        continue
+    return {
+        "processed_symbols": processed_symbols,
+        "written_rows": written_rows,
+        "skipped_no_data": skipped_no_data,
+        "errors": errors,
+        "error_samples": error_samples,
+    }
 
-                    payload_rows = []
-                    for d in wanted:
-                        # MA bucket (daily)
-                        ma_bucket = None
-                        try:
-                            ma_bucket = classify_ma_bucket_from_ma(
-                                {
-                                    "price": float(price.loc[d]),
-                                    "sma_5": float(core.loc[d, "sma_5"]) if not pd.isna(core.loc[d, "sma_5"]) else None,
-                                    "sma_8": float(core.loc[d, "sma_8"]) if not pd.isna(core.loc[d, "sma_8"]) else None,
-                                    "sma_21": float(core.loc[d, "sma_21"]) if not pd.isna(core.loc[d, "sma_21"]) else None,
-                                    "sma_50": float(core.loc[d, "sma_50"]) if not pd.isna(core.loc[d, "sma_50"]) else None,
-                                    "sma_100": float(core.loc[d, "sma_100"]) if not pd.isna(core.loc[d, "sma_100"]) else None,
-                                    "sma_200": float(core.loc[d, "sma_200"]) if not pd.isna(core.loc[d, "sma_200"]) else None,
-                                }
-                            ).get("bucket")
-                        except Exception:
-                            ma_bucket = None
-
-                        stage_label = None
-                        stage_slope_pct = None
-                        stage_dist_pct = None
-                        rs_mansfield_pct = None
-                        try:
-                            if not stage_daily.empty and d in stage_daily.index:
-                                stage_label = stage_daily.loc[d, "stage_label"]
-                                stage_slope_pct = (
-                                    float(stage_daily.loc[d, "stage_slope_pct"])
-                                    if "stage_slope_pct" in stage_daily.columns and not pd.isna(stage_daily.loc[d, "stage_slope_pct"])
-                                    else None
-                                )
-                                stage_dist_pct = (
-                                    float(stage_daily.loc[d, "stage_dist_pct"])
-                                    if "stage_dist_pct" in stage_daily.columns and not pd.isna(stage_daily.loc[d, "stage_dist_pct"])
-                                    else None
-                                )
-                                rs_mansfield_pct = (
-                                    float(stage_daily.loc[d, "rs_mansfield_pct"])
-                                    if "rs_mansfield_pct" in stage_daily.columns and not pd.isna(stage_daily.loc[d, "rs_mansfield_pct"])
-                                    else None
-                                )
-                        except Exception:
-                            pass
 
-                        payload = {
-                            "symbol": sym,
-                            "analysis_type": "technical_snapshot",
-                            "as_of_timestamp": d.isoformat() if hasattr(d, "isoformat") else str(d),
-                            "current_price": float(price.loc[d]) if not pd.isna(price.loc[d]) else None,
-                            "rsi": float(core.loc[d, "rsi"]) if "rsi" in core.columns and not pd.isna(core.loc[d, "rsi"]) else None,
-                            "sma_5": float(core.loc[d, "sma_5"]) if not pd.isna(core.loc[d, "sma_5"]) else None,
-                            "sma_14": float(core.loc[d, "sma_14"]) if not pd.isna(core.loc[d, "sma_14"]) else None,
-                            "sma_21": float(core.loc[d, "sma_21"]) if not pd.isna(core.loc[d, "sma_21"]) else None,
-                            "sma_50": float(core.loc[d, "sma_50"]) if not pd.isna(core.loc[d, "sma_50"]) else None,
-                            "sma_100": float(core.loc[d, "sma_100"]) if not pd.isna(core.loc[d, "sma_100"]) else None,
-                            "sma_150": float(core.loc[d, "sma_150"]) if not pd.isna(core.loc[d, "sma_150"]) else None,
-                            "sma_200": float(core.loc[d, "sma_200"]) if not pd.isna(core.loc[d, "sma_200"]) else None,
-                            "atr_14": float(atr14.loc[d]) if atr14 is not None and not pd.isna(atr14.loc[d]) else None,
-                            "atr_30": float(atr30.loc[d]) if atr30 is not None and not pd.isna(atr30.loc[d]) else None,
-                            "atrp_14": float(atrp14.loc[d]) if not pd.isna(atrp14.loc[d]) else None,
-                            "atrp_30": float(atrp30.loc[d]) if not pd.isna(atrp30.loc[d]) else None,
-                            "atr_distance": float(atr_distance.loc[d]) if not pd.isna(atr_distance.loc[d]) else None,
-                            "range_pos_20d": float(range20.loc[d]) if not pd.isna(range20.loc[d]) else None,
-                            "range_pos_50d": float(range50.loc[d]) if not pd.isna(range50.loc[d]) else None,
-                            "range_pos_52w": float(range252.loc[d]) if not pd.isna(range252.loc[d]) else None,
-                            "atrx_sma_21": float(atrx_sma21.loc[d]) if not pd.isna(atrx_sma21.loc[d]) else None,
-                            "atrx_sma_50": float(atrx_sma50.loc[d]) if not pd.isna(atrx_sma50.loc[d]) else None,
-                            "atrx_sma_100": float(atrx_sma100.loc[d]) if not pd.isna(atrx_sma100.loc[d]) else None,
-                            "atrx_sma_150": float(atrx_sma150.loc[d]) if not pd.isna(atrx_sma150.loc[d]) else None,
-                            "macd": float(core.loc[d, "macd"]) if "macd" in core.columns and not pd.isna(core.loc[d, "macd"]) else None,
-                            "macd_signal": float(core.loc[d, "macd_signal"]) if "macd_signal" in core.columns and not pd.isna(core.loc[d, "macd_signal"]) else None,
-                            "ma_bucket": ma_bucket,
-                            "stage_label": stage_label if isinstance(stage_label, str) else None,
-                            "stage_label_5d_ago": None,  # computed below
-                            "stage_slope_pct": stage_slope_pct,
-                            "stage_dist_pct": stage_dist_pct,
-                            "rs_mansfield_pct": rs_mansfield_pct,
-                        }
-                        row = {
-                            "symbol": sym,
-                            "analysis_type": "technical_snapshot",
-                            "as_of_date": d,
-                            "current_price": payload.get("current_price"),
-                            "rsi": payload.get("rsi"),
-                            "atr_value": payload.get("atr_14"),
-                            "sma_50": payload.get("sma_50"),
-                            "macd": payload.get("macd"),
-                            "macd_signal": payload.get("macd_signal"),
-                        }
-                        # Add any wide columns that exist on the model.
-                        for k, v in payload.items():
-                            if hasattr(MarketSnapshotHistory, k):
-                                row[k] = v
-                        payload_rows.append(row)
+@shared_task(name="backend.tasks.market_data_tasks.backfill_snapshot_history_last_n_days")
+@task_run("backfill_snapshot_history_last_n_days")
+def backfill_snapshot_history_last_n_days(
+    days: int = 200,
+    batch_size: int = 25,
+    since_date: str | None = None,
+    chunk_size: int | None = None,
+    fan_out: bool = False,
+    restart: bool = False,
+) -> dict:
+    """Backfill `market_snapshot_history` for the last N trading days (SPY calendar) from local DB prices.
 
-                    # Stage 5d ago: compute from daily mapped labels and attach to payloads
-                    try:
-                        if not stage_daily.empty and "stage_label" in stage_daily.columns:
-                            stage_5d = stage_daily["stage_label"].shift(5)
-                            for r in payload_rows:
-                                d = r["as_of_date"]
-                                if d in stage_5d.index:
-                                    lbl = stage_5d.loc[d]
-                                    if isinstance(lbl, str):
-                                        r["stage_label_5d_ago"] = lbl
-                    except Exception:
-                        pass
-
-                    stmt = pg_insert(MarketSnapshotHistory).values(payload_rows)
-                    stmt = stmt.on_conflict_do_update(
-                        constraint="uq_symbol_type_asof",
-                        set_={
-                            "current_price": stmt.excluded.current_price,
-                            "rsi": stmt.excluded.rsi,
-                            "atr_value": stmt.excluded.atr_value,
-                            "sma_50": stmt.excluded.sma_50,
-                            "macd": stmt.excluded.macd,
-                            "macd_signal": stmt.excluded.macd_signal,
-                            # Wide columns: update everything we provided (excluding identity cols).
-                            **{
-                                c.name: getattr(stmt.excluded, c.name)
-                                for c in MarketSnapshotHistory.__table__.columns
-                                if c.name
-                                not in {
-                                    "id",
-                                    "symbol",
-                                    "analysis_type",
-                                    "as_of_date",
-                                    "analysis_timestamp",
-                                }
-                            },
-                        },
-                    )
-                    session.execute(stmt)
-                    session.commit()
-                    written_rows += len(payload_rows)
-                    processed_symbols += 1
-
-                    # Emit progress every ~10 symbols to keep UI responsive without spamming Redis.
-                    if processed_symbols - last_progress_emit >= 10:
-                        last_progress_emit = processed_symbols
-                        _set_task_status(
-                            "backfill_snapshot_history_last_n_days",
-                            "running",
-                            {
-                                "days": int(days),
-                                "symbols": len(ordered),
-                                "estimated_rows": estimated_rows,
-                                "processed_symbols": processed_symbols,
-                                "written_rows": written_rows,
-                                "skipped_no_data": skipped_no_data,
-                                "errors": errors,
-                            },
-                        )
-                except Exception as exc:
-                    session.rollback()
-                    errors += 1
-                    if len(error_samples) < 25:
-                        error_samples.append({"symbol": sym, "error": str(exc)})
+    This computes and stores indicators per day (ledger) so you can later view/backtest
+    historical snapshots. `market_snapshot` remains the fast latest-view.
 
-        res = {
-            "status": "ok" if errors == 0 else "error",
-            "days": int(days),
-            "symbols": len(ordered),
-            "calendar_symbol": calendar_symbol,
-            "processed_symbols": processed_symbols,
-            "written_rows": written_rows,
-            "skipped_no_data": skipped_no_data,
-            "errors": errors,
-            "error_samples": error_samples,
-        }
-        if error_samples:
-            res["error"] = "Sample errors:\n" + "\n".join(
-                f"- {e.get('symbol')}: {e.get('error')}" for e in error_samples
-            )
-        _set_task_status(
-            "backfill_snapshot_history_last_n_days",
-            "ok" if errors == 0 else "error",
-            res,
-        )
-        return res
+    Symbols are processed in checkpointed chunks (task_utils.run_chunked), keyed by the
+    resolved trading-day window: a rerun for the same window resumes from the last
+    completed chunk (restart=True starts over); fan_out=True spreads chunks across bulk
+    workers. `chunk_size` defaults to BACKFILL_CHUNK_SIZE. `batch_size` is deprecated and
+    ignored; it stays in the signature so queued calls and older callers keep working.
+    """
+    import pandas as pd
+
+    session = SessionLocal()
+    try:
+        ordered = _tracked_universe(session)
+        since_dt = None
+        if since_date:
+            try:
+                since_dt = pd.to_datetime(since_date, utc=True).tz_convert(None).normalize().to_pydatetime()
+            except Exception:
+                since_dt = None
+        calendar_symbol, as_of_dates = _snapshot_history_calendar(session, days, since_dt)
     finally:
         session.close()
 
+    if not as_of_dates:
+        err = "No daily bars found in price_data to establish a trading-day calendar (expected SPY or any 1d bars)."
+        _set_task_status("backfill_snapshot_history_last_n_days", "error", {"status": "error", "error": err})
+        return {"status": "error", "error": err}
+
+    def _norm_midnight_utc(dt: object) -> datetime:
+        # Ensure DatetimeIndex-compatible keys while avoiding tz mismatches.
+        ts = pd.to_datetime(dt, utc=True, errors="coerce")
+        if ts is None or pd.isna(ts):
+            raise ValueError(f"Invalid as_of_date value: {dt!r}")
+        return ts.tz_convert(None).normalize().to_pydatetime()
+
+    as_of_days = [_norm_midnight_utc(d) for d in as_of_dates]
+    window = {"days": int(days), "since_date": since_date, "calendar_symbol": calendar_symbol}
+
+    # Progress/observability: estimate total rows upfront (upper bound).
+    estimated_rows = int(len(ordered) * len(as_of_days))
+    _set_task_status(
+        "backfill_snapshot_history_last_n_days",
+        "running",
+        {**window, "symbols": len(ordered), "estimated_rows": estimated_rows},
+    )
+
+    chunked = run_chunked(
+        "backfill_snapshot_history_last_n_days",
+        ordered,
+        params={
+            "calendar_symbol": calendar_symbol,
+            "start_dt": as_of_dates[0].isoformat(),
+            "as_of_days": [d.isoformat() for d in as_of_days],
+        },
+        chunk_size=chunk_size,
+        fan_out=fan_out,
+        restart=restart,
+        on_progress=lambda progress: _set_task_status(
+            "backfill_snapshot_history_last_n_days",
+            "running",
+            {**window, "estimated_rows": estimated_rows, **progress},
+        ),
+    )
+    res = {**window, **chunked}
+    _set_task_status("backfill_snapshot_history_last_n_days", res["status"], res)
+    return res
+
 
 # ============================= Daily Analysis History =============================
 
@@ -1547,15 +1426,7 @@ def record_daily_history(symbols: List[str] | None = None) -> dict:
     session = SessionLocal()
     try:
         if not symbols:
-            # Default to tracked universe (Redis tracked:all, fallback to DB-derived tracked symbols)
-            symbols = []
-            try:
-                raw = market_data_service.redis_client.get("tracked:all")
-                symbols = json.loads(raw) if raw else []
-            except Exception:
-                symbols = []
-            if not symbols:
-                symbols = _get_tracked_universe_from_db(session)
+            symbols = _tracked_universe(session)
         written = 0
         skipped_no_snapshot = 0
         errors = 0
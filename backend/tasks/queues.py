@@ -0,0 +1,73 @@
+"""Celery queue topology.
+
+Each queue is consumed by its own worker pool (see infra/compose.dev.yaml) so a
+user-triggered refresh never waits behind a multi-hour backfill:
+
+- interactive: single-symbol refreshes, alert checks, admin run-now (prefork, small)
+- bulk: long backfills and universe-wide recomputes (prefork, one task per child)
+- io: provider-bound fetches that mostly wait on HTTP (threads pool)
+- account_sync: broker account syncs
+- celery (default): short housekeeping (tracked cache, coverage monitor, digests)
+"""
+
+from __future__ import annotations
+
+from typing import Dict
+
+QUEUE_DEFAULT = "celery"
+QUEUE_INTERACTIVE = "interactive"
+QUEUE_BULK = "bulk"
+QUEUE_IO = "io"
+QUEUE_ACCOUNT_SYNC = "account_sync"
+
+ALL_QUEUES = (QUEUE_DEFAULT, QUEUE_INTERACTIVE, QUEUE_BULK, QUEUE_IO, QUEUE_ACCOUNT_SYNC)
+
+# Run-now keeps these queues; anything else is sent to the interactive pool
+LONG_RUNNING_QUEUES = frozenset({QUEUE_BULK, QUEUE_ACCOUNT_SYNC})
+
+_MD = "backend.tasks.market_data_tasks."
+
+TASK_QUEUES: Dict[str, str] = {
+    # Latency-sensitive
+    _MD + "refresh_single_symbol": QUEUE_INTERACTIVE,
+    _MD + "evaluate_alerts": QUEUE_INTERACTIVE,
+    # Provider-bound fetches
+    _MD + "refresh_index_constituents": QUEUE_IO,
+    _MD + "refresh_fundamentals": QUEUE_IO,
+    _MD + "enrich_index_fundamentals": QUEUE_IO,
+    _MD + "fill_missing_snapshot_fundamentals": QUEUE_IO,
+    _MD + "backfill_symbols": QUEUE_IO,
+    _MD + "backfill_5m_for_symbols": QUEUE_IO,
+    # Long-running, universe-wide
+    _MD + "backfill_last_bars": QUEUE_BULK,
+    _MD + "backfill_daily_since_date": QUEUE_BULK,
+    _MD + "run_backfill_chunk": QUEUE_BULK,
+    _MD + "bootstrap_daily_coverage_tracked": QUEUE_BULK,
+    _MD + "backfill_stale_daily_tracked": QUEUE_BULK,
+    _MD + "recompute_indicators_universe": QUEUE_BULK,
+    _MD + "backfill_snapshot_history_for_date": QUEUE_BULK,
+    _MD + "backfill_snapshot_history_last_n_days": QUEUE_BULK,
+    _MD + "record_daily_history": QUEUE_BULK,
+    _MD + "backfill_5m_last_n_days": QUEUE_BULK,
+    _MD + "enforce_price_data_retention": QUEUE_BULK,
+}
+
+
+def queue_for_task(task: str) -> str:
+    """Queue a dotted task name is routed to."""
+    if task.startswith("backend.tasks.account_sync."):
+        return QUEUE_ACCOUNT_SYNC
+    return TASK_QUEUES.get(task, QUEUE_DEFAULT)
+
+
+def run_now_queue(task: str) -> str:
+    """Queue for an on-demand admin run: long-running tasks stay in their pool."""
+    queue = queue_for_task(task)
+    return queue if queue in LONG_RUNNING_QUEUES else QUEUE_INTERACTIVE
+
+
+def task_routes() -> Dict[str, Dict[str, str]]:
+    """Celery `task_routes` built from the table above."""
+    routes: Dict[str, Dict[str, str]] = {"backend.tasks.account_sync.*": {"queue": QUEUE_ACCOUNT_SYNC}}
+    routes.update({task: {"queue": queue} for task, queue in TASK_QUEUES.items()})
+    return routes
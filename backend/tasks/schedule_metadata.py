@@ -46,6 +46,13 @@ class HookConfig(BaseModel):
     slow_threshold_s: Optional[float] = None
 
 
+class ProfileConfig(BaseModel):
+    """Opt-in sampling profiler; the folded-stack profile is stored on the JobRun."""
+
+    enabled: bool = False
+    interval_ms: int = 10
+
+
 class ScheduleMetadata(BaseModel):
     """Rich metadata persisted alongside each RedBeat schedule."""
 
@@ -56,6 +63,7 @@ class ScheduleMetadata(BaseModel):
     preflight_checks: List[str] = Field(default_factory=list)
     safety: SafetyConfig = Field(default_factory=SafetyConfig)
     hooks: HookConfig = Field(default_factory=HookConfig)
+    profile: ProfileConfig = Field(default_factory=ProfileConfig)
     notes: Optional[str] = None
     audit: Dict[str, Any] = Field(default_factory=dict)
 
@@ -80,6 +88,7 @@ class ScheduleMetadataPatch(BaseModel):
     preflight_checks: Optional[List[str]] = None
     safety: Optional[SafetyConfig] = None
     hooks: Optional[HookConfig] = None
+    profile: Optional[ProfileConfig] = None
     notes: Optional[str] = None
 
     def apply(self, base: ScheduleMetadata | None) -> ScheduleMetadata:
@@ -92,6 +101,8 @@ class ScheduleMetadataPatch(BaseModel):
             payload["safety"] = payload["safety"].dict()
         if "hooks" in payload and isinstance(payload["hooks"], HookConfig):
             payload["hooks"] = payload["hooks"].dict()
+        if "profile" in payload and isinstance(payload["profile"], ProfileConfig):
+            payload["profile"] = payload["profile"].dict()
         data.update(payload)
         return ScheduleMetadata(**data)
 
@@ -152,6 +163,7 @@ def delete_schedule_metadata(name: str, client: Optional[redis.Redis] = None) ->
 __all__ = [
     "HookConfig",
     "MaintenanceWindow",
+    "ProfileConfig",
     "ScheduleMetadata",
     "ScheduleMetadataPatch",
     "SafetyConfig",
@@ -1,27 +1,54 @@
 from __future__ import annotations
 
+import hashlib
 import json
 import functools
+import logging
 import traceback
+from contextvars import ContextVar
 from datetime import datetime, timedelta
-from typing import Any, Callable, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional
 
-from celery import current_task
+from celery import current_app, current_task
 
 from backend.config import settings
 from backend.database import SessionLocal
 from backend.models import JobRun
 from backend.services.market.market_data_service import market_data_service
 from backend.services.alerts import alert_service
+from backend.services.metrics import TASK_DURATION
+from backend.services.tracing import RunTrace, SamplingProfiler
+from backend.tasks.queues import QUEUE_BULK
 from backend.tasks.schedule_metadata import HookConfig, ScheduleMetadata
 
+logger = logging.getLogger(__name__)
+
+# JobRun id of the enclosing task_run() invocation
+_current_job_id: ContextVar[Optional[int]] = ContextVar("task_run_job_id", default=None)
+
+
+# ScheduleMetadata of the enclosing task_run() invocation (fanned-out chunks close the
+# parent run with the same hooks)
+_current_schedule_metadata: ContextVar[Optional[ScheduleMetadata]] = ContextVar(
+    "task_run_schedule_metadata", default=None
+)
+
+
+def current_job_id() -> Optional[int]:
+    """JobRun id of the task_run() currently executing (None outside one)."""
+    return _current_job_id.get()
+
 
 def task_run(task_name: str, *, lock_key: Optional[Callable[..., Optional[str]]] = None, lock_ttl_seconds: int = 1800):
     """
     Decorator to standardize task execution:
     - Optional Redis lock to prevent duplicate work (by computed key)
     - Write JobRun row with status running/ok/error and counters from returned dict
+    - Aggregate `span()` stages into JobRun.counters["stages"]; store a folded-stack
+      profile on JobRun.profile when the schedule opts in (ScheduleMetadata.profile)
     - Publish last-run status into Redis key: taskstatus:{task_name}:last
+    - A returned {"status": "running"} leaves the JobRun open; fanned-out chunks
+      finish it (see run_chunked)
     """
 
     def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
@@ -57,8 +84,13 @@ def task_run(task_name: str, *, lock_key: Optional[Callable[..., Optional[str]]]
                 _publish_status(task_name, "running", {"id": job.id, "params": kwargs})
             except Exception:
                 pass
+            trace = RunTrace()
+            profiler = _start_profiler(meta)
+            job_token = _current_job_id.set(job.id)
+            meta_token = _current_schedule_metadata.set(meta)
             try:
-                result = func(*args, **kwargs)
+                with trace.activate():
+                    result = func(*args, **kwargs)
                 counters = None
                 if isinstance(result, dict):
                     counters = {k: v for k, v in result.items() if k not in ("status", "error")}
@@ -70,56 +102,51 @@ def task_run(task_name: str, *, lock_key: Optional[Callable[..., Optional[str]]]
                             job.error = str(nonfatal_error)[:10000]
                     except Exception:
                         pass
-                job.status = "ok"
-                job.finished_at = datetime.utcnow()
+                if isinstance(result, dict) and result.get("status") == "running":
+                    # Lock the row: a fast final chunk may already have closed the run, and
+                    # its aggregated counters must not be overwritten by the dispatch summary.
+                    session.refresh(job, with_for_update=True)
+                    if job.status == "running":
+                        job.counters = {**(job.counters or {}), **(counters or {})}
+                        _record_trace(job, trace, profiler)
+                    session.commit()
+                    if job.status == "running":
+                        try:
+                            _publish_status(task_name, "running", {"id": job.id, "payload": result})
+                        except Exception:
+                            pass
+                    return result
                 if counters:
                     job.counters = counters
-                session.commit()
-                try:
-                    _publish_status(task_name, "ok", {"id": job.id, "payload": result})
-                except Exception:
-                    pass
-                duration = _job_duration_seconds(job)
-                _emit_alerts(
-                    event="success",
-                    task_name=task_name,
-                    job=job,
+                _record_trace(job, trace, profiler)
+                _close_job(
+                    session,
+                    job,
+                    task_name,
+                    status="ok",
                     hooks=hooks,
-                    duration_s=duration,
                     meta=meta,
                     counters=counters,
+                    published={"id": job.id, "payload": result},
                 )
-                if _is_slow_run(duration, meta, hooks):
-                    _emit_alerts(
-                        event="slow",
-                        task_name=task_name,
-                        job=job,
-                        hooks=hooks,
-                        duration_s=duration,
-                        meta=meta,
-                        counters=counters,
-                    )
                 return result
             except Exception as exc:
-                job.status = "error"
                 job.error = f"{exc}\n{traceback.format_exc()}"
-                job.finished_at = datetime.utcnow()
-                session.commit()
-                try:
-                    _publish_status(task_name, "error", {"id": job.id, "error": str(exc)})
-                except Exception:
-                    pass
-                _emit_alerts(
-                    event="failure",
-                    task_name=task_name,
-                    job=job,
+                _record_trace(job, trace, profiler)
+                _close_job(
+                    session,
+                    job,
+                    task_name,
+                    status="error",
                     hooks=hooks,
-                    duration_s=_job_duration_seconds(job),
                     meta=meta,
                     error=str(exc),
+                    published={"id": job.id, "error": str(exc)},
                 )
                 raise
             finally:
+                _current_job_id.reset(job_token)
+                _current_schedule_metadata.reset(meta_token)
                 session.close()
                 if lock_id is not None:
                     try:
@@ -132,6 +159,26 @@ def task_run(task_name: str, *, lock_key: Optional[Callable[..., Optional[str]]]
     return decorator
 
 
+def _start_profiler(meta: ScheduleMetadata | None) -> SamplingProfiler | None:
+    if not meta or not meta.profile or not meta.profile.enabled:
+        return None
+    try:
+        return SamplingProfiler(interval_s=max(1, int(meta.profile.interval_ms)) / 1000.0).start()
+    except Exception:
+        return None
+
+
+def _record_trace(job: JobRun, trace: RunTrace, profiler: SamplingProfiler | None) -> None:
+    """Merge stage aggregates into counters and attach the profile (if any)."""
+    stages = trace.summary()
+    if stages:
+        job.counters = {**(job.counters or {}), "stages": stages}
+    if profiler is not None:
+        profiler.stop()
+        if profiler.samples:
+            job.profile = profiler.folded()
+
+
 def _publish_status(task: str, status: str, payload: dict | None = None) -> None:
     r = market_data_service.redis_client
     r.set(
@@ -256,4 +303,516 @@ def _emit_alerts(
     )
 
 
+def _close_job(
+    session,
+    job: JobRun,
+    task_name: str,
+    *,
+    status: str,
+    hooks: HookConfig | None,
+    meta: ScheduleMetadata | None,
+    counters: dict | None = None,
+    error: Optional[str] = None,
+    published: dict | None = None,
+) -> None:
+    """Finish a JobRun: commit status, publish last-run status, record duration, alert.
+
+    Shared by task_run() and the chunk that completes a fanned-out run.
+    """
+    job.status = status
+    job.finished_at = datetime.utcnow()
+    session.commit()
+    try:
+        _publish_status(task_name, status, published or {"id": job.id})
+    except Exception:
+        pass
+    duration = _job_duration_seconds(job)
+    TASK_DURATION.observe(duration, task=task_name, status=status)
+    event = "success" if status == "ok" else "failure"
+    _emit_alerts(
+        event=event,
+        task_name=task_name,
+        job=job,
+        hooks=hooks,
+        duration_s=duration,
+        meta=meta,
+        counters=counters if status == "ok" else None,
+        error=error,
+    )
+    if status == "ok" and _is_slow_run(duration, meta, hooks):
+        _emit_alerts(
+            event="slow",
+            task_name=task_name,
+            job=job,
+            hooks=hooks,
+            duration_s=duration,
+            meta=meta,
+            counters=counters,
+        )
+
+
+# ---------------------------------------------------------------------------
+# Checkpointed, chunked backfills
+# ---------------------------------------------------------------------------
+
+CHUNK_TASK = "backend.tasks.market_data_tasks.run_backfill_chunk"
+ERROR_SAMPLE_LIMIT = 25
+
+# task name -> fn(symbols, params) -> counters dict; registered with @chunk_runner
+_CHUNK_RUNNERS: Dict[str, Callable[[List[str], Dict[str, Any]], Dict[str, Any]]] = {}
+
+
+def chunk_runner(task_name: str):
+    """Register the per-chunk worker for a chunked backfill.
+
+    The runner must be idempotent (re-running a chunk rewrites the same rows) and
+    return a counters dict; ints are summed, dicts of ints merged and lists
+    concatenated across chunks (see merge_counters).
+    """
+
+    def decorator(func: Callable[[List[str], Dict[str, Any]], Dict[str, Any]]):
+        _CHUNK_RUNNERS[task_name] = func
+        return func
+
+    return decorator
+
+
+def merge_counters(results: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Sum per-chunk counters into one dict (lists are capped at ERROR_SAMPLE_LIMIT)."""
+    out: Dict[str, Any] = {}
+    for res in results:
+        for k, v in (res or {}).items():
+            if isinstance(v, bool):
+                continue
+            if isinstance(v, (int, float)):
+                out[k] = out.get(k, 0) + v
+            elif isinstance(v, dict):
+                merged = out.setdefault(k, {})
+                for sub_k, sub_v in v.items():
+                    if isinstance(sub_v, (int, float)) and not isinstance(sub_v, bool):
+                        merged[sub_k] = merged.get(sub_k, 0) + sub_v
+            elif isinstance(v, list):
+                bucket = out.setdefault(k, [])
+                bucket.extend(v[: max(0, ERROR_SAMPLE_LIMIT - len(bucket))])
+    return out
+
+
+class BackfillCheckpoint:
+    """Redis-persisted cursor for a backfill split into symbol-range chunks.
+
+    Keys under backfill:{task}:{sha1(identity)[:16]}, all expiring after
+    BACKFILL_CHECKPOINT_TTL_HOURS (refreshed on every write):
+    - <key>          JSON state: symbols, chunk_size, params, parent job_id
+    - <key>:done     set of completed chunk indexes
+    - <key>:results  hash chunk index -> counters JSON
+    - <key>:failed   hash chunk index -> error text
+
+    The same task + identity resumes the stored state (symbol list included) until
+    the run completes and clears it. Everything read or written is mirrored in memory,
+    so when Redis fails (up front or mid-run) the checkpoint carries on from the mirror
+    for the rest of this invocation.
+    """
+
+    def __init__(self, task_name: str, identity: Dict[str, Any], redis_client=None):
+        self.task_name = task_name
+        digest = hashlib.sha1(json.dumps(identity, sort_keys=True, default=str).encode()).hexdigest()[:16]
+        self.key = f"backfill:{task_name}:{digest}"
+        self._redis = redis_client
+        self._offline = False
+        self._memory: Dict[str, Any] = {"state": None, "done": set(), "results": {}, "failed": {}}
+
+    @classmethod
+    def from_key(cls, task_name: str, key: str, redis_client=None) -> "BackfillCheckpoint":
+        checkpoint = cls(task_name, {}, redis_client=redis_client)
+        checkpoint.key = key
+        return checkpoint
+
+    @property
+    def redis(self):
+        if self._offline:
+            return None
+        if self._redis is None:
+            try:
+                self._redis = market_data_service.redis_client
+            except Exception as exc:
+                self._fallback(exc)
+        return self._redis
+
+    @property
+    def ttl_seconds(self) -> int:
+        return int(getattr(settings, "BACKFILL_CHECKPOINT_TTL_HOURS", 72)) * 3600
+
+    def _fallback(self, exc: Exception) -> None:
+        if not self._offline:
+            logger.warning(f"⚠️ Backfill checkpoint {self.key} kept in memory (Redis unavailable): {exc}")
+        self._offline = True
+
+    def _call(self, op: Callable[[Any], Any], memory: Callable[[], Any]) -> Any:
+        """Run `op(redis)`; on a Redis error (or without Redis) answer from the mirror."""
+        client = self.redis
+        if client is not None:
+            try:
+                return op(client)
+            except Exception as exc:
+                self._fallback(exc)
+        return memory()
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        def _read(r):
+            raw = r.get(self.key)
+            self._memory["state"] = None if raw is None else json.loads(raw.decode() if isinstance(raw, bytes) else raw)
+            return self._memory["state"]
+
+        return self._call(_read, lambda: self._memory["state"])
+
+    def begin(
+        self,
+        symbols: List[str],
+        *,
+        chunk_size: int,
+        params: Dict[str, Any],
+        job_id: Optional[int],
+        restart: bool = False,
+    ) -> Dict[str, Any]:
+        """Resume the stored state (adopting it for `job_id`) or start a new one."""
+        if restart:
+            self.clear()
+        state = self.load()
+        if state is None:
+            state = {
+                "symbols": list(symbols),
+                "chunk_size": max(1, int(chunk_size)),
+                "params": params,
+                "created_at": datetime.utcnow().isoformat(),
+            }
+        state["previous_job_id"] = state.get("job_id")
+        state["job_id"] = job_id
+        state.pop("fanned_out", None)
+        self._save_state(state)
+        self._clear_failed()  # failed chunks are retried by this run
+        return state
+
+    def _save_state(self, state: Dict[str, Any]) -> None:
+        self._memory["state"] = state
+        self._call(lambda r: r.setex(self.key, self.ttl_seconds, json.dumps(state, default=str)), lambda: None)
+
+    def _clear_failed(self) -> None:
+        self._memory["failed"].clear()
+        self._call(lambda r: r.delete(self.key + ":failed"), lambda: None)
+
+    @staticmethod
+    def chunks(state: Dict[str, Any]) -> List[List[str]]:
+        symbols, size = state["symbols"], int(state["chunk_size"])
+        return [symbols[i : i + size] for i in range(0, len(symbols), size)]
+
+    def done(self) -> set:
+        def _read(r):
+            self._memory["done"] = {int(m) for m in r.smembers(self.key + ":done")}
+            return set(self._memory["done"])
+
+        return self._call(_read, lambda: set(self._memory["done"]))
+
+    def results(self) -> List[Dict[str, Any]]:
+        def _read(r):
+            self._memory["results"] = {int(k): json.loads(v) for k, v in r.hgetall(self.key + ":results").items()}
+            return list(self._memory["results"].values())
+
+        return self._call(_read, lambda: list(self._memory["results"].values()))
+
+    def failed(self) -> Dict[int, str]:
+        def _read(r):
+            self._memory["failed"] = {
+                int(k): (v.decode() if isinstance(v, bytes) else v)
+                for k, v in r.hgetall(self.key + ":failed").items()
+            }
+            return dict(self._memory["failed"])
+
+        return self._call(_read, lambda: dict(self._memory["failed"]))
+
+    def _last_in_memory(self, new: bool, total: int) -> bool:
+        return new and len(self._memory["done"]) + len(self._memory["failed"]) >= total
+
+    def record(self, index: int, counters: Dict[str, Any], total: int) -> bool:
+        """Mark a chunk done; True when this call accounted for the last outstanding chunk."""
+        new = index not in self._memory["done"]
+        self._memory["done"].add(index)
+        self._memory["results"][index] = counters
+        self._memory["failed"].pop(index, None)
+
+        def _write(r):
+            pipe = r.pipeline()
+            pipe.hset(self.key + ":results", str(index), json.dumps(counters, default=str))
+            pipe.hdel(self.key + ":failed", str(index))
+            pipe.sadd(self.key + ":done", index)
+            pipe.scard(self.key + ":done")
+            pipe.hlen(self.key + ":failed")
+            for suffix in ("", ":done", ":results"):
+                pipe.expire(self.key + suffix, self.ttl_seconds)
+            _, _, added, n_done, n_failed = pipe.execute()[:5]
+            return bool(added) and int(n_done) + int(n_failed) >= total
+
+        return self._call(_write, lambda: self._last_in_memory(new, total))
+
+    def fail(self, index: int, error: str, total: int) -> bool:
+        """Record a failed chunk (retried on resume); True when it was the last outstanding one."""
+        new = index not in self._memory["failed"]
+        self._memory["failed"][index] = error
+
+        def _write(r):
+            pipe = r.pipeline()
+            pipe.hset(self.key + ":failed", str(index), error[:2000])
+            pipe.expire(self.key + ":failed", self.ttl_seconds)
+            pipe.scard(self.key + ":done")
+            pipe.hlen(self.key + ":failed")
+            added, _, n_done, n_failed = pipe.execute()
+            return bool(added) and int(n_done) + int(n_failed) >= total
+
+        return self._call(_write, lambda: self._last_in_memory(new, total))
+
+    def progress(self, total: int) -> Dict[str, Any]:
+        failed = self.failed()
+        return {
+            **merge_counters(self.results()),
+            "chunks_total": total,
+            "chunks_done": len(self.done()),
+            "chunks_failed": len(failed),
+            "chunk_errors": [{"chunk": i, "error": e[:500]} for i, e in sorted(failed.items())][:ERROR_SAMPLE_LIMIT],
+        }
+
+    def clear(self) -> None:
+        self._memory = {"state": None, "done": set(), "results": {}, "failed": {}}
+        self._call(
+            lambda r: r.delete(self.key, self.key + ":done", self.key + ":results", self.key + ":failed"),
+            lambda: None,
+        )
+
+
+class StepCheckpoint:
+    """Results of completed steps of a multi-step task, so a restarted run skips them.
+
+    Redis hash backfill:{task}:{sha1(identity)[:16]}:steps (BACKFILL_CHECKPOINT_TTL_HOURS);
+    best-effort: without Redis every step simply runs.
+    """
+
+    def __init__(self, task_name: str, identity: Dict[str, Any], redis_client=None):
+        digest = hashlib.sha1(json.dumps(identity, sort_keys=True, default=str).encode()).hexdigest()[:16]
+        self.key = f"backfill:{task_name}:{digest}:steps"
+        self._redis = redis_client
+
+    @property
+    def redis(self):
+        return self._redis if self._redis is not None else market_data_service.redis_client
+
+    def get(self, step: str) -> Optional[Dict[str, Any]]:
+        try:
+            raw = self.redis.hget(self.key, step)
+            return json.loads(raw) if raw is not None else None
+        except Exception:
+            return None
+
+    def save(self, step: str, result: Dict[str, Any]) -> None:
+        try:
+            pipe = self.redis.pipeline()
+            pipe.hset(self.key, step, json.dumps(result, default=str))
+            pipe.expire(self.key, int(getattr(settings, "BACKFILL_CHECKPOINT_TTL_HOURS", 72)) * 3600)
+            pipe.execute()
+        except Exception:
+            pass
+
+    def clear(self) -> None:
+        try:
+            self.redis.delete(self.key)
+        except Exception:
+            pass
+
+
+def _update_job(job_id: Optional[int], counters: Dict[str, Any]) -> None:
+    """Merge progress counters into a JobRun that is still running."""
+    if job_id is None:
+        return
+    session = SessionLocal()
+    try:
+        job = session.get(JobRun, job_id, with_for_update=True)
+        if job is None or job.status != "running":
+            return
+        job.counters = {**(job.counters or {}), **counters}
+        session.commit()
+    except Exception as exc:
+        session.rollback()
+        logger.warning(f"⚠️ Could not update JobRun {job_id} progress: {exc}")
+    finally:
+        session.close()
+
+
+def _complete_fanned_out(task_name: str, state: Dict[str, Any], res: Dict[str, Any]) -> None:
+    """Close the parent JobRun of a fanned-out backfill the way task_run() closes inline runs."""
+    job_id = state.get("job_id")
+    if job_id is None:
+        return
+    meta = ScheduleMetadata(**state["schedule_metadata"]) if state.get("schedule_metadata") else None
+    hooks = (meta.hooks if meta else None) or _default_hooks()
+    status = "ok" if res["status"] == "ok" else "error"
+    session = SessionLocal()
+    try:
+        job = session.get(JobRun, job_id, with_for_update=True)
+        if job is None or job.status != "running":
+            return
+        counters = {k: v for k, v in res.items() if k not in ("status", "error")}
+        job.counters = {**(job.counters or {}), **counters}
+        if res.get("error"):
+            job.error = str(res["error"])[:10000]
+        _close_job(
+            session,
+            job,
+            task_name,
+            status=status,
+            hooks=hooks,
+            meta=meta,
+            counters=counters,
+            error=res.get("error") if status == "error" else None,
+            published={"id": job_id, "payload": res},
+        )
+    except Exception as exc:
+        session.rollback()
+        logger.warning(f"⚠️ Could not close JobRun {job_id}: {exc}")
+    finally:
+        session.close()
+
+
+def _job_running(job_id: Optional[int]) -> bool:
+    """True when `job_id` names a JobRun still marked running."""
+    if job_id is None:
+        return False
+    session = SessionLocal()
+    try:
+        job = session.get(JobRun, job_id)
+        return job is not None and job.status == "running"
+    except Exception:
+        return False
+    finally:
+        session.close()
+
+
+def _supersede_job(previous_job_id: Optional[int], job_id: Optional[int]) -> None:
+    """Close a parent run that died mid-backfill; its chunks now count towards `job_id`."""
+    if previous_job_id is None or previous_job_id == job_id:
+        return
+    session = SessionLocal()
+    try:
+        job = session.get(JobRun, previous_job_id)
+        if job is not None and job.status == "running":
+            job.status = "cancelled"
+            job.finished_at = datetime.utcnow()
+            job.error = f"Interrupted; resumed by job {job_id}"
+            session.commit()
+    except Exception:
+        session.rollback()
+    finally:
+        session.close()
+
+
+def _finish_chunked(checkpoint: BackfillCheckpoint, total: int) -> Dict[str, Any]:
+    """Aggregate chunk counters; clear the checkpoint once every chunk succeeded."""
+    progress = checkpoint.progress(total)
+    complete = progress["chunks_done"] >= total
+    errors = progress.get("errors", 0) + progress["chunks_failed"]
+    res = {"status": "ok" if complete and not errors else "error", **progress}
+    lines = [f"- {e.get('symbol')}: {e.get('error')}" for e in progress.get("error_samples", [])]
+    lines += [f"- chunk {e['chunk']} (retried on the next run): {e['error']}" for e in progress["chunk_errors"]]
+    if lines:
+        res["error"] = "Sample errors:\n" + "\n".join(lines)
+    if complete:
+        checkpoint.clear()
+    return res
+
+
+def run_chunked(
+    task_name: str,
+    symbols: List[str],
+    *,
+    params: Dict[str, Any],
+    identity: Optional[Dict[str, Any]] = None,
+    chunk_size: Optional[int] = None,
+    fan_out: bool = False,
+    restart: bool = False,
+    on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """Run the registered chunk runner over `symbols` in checkpointed chunks.
+
+    - Chunks already completed under the same task + identity (default: params) are
+      skipped, so a run interrupted by a worker restart picks up where it stopped
+    - Inline (default): chunks run here one after another; the parent JobRun's
+      counters are updated after each
+    - fan_out=True: pending chunks are queued as run_backfill_chunk subtasks on the
+      bulk queue and this returns {"status": "running"}; the chunk that completes
+      last closes the parent JobRun with the aggregated counters
+    - While a fanned-out parent is still running, another trigger is skipped instead
+      of superseding it and re-dispatching its chunks (restart=True overrides)
+    """
+    runner = _CHUNK_RUNNERS[task_name]
+    job_id = current_job_id()
+    checkpoint = BackfillCheckpoint(task_name, identity or params)
+    stored = None if restart else checkpoint.load()
+    if stored and stored.get("fanned_out") and stored.get("job_id") != job_id and _job_running(stored.get("job_id")):
+        logger.info(f"⏭️ {task_name} already running as job {stored['job_id']}; chunks still in flight")
+        return {"status": "skipped", "reason": "chunks in flight", "running_job_id": stored["job_id"]}
+    state = checkpoint.begin(
+        symbols,
+        chunk_size=chunk_size or int(getattr(settings, "BACKFILL_CHUNK_SIZE", 100)),
+        params=params,
+        job_id=job_id,
+        restart=restart,
+    )
+    _supersede_job(state.get("previous_job_id"), job_id)
+    chunks = checkpoint.chunks(state)
+    done = checkpoint.done()
+    pending = [i for i in range(len(chunks)) if i not in done]
+    base = {"symbols": len(state["symbols"]), "chunks_total": len(chunks), "chunks_resumed": len(done)}
+    if done:
+        logger.info(f"🔁 {task_name} resuming: {len(done)}/{len(chunks)} chunks already done")
+
+    if fan_out and pending and checkpoint.redis is not None:
+        meta = _current_schedule_metadata.get()
+        checkpoint._save_state(
+            {**state, "fanned_out": True, "schedule_metadata": meta.model_dump(mode="json") if meta else None}
+        )
+        for index in pending:
+            current_app.send_task(CHUNK_TASK, args=[task_name, checkpoint.key, index], queue=QUEUE_BULK)
+        return {"status": "running", **base, "chunks_dispatched": len(pending)}
+
+    for index in pending:
+        try:
+            counters = runner(chunks[index], state["params"])
+            checkpoint.record(index, counters or {}, len(chunks))
+        except Exception as exc:
+            logger.warning(f"⚠️ {task_name} chunk {index} failed: {exc}")
+            checkpoint.fail(index, str(exc), len(chunks))
+        progress = checkpoint.progress(len(chunks))
+        _update_job(job_id, {**base, **progress})
+        if on_progress is not None:
+            on_progress({**base, **progress})
+    return {**base, **_finish_chunked(checkpoint, len(chunks))}
+
 
+def execute_chunk(task_name: str, key: str, index: int) -> Dict[str, Any]:
+    """Body of the run_backfill_chunk subtask: run one chunk (unless done) and record it."""
+    checkpoint = BackfillCheckpoint.from_key(task_name, key)
+    state = checkpoint.load()
+    if state is None:
+        return {"status": "skipped", "reason": "checkpoint expired or cleared", "chunk": index}
+    chunks = checkpoint.chunks(state)
+    if index in checkpoint.done():
+        return {"status": "skipped", "reason": "already done", "chunk": index}
+    try:
+        counters = _CHUNK_RUNNERS[task_name](chunks[index], state["params"])
+        last = checkpoint.record(index, counters or {}, len(chunks))
+    except Exception as exc:
+        last = checkpoint.fail(index, str(exc), len(chunks))
+        counters = {"error": str(exc)}
+    job_id = state.get("job_id")
+    if last:
+        res = {"symbols": len(state["symbols"]), **_finish_chunked(checkpoint, len(chunks))}
+        _complete_fanned_out(task_name, state, res)
+    else:
+        _update_job(job_id, checkpoint.progress(len(chunks)))
+    return {"status": "ok", "chunk": index, **(counters or {})}
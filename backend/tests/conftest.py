@@ -20,6 +20,20 @@ def _enable_fast_test_mode():
     os.environ.pop("QUANTMATRIX_TESTING", None)
 
 
+@pytest.fixture(autouse=True, scope="session")
+def _pin_sdk_provider_transport():
+    """Provider calls go through fmpsdk (which tests monkeypatch), never real HTTP."""
+    from backend.config import settings
+    from backend.services.market.provider_transport import set_provider_transport
+
+    previous_kind = settings.MARKET_PROVIDER_TRANSPORT
+    settings.MARKET_PROVIDER_TRANSPORT = "sdk"
+    previous = set_provider_transport(None)
+    yield
+    settings.MARKET_PROVIDER_TRANSPORT = previous_kind
+    set_provider_transport(previous)
+
+
 # Add the backend directory to the Python path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
@@ -184,6 +198,128 @@ def _no_global_cleanup_marker():
     yield
 
 
+class _FakePipeline:
+    """Queues commands and runs them against the fake on execute()."""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+            return self
+
+        return queue
+
+    def execute(self):
+        calls, self.calls = self.calls, []
+        return [getattr(self.redis, name)(*args, **kwargs) for name, args, kwargs in calls]
+
+
+class FakeRedis:
+    """In-memory stand-in for the redis-py commands used by the services.
+
+    Like redis-py without decode_responses, reads return bytes. `gets` records GET
+    keys and `published` the (channel, message) pairs.
+    """
+
+    def __init__(self):
+        self.store = {}
+        self.gets = []
+        self.published = []
+
+    @staticmethod
+    def _encode(value):
+        if value is None or isinstance(value, bytes):
+            return value
+        return str(value).encode()
+
+    # Strings
+    def get(self, key):
+        self.gets.append(key)
+        return self._encode(self.store.get(key))
+
+    def mget(self, keys):
+        return [self.get(k) for k in keys]
+
+    def set(self, key, value, **_):
+        self.store[key] = value
+        return True
+
+    def setex(self, key, _ttl, value):
+        self.store[key] = value
+        return True
+
+    def incr(self, key):
+        self.store[key] = str(int(self.store.get(key) or 0) + 1)
+        return int(self.store[key])
+
+    def expire(self, key, _ttl):
+        return key in self.store
+
+    def delete(self, *keys):
+        return sum(self.store.pop(k, None) is not None for k in keys)
+
+    def publish(self, channel, message):
+        self.published.append((channel, message))
+        return 0
+
+    # Sets
+    def sadd(self, key, member):
+        members = self.store.setdefault(key, set())
+        added = str(member) not in members
+        members.add(str(member))
+        return int(added)
+
+    def smembers(self, key):
+        return {self._encode(m) for m in self.store.get(key, set())}
+
+    def scard(self, key):
+        return len(self.store.get(key, set()))
+
+    # Hashes
+    def hset(self, key, field, value):
+        bucket = self.store.setdefault(key, {})
+        added = field not in bucket
+        bucket[field] = value
+        return int(added)
+
+    def hget(self, key, field):
+        return self._encode(self.store.get(key, {}).get(field))
+
+    def hdel(self, key, field):
+        return int(self.store.get(key, {}).pop(field, None) is not None)
+
+    def hvals(self, key):
+        return [self._encode(v) for v in self.store.get(key, {}).values()]
+
+    def hgetall(self, key):
+        return {self._encode(k): self._encode(v) for k, v in self.store.get(key, {}).items()}
+
+    def hlen(self, key):
+        return len(self.store.get(key, {}))
+
+    def hincrby(self, key, field, amount=1):
+        bucket = self.store.setdefault(key, {})
+        bucket[field] = int(bucket.get(field, 0)) + int(amount)
+        return bucket[field]
+
+    def hincrbyfloat(self, key, field, amount=1.0):
+        bucket = self.store.setdefault(key, {})
+        bucket[field] = float(bucket.get(field, 0.0)) + float(amount)
+        return bucket[field]
+
+    def pipeline(self):
+        return _FakePipeline(self)
+
+
+@pytest.fixture
+def fake_redis():
+    """Fresh in-memory Redis (see FakeRedis) for tests that must not touch a real one."""
+    return FakeRedis()
+
+
 @pytest.fixture
 def sample_user():
     """Create a sample user for testing."""
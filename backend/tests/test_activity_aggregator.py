@@ -0,0 +1,222 @@
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import inspect
+
+from backend.models import BrokerAccount, User
+from backend.models.trade import Trade
+from backend.models.transaction import Dividend, Transaction, TransactionType
+from backend.services.portfolio import activity_aggregator as aggregator_module
+from backend.services.portfolio.activity_aggregator import activity_aggregator
+
+
+@pytest.fixture
+def accounts(db_session):
+    if not inspect(db_session.bind).has_table("portfolio_activity"):
+        pytest.skip("activity tables not migrated")
+    from backend.models.broker_account import AccountType, BrokerType
+
+    user = User(email="activity@example.com", username="activity_user")
+    db_session.add(user)
+    db_session.flush()
+    out = []
+    for n in (1, 2):
+        acct = BrokerAccount(
+            user_id=user.id,
+            account_number=f"ACTIVITY_TEST_{n}",
+            account_name=f"Activity {n}",
+            broker=BrokerType.IBKR,
+            account_type=AccountType.TAXABLE,
+        )
+        db_session.add(acct)
+        out.append(acct)
+    db_session.flush()
+    return out
+
+
+def _trade(account_id, side, qty, price, when, symbol="AAPL"):
+    return Trade(
+        account_id=account_id,
+        symbol=symbol,
+        side=side,
+        quantity=qty,
+        price=price,
+        total_value=qty * price,
+        execution_time=when,
+    )
+
+
+def _seed(db_session, acct, day):
+    when = datetime.combine(day, datetime.min.time()) + timedelta(hours=15)
+    db_session.add_all(
+        [
+            _trade(acct.id, "BUY", 10, 100.0, when),
+            _trade(acct.id, "SELL", 4, 110.0, when + timedelta(minutes=5)),
+            Transaction(
+                account_id=acct.id,
+                symbol="USD",
+                transaction_type=TransactionType.DEPOSIT,
+                amount=1000.0,
+                net_amount=1000.0,
+                transaction_date=when,
+            ),
+            Dividend(
+                account_id=acct.id,
+                symbol="AAPL",
+                ex_date=when,
+                dividend_per_share=0.5,
+                shares_held=10,
+                total_dividend=5.0,
+                net_dividend=5.0,
+            ),
+        ]
+    )
+    db_session.flush()
+
+
+def _daily(db_session, account_id):
+    return {r["day"]: r for r in activity_aggregator.get_daily_summary(db_session, account_id=account_id)}
+
+
+def test_refresh_is_scoped_to_accounts_and_days(db_session, accounts):
+    a, b = accounts
+    old_day = date.today() - timedelta(days=90)
+    _seed(db_session, a, old_day)
+    _seed(db_session, b, old_day)
+    res = activity_aggregator.refresh(db_session, account_ids=[a.id, b.id])
+    assert res["errors"] == [] and res["rows"] == 8
+
+    daily = _daily(db_session, a.id)[old_day]
+    assert (daily["trade_count"], daily["buy_count"], daily["sell_count"]) == (2, 1, 1)
+    assert float(daily["money_in"]) == pytest.approx(440.0 + 1000.0 + 5.0)
+    assert float(daily["money_out"]) == pytest.approx(1000.0)
+
+    # New activity for both accounts; only account A is refreshed, from today
+    today = date.today()
+    _seed(db_session, a, today)
+    _seed(db_session, b, today)
+    res = activity_aggregator.refresh(db_session, account_ids=[a.id], since=today)
+    assert res["rows"] == 4 and res["days"] == 1
+    assert set(_daily(db_session, a.id)) == {old_day, today}
+    assert set(_daily(db_session, b.id)) == {old_day}
+
+    rows = activity_aggregator.get_activity(db_session, account_id=a.id, category="TRADE")
+    assert [r["side"] for r in rows] == ["SELL", "BUY", "SELL", "BUY"]
+    assert {r["src"] for r in activity_aggregator.get_activity(db_session, account_id=a.id)} == {
+        "trades",
+        "transactions",
+        "dividends",
+    }
+
+    # Per-symbol summaries aggregate the activity rows
+    by_symbol = activity_aggregator.get_daily_summary(db_session, account_id=a.id, symbol="aapl")
+    assert sum(r["trade_count"] for r in by_symbol) == 4
+    assert all(float(r["money_out"]) == pytest.approx(1000.0) for r in by_symbol)
+
+
+def test_refresh_after_sync_reaches_back_to_touched_days(db_session, accounts):
+    a, _ = accounts
+    started = datetime.now(timezone.utc) - timedelta(seconds=1)
+    old_day = date.today() - timedelta(days=200)
+    _seed(db_session, a, old_day)
+    res = activity_aggregator.refresh_after_sync(db_session, a.id, started)
+    assert res["since"] == old_day.isoformat()
+    assert old_day in _daily(db_session, a.id)
+
+
+def test_refresh_moves_rows_edited_into_the_window(db_session, accounts):
+    a, _ = accounts
+    old_day = date.today() - timedelta(days=30)
+    today = date.today()
+    _seed(db_session, a, old_day)
+    assert activity_aggregator.refresh(db_session, account_ids=[a.id])["errors"] == []
+
+    # A broker correction moves one trade from the old day to today
+    trade = db_session.query(Trade).filter(Trade.account_id == a.id, Trade.side == "SELL").one()
+    trade.execution_time = datetime.combine(today, datetime.min.time()) + timedelta(hours=16)
+    db_session.flush()
+    res = activity_aggregator.refresh(db_session, account_ids=[a.id], since=today)
+    assert res["errors"] == [] and res["rows"] == 1
+
+    daily = _daily(db_session, a.id)
+    assert (daily[old_day]["trade_count"], daily[old_day]["sell_count"]) == (1, 0)
+    assert (daily[today]["trade_count"], daily[today]["sell_count"]) == (1, 1)
+    srcs = [r for r in activity_aggregator.get_activity(db_session, account_id=a.id) if r["src_id"] == trade.id]
+    assert len(srcs) == 1 and srcs[0]["ts"].date() == today
+
+
+def test_live_union_matches_tables(db_session, accounts):
+    a, _ = accounts
+    _seed(db_session, a, date.today() - timedelta(days=3))
+    activity_aggregator.refresh(db_session, account_ids=[a.id])
+    from_table = activity_aggregator.get_daily_summary(db_session, account_id=a.id)
+    live = activity_aggregator.get_daily_summary(db_session, account_id=a.id, use_mv=False)
+    assert [dict(r) for r in from_table] == [dict(r) for r in live]
+
+
+def test_cursor_pages_walk_the_whole_feed(db_session, accounts):
+    a, _ = accounts
+    start = datetime.combine(date.today() - timedelta(days=30), datetime.min.time())
+    same_time = start + timedelta(days=3)
+    db_session.add_all(
+        [_trade(a.id, "BUY", 1, 10.0, start + timedelta(hours=i), symbol="msft") for i in range(17)]
+        # Identical timestamps must still page deterministically
+        + [_trade(a.id, "SELL", 1, 11.0, same_time, symbol="msft") for _ in range(5)]
+    )
+    db_session.flush()
+    activity_aggregator.refresh(db_session, account_ids=[a.id])
+
+    expected = activity_aggregator.get_activity(db_session, account_id=a.id, limit=1000)
+    assert len(expected) == 22
+    seen, cursor, pages = [], None, 0
+    while True:
+        page = activity_aggregator.get_activity_page(
+            db_session, account_id=a.id, symbol="MSFT", limit=5, cursor=cursor
+        )
+        seen.extend(page["rows"])
+        pages += 1
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert pages == 5
+    assert [(r["src"], r["src_id"]) for r in seen] == [(r["src"], r["src_id"]) for r in expected]
+    assert all(r["symbol_upper"] == "MSFT" for r in seen)
+
+    # The live union pages the same way
+    live = activity_aggregator.get_activity_page(
+        db_session, account_id=a.id, limit=5, cursor=aggregator_module.encode_cursor(seen[4]), use_mv=False
+    )
+    assert [r["src_id"] for r in live["rows"]] == [r["src_id"] for r in seen[5:10]]
+
+    with pytest.raises(ValueError):
+        activity_aggregator.get_activity_page(db_session, cursor="not-a-cursor")
+
+
+@pytest.mark.no_db
+def test_table_existence_is_cached(monkeypatch):
+    calls = []
+
+    class _Result:
+        def __init__(self, value):
+            self.value = value
+
+        def first(self):
+            return (self.value,)
+
+    class _Session:
+        def execute(self, stmt, params=None):
+            calls.append(params["name"])
+            return _Result(params["name"] == "present")
+
+    aggregator_module.reset_table_cache()
+    db = _Session()
+    for _ in range(3):
+        assert activity_aggregator._table_exists(db, "present") is True
+        assert activity_aggregator._table_exists(db, "absent") is False
+    assert calls == ["present", "absent"]
+
+    monkeypatch.setattr(aggregator_module, "_MISSING_RECHECK_SECONDS", 0.0)
+    activity_aggregator._table_exists(db, "absent")
+    activity_aggregator._table_exists(db, "present")
+    assert calls == ["present", "absent", "absent"]
+    aggregator_module.reset_table_cache()
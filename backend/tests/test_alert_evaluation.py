@@ -0,0 +1,136 @@
+from datetime import datetime, timedelta, timezone
+
+from backend.models import User
+from backend.models.alert import Alert, AlertCondition, AlertHistory
+from backend.models.market_data import MarketSnapshot, MarketSnapshotHistory
+from backend.services.market.alert_evaluation import AlertEvaluator
+
+
+def _snapshot(db, symbol, as_of, **values):
+    db.add(
+        MarketSnapshot(
+            symbol=symbol,
+            analysis_type="technical_snapshot",
+            as_of_timestamp=as_of,
+            expiry_timestamp=as_of + timedelta(days=1),
+            **values,
+        )
+    )
+
+
+def _history(db, symbol, as_of, **values):
+    db.add(
+        MarketSnapshotHistory(
+            symbol=symbol,
+            analysis_type="technical_snapshot",
+            as_of_date=as_of,
+            **values,
+        )
+    )
+
+
+def _alert(db, user, symbol, conditions, **kw):
+    alert = Alert(user_id=user.id, name=f"{symbol} alert", symbol=symbol, alert_type="INDICATOR", **kw)
+    for cond in conditions:
+        alert.conditions.append(AlertCondition(**cond))
+    db.add(alert)
+    return alert
+
+
+def test_alert_evaluation_single_pass(db_session):
+    user = User(email="alerts@quantmatrix.com", username="alertuser")
+    db_session.add(user)
+    db_session.commit()
+
+    today = datetime(2026, 3, 10, tzinfo=timezone.utc)
+    yesterday = datetime(2026, 3, 9)
+    _snapshot(db_session, "AAA", today, current_price=105.0, rsi=72.0, atr_distance=1.5)
+    _snapshot(db_session, "BBB", today, current_price=48.0, rsi=40.0, atr_distance=-0.5)
+    _history(db_session, "AAA", yesterday, current_price=99.0, rsi=65.0)
+    _history(db_session, "BBB", yesterday, current_price=47.0, rsi=45.0)
+
+    cross = _alert(
+        db_session, user, "AAA",
+        [{"condition_type": "PRICE", "operator": "CROSSES_ABOVE", "target_value": 100.0}],
+    )
+    both = _alert(
+        db_session, user, "AAA",
+        [
+            {"condition_type": "RSI", "operator": "GT", "target_value": 70.0},
+            {"condition_type": "ATR_DISTANCE", "operator": "LT", "target_value": 1.0},
+        ],
+    )
+    either = _alert(
+        db_session, user, "BBB",
+        [
+            {"condition_type": "RSI", "operator": "GT", "target_value": 70.0, "logical_operator": "OR"},
+            {"condition_type": "ATR_DISTANCE", "operator": "LT", "target_value": 0.0, "logical_operator": "OR"},
+        ],
+        is_repeating=True,
+    )
+    no_cross = _alert(
+        db_session, user, "BBB",
+        [{"condition_type": "PRICE", "operator": "CROSSES_BELOW", "target_value": 47.5}],
+    )
+    db_session.commit()
+
+    notified = []
+
+    def _notifier(triggered):
+        notified.extend(t["alert_id"] for t in triggered)
+        return {t["alert_id"]: True for t in triggered}
+
+    evaluator = AlertEvaluator(notifier=_notifier)
+    res = evaluator.evaluate(db_session)
+
+    assert res["conditions"] == 6
+    assert res["triggered"] == 2
+    assert sorted(notified) == sorted([cross.id, either.id])
+
+    db_session.expire_all()
+    assert db_session.get(Alert, cross.id).is_active is False  # single-shot alert exhausted
+    assert db_session.get(Alert, either.id).current_triggers == 1
+    assert db_session.get(Alert, both.id).current_triggers == 0
+    conds = {c.condition_type: c for c in db_session.get(Alert, both.id).conditions}
+    assert conds["RSI"].is_met is True and conds["RSI"].times_met == 1
+    assert conds["ATR_DISTANCE"].is_met is False
+    assert conds["ATR_DISTANCE"].current_value == 1.5
+    assert db_session.get(Alert, no_cross.id).conditions[0].is_met is False
+    histories = db_session.query(AlertHistory).all()
+    assert len(histories) == 2 and all(h.discord_sent for h in histories)
+
+    # Still true on the next refresh: no re-trigger until the condition resets
+    again = evaluator.evaluate(db_session)
+    assert again["triggered"] == 0
+    db_session.expire_all()
+    assert db_session.get(Alert, either.id).conditions[1].times_met == 1
+
+
+def test_alert_with_intraday_condition_is_skipped_whole(db_session):
+    user = User(email="alerts-mixed@quantmatrix.com", username="alertmixed")
+    db_session.add(user)
+    db_session.commit()
+
+    _snapshot(db_session, "CCC", datetime(2026, 3, 10, tzinfo=timezone.utc), current_price=120.0, rsi=30.0)
+    # The daily condition holds, but the 1H condition cannot be evaluated from snapshots
+    mixed = _alert(
+        db_session, user, "CCC",
+        [
+            {"condition_type": "PRICE", "operator": "GT", "target_value": 100.0},
+            {"condition_type": "RSI", "operator": "GT", "target_value": 70.0, "timeframe": "1H"},
+        ],
+    )
+    daily = _alert(
+        db_session, user, "CCC",
+        [{"condition_type": "PRICE", "operator": "GT", "target_value": 100.0, "timeframe": "1D"}],
+    )
+    db_session.commit()
+
+    notified = []
+    res = AlertEvaluator(notifier=lambda t: notified.extend(x["alert_id"] for x in t)).evaluate(db_session)
+
+    assert (res["conditions"], res["alerts"], res["skipped_alerts"]) == (1, 1, 1)
+    assert notified == [daily.id]
+    db_session.expire_all()
+    assert db_session.get(Alert, mixed.id).current_triggers == 0
+    assert all(c.last_checked is None for c in db_session.get(Alert, mixed.id).conditions)
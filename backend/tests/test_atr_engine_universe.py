@@ -0,0 +1,95 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.models.index_constituent import IndexConstituent
+from backend.models.market_data import PriceData
+from backend.services.analysis.atr_engine import ATREngine
+
+
+def _bars(symbol: str, n: int, end: datetime, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 2, n))
+    high = close + rng.uniform(0.5, 3, n)
+    low = close - rng.uniform(0.5, 3, n)
+    open_ = close + rng.normal(0, 1, n)
+    dates = [end - timedelta(days=n - 1 - i) for i in range(n)]
+    return pd.DataFrame(
+        {"open": open_, "high": high, "low": low, "close": close}, index=dates
+    )
+
+
+def _seed(db_session, frames):
+    for symbol, df in frames.items():
+        db_session.add(IndexConstituent(index_name="SP500", symbol=symbol, is_active=True))
+        for dt, row in df.iterrows():
+            db_session.add(
+                PriceData(
+                    symbol=symbol,
+                    interval="1d",
+                    date=dt,
+                    open_price=float(row["open"]),
+                    high_price=float(row["high"]),
+                    low_price=float(row["low"]),
+                    close_price=float(row["close"]),
+                    volume=1000,
+                    data_source="test",
+                )
+            )
+    db_session.commit()
+
+
+@pytest.mark.asyncio
+async def test_db_universe_matches_per_symbol_calculation(db_session, monkeypatch, fake_redis):
+    end = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    frames = {
+        "AAA": _bars("AAA", 120, end, 1),
+        "BBB": _bars("BBB", 60, end, 2),
+        # Older last bar and short history: still right-aligned on its own bars
+        "CCC": _bars("CCC", 30, end - timedelta(days=3), 3),
+    }
+    _seed(db_session, frames)
+
+    from backend.services.market import market_data_service as mds
+
+    monkeypatch.setattr(mds.market_data_service, "_redis_client", fake_redis)
+
+    async def _no_provider(*args, **kwargs):
+        raise AssertionError("provider call in DB-first mode")
+
+    monkeypatch.setattr(mds.market_data_service, "get_historical_data", _no_provider)
+
+    engine = ATREngine(db_session=db_session)
+    panel = engine.load_price_panel(db_session, list(frames), end=end)
+    by_symbol = {r.symbol: r for r in engine.calculate_atr_panel(panel, 14)}
+    assert set(by_symbol) == {"AAA", "BBB", "CCC"}
+
+    for symbol, df in frames.items():
+        tr = engine.calculate_true_range_series(df)
+        atr = engine.calculate_wilder_atr(tr, 14)
+        current_atr = atr.dropna().iloc[-1]
+        regime = engine._analyze_volatility_regime(atr, current_atr)
+        chandelier = engine._calculate_chandelier_exits(df, atr)
+        bands = engine._calculate_atr_bands(df, atr)
+        got = by_symbol[symbol]
+        assert got.atr_value == pytest.approx(current_atr)
+        assert got.true_range == pytest.approx(tr.iloc[-1])
+        assert got.volatility_percentile == pytest.approx(regime["percentile"])
+        assert got.volatility_level == regime["level"]
+        assert got.volatility_trend == regime["trend"]
+        assert got.chandelier_long_exit == pytest.approx(chandelier["long"])
+        assert got.atr_bands_upper == pytest.approx(bands["upper"])
+
+    first = await engine.process_universe_from_db(indices=["SP500"])
+    assert first.total_symbols == 3
+    assert first.successful_calculations == 3
+    assert len(fake_redis.store) == 1
+
+    # Second run is served from the cache keyed by the last bar date
+    monkeypatch.setattr(
+        engine, "calculate_atr_panel", lambda *a, **k: pytest.fail("cache miss")
+    )
+    second = await engine.process_major_indices(["SP500"])
+    assert second.successful_calculations == 3
@@ -0,0 +1,134 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.models import User
+from backend.models.market_data import MarketSnapshot
+from backend.models.trade import TradeSignal
+from backend.services.signals import atr_signal_generator as generator_module
+from backend.services.signals.atr_signal_generator import ATRSignalGenerator, evaluate_atr_rules
+
+
+def _snap(symbol, price, dist, *, sma_21=None, stage="2A", atr=2.0, range_pos=80.0, atrp=4.0):
+    sma_50 = price - dist * atr if dist is not None else None
+    return {
+        "symbol": symbol,
+        "name": f"{symbol} Inc",
+        "sector": "Technology",
+        "market_cap": 5e10,
+        "current_price": price,
+        "sma_21": sma_21 if sma_21 is not None else price - 1,
+        "sma_50": sma_50,
+        "sma_100": (sma_50 or 0) - 5,
+        "atr_14": atr,
+        "atrp_14": atrp,
+        "atrx_sma_50": dist,
+        "range_pos_20d": range_pos,
+        "stage_label": stage,
+        "rsi": 55.0,
+        "macd": 0.4,
+    }
+
+
+@pytest.mark.no_db
+def test_rules_pick_one_signal_per_symbol_by_priority():
+    frame = pd.DataFrame(
+        [
+            _snap("ENT", 100.0, 2.5),
+            _snap("WEAK", 100.0, 2.5, stage="4"),  # entry suppressed in stage 4
+            _snap("SCL", 100.0, 8.5),
+            _snap("OVR", 100.0, 13.0),
+            _snap("BRK", 100.0, -1.0),
+            _snap("GAP", 100.0, 5.0),  # between buy zone and first scale-out level
+            _snap("NAN", 100.0, None),
+        ]
+    )
+    out = evaluate_atr_rules(frame).set_index("symbol")
+    assert out["kind"].to_dict() == {
+        "ENT": "entry",
+        "SCL": "scale_out",
+        "OVR": "overextended",
+        "BRK": "support_break",
+    }
+
+    entry = out.loc["ENT"]
+    assert entry["signal_strength"] == pytest.approx(1.0)
+    assert entry["stop_loss"] == pytest.approx(97.0)
+    assert entry["target_price"] == pytest.approx(95.0 + 14.0)
+    assert entry["risk_reward_ratio"] == pytest.approx(3.0)
+    assert entry["time_horizon"] == "1-2 weeks"
+
+    scale = out.loc["SCL"]
+    assert scale["scale_level"] == 8.0
+    assert scale["signal_strength"] == pytest.approx(0.725)
+    assert np.isnan(out.loc["BRK", "stop_loss"])
+
+
+@pytest.mark.no_db
+def test_rules_are_vectorized_over_large_frames():
+    rng = np.random.default_rng(3)
+    frame = pd.DataFrame([_snap(f"S{i}", 100.0, float(d)) for i, d in enumerate(rng.uniform(-3, 15, 5000))])
+    start = time.perf_counter()
+    out = evaluate_atr_rules(frame)
+    assert time.perf_counter() - start < 0.5
+    assert set(out["kind"]) == {"entry", "scale_out", "overextended", "support_break"}
+
+
+def test_generate_portfolio_signals_from_snapshots(db_session, monkeypatch):
+    user = User(email="signals@example.com", username="signals_user")
+    db_session.add(user)
+    now = datetime.utcnow()
+    rows = [_snap("SGA", 100.0, 2.5), _snap("SGB", 100.0, 9.2), _snap("SGC", 100.0, -2.0), _snap("SGD", 100.0, 5.0)]
+    for row in rows:
+        db_session.add(
+            MarketSnapshot(analysis_type="technical_snapshot", expiry_timestamp=now + timedelta(hours=12), **row)
+        )
+    db_session.flush()
+
+    queued = []
+
+    async def fake_alert(message, channel="signals", signal_data=None, wait=False):
+        queued.append((channel, signal_data["symbol"]))
+        return True
+
+    async def fake_flush(timeout=None):
+        return True
+
+    monkeypatch.setattr(generator_module.discord_notifier, "send_signal_alert", fake_alert)
+    monkeypatch.setattr(generator_module.discord_notifier, "flush", fake_flush)
+
+    gen = ATRSignalGenerator()
+    symbols = ["sga", "SGB", "SGC", "SGD", "MISSING"]
+    res = asyncio.run(gen.generate_portfolio_signals(user.id, symbols=symbols, db=db_session))
+    assert res["signals_generated"] == 3 and res["snapshots_missing"] == 1
+    assert (res["entry_signals"], res["scale_out_signals"], res["exit_signals"]) == (1, 1, 1)
+    assert sorted(queued) == [("signals", "SGA"), ("signals", "SGB"), ("system_status", "SGC")]
+
+    stored = {
+        s.symbol: s
+        for s in db_session.query(TradeSignal).filter(TradeSignal.symbol.in_(["SGA", "SGB", "SGC", "SGD"]))
+    }
+    assert set(stored) == {"SGA", "SGB", "SGC"}
+    assert stored["SGA"].signal_type == "ENTRY" and stored["SGA"].ma_alignment is True
+    assert stored["SGB"].market_conditions["scale_level"] == 9.0
+
+    # Re-running within the dedupe window raises nothing new ...
+    again = asyncio.run(gen.generate_portfolio_signals(user.id, symbols=symbols, db=db_session, notify=False))
+    assert again["signals_generated"] == 0 and again["duplicates_skipped"] == 3
+
+    # ... until a symbol reaches a higher scale-out level
+    db_session.query(MarketSnapshot).filter(MarketSnapshot.symbol == "SGB").update({"atrx_sma_50": 10.4})
+    db_session.flush()
+    moved = asyncio.run(gen.generate_portfolio_signals(user.id, symbols=symbols, db=db_session, notify=False))
+    assert moved["scale_out_signals"] == 1 and moved["duplicates_skipped"] == 2
+
+    # Dedupe is per user: another account holding the same symbols still gets its signals
+    other = User(email="signals2@example.com", username="signals_user2")
+    db_session.add(other)
+    db_session.flush()
+    theirs = asyncio.run(gen.generate_portfolio_signals(other.id, symbols=symbols, db=db_session, notify=False))
+    assert theirs["signals_generated"] == 3 and theirs["duplicates_skipped"] == 0
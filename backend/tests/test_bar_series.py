@@ -0,0 +1,53 @@
+import json
+
+import numpy as np
+
+from backend.benchmarks.synthetic import synthetic_ohlcv
+from backend.services.market.bar_series import BarSeries, etag_matches, lttb_indices, series_etag
+
+
+def test_from_frame_sorts_and_serializes_like_legacy_rows():
+    df = synthetic_ohlcv("AAA", 50)
+    series = BarSeries.from_frame(df.iloc[::-1])  # providers hand back newest first
+    assert series.index.is_monotonic_increasing
+    rows = series.to_rows()
+    assert rows[0]["time"] == df.index[0].isoformat()
+    assert rows[-1]["close"] == float(df["Close"].iloc[-1])
+    cols = series.to_columns()
+    assert len(cols["time"]) == 50 and cols["time"][0] == int(df.index[0].timestamp())
+
+
+def test_ohlc_buckets_preserve_extremes_and_volume():
+    df = synthetic_ohlcv("AAA", 1000)
+    out = BarSeries.from_frame(df).downsampled(100, "ohlc")
+    assert len(out) == 100 and out.total == 1000 and out.downsample == "ohlc"
+    assert out.high.max() == df["High"].max()
+    assert out.low.min() == df["Low"].min()
+    assert out.volume.sum() == df["Volume"].sum()
+    assert out.open[0] == df["Open"].iloc[0] and out.close[-1] == df["Close"].iloc[-1]
+
+
+def test_lttb_keeps_endpoints_and_spikes():
+    y = np.zeros(1000)
+    y[437] = 50.0
+    idx = lttb_indices(np.arange(1000, dtype=float), y, 20)
+    assert len(idx) == 20 and idx[0] == 0 and idx[-1] == 999
+    assert 437 in idx
+    assert np.all(np.diff(idx) > 0)
+    assert len(BarSeries.from_frame(synthetic_ohlcv("AAA", 30)).downsampled(100)) == 30
+
+
+def test_ndjson_header_then_one_line_per_bar():
+    series = BarSeries.from_frame(synthetic_ohlcv("AAA", 25))
+    lines = b"".join(series.iter_ndjson({"symbol": "AAA"}, chunk_size=10)).decode().splitlines()
+    assert json.loads(lines[0]) == {"symbol": "AAA"}
+    assert len(lines) == 26 and len(json.loads(lines[1])) == 6
+
+
+def test_etag_changes_with_last_bar_and_matches_weakly():
+    series = BarSeries.from_frame(synthetic_ohlcv("AAA", 25))
+    tag = series_etag("AAA", "1d", series.last_time, len(series), ("columns",))
+    assert tag == series_etag("aaa", "1d", series.last_time, len(series), ("columns",))
+    assert tag != series_etag("AAA", "1d", series.index[-2].to_pydatetime(), len(series), ("columns",))
+    assert etag_matches(f'"x", {tag[2:]}', tag)
+    assert not etag_matches(None, tag)
@@ -0,0 +1,82 @@
+import os
+import logging
+
+import numpy as np
+import pytest
+
+from backend.benchmarks.suite import (
+    CASES,
+    BenchResult,
+    SuiteReport,
+    compare,
+    load_baseline,
+    run_suite,
+)
+from backend.benchmarks.synthetic import synthetic_flexquery_xml, synthetic_ohlcv, synthetic_universe
+from backend.services.clients.ibkr_flexquery_client import IBKRFlexQueryClient
+
+
+def test_synthetic_ohlcv_is_deterministic_and_well_formed():
+    a = synthetic_ohlcv("AAA", 300, seed=1)
+    b = synthetic_ohlcv("AAA", 300, seed=1)
+    assert a.equals(b)
+    assert not a.equals(synthetic_ohlcv("BBB", 300, seed=1))
+    assert list(a.columns) == ["Open", "High", "Low", "Close", "Volume"]
+    assert a.index.is_monotonic_increasing
+    assert (a["High"] >= a[["Open", "Close"]].max(axis=1)).all()
+    assert (a["Low"] <= a[["Open", "Close"]].min(axis=1)).all()
+
+
+def test_synthetic_gaps_and_splits():
+    gapped = synthetic_ohlcv("AAA", 500, gap_rate=0.1)
+    assert 400 < len(gapped) < 500
+
+    plain = synthetic_ohlcv("AAA", 300)
+    split = synthetic_ohlcv("AAA", 300, split_every=100, split_ratio=2.0)
+    assert np.allclose(split["Close"].iloc[:100], plain["Close"].iloc[:100])
+    assert np.allclose(split["Close"].iloc[100:200], plain["Close"].iloc[100:200] / 2.0, atol=1e-3)
+
+    universe = synthetic_universe(6, 260, split_every=100)
+    assert list(universe)[:2] == ["SYN0001", "SYN0002"]
+
+
+def test_synthetic_flexquery_feeds_parsers():
+    logging.disable(logging.WARNING)
+    try:
+        xml = synthetic_flexquery_xml(trades=120, positions=8, option_positions=4, cash_transactions=30)
+        client = IBKRFlexQueryClient()
+        assert len(client._parse_trades_from_xml(xml, "U0000001")) == 120
+        assert len(client._parse_option_positions(xml, "U0000001")) == 4
+        assert len(client._parse_cash_transactions(xml, "U0000001")) == 30
+        assert len(client._parse_transfers(xml, "U0000001")) == 20
+        assert len(client._parse_interest_accruals(xml, "U0000001")) == 12
+        assert client._parse_tax_lots(xml, "U0000001")
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+def test_compare_flags_throughput_regressions_beyond_threshold():
+    report = SuiteReport(
+        results=[
+            BenchResult("fast", "small", 10, 0.1, 3, 100.0),
+            BenchResult("slow", "small", 10, 0.2, 3, 50.0),
+            BenchResult("new", "small", 10, 0.2, 3, 50.0),
+        ]
+    )
+    baseline = {"fast[small]": {"throughput": 110.0}, "slow[small]": {"throughput": 100.0}}
+    regressions = compare(report, baseline, threshold=0.3)
+    assert [r.key for r in regressions] == ["slow[small]"]
+    assert regressions[0].change == pytest.approx(-0.5)
+
+
+def test_baseline_covers_every_case_at_small_scale():
+    baseline = load_baseline()
+    assert {f"{name}[small]" for name in CASES} <= set(baseline)
+
+
+@pytest.mark.performance
+@pytest.mark.skipif(os.getenv("QM_RUN_BENCHMARKS") != "1", reason="set QM_RUN_BENCHMARKS=1 to run timing checks")
+def test_flexquery_parsers_within_baseline_throughput():
+    report = run_suite(["small"], cases=[c for c in CASES if c.startswith("flexquery.")], repeat=3)
+    assert not report.skipped
+    assert compare(report, load_baseline()) == []
@@ -0,0 +1,78 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.api.dependencies import get_admin_user
+from backend.api.main import app
+from backend.api.routes import admin_scheduler as routes
+from backend.tasks import market_data_tasks
+from backend.tasks.celery_app import celery_app
+from backend.tasks.job_catalog import CATALOG
+from backend.tasks.queues import ALL_QUEUES, TASK_QUEUES, queue_for_task, run_now_queue
+
+MD = "backend.tasks.market_data_tasks."
+
+
+def _routed_queue(task: str) -> str:
+    return celery_app.amqp.router.route({}, task)["queue"].name
+
+
+@pytest.mark.no_db
+def test_catalog_queues_match_task_routes():
+    for tmpl in CATALOG:
+        assert tmpl.queue in ALL_QUEUES, tmpl.id
+        assert tmpl.queue == _routed_queue(tmpl.task), tmpl.id
+
+
+@pytest.mark.no_db
+def test_routing_separates_interactive_from_bulk():
+    assert _routed_queue(MD + "refresh_single_symbol") == "interactive"
+    assert _routed_queue(MD + "backfill_snapshot_history_last_n_days") == "bulk"
+    assert _routed_queue(MD + "refresh_fundamentals") == "io"
+    assert _routed_queue("backend.tasks.account_sync.sync_all_ibkr_accounts") == "account_sync"
+    assert _routed_queue(MD + "monitor_coverage_health") == "celery"
+    # Every routed name is a registered task
+    for task in TASK_QUEUES:
+        assert hasattr(market_data_tasks, task.rsplit(".", 1)[-1]), task
+
+
+@pytest.mark.no_db
+def test_run_now_queue_keeps_long_running_pools():
+    assert run_now_queue(MD + "monitor_coverage_health") == "interactive"
+    assert run_now_queue(MD + "refresh_fundamentals") == "interactive"
+    assert run_now_queue(MD + "backfill_daily_since_date") == "bulk"
+    assert run_now_queue("backend.tasks.account_sync.sync_all_ibkr_accounts") == "account_sync"
+    assert queue_for_task("backend.tasks.unknown") == "celery"
+
+
+@pytest.mark.no_db
+def test_run_now_endpoint_sends_to_interactive(monkeypatch):
+    sent = []
+
+    class _Result:
+        id = "task-1"
+
+    def fake_send_task(name, args=(), kwargs=None, queue=None):
+        sent.append((name, queue))
+        return _Result()
+
+    class _Admin:
+        email = "admin@test.local"
+        username = "admin"
+
+    monkeypatch.setattr(routes.celery_app, "send_task", fake_send_task)
+    app.dependency_overrides[get_admin_user] = lambda: _Admin()
+    try:
+        client = TestClient(app)
+        resp = client.post("/api/v1/admin/schedules/run-now", params={"task": MD + "recompute_indicators_universe"})
+        assert resp.status_code == 200 and resp.json()["queue"] == "bulk"
+        resp = client.post(
+            "/api/v1/admin/schedules/run-now",
+            params={"task": MD + "update_tracked_symbol_cache"},
+        )
+        assert resp.json()["queue"] == "interactive"
+    finally:
+        app.dependency_overrides.pop(get_admin_user, None)
+    assert sent == [
+        (MD + "recompute_indicators_universe", "bulk"),
+        (MD + "update_tracked_symbol_cache", "interactive"),
+    ]
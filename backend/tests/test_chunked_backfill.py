@@ -0,0 +1,219 @@
+import json
+import types
+
+import pytest
+
+from backend.models.market_data import JobRun
+from backend.tasks import task_utils
+from backend.tasks.task_utils import (
+    BackfillCheckpoint,
+    StepCheckpoint,
+    chunk_runner,
+    execute_chunk,
+    merge_counters,
+    run_chunked,
+)
+
+SYMBOLS = ["C1", "C2", "C3", "C4", "C5", "C6"]
+
+
+@pytest.fixture
+def fake_redis(fake_redis, monkeypatch):
+    monkeypatch.setattr(task_utils, "market_data_service", types.SimpleNamespace(redis_client=fake_redis))
+    return fake_redis
+
+
+@pytest.fixture
+def probe_runner():
+    calls = []
+    failing = {"C3"}
+
+    @chunk_runner("chunk_probe")
+    def run(symbols, params):
+        calls.append(list(symbols))
+        if failing & set(symbols):
+            raise RuntimeError("provider down")
+        return {"processed": len(symbols), "errors": 0, "by_day": {params["day"]: len(symbols)}}
+
+    yield calls, failing
+    task_utils._CHUNK_RUNNERS.pop("chunk_probe", None)
+
+
+@pytest.mark.no_db
+def test_merge_counters_sums_and_caps_samples():
+    merged = merge_counters(
+        [
+            {"rows": 2, "ok": True, "usage": {"fmp": 1}, "error_samples": [{"symbol": "A"}] * 20},
+            {"rows": 3, "usage": {"fmp": 2, "yf": 1}, "error_samples": [{"symbol": "B"}] * 20},
+        ]
+    )
+    assert merged["rows"] == 5 and "ok" not in merged
+    assert merged["usage"] == {"fmp": 3, "yf": 1}
+    assert len(merged["error_samples"]) == task_utils.ERROR_SAMPLE_LIMIT
+
+
+@pytest.mark.no_db
+def test_inline_run_resumes_from_last_completed_chunk(fake_redis, probe_runner, monkeypatch):
+    calls, failing = probe_runner
+    monkeypatch.setattr(task_utils, "_update_job", lambda *a, **k: None)
+    params = {"day": "2026-01-02"}
+    progress = []
+
+    first = run_chunked("chunk_probe", SYMBOLS, params=params, chunk_size=2, on_progress=progress.append)
+    assert first["status"] == "error"
+    assert (first["chunks_done"], first["chunks_failed"], first["processed"]) == (2, 1, 4)
+    assert "chunk 1" in first["error"]
+    assert [p["chunks_done"] for p in progress] == [1, 1, 2]
+
+    # The universe changed meanwhile; the resumed run keeps its stored symbol ranges
+    failing.clear()
+    calls.clear()
+    second = run_chunked("chunk_probe", SYMBOLS + ["C7"], params=params, chunk_size=2)
+    assert calls == [["C3", "C4"]]
+    assert second["status"] == "ok" and second["chunks_resumed"] == 2
+    assert second["processed"] == 6 and second["by_day"] == {"2026-01-02": 6}
+    assert not [k for k in fake_redis.store if k.startswith("backfill:chunk_probe")]
+
+    # Completed runs leave nothing behind: the next run starts from scratch
+    calls.clear()
+    run_chunked("chunk_probe", SYMBOLS, params=params, chunk_size=3)
+    assert calls == [["C1", "C2", "C3"], ["C4", "C5", "C6"]]
+
+
+def test_fan_out_chunks_close_parent_job(db_session, fake_redis, probe_runner, monkeypatch):
+    calls, failing = probe_runner
+    failing.clear()
+    monkeypatch.setattr(task_utils, "SessionLocal", lambda: db_session)
+    sent = []
+    monkeypatch.setattr(
+        task_utils,
+        "current_app",
+        types.SimpleNamespace(send_task=lambda name, args, queue: sent.append((name, args, queue))),
+    )
+
+    job = JobRun(task_name="chunk_probe", status="running", params={})
+    db_session.add(job)
+    db_session.commit()
+    job_id = job.id
+    token = task_utils._current_job_id.set(job_id)
+    try:
+        res = run_chunked("chunk_probe", SYMBOLS, params={"day": "d"}, chunk_size=4, fan_out=True)
+    finally:
+        task_utils._current_job_id.reset(token)
+    assert res["status"] == "running" and res["chunks_dispatched"] == 2
+    assert [(name, args[2], queue) for name, args, queue in sent] == [
+        (task_utils.CHUNK_TASK, 0, "bulk"),
+        (task_utils.CHUNK_TASK, 1, "bulk"),
+    ]
+
+    # A second trigger while chunks are in flight leaves the live parent alone
+    token = task_utils._current_job_id.set(job_id + 1000)
+    try:
+        again = run_chunked("chunk_probe", SYMBOLS, params={"day": "d"}, chunk_size=4, fan_out=True)
+    finally:
+        task_utils._current_job_id.reset(token)
+    assert again == {"status": "skipped", "reason": "chunks in flight", "running_job_id": job_id}
+    assert len(sent) == 2
+    assert db_session.get(JobRun, job_id).status == "running"
+
+    task_name, key, _ = sent[1][1]
+    assert execute_chunk(task_name, key, 1)["processed"] == 2
+    job = db_session.get(JobRun, job_id)
+    assert job.status == "running" and job.counters["chunks_done"] == 1
+
+    # Redelivery of a finished chunk is a no-op
+    assert execute_chunk(task_name, key, 1)["status"] == "skipped"
+    execute_chunk(task_name, key, 0)
+    db_session.expire_all()
+    job = db_session.get(JobRun, job_id)
+    assert job.status == "ok" and job.finished_at is not None
+    assert job.counters["processed"] == 6 and job.counters["chunks_done"] == 2
+    assert calls == [["C5", "C6"], ["C1", "C2", "C3", "C4"]]
+    assert key not in fake_redis.store
+
+
+def test_fan_out_failure_closes_parent_with_alerts_and_metrics(db_session, fake_redis, probe_runner, monkeypatch):
+    monkeypatch.setattr(task_utils, "SessionLocal", lambda: db_session)
+    sent, alerts, observed = [], [], []
+    monkeypatch.setattr(
+        task_utils,
+        "current_app",
+        types.SimpleNamespace(send_task=lambda name, args, queue: sent.append(args)),
+    )
+    monkeypatch.setattr(task_utils, "_emit_alerts", lambda **kw: alerts.append(kw))
+    monkeypatch.setattr(
+        task_utils,
+        "TASK_DURATION",
+        types.SimpleNamespace(observe=lambda value, **labels: observed.append(labels)),
+    )
+
+    job = JobRun(task_name="chunk_probe", status="running", params={})
+    db_session.add(job)
+    db_session.commit()
+    job_id = job.id
+    token = task_utils._current_job_id.set(job_id)
+    try:
+        run_chunked("chunk_probe", SYMBOLS, params={"day": "d"}, chunk_size=3, fan_out=True)
+    finally:
+        task_utils._current_job_id.reset(token)
+
+    for task_name, key, index in sent:
+        execute_chunk(task_name, key, index)
+    db_session.expire_all()
+    job = db_session.get(JobRun, job_id)
+    assert job.status == "error" and "provider down" in job.error
+    assert job.counters["chunks_failed"] == 1
+    assert observed == [{"task": "chunk_probe", "status": "error"}]
+    assert [a["event"] for a in alerts] == ["failure"]
+
+    # Progress from a late redelivery does not reopen or overwrite the closed job
+    task_utils._update_job(job_id, {"chunks_done": 99})
+    db_session.expire_all()
+    job = db_session.get(JobRun, job_id)
+    assert job.status == "error" and job.counters["chunks_done"] != 99
+
+
+@pytest.mark.no_db
+def test_step_checkpoint_roundtrip(fake_redis):
+    steps = StepCheckpoint("bootstrap_probe", {"date": "2026-01-02"}, redis_client=fake_redis)
+    assert steps.get("refresh") is None
+    steps.save("refresh", {"status": "ok", "n": 3})
+    assert steps.get("refresh") == {"status": "ok", "n": 3}
+    assert json.loads(fake_redis.store[steps.key]["refresh"])["n"] == 3
+    steps.clear()
+    assert steps.get("refresh") is None
+
+
+@pytest.mark.no_db
+def test_checkpoint_falls_back_to_memory_without_redis():
+    class _Down:
+        def get(self, key):
+            raise ConnectionError("redis down")
+
+    cp = BackfillCheckpoint("chunk_probe", {"day": "d"}, redis_client=_Down())
+    state = cp.begin(SYMBOLS, chunk_size=4, params={}, job_id=None)
+    assert cp.redis is None and len(cp.chunks(state)) == 2
+    assert cp.record(0, {"processed": 4}, 2) is False
+    assert cp.record(1, {"processed": 2}, 2) is True
+    assert cp.progress(2)["processed"] == 6
+
+
+@pytest.mark.no_db
+def test_checkpoint_survives_redis_failing_mid_run(fake_redis, probe_runner, monkeypatch):
+    calls, failing = probe_runner
+    monkeypatch.setattr(task_utils, "_update_job", lambda *a, **k: None)
+
+    def _down(*args, **kwargs):
+        raise ConnectionError("redis down")
+
+    def _progress(p):
+        # Redis goes away once the first chunk is recorded
+        monkeypatch.setattr(fake_redis, "pipeline", _down)
+        monkeypatch.setattr(fake_redis, "hgetall", _down)
+        monkeypatch.setattr(fake_redis, "smembers", _down)
+        monkeypatch.setattr(fake_redis, "delete", _down)
+
+    res = run_chunked("chunk_probe", SYMBOLS, params={"day": "d"}, chunk_size=2, on_progress=_progress)
+    assert res["status"] == "error"
+    assert (res["chunks_done"], res["chunks_failed"], res["processed"]) == (2, 1, 4)
+    assert "chunk 1" in res["error"] and len(calls) == 3
@@ -121,7 +121,7 @@ def test_coverage_prefers_cached_snapshot(monkeypatch):
         def coverage_snapshot(self, db):
             raise AssertionError("Should not hit DB when cache is present")
 
-    monkeypatch.setattr(routes, "MarketDataService", _StubService)
+    monkeypatch.setattr(routes, "get_market_data_service", _StubService)
 
     resp = client.get("/api/v1/market-data/coverage")
     assert resp.status_code == 200
@@ -169,7 +169,7 @@ def test_coverage_meta_exposes_kpis_and_sparkline(monkeypatch):
                 },
             }
 
-    monkeypatch.setattr(routes, "MarketDataService", _StubService)
+    monkeypatch.setattr(routes, "get_market_data_service", _StubService)
 
     resp = client.get("/api/v1/market-data/coverage")
     assert resp.status_code == 200
@@ -0,0 +1,84 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+from discord_webhook import DiscordEmbed
+
+from backend.services.notifications.discord_dispatcher import DiscordDispatcher, _embed_payload
+
+SIGNALS = "https://discord.test/api/webhooks/1/signals"
+ALERTS = "https://discord.test/api/webhooks/2/alerts"
+
+
+def _embed(i: int) -> DiscordEmbed:
+    embed = DiscordEmbed(title=f"Signal {i}", description="ATR entry", color=0x00FF00)
+    embed.add_embed_field(name="Price", value=f"{100 + i:.2f}")
+    return embed
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_batches_embeds_per_webhook():
+    posts = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        posts.append((str(request.url.copy_with(query=None)), json.loads(request.content)))
+        return httpx.Response(200, json={}, headers={"X-RateLimit-Remaining": "4"})
+
+    dispatcher = DiscordDispatcher(
+        flush_interval_s=0.01, transport=httpx.MockTransport(handler)
+    )
+    futures = [dispatcher.enqueue(SIGNALS, _embed(i)) for i in range(25)]
+    futures += [dispatcher.enqueue(ALERTS, _embed(i)) for i in range(3)]
+    assert await dispatcher.flush(timeout=5)
+
+    assert all(f.result() is True for f in futures)
+    signal_posts = [len(body["embeds"]) for url, body in posts if url == SIGNALS]
+    alert_posts = [len(body["embeds"]) for url, body in posts if url == ALERTS]
+    assert signal_posts == [10, 10, 5]
+    assert alert_posts == [3]
+    assert dispatcher.stats["embeds"] == 28
+    assert dispatcher.stats["messages"] == 4
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_honours_rate_limits():
+    calls = {"n": 0}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls["n"] += 1
+        if calls["n"] == 1:
+            # Bucket exhausted: next request must wait for the reset window.
+            return httpx.Response(
+                200,
+                json={},
+                headers={"X-RateLimit-Remaining": "0", "X-RateLimit-Reset-After": "0.1"},
+            )
+        if calls["n"] == 2:
+            return httpx.Response(429, json={"retry_after": 0.05})
+        return httpx.Response(200, json={})
+
+    dispatcher = DiscordDispatcher(
+        flush_interval_s=0.0, transport=httpx.MockTransport(handler)
+    )
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    futures = [dispatcher.enqueue(SIGNALS, _embed(i)) for i in range(11)]
+    assert await dispatcher.flush(timeout=5)
+
+    assert all(f.result() is True for f in futures)
+    assert calls["n"] == 3
+    assert dispatcher.stats["rate_limited"] == 1
+    assert loop.time() - started >= 0.14
+
+
+@pytest.mark.no_db
+def test_embed_payload_uses_public_accessors():
+    class _Embed:
+        def get_embed(self):
+            return {"title": "T", "url": None}
+
+    assert _embed_payload(_Embed()) == {"title": "T"}
+    payload = _embed_payload(_embed(1))
+    assert payload["title"] == "Signal 1" and payload["fields"][0]["name"] == "Price"
+    assert "url" not in payload
@@ -0,0 +1,125 @@
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from backend.models import User, BrokerAccount
+from backend.models.broker_account import BrokerType, AccountType, SyncStatus
+from backend.models.flexquery_report import FlexQueryReport
+from backend.services.clients.flexquery_report_store import (
+    FlexQueryReportStore,
+    compute_section_hashes,
+)
+from backend.services.portfolio.ibkr_sync_service import IBKRSyncService
+
+ACCOUNT = "IBKR_STORE_TEST"
+
+
+def _report(generated: str = "20260101;010101", trade_qty: str = "100") -> str:
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<FlexQueryResponse queryName="Test" type="AF">
+  <FlexStatements count="1">
+    <FlexStatement accountId="{ACCOUNT}" whenGenerated="{generated}">
+      <OpenPositions>
+        <OpenPosition accountId="{ACCOUNT}" symbol="AAPL" position="100" markPrice="150.0" />
+      </OpenPositions>
+      <Trades>
+        <Trade accountId="{ACCOUNT}" symbol="AAPL" quantity="{trade_qty}" tradePrice="149.0" tradeDate="20240115" tradeID="1" />
+      </Trades>
+      <CashTransactions />
+      <Transfers />
+    </FlexStatement>
+  </FlexStatements>
+</FlexQueryResponse>"""
+
+
+def test_section_hashes_ignore_generation_timestamp():
+    a = compute_section_hashes(_report(generated="20260101;010101"), ACCOUNT)
+    b = compute_section_hashes(_report(generated="20260102;010101"), ACCOUNT)
+    c = compute_section_hashes(_report(trade_qty="200"), ACCOUNT)
+    assert set(a) == {"OpenPositions", "Trades", "CashTransactions", "Transfers"}
+    assert a == b
+    assert a["Trades"] != c["Trades"]
+    assert a["OpenPositions"] == c["OpenPositions"]
+
+
+def test_store_dedupes_by_content_and_tracks_synced_sections(db_session):
+    store = FlexQueryReportStore()
+    first = store.put(db_session, ACCOUNT, _report(generated="20260101;010101"))
+    second = store.put(db_session, ACCOUNT, _report(generated="20260102;010101"))
+    assert first.id == second.id
+    assert (
+        db_session.query(FlexQueryReport)
+        .filter(FlexQueryReport.account_number == ACCOUNT)
+        .count()
+        == 1
+    )
+    assert FlexQueryReportStore.load_xml(first).startswith("<?xml")
+    assert first.raw_size > len(first.payload)
+
+    hashes = compute_section_hashes(_report(), ACCOUNT)
+    assert store.unchanged_sections(db_session, ACCOUNT, hashes) == set()
+    store.mark_synced(db_session, ACCOUNT, hashes, ["Trades", "OpenPositions", "InterestAccruals"])
+
+    changed = compute_section_hashes(_report(trade_qty="200"), ACCOUNT)
+    # Absent section recorded as missing stays unchanged while it remains absent.
+    assert store.unchanged_sections(db_session, ACCOUNT, changed) == {
+        "OpenPositions",
+        "InterestAccruals",
+    }
+
+
+@pytest.mark.asyncio
+async def test_comprehensive_sync_skips_unchanged_sections(db_session, monkeypatch):
+    user = User(email="store@quantmatrix.com", username="storeuser")
+    db_session.add(user)
+    db_session.commit()
+    acct = BrokerAccount(
+        user_id=user.id,
+        account_number=ACCOUNT,
+        broker=BrokerType.IBKR,
+        account_type=AccountType.TAXABLE,
+        sync_status=SyncStatus.QUEUED,
+    )
+    db_session.add(acct)
+    db_session.commit()
+
+    from backend.services.portfolio import ibkr_sync_service as mod
+
+    monkeypatch.setattr(mod.settings, "IBKR_FLEX_REPORT_REUSE_SECONDS", 0)
+    svc = IBKRSyncService()
+    step_names = [
+        "_sync_instruments",
+        "_sync_tax_lots_from_flexquery",
+        "_sync_option_positions_from_flexquery",
+        "_sync_trades_from_flexquery",
+        "_sync_position_from_tax_lots",
+        "_refresh_prices_for_account",
+        "_create_portfolio_snapshot",
+        "_sync_positions_from_position",
+        "_sync_cash_transactions",
+        "_sync_account_balances",
+        "_sync_margin_interest",
+        "_sync_transfers",
+    ]
+    mocks = {name: AsyncMock(return_value={"synced": 1}) for name in step_names}
+    for name, m in mocks.items():
+        monkeypatch.setattr(svc, name, m)
+
+    with patch.object(
+        svc.flexquery_client, "get_full_report", AsyncMock(return_value=_report())
+    ) as fetch:
+        first = await svc.sync_comprehensive_portfolio(ACCOUNT, db_session=db_session)
+        assert first["trades"] == {"synced": 1}
+        # Tax lots read the shared report instead of triggering a second request.
+        assert mocks["_sync_tax_lots_from_flexquery"].await_args.args[3] == _report()
+
+        fetch.return_value = _report(generated="20260105;010101", trade_qty="200")
+        second = await svc.sync_comprehensive_portfolio(ACCOUNT, db_session=db_session)
+
+    assert second["trades"] == {"synced": 1}
+    assert second["tax_lots"] == {"synced": 1}
+    assert second["cash_transactions"] == {"skipped": "unchanged"}
+    assert second["transfers"] == {"skipped": "unchanged"}
+    assert second["option_positions"] == {"skipped": "unchanged"}
+    # DB-derived steps always run.
+    assert mocks["_create_portfolio_snapshot"].await_count == 2
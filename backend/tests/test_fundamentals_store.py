@@ -0,0 +1,95 @@
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+
+from backend.models.market_data import MarketSnapshot, SymbolFundamentals
+from backend.services.market import fundamentals_store as fs_module
+from backend.services.market.fundamentals_store import FundamentalsStore
+
+
+def _profile(sym, sector="Technology", cap=1e9):
+    return {"symbol": sym, "companyName": f"{sym} Inc", "sector": sector, "industry": "Software", "mktCap": cap}
+
+
+def test_bulk_refresh_respects_ttl_and_batches(db_session, monkeypatch):
+    calls = []
+
+    def _company_profile(apikey, symbol):
+        batch = symbol.split(",")
+        calls.append(batch)
+        # ZZZ is unknown to FMP
+        return [_profile(s) for s in batch if s != "ZZZ"]
+
+    monkeypatch.setattr(fs_module.settings, "FMP_API_KEY", "test-key")
+    monkeypatch.setattr(fs_module.fmpsdk, "company_profile", _company_profile, raising=False)
+    monkeypatch.setattr(FundamentalsStore, "fetch_yfinance_profile", staticmethod(lambda s: {}))
+
+    db_session.add(
+        SymbolFundamentals(
+            symbol="FRESH",
+            sector="Energy",
+            market_cap=5.0,
+            source="fmp",
+            refreshed_at=datetime.now(timezone.utc),
+        )
+    )
+    db_session.add(
+        SymbolFundamentals(
+            symbol="OLD",
+            name="Old Co",
+            sector="Utilities",
+            source="fmp",
+            refreshed_at=datetime.now(timezone.utc) - timedelta(days=30),
+        )
+    )
+    db_session.commit()
+
+    store = FundamentalsStore(ttl=timedelta(days=7), batch_size=2)
+    res = store.refresh(db_session, ["aaa", "BBB", "FRESH", "OLD", "ZZZ"])
+
+    assert res["stale"] == 4 and res["fmp"] == 3 and res["missing"] == 1
+    assert calls == [["AAA", "BBB"], ["OLD", "ZZZ"]]  # FRESH skipped, 2 symbols per request
+
+    loaded = store.load(db_session, ["AAA", "OLD", "FRESH", "ZZZ"])
+    assert loaded["AAA"]["sector"] == "Technology"
+    assert loaded["OLD"]["name"] == "OLD Inc"
+    assert loaded["FRESH"]["sector"] == "Energy"
+    assert "ZZZ" not in loaded
+
+    # Re-running inside the TTL only retries the symbol that is still missing
+    calls.clear()
+    store.refresh(db_session, ["AAA", "BBB", "FRESH", "OLD", "ZZZ"])
+    assert calls == [["ZZZ"]]
+
+
+def test_snapshot_from_db_never_calls_providers(db_session, monkeypatch):
+    from backend.services.market.market_data_service import market_data_service
+
+    def _network(*args, **kwargs):
+        raise AssertionError("provider call in snapshot hot path")
+
+    monkeypatch.setattr(market_data_service, "get_fundamentals_info", _network)
+
+    dates = [datetime(2026, 1, 1) + timedelta(days=i) for i in range(60)]
+    df = pd.DataFrame(
+        {"Open": 10.0, "High": 11.0, "Low": 9.0, "Close": [10.0 + i * 0.1 for i in range(60)], "Volume": 100},
+        index=pd.DatetimeIndex(dates),
+    )
+    market_data_service.persist_price_bars(db_session, "FUND", df, interval="1d", data_source="test", is_adjusted=True)
+    market_data_service.persist_price_bars(db_session, "BARE", df, interval="1d", data_source="test", is_adjusted=True)
+    db_session.add(SymbolFundamentals(symbol="FUND", name="Fund Co", sector="Health Care", market_cap=7.0))
+    db_session.add(
+        MarketSnapshot(
+            symbol="FUND",
+            analysis_type="technical_snapshot",
+            expiry_timestamp=datetime.utcnow() + timedelta(hours=1),
+            sector="Stale Sector",
+        )
+    )
+    db_session.commit()
+
+    snap = market_data_service.compute_snapshot_from_db(db_session, "FUND")
+    assert snap["sector"] == "Health Care" and snap["name"] == "Fund Co"
+
+    bare = market_data_service.compute_snapshot_from_db(db_session, "BARE")
+    assert bare and bare.get("sector") is None
@@ -0,0 +1,106 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.models.market_data import JobRun
+from backend.services import job_history as job_history_module
+from backend.services.job_history import JobHistoryService, decode_cursor, encode_cursor
+
+
+def _seed(db_session, now):
+    # jh_fast: 10 runs of 1..10s; jh_slow: 3 runs, last one failed
+    for i in range(10):
+        started = now - timedelta(hours=10 - i)
+        db_session.add(
+            JobRun(
+                task_name="jh_fast",
+                status="ok",
+                params={"i": i},
+                counters={"processed": i},
+                started_at=started,
+                finished_at=started + timedelta(seconds=i + 1),
+            )
+        )
+    for i, status in enumerate(["ok", "ok", "error"]):
+        started = now - timedelta(minutes=30 - i)
+        db_session.add(
+            JobRun(
+                task_name="jh_slow",
+                status=status,
+                error="boom" if status == "error" else None,
+                started_at=started,
+                finished_at=started + timedelta(seconds=100),
+            )
+        )
+    # Two runs sharing a start time exercise the id tie-breaker
+    db_session.add(JobRun(task_name="jh_tie", status="running", started_at=now - timedelta(days=1)))
+    db_session.add(JobRun(task_name="jh_tie", status="running", started_at=now - timedelta(days=1)))
+    db_session.flush()
+
+
+def test_cursor_paging_walks_all_runs_once(db_session):
+    now = datetime.utcnow()
+    _seed(db_session, now)
+    svc = JobHistoryService()
+    expected = [
+        r.id
+        for r in db_session.query(JobRun).order_by(JobRun.started_at.desc(), JobRun.id.desc())
+    ]
+
+    seen, cursor = [], None
+    while True:
+        page = svc.page(db_session, cursor=cursor, limit=4, include_payload=False)
+        seen.extend(j["id"] for j in page["jobs"])
+        assert all("params" not in j for j in page["jobs"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == expected
+
+    first = svc.page(db_session, task_name="jh_fast", limit=2)["jobs"][0]
+    assert first["params"] == {"i": 9} and first["duration_s"] == 10.0
+    assert svc.page(db_session, task_name="jh_fast", offset=8, limit=5)["next_cursor"] is None
+    assert [j["id"] for j in svc.page(db_session, status="error")["jobs"]] == [
+        r.id for r in db_session.query(JobRun).filter(JobRun.status == "error")
+    ]
+
+
+def test_count_is_capped_for_filtered_views(db_session, monkeypatch):
+    _seed(db_session, datetime.utcnow())
+    svc = JobHistoryService()
+    assert svc.count(db_session, task_name="jh_fast") == {"total": 10, "estimated": False}
+    monkeypatch.setattr(job_history_module.settings, "JOB_HISTORY_EXACT_COUNT_LIMIT", 5)
+    assert svc.count(db_session, task_name="jh_fast") == {"total": 5, "estimated": True}
+    assert svc.count(db_session, task_name="jh_slow") == {"total": 3, "estimated": False}
+
+
+def test_latest_by_task_and_duration_stats(db_session):
+    now = datetime.utcnow()
+    _seed(db_session, now)
+    svc = JobHistoryService()
+
+    latest = svc.latest_by_task(db_session, ["jh_fast", "jh_slow", "jh_missing"])
+    assert set(latest) == {"jh_fast", "jh_slow"}
+    assert latest["jh_slow"]["status"] == "error"
+    assert latest["jh_fast"]["duration_s"] == 10.0
+    assert svc.latest_by_task(db_session)["jh_slow"] == latest["jh_slow"]
+    assert svc.latest_by_task(db_session, []) == {}
+
+    stats = svc.duration_stats(db_session, since=now - timedelta(hours=12), task_names=["jh_fast", "jh_slow"])
+    fast = stats["jh_fast"]
+    assert (fast["runs"], fast["errors"]) == (10, 0)
+    assert fast["p50_s"] == pytest.approx(5.5)
+    assert fast["p90_s"] == pytest.approx(9.1)
+    assert (fast["mean_s"], fast["max_s"]) == (pytest.approx(5.5), pytest.approx(10.0))
+    assert (stats["jh_slow"]["runs"], stats["jh_slow"]["errors"]) == (3, 1)
+
+    summary = {row["task_name"]: row for row in svc.summary(db_session, since=now - timedelta(hours=12))}
+    assert summary["jh_tie"]["stats"] is None and summary["jh_tie"]["last_run"]["duration_s"] is None
+
+
+@pytest.mark.no_db
+def test_cursor_roundtrip_and_validation():
+    started = datetime(2026, 1, 2, 3, 4, 5)
+    assert decode_cursor(encode_cursor({"started_at": started, "id": 42})) == (started, 42)
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
@@ -1,5 +1,12 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
 from fastapi.testclient import TestClient
+
 from backend.api.main import app
+from backend.database import get_db
+from backend.models.market_data import PriceData
 
 client = TestClient(app, raise_server_exceptions=False)
 
@@ -13,3 +20,78 @@ def test_db_history_empty_ok():
     assert isinstance(data["bars"], list)
 
 
+
+
+@pytest.fixture
+def seeded_5m(db_session):
+    if db_session is None:
+        pytest.skip("DB session unavailable")
+    start = datetime(2024, 1, 2, 14, 30)
+    for i in range(600):
+        px = 100.0 + (i % 50) * 0.1
+        db_session.add(
+            PriceData(
+                symbol="DBH",
+                interval="5m",
+                date=start + timedelta(minutes=5 * i),
+                open_price=px,
+                high_price=px + (5.0 if i == 321 else 0.5),
+                low_price=px - 0.5,
+                close_price=px,
+                volume=100,
+                data_source="test",
+            )
+        )
+    db_session.commit()
+
+    def _override_db():
+        yield db_session
+
+    app.dependency_overrides[get_db] = _override_db
+    yield db_session
+    app.dependency_overrides.pop(get_db, None)
+
+
+def test_db_history_columns_downsampled_to_viewport(seeded_5m):
+    resp = client.get(
+        "/api/v1/market-data/db/history",
+        params={"symbol": "DBH", "interval": "5m", "format": "columns", "max_points": 60},
+    )
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["total"] == 600 and data["count"] == 60 and data["downsample"] == "ohlc"
+    assert len(data["columns"]["time"]) == 60
+    assert max(data["columns"]["high"]) == pytest.approx(107.1)
+    assert sum(data["columns"]["volume"]) == 600 * 100
+
+
+def test_db_history_conditional_request_and_ndjson(seeded_5m):
+    params = {"symbol": "DBH", "interval": "5m"}
+    first = client.get("/api/v1/market-data/db/history", params=params)
+    assert len(first.json()["bars"]) == 600
+    etag = first.headers["etag"]
+
+    again = client.get("/api/v1/market-data/db/history", params=params, headers={"If-None-Match": etag})
+    assert again.status_code == 304
+
+    seeded_5m.add(
+        PriceData(
+            symbol="DBH",
+            interval="5m",
+            date=datetime(2024, 2, 1, 15, 0),
+            open_price=1.0,
+            high_price=1.0,
+            low_price=1.0,
+            close_price=1.0,
+            volume=1,
+            data_source="test",
+        )
+    )
+    seeded_5m.commit()
+    changed = client.get("/api/v1/market-data/db/history", params=params, headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
+
+    streamed = client.get("/api/v1/market-data/db/history", params={**params, "format": "ndjson"})
+    assert streamed.headers["content-type"].startswith("application/x-ndjson")
+    lines = streamed.text.splitlines()
+    assert json.loads(lines[0])["count"] == 601 and len(lines) == 602
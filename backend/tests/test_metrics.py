@@ -0,0 +1,88 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.api.main import app
+from backend.services import metrics
+from backend.services.metrics import Counter, Histogram, provider_call
+
+
+def test_histogram_renders_cumulative_buckets():
+    h = Histogram("t_latency_seconds", "test", ("route",), buckets=(0.1, 1.0))
+    h.observe(0.05, route="/a")
+    h.observe(0.5, route="/a")
+    h.observe(5.0, route="/a")
+    text = h.render()
+    assert "# TYPE t_latency_seconds histogram" in text
+    assert 't_latency_seconds_bucket{route="/a",le="0.1"} 1' in text
+    assert 't_latency_seconds_bucket{route="/a",le="1"} 2' in text
+    assert 't_latency_seconds_bucket{route="/a",le="+Inf"} 3' in text
+    assert 't_latency_seconds_count{route="/a"} 3' in text
+
+
+def test_counter_escapes_label_values():
+    c = Counter("t_total", "test", ("name",))
+    c.inc(name='a"b')
+    assert 't_total{name="a\\"b"} 1' in c.render()
+
+
+def test_provider_call_records_status_and_latency():
+    before_err = metrics.PROVIDER_REQUESTS.value(provider="probe", operation="quote", status="error")
+    with provider_call("probe", "quote") as call:
+        call.empty = True
+    with pytest.raises(RuntimeError):
+        with provider_call("probe", "quote"):
+            raise RuntimeError("boom")
+
+    assert metrics.PROVIDER_REQUESTS.value(provider="probe", operation="quote", status="empty") >= 1
+    assert metrics.PROVIDER_REQUESTS.value(provider="probe", operation="quote", status="error") == before_err + 1
+    assert metrics.PROVIDER_REQUEST_DURATION.count(provider="probe", operation="quote") >= 2
+
+
+def test_shared_histogram_aggregates_across_processes(monkeypatch, fake_redis):
+    monkeypatch.setattr(metrics, "_redis", lambda: fake_redis)
+    worker = Histogram("t_task_seconds", "test", ("task", "status"), buckets=(10.0,), shared=True, flush_seconds=0)
+    api = Histogram("t_task_seconds", "test", ("task", "status"), buckets=(10.0,), shared=True, flush_seconds=0)
+    worker.observe(3.0, task="probe", status="ok")
+    worker.observe(30.0, task="probe", status="ok")
+
+    # Another process renders the totals
+    text = api.render()
+    assert 't_task_seconds_bucket{task="probe",status="ok",le="10"} 1' in text
+    assert 't_task_seconds_bucket{task="probe",status="ok",le="+Inf"} 2' in text
+    assert 't_task_seconds_sum{task="probe",status="ok"} 33' in text
+
+
+def test_shared_counter_buffers_until_flush(monkeypatch, fake_redis):
+    monkeypatch.setattr(metrics, "_redis", lambda: fake_redis)
+    a = Counter("t_shared_total", "test", ("name",), shared=True, flush_seconds=3600)
+    b = Counter("t_shared_total", "test", ("name",), shared=True, flush_seconds=3600)
+    a.inc(name="x")  # first write flushes, later ones wait for the interval
+    a.inc(2, name="x")
+    b.inc(name="x")
+    assert fake_redis.store["metrics:t_shared_total"] == {"x|v": 2.0}
+    # a's buffered +2 shows up once it flushes (its own render always does)
+    assert 't_shared_total{name="x"} 2' in b.render()
+    assert 't_shared_total{name="x"} 4' in a.render()
+
+    # Redis down: the local value is reported and deltas are kept for later
+    def _down():
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr(metrics, "_redis", _down)
+    a.inc(name="x")
+    assert 't_shared_total{name="x"} 4' in a.render()
+    monkeypatch.setattr(metrics, "_redis", lambda: fake_redis)
+    a.flush()
+    assert fake_redis.store["metrics:t_shared_total"]["x|v"] == 5.0
+
+
+def test_metrics_endpoint_reports_route_templates(monkeypatch, fake_redis):
+    monkeypatch.setattr(metrics, "_redis", lambda: fake_redis)
+    client = TestClient(app)
+    assert client.get("/health").status_code == 200
+
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain")
+    assert 'quantmatrix_http_request_duration_seconds_count{method="GET",route="/health",status="200"}' in resp.text
+    assert "# TYPE quantmatrix_cache_requests_total counter" in resp.text
@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+import requests
+
+from backend.benchmarks.fake_provider import FakeProviderServer, FaultConfig
+from backend.services.market.market_data_service import APIProvider, MarketDataService
+from backend.services.market import provider_transport
+from backend.services.market.provider_transport import HttpTransport, SdkTransport
+
+
+@pytest.fixture
+def fake_provider():
+    with FakeProviderServer(bars=300) as server:
+        yield server
+
+
+@pytest.mark.no_db
+def test_http_transport_serves_deterministic_history(fake_provider):
+    transport = HttpTransport(fake_provider.url, pool_size=2)
+    svc = MarketDataService(transport=transport)
+
+    df = svc._get_historical_fmp_sync("SYN0001", "1y", "1d")
+    again = svc._get_historical_fmp_sync("SYN0001", "1y", "1d")
+    assert len(df) == 300
+    assert list(df.columns) == ["Open", "High", "Low", "Close", "Volume"]
+    assert df.index[0] > df.index[-1]  # newest first
+    assert df.equals(again)
+
+    intraday = svc._get_historical_fmp_5m_sync("SYN0001", "5d")
+    assert intraday is not None and not intraday.empty
+
+    assert transport.quote("SYN0001,SYN0002")[1]["symbol"] == "SYN0002"
+    assert len(transport.index_constituents("dowjones_constituent")) == 30
+    assert svc.get_fundamentals_info("SYN0003")["sector"]
+    assert fake_provider.stats["endpoints"]["historical-price-full"] == 2
+
+
+@pytest.mark.no_db
+def test_http_transport_is_exclusive_and_sdk_keeps_fallbacks(fake_provider):
+    svc = MarketDataService(transport=HttpTransport(fake_provider.url))
+    assert svc._provider_priority("historical_data") == [APIProvider.FMP]
+    assert svc._is_provider_available(APIProvider.FMP)
+
+    sdk = MarketDataService(transport=SdkTransport())
+    assert APIProvider.YFINANCE in sdk._provider_priority("historical_data")
+
+
+@pytest.mark.no_db
+def test_rate_limit_bursts_surface_status_and_are_retried(fake_provider):
+    fake_provider.configure(burst_every=3, burst_length=2)
+    transport = HttpTransport(fake_provider.url)
+    svc = MarketDataService(transport=transport)
+
+    transport.historical_price_full("SYN0001")
+    with pytest.raises(requests.HTTPError) as excinfo:
+        transport.historical_price_full("SYN0001")
+    assert svc._extract_http_status(excinfo.value) == 429
+
+    df = asyncio.run(
+        svc._call_blocking_with_retries(
+            svc._get_historical_fmp_sync, "SYN0002", "1y", "1d", attempts=3, max_delay_seconds=0.0
+        )
+    )
+    assert len(df) == 300
+    assert fake_provider.stats["status"] == {"200": 2, "429": 2}
+
+
+@pytest.mark.no_db
+def test_error_rate_injects_server_errors():
+    with FakeProviderServer(faults=FaultConfig(error_rate=1.0)) as server:
+        transport = HttpTransport(server.url)
+        with pytest.raises(requests.HTTPError) as excinfo:
+            transport.company_profile("SYN0001")
+    assert excinfo.value.response.status_code in (500, 502, 503)
+
+
+@pytest.mark.no_db
+def test_http_transport_to_real_fmp_keeps_fallbacks():
+    assert HttpTransport(pool_size=1).exclusive is False
+
+
+
+@pytest.mark.no_db
+def test_default_transport_stays_sdk_with_fmp_key(monkeypatch):
+    settings = provider_transport.settings
+    monkeypatch.setattr(settings, "MARKET_PROVIDER_TRANSPORT", "sdk")
+    monkeypatch.setattr(settings, "FMP_API_KEY", "key")
+    assert isinstance(provider_transport.build_provider_transport(), SdkTransport)
+    monkeypatch.setattr(settings, "MARKET_PROVIDER_TRANSPORT", "HTTP")
+    assert isinstance(provider_transport.build_provider_transport(), HttpTransport)
@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from backend.models.market_data import MarketSnapshotHistory, PriceData
+from backend.services.analysis.screen_backtest import ScreenBacktester, expression_fields
+
+
+def _seed(db_session):
+    start = datetime(2026, 1, 5)
+    dates = [start + timedelta(days=i) for i in range(8)]
+    closes = {
+        "AAA": [10, 11, 12, 13, 14, 15, 16, 17],
+        "BBB": [20, 19, 18, 17, 16, 15, 14, 13],
+        "CCC": [30, 30, 30, 30, 30, 30, 30, 30],
+    }
+    for sym, series in closes.items():
+        for i, d in enumerate(dates):
+            db_session.add(
+                PriceData(
+                    symbol=sym, interval="1d", date=d, open_price=series[i], high_price=series[i],
+                    low_price=series[i], close_price=series[i], volume=1, data_source="test",
+                )
+            )
+            db_session.add(
+                MarketSnapshotHistory(
+                    symbol=sym,
+                    analysis_type="technical_snapshot",
+                    as_of_date=d,
+                    stage_label="2" if sym != "CCC" else "1",
+                    # BBB is extended (atrx >= 4) on the first half of the window
+                    atrx_sma_50={"AAA": 1.0, "BBB": 5.0 if i < 4 else 2.0, "CCC": 0.5}[sym],
+                    current_price=series[i],
+                )
+            )
+    db_session.commit()
+    return dates, closes
+
+
+def test_screen_replay_hit_rates_and_equity(db_session):
+    dates, closes = _seed(db_session)
+    bt = ScreenBacktester()
+
+    res = bt.run(db_session, 'stage_label == "2" & atrx_sma_50 < 4', horizons=[1, 3])
+
+    assert res.dates == 8 and res.symbols == 3
+    # AAA on all 8 dates, BBB on the last 4
+    assert res.signals == 12
+    # 1-session horizon: last date has no forward bar
+    h1 = res.horizons[1]
+    assert h1["signals"] == 7 + 3
+    assert h1["hit_rate"] == pytest.approx(7 / 10)
+    expected = [closes["AAA"][i + 1] / closes["AAA"][i] - 1 for i in range(7)]
+    expected += [closes["BBB"][i + 1] / closes["BBB"][i] - 1 for i in range(4, 7)]
+    assert h1["avg_return"] == pytest.approx(np.mean(expected))
+    assert res.horizons[3]["signals"] == 5 + 1
+
+    first_day = closes["AAA"][1] / closes["AAA"][0] - 1
+    assert res.equity_curve[0]["equity"] == pytest.approx(1 + first_day)
+    assert res.signals_per_date[0]["count"] == 1 and res.signals_per_date[-1]["count"] == 2
+
+    # Panel is served from the in-process cache until the ledger changes
+    calls = []
+    real = db_session.execute
+
+    def _spy(stmt, *a, **k):
+        calls.append(str(stmt))
+        return real(stmt, *a, **k)
+
+    db_session.execute = _spy
+    try:
+        bt.load_ledger(db_session, ["atrx_sma_50", "stage_label"])
+    finally:
+        del db_session.execute
+    assert not any("market_snapshot_history.atrx_sma_50" in c for c in calls)
+
+
+def test_expression_validation():
+    assert expression_fields("rs_mansfield_pct > 0 | range_pos_52w >= 80") == ["rs_mansfield_pct", "range_pos_52w"]
+    with pytest.raises(ValueError):
+        expression_fields("not_a_field > 1")
+    with pytest.raises(ValueError):
+        expression_fields("__import__('os').system('x')")
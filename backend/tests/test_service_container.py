@@ -0,0 +1,60 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.api.main import app
+from backend.services.market import market_data_service as mds
+from backend.services.market.provider_transport import ProviderTransport, get_provider_transport, set_provider_transport
+from backend.services.market.service_container import (
+    get_market_data_service,
+    market_data_container,
+    redis_pool,
+)
+
+
+class _ClosingTransport(ProviderTransport):
+    name = "probe"
+
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.mark.no_db
+def test_service_instances_share_one_redis_pool():
+    a, b = mds.MarketDataService(), mds.MarketDataService()
+    assert a.redis_client.connection_pool is b.redis_client.connection_pool
+    assert a.redis_client.connection_pool is redis_pool()
+    assert get_market_data_service() is mds.market_data_service
+
+
+@pytest.mark.no_db
+def test_routes_reuse_the_shared_service(monkeypatch):
+    def _no_new_instances(self, *args, **kwargs):
+        raise AssertionError("routes must use get_market_data_service()")
+
+    monkeypatch.setattr(mds.MarketDataService, "__init__", _no_new_instances)
+    monkeypatch.setattr(mds.MarketDataService, "get_db_history_marker", lambda self, db, **kw: (None, 0))
+    client = TestClient(app)
+    resp = client.get("/api/v1/market-data/db/history", params={"symbol": "ZZZZ"})
+    assert resp.status_code == 200
+
+
+@pytest.mark.no_db
+def test_container_shutdown_releases_connections_and_reconnects():
+    probe = _ClosingTransport()
+    previous = set_provider_transport(probe)
+    try:
+        market_data_container.startup()
+        assert market_data_container.started
+        pool = redis_pool()
+        market_data_container.shutdown()
+
+        assert probe.closed and not market_data_container.started
+        assert mds.market_data_service._redis_client is None
+        # Next use lazily rebuilds the pool and transport from settings.
+        assert mds.market_data_service.redis_client.connection_pool is not pool
+        assert get_provider_transport() is not probe
+    finally:
+        set_provider_transport(previous)
@@ -0,0 +1,98 @@
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.models.market_data import MarketSnapshotHistory
+from backend.services.market import snapshot_query
+
+D1 = datetime(2026, 2, 2)
+D2 = datetime(2026, 2, 9)
+
+
+def _seed(db_session):
+    rows = [
+        # symbol, date, stage, rs, price
+        ("AAA", D1, "1", 5.0, 10.0),
+        ("AAA", D2, "2", 8.0, 12.0),
+        ("BBB", D1, "2", -1.0, 20.0),
+        ("BBB", D2, "2", 2.0, 21.0),
+        ("CCC", D1, "3", None, 30.0),
+        ("CCC", D2, "4", -6.0, 25.0),
+        ("DDD", D2, "2", 3.0, 40.0),
+    ]
+    for sym, d, stage, rs, px in rows:
+        db_session.add(
+            MarketSnapshotHistory(
+                symbol=sym,
+                analysis_type="technical_snapshot",
+                as_of_date=d,
+                stage_label=stage,
+                rs_mansfield_pct=rs,
+                current_price=px,
+            )
+        )
+    db_session.commit()
+
+
+def test_cross_section_projection_filters_and_keyset(db_session):
+    _seed(db_session)
+
+    latest = snapshot_query.cross_section(db_session, fields=["stage_label", "rs_mansfield_pct"], limit=2)
+    assert latest["as_of_date"] == D2
+    assert latest["columns"] == ["symbol", "stage_label", "rs_mansfield_pct"]
+    assert [r["symbol"] for r in latest["rows"]] == ["AAA", "BBB"]
+    assert latest["next_cursor"] == "BBB"
+
+    page2 = snapshot_query.cross_section(
+        db_session, D2, fields=["stage_label"], cursor=latest["next_cursor"], limit=2
+    )
+    assert [r["symbol"] for r in page2["rows"]] == ["CCC", "DDD"]
+    assert page2["next_cursor"] is None
+
+    screened = snapshot_query.cross_section(
+        db_session, D2, fields=["current_price"], filters=["stage_label:eq:2", "rs_mansfield_pct:gt:2.5"]
+    )
+    assert [r["symbol"] for r in screened["rows"]] == ["AAA", "DDD"]
+
+    nulls = snapshot_query.cross_section(db_session, D1, filters=["rs_mansfield_pct:isnull"])
+    assert [r["symbol"] for r in nulls["rows"]] == ["CCC"]
+
+    with pytest.raises(ValueError):
+        snapshot_query.cross_section(db_session, D2, fields=["not_a_column"])
+    with pytest.raises(ValueError):
+        snapshot_query.cross_section(db_session, D2, filters=["rs_mansfield_pct:gt:abc"])
+
+
+def test_stage_transitions_endpoint(db_session):
+    from backend.api.dependencies import get_optional_user
+    from backend.api.main import app
+    from backend.api.routes import market_data as routes
+
+    _seed(db_session)
+
+    res = snapshot_query.stage_transitions(db_session, D1, D2)
+    assert [(r["symbol"], r["stage_from"], r["stage_to"]) for r in res["rows"]] == [
+        ("AAA", "1", "2"),
+        ("CCC", "3", "4"),
+    ]
+
+    app.dependency_overrides[get_optional_user] = lambda: None
+    app.dependency_overrides[routes.get_db] = lambda: db_session
+    try:
+        client = TestClient(app)
+        resp = client.get(
+            "/api/v1/market-data/technical/cross-section/stage-transitions",
+            params={"from_date": "2026-02-02", "to_date": "2026-02-09", "to_stage": "2", "fields": "rs_mansfield_pct"},
+        )
+        assert resp.status_code == 200
+        body = resp.json()
+        assert body["rows"] == [
+            {"symbol": "AAA", "rs_mansfield_pct": 8.0, "stage_from": "1", "stage_to": "2"}
+        ]
+
+        bad = client.get("/api/v1/market-data/technical/cross-section", params={"filter": "sma_50:between:1"})
+        assert bad.status_code == 400
+    finally:
+        app.dependency_overrides.pop(routes.get_db, None)
+        app.dependency_overrides.pop(get_optional_user, None)
@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.services.market.indicator_engine import (
+    classify_ma_bucket_from_ma,
+    compute_core_indicators_series,
+)
+from backend.services.market.snapshot_history import (
+    compute_history_frame,
+    history_rows,
+    iter_insert_batches,
+    ohlcv_frame_from_rows,
+)
+
+
+def _rows(n: int, seed: int, start: datetime = datetime(2024, 1, 1)):
+    rng = np.random.default_rng(seed)
+    close = 50 + np.cumsum(rng.normal(0, 1, n))
+    out = []
+    for i in range(n):
+        c = float(close[i])
+        # Sprinkle missing highs/lows to exercise the close fallback.
+        high = None if i % 17 == 0 else c + 1.0
+        out.append((start + timedelta(days=i), c - 0.2, high, c - 1.0, c, 1000 + i))
+    return out
+
+
+def test_history_rows_match_scalar_materialization():
+    df = ohlcv_frame_from_rows(_rows(320, 7))
+    spy = ohlcv_frame_from_rows(_rows(320, 11))
+    frame = compute_history_frame(df, spy)
+    wanted = list(df.index[-30:])
+    rows = history_rows(frame, "AAA", dates=wanted)
+
+    assert len(rows) == 30
+    assert len({tuple(r) for r in rows}) == 1  # identical key sets for a multi-row INSERT
+    assert "price" not in rows[0]
+
+    core = compute_core_indicators_series(df)
+    for r in rows:
+        d = pd.Timestamp(r["as_of_date"])
+        assert r["current_price"] == pytest.approx(df.loc[d, "Close"])
+        assert r["atr_value"] == pytest.approx(core.loc[d, "atr_14"])
+        assert r["sma_200"] == pytest.approx(core.loc[d, "sma_200"])
+        hi = df["High"].rolling(20).max().loc[d]
+        lo = df["Low"].rolling(20).min().loc[d]
+        assert r["range_pos_20d"] == pytest.approx((df.loc[d, "Close"] - lo) / (hi - lo) * 100.0)
+        ma = {"price": float(df.loc[d, "Close"])}
+        for k in ("sma_5", "sma_8", "sma_21", "sma_50", "sma_100", "sma_200"):
+            ma[k] = float(core.loc[d, k])
+        assert r["ma_bucket"] == classify_ma_bucket_from_ma(ma)["bucket"]
+        assert isinstance(r["stage_label"], str)
+
+    pos = {d: i for i, d in enumerate(frame.index)}
+    for r in rows:
+        prior = frame["stage_label"].iloc[pos[pd.Timestamp(r["as_of_date"])] - 5]
+        assert r["stage_label_5d_ago"] == prior
+
+
+def test_history_rows_nan_to_none_and_batches():
+    df = ohlcv_frame_from_rows(_rows(10, 3))
+    frame = compute_history_frame(df)
+    rows = history_rows(frame, "BBB")
+
+    assert len(rows) == 10
+    first = rows[0]
+    assert first["sma_200"] is None and first["range_pos_52w"] is None
+    assert first["ma_bucket"] == "UNKNOWN"
+    assert "stage_label" not in first  # no benchmark supplied
+    assert isinstance(first["current_price"], float)
+    assert [len(b) for b in iter_insert_batches(rows, 4)] == [4, 4, 2]
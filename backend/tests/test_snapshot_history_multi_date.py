@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from backend.models.market_data import MarketSnapshotHistory, PriceData
+
+
+def _seed_bars(db_session, symbol: str, dates: list[datetime], seed: int) -> None:
+    rng = np.random.default_rng(seed)
+    close = 80 + np.cumsum(rng.normal(0, 1.5, len(dates)))
+    for i, d in enumerate(dates):
+        c = float(close[i])
+        # Every 40th bar gaps up to exercise the chart metrics.
+        bump = 3.0 if i % 40 == 0 else 0.0
+        db_session.add(
+            PriceData(
+                symbol=symbol,
+                interval="1d",
+                date=d,
+                open_price=c + bump,
+                high_price=c + bump + 1.0,
+                low_price=c + bump - 0.5,
+                close_price=c + bump,
+                volume=1000 + i,
+                data_source="test",
+            )
+        )
+
+
+def test_backfill_for_dates_matches_single_date_snapshots(db_session, monkeypatch):
+    from backend.tasks import market_data_tasks
+
+    svc = market_data_tasks.market_data_service
+    monkeypatch.setattr(market_data_tasks, "SessionLocal", lambda: db_session)
+    monkeypatch.setattr(svc.redis_client, "get", lambda key: b'["AAA"]' if key == "tracked:all" else None)
+    monkeypatch.setattr(svc, "get_fundamentals_info", lambda symbol: {})
+
+    start = datetime(2025, 1, 1)
+    dates = [start + timedelta(days=i) for i in range(330) if (start + timedelta(days=i)).weekday() < 5]
+    _seed_bars(db_session, "AAA", dates, seed=5)
+    _seed_bars(db_session, "SPY", dates, seed=9)
+    db_session.commit()
+
+    wanted = [dates[-1], dates[-3], dates[-7]]
+    expected = {d: svc.compute_snapshot_from_db(db_session, "AAA", as_of_dt=d) for d in wanted}
+
+    def _no_single_date(*args, **kwargs):
+        raise AssertionError("per-date snapshot computation in multi-date backfill")
+
+    monkeypatch.setattr(svc, "compute_snapshot_from_db", _no_single_date)
+    res = market_data_tasks.backfill_snapshot_history_for_date(
+        as_of_dates=[d.date().isoformat() for d in wanted]
+    )
+    assert res["status"] == "ok"
+    assert res["processed_ok"] == 1
+    assert res["upserted"] == 3
+
+    rows = {
+        r.as_of_date: r
+        for r in db_session.query(MarketSnapshotHistory).filter(MarketSnapshotHistory.symbol == "AAA")
+    }
+    assert set(rows) == set(wanted)
+    for d in wanted:
+        row, snap = rows[d], expected[d]
+        for key in (
+            "current_price",
+            "sma_50",
+            "sma_200",
+            "rsi",
+            "atr_14",
+            "atr_value",
+            "atr_distance",
+            "range_pos_20d",
+            "range_pos_52w",
+            "perf_1d",
+            "perf_20d",
+            "perf_mtd",
+            "perf_ytd",
+            "ema_21",
+            "pct_dist_ema21",
+        ):
+            assert getattr(row, key) == pytest.approx(snap[key]), key
+        for key in ("ma_bucket", "td_buy_setup", "td_sell_setup", "gaps_unfilled_up", "trend_up_count"):
+            assert getattr(row, key) == snap[key], key
+        assert row.stage_label in {"1", "2", "3", "4", "UNKNOWN"}
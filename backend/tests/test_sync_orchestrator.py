@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+
+from backend.models import User, BrokerAccount
+from backend.models.broker_account import BrokerType, AccountType, SyncStatus
+from backend.services.portfolio.sync_orchestrator import SyncOrchestrator
+
+
+class _FakeBrokerSync:
+    """Records concurrency per broker while pretending each sync takes a while."""
+
+    def __init__(self, accounts_by_id: dict, delay: float = 0.05):
+        self.accounts_by_id = accounts_by_id
+        self.delay = delay
+        self.active: dict = {}
+        self.peak: dict = {}
+
+    async def sync_account_async(self, account_id, db=None, sync_type="comprehensive"):
+        broker = self.accounts_by_id[account_id]
+        self.active[broker] = self.active.get(broker, 0) + 1
+        self.peak[broker] = max(self.peak.get(broker, 0), self.active[broker])
+        await asyncio.sleep(self.delay)
+        self.active[broker] -= 1
+        if broker == BrokerType.SCHWAB:
+            return {"status": "error", "error": "boom"}
+        return {"status": "success"}
+
+
+def _make_accounts(db_session, spec):
+    user = User(email="orch@quantmatrix.com", username="orchuser", full_name="Orch User")
+    db_session.add(user)
+    db_session.commit()
+    accounts = []
+    for i, broker in enumerate(spec):
+        acct = BrokerAccount(
+            user_id=user.id,
+            account_number=f"ORCH_{broker.value}_{i}",
+            account_name=f"Orch {i}",
+            broker=broker,
+            account_type=AccountType.TAXABLE,
+            sync_status=SyncStatus.QUEUED,
+        )
+        db_session.add(acct)
+        accounts.append(acct)
+    db_session.commit()
+    return user, accounts
+
+
+@pytest.mark.asyncio
+async def test_orchestrator_runs_in_parallel_with_per_broker_caps(db_session):
+    spec = [BrokerType.IBKR] * 4 + [BrokerType.TASTYTRADE] * 2 + [BrokerType.SCHWAB]
+    user, accounts = _make_accounts(db_session, spec)
+    fake = _FakeBrokerSync({a.id: a.broker for a in accounts})
+    orch = SyncOrchestrator(
+        broker_sync=fake,
+        concurrency={BrokerType.IBKR: 2, BrokerType.TASTYTRADE: 4, BrokerType.SCHWAB: 1},
+        stagger_seconds={BrokerType.IBKR: 0.0},
+    )
+
+    report = await orch.sync_accounts(user_id=user.id, db=db_session)
+
+    assert report["accounts"] == 7
+    assert report["succeeded"] == 6
+    assert report["failed"] == 1
+    assert report["status"] == "partial"
+    assert fake.peak[BrokerType.IBKR] == 2
+    assert fake.peak[BrokerType.TASTYTRADE] == 2
+    # 4 IBKR accounts at cap 2 => ~2 rounds, not 7 serial syncs
+    assert report["wall_seconds"] < report["serial_seconds"]
+    assert len(report["timings"]) == 7
+    assert all("duration_s" in t for t in report["timings"])
+    assert set(report["results"].keys()) == {
+        f"{a.broker.value}_{a.account_number}" for a in accounts
+    }
+
+
+@pytest.mark.asyncio
+async def test_orchestrator_staggers_ibkr_starts(db_session):
+    user, accounts = _make_accounts(db_session, [BrokerType.IBKR] * 3)
+    fake = _FakeBrokerSync({a.id: a.broker for a in accounts}, delay=0.0)
+    orch = SyncOrchestrator(
+        broker_sync=fake,
+        concurrency={BrokerType.IBKR: 3},
+        stagger_seconds={BrokerType.IBKR: 0.05},
+    )
+
+    report = await orch.sync_accounts(broker=BrokerType.IBKR, user_id=user.id, db=db_session)
+
+    offsets = sorted(t["started_offset_s"] for t in report["timings"])
+    assert offsets[1] - offsets[0] >= 0.04
+    assert offsets[2] - offsets[1] >= 0.04
@@ -0,0 +1,98 @@
+import time
+
+from sqlalchemy import text
+
+from backend.models import JobRun
+from backend.services.tracing import RunTrace, SamplingProfiler, add_rows, span
+from backend.tasks import task_utils
+from backend.tasks.schedule_metadata import ProfileConfig, ScheduleMetadata
+from backend.tasks.task_utils import task_run
+
+
+def test_spans_aggregate_nested_stages_rows_and_queries(db_session):
+    db_session.execute(text("SELECT 1"))  # connection checkout is not attributed to a stage
+    trace = RunTrace()
+    with trace.activate():
+        for _ in range(2):
+            with span("load") as sp:
+                db_session.execute(text("SELECT 1"))
+                sp.add_rows(10)
+                with span("parse"):
+                    add_rows(3)
+
+    stages = trace.summary()
+    assert stages["load"]["calls"] == 2
+    assert stages["load"]["rows"] == 20
+    assert stages["load"]["queries"] == 2
+    assert stages["load/parse"] == {**stages["load/parse"], "calls": 2, "rows": 6, "queries": 0}
+    assert stages["load"]["wall_s"] >= stages["load/parse"]["wall_s"]
+
+
+def test_span_is_noop_without_active_trace():
+    @span("work")
+    def work():
+        add_rows(5)
+        return 7
+
+    assert work() == 7
+    trace = RunTrace()
+    with trace.activate():
+        assert work() == 7
+    assert trace.summary()["work"]["rows"] == 5
+
+
+def test_sampling_profiler_emits_folded_stacks():
+    def busy_loop():
+        deadline = time.perf_counter() + 0.1
+        while time.perf_counter() < deadline:
+            pass
+
+    profiler = SamplingProfiler(interval_s=0.002).start()
+    busy_loop()
+    profiler.stop()
+
+    assert profiler.samples > 0
+    line = profiler.folded().splitlines()[0]
+    stack, count = line.rsplit(" ", 1)
+    assert int(count) > 0
+    assert "busy_loop" in profiler.folded()
+    assert ";" in stack
+
+
+def test_task_run_records_stages_and_opt_in_profile(db_session, monkeypatch):
+    meta = ScheduleMetadata(profile=ProfileConfig(enabled=True, interval_ms=1))
+    monkeypatch.setattr(task_utils, "_active_schedule_metadata", lambda: meta)
+    monkeypatch.setattr(task_utils, "_emit_alerts", lambda **_: None)
+
+    @task_run("tracing_probe")
+    def probe():
+        with span("compute", rows=4):
+            time.sleep(0.03)
+        return {"status": "ok", "processed": 4}
+
+    assert probe()["processed"] == 4
+
+    job = db_session.query(JobRun).filter(JobRun.task_name == "tracing_probe").order_by(JobRun.id.desc()).first()
+    assert job.counters["processed"] == 4
+    assert job.counters["stages"]["compute"]["rows"] == 4
+    assert job.counters["stages"]["compute"]["wall_s"] > 0
+    assert job.profile and "probe" in job.profile
+
+
+def test_task_run_stores_nonfatal_error_summary(db_session, monkeypatch):
+    monkeypatch.setattr(task_utils, "_emit_alerts", lambda **_: None)
+
+    @task_run("nonfatal_error_probe")
+    def probe():
+        return {"status": "ok", "processed": 2, "error": "Sample errors:\n- AAA: no data"}
+
+    probe()
+    job = (
+        db_session.query(JobRun)
+        .filter(JobRun.task_name == "nonfatal_error_probe")
+        .order_by(JobRun.id.desc())
+        .first()
+    )
+    assert job.status == "ok"
+    assert job.error == "Sample errors:\n- AAA: no data"
+    assert job.counters["processed"] == 2
@@ -0,0 +1,105 @@
+import json
+import queue
+
+from backend.services.market.universe import TrackedUniverse
+
+
+def test_publish_bumps_version_only_on_membership_change(fake_redis):
+    r = fake_redis
+    tu = TrackedUniverse(use_pubsub=False)
+
+    first = tu.publish(r, ["msft", "AAPL", "AAPL"])
+    assert first == {"version": 1, "symbols": 2, "added": ["AAPL", "MSFT"], "removed": []}
+    assert json.loads(r.store["tracked:all"]) == ["AAPL", "MSFT"]
+    assert r.published == [("tracked:invalidate", "1")]
+
+    same = tu.publish(r, ["AAPL", "MSFT"])
+    assert same["version"] == 1
+    assert json.loads(r.store["tracked:new"]) == []
+    assert len(r.published) == 1
+
+    nxt = tu.publish(r, ["AAPL", "NVDA"])
+    assert nxt["version"] == 2
+    assert nxt["added"] == ["NVDA"] and nxt["removed"] == ["MSFT"]
+
+
+def test_get_serves_cached_tuple_until_version_changes(fake_redis):
+    r = fake_redis
+    writer = TrackedUniverse(use_pubsub=False)
+    reader = TrackedUniverse(use_pubsub=False)
+    writer.publish(r, ["AAPL", "MSFT"])
+
+    assert reader.get(r) == ("AAPL", "MSFT")
+    r.gets.clear()
+    assert reader.get(r) == ("AAPL", "MSFT")
+    assert r.gets == ["tracked:version"]
+
+    writer.publish(r, ["AAPL"])
+    assert reader.get(r) == ("AAPL",)
+
+
+class _FakePubSub:
+    def __init__(self):
+        self.messages = queue.Queue()
+
+    def subscribe(self, channel):
+        self.channel = channel
+
+    def listen(self):
+        while True:
+            yield self.messages.get()
+
+
+def test_listener_cache_is_trusted_only_after_subscribe_confirmation(fake_redis):
+    r = fake_redis
+    pubsub = _FakePubSub()
+    r.pubsub = lambda: pubsub
+    writer = TrackedUniverse(use_pubsub=False)
+    reader = TrackedUniverse(use_pubsub=True)
+    writer.publish(r, ["AAPL", "MSFT"])
+    assert reader.get(r) == ("AAPL", "MSFT")
+
+    # Published before the subscription is confirmed: the message never reaches the
+    # listener, but readers still validate the version on every read
+    writer.publish(r, ["AAPL"])
+    assert reader.get(r) == ("AAPL",)
+
+    pubsub.messages.put({"type": "subscribe", "channel": "tracked:invalidate", "data": 1})
+    assert reader._subscribed.wait(timeout=2)
+    assert reader.get(r) == ("AAPL",)
+    r.gets.clear()
+    assert reader.get(r) == ("AAPL",)
+    assert r.gets == []
+
+
+def test_get_without_version_parses_legacy_key_every_read(fake_redis):
+    r = fake_redis
+    tu = TrackedUniverse(use_pubsub=False)
+    r.set("tracked:all", json.dumps(["bbb", "AAA"]))
+    assert tu.get(r) == ("AAA", "BBB")
+
+    r.set("tracked:all", json.dumps(["CCC"]))
+    assert tu.get(r) == ("CCC",)
+
+    r.delete("tracked:all")
+    assert tu.get(r) == ()
+
+
+def test_changes_since_nets_deltas_and_flags_expired_history(fake_redis):
+    r = fake_redis
+    tu = TrackedUniverse(use_pubsub=False)
+    tu.publish(r, ["AAA", "BBB"])
+    tu.publish(r, ["AAA", "CCC"])
+    tu.publish(r, ["AAA", "BBB", "DDD"])
+
+    res = tu.changes_since(r, 1)
+    assert res["version"] == 3 and res["complete"] is True
+    assert res["added"] == ["DDD"]
+    assert res["removed"] == []
+
+    assert tu.changes_since(r, 3)["added"] == []
+
+    r.delete("tracked:delta:2")
+    expired = tu.changes_since(r, 1)
+    assert expired["complete"] is False
+    assert expired["added"] == ["AAA", "BBB", "DDD"]
@@ -0,0 +1,109 @@
+import json
+from datetime import date, datetime, time, timedelta
+
+import pytest
+
+from backend.models.market_data import MarketSnapshot, MarketSnapshotHistory
+from backend.services.market.universe import TRACKED_ALL_KEY, tracked_universe
+from backend.services.market.universe_digest import UniverseDigestService, format_discord
+
+SYMBOLS = ["DGA", "DGB", "DGC", "DGD"]
+
+
+@pytest.fixture
+def digest_service(fake_redis):
+    fake_redis.store[TRACKED_ALL_KEY] = json.dumps(SYMBOLS)
+    tracked_universe.invalidate()
+    yield UniverseDigestService(redis_client=fake_redis)
+    tracked_universe.invalidate()
+
+
+def _history(symbol, day, stage, rs):
+    return MarketSnapshotHistory(
+        symbol=symbol,
+        analysis_type="technical_snapshot",
+        as_of_date=datetime.combine(day, time.min),
+        stage_label=stage,
+        rs_mansfield_pct=rs,
+        current_price=10.0,
+    )
+
+
+def _seed(db_session):
+    now = datetime.utcnow()
+    live = [("DGA", "2A", 15.0), ("DGB", "2A", 30.0), ("DGC", "4", -5.0), ("DGD", None, None)]
+    for sym, stage, rs in live:
+        db_session.add(
+            MarketSnapshot(
+                symbol=sym,
+                analysis_type="technical_snapshot",
+                expiry_timestamp=now + timedelta(hours=12),
+                current_price=10.0,
+                stage_label=stage,
+                rs_mansfield_pct=rs,
+            )
+        )
+    yesterday = date.today() - timedelta(days=1)
+    for sym, stage in [("DGA", "1"), ("DGB", "2A"), ("DGC", "3")]:
+        db_session.add(_history(sym, yesterday, stage, 1.0))
+    for sym, stage in [("DGA", "1"), ("DGB", "1"), ("DGC", "3")]:
+        db_session.add(_history(sym, yesterday - timedelta(days=3), stage, 2.0))
+    db_session.flush()
+    return yesterday
+
+
+def test_live_digest_aggregates_in_sql_and_caches(db_session, digest_service):
+    yesterday = _seed(db_session)
+
+    digest = digest_service.get(db_session)
+    assert digest["source"] == "snapshot" and digest["as_of"] == date.today().isoformat()
+    assert (digest["universe"], digest["with_snapshot"]) == (4, 4)
+    assert digest["stage_counts"] == [
+        {"stage": "2A", "count": 2},
+        {"stage": "4", "count": 1},
+        {"stage": "UNKNOWN", "count": 1},
+    ]
+    assert [r["symbol"] for r in digest["top_rs"]] == ["DGB", "DGA", "DGC", "DGD"]
+    transitions = digest["transitions"]
+    assert transitions["previous_as_of"] == yesterday.isoformat()
+    assert sorted((c["from"], c["to"], c["count"]) for c in transitions["counts"]) == [
+        ("1", "2A", 1),
+        ("3", "4", 1),
+    ]
+
+    # Served from the per-date cache until refreshed
+    db_session.query(MarketSnapshot).filter(MarketSnapshot.symbol == "DGD").delete()
+    db_session.flush()
+    assert digest_service.get(db_session, limit=2)["top_rs"] == digest["top_rs"][:2]
+    assert digest_service.get(db_session, refresh=True)["with_snapshot"] == 3
+    digest_service.invalidate()
+    assert digest_service.cache_key() not in digest_service.redis_client.store
+
+
+def test_historical_digest_compares_to_previous_history_date(db_session, digest_service):
+    yesterday = _seed(db_session)
+
+    digest = digest_service.get(db_session, yesterday)
+    assert digest["source"] == "history" and digest["with_snapshot"] == 3
+    assert digest["transitions"]["previous_as_of"] == (yesterday - timedelta(days=3)).isoformat()
+    assert [(c["from"], c["to"]) for c in digest["transitions"]["counts"]] == [("1", "2A")]
+    assert digest_service.cache_key(yesterday) in digest_service.redis_client.store
+
+
+@pytest.mark.no_db
+def test_format_discord():
+    digest = {
+        "generated_at": "2026-01-02T04:00:00Z",
+        "universe": 3,
+        "with_snapshot": 2,
+        "stage_counts": [{"stage": "2A", "count": 2}],
+        "top_rs": [
+            {"symbol": "AAA", "rs_mansfield_pct": 12.34, "stage_label": "2A"},
+            {"symbol": "BBB", "rs_mansfield_pct": None, "stage_label": None},
+        ],
+        "transitions": {"previous_as_of": "2026-01-01", "total": 1, "counts": [{"from": "1", "to": "2A", "count": 1}]},
+    }
+    lines = format_discord(digest, limit=2).splitlines()
+    assert lines[1] == "Universe: 2/3 symbols have snapshots"
+    assert "Stage changes since 2026-01-01: 1" in lines
+    assert lines[-2:] == ["- AAA: RS 12.3% • Stage 2A", "- BBB: RS — • Stage ?"]
@@ -254,6 +254,7 @@ export const activityApi = {
     side?: string;
     limit?: number;
     offset?: number;
+    cursor?: string; // next_cursor from the previous page (preferred over offset)
   }) => {
     const q: string[] = [];
     if (params.accountId) q.push(`account_id=${encodeURIComponent(params.accountId)}`);
@@ -263,7 +264,8 @@ export const activityApi = {
     if (params.category) q.push(`category=${encodeURIComponent(params.category)}`);
     if (params.side) q.push(`side=${encodeURIComponent(params.side)}`);
     q.push(`limit=${encodeURIComponent(String(params.limit ?? 500))}`);
-    q.push(`offset=${encodeURIComponent(String(params.offset ?? 0))}`);
+    if (params.cursor) q.push(`cursor=${encodeURIComponent(params.cursor)}`);
+    else q.push(`offset=${encodeURIComponent(String(params.offset ?? 0))}`);
     const url = `/portfolio/activity?${q.join('&')}`;
     return makeOptimizedRequest(() => api.get(url));
   },